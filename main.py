@@ -1,18 +1,31 @@
 """KShop Streamlit Chat UI - Main application file."""
 
-from typing import Any, Dict, Union, List
+from typing import Any, Dict, Optional, Union, List
 import asyncio
+import time
+import uuid
 
 import streamlit as st
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage
 from langgraph.graph.state import CompiledStateGraph
-from playground.agents.supervisor.graph import make_supervisor_graph as graph
+from playground.agents.supervisor.graph import FINAL_ANSWER_TAG, make_supervisor_graph as graph
+from playground.agents.supervisor.handoff import get_handoff_savings
+from playground.jobs import SUCCEEDED, FAILED, get_job_runner
+from playground.utils.admission import AdmissionRejected, QueuePosition, get_admission_controller
+from playground.utils.cancellation import INTERRUPTED, USER, get_cancellation_registry
+from playground.utils.progress import PROGRESS_EVENT
+from playground.utils.runs import new_run_config
+from playground.utils.session_store import get_session_store, payload_size
+from playground.utils.tracing import trace
 # from playground.agents.supervisor_agent import graph
 # from src.kshop.agents.shopping_agent import graph
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# Minimum seconds between re-renders of one tool's progress line
+PROGRESS_RENDER_INTERVAL = 0.5
+
 # Page config
 st.set_page_config(
     page_title="Agent Playground",
@@ -187,15 +200,92 @@ def init_session_state():
         st.session_state.tool_calls = []
     if "tool_results" not in st.session_state:
         st.session_state.tool_results = []
-    if "message_tools" not in st.session_state:
-        st.session_state.message_tools = {}  # {message_index: {"tool_calls": [], "tool_results": []}}
+    if "thread_id" not in st.session_state:
+        st.session_state.thread_id = str(uuid.uuid4())  # Conversation id; each submission gets its own run id
+    if "background_mode" not in st.session_state:
+        st.session_state.background_mode = False
+    if "active_run" not in st.session_state:
+        st.session_state.active_run = None  # Output of the run being streamed, kept if it is stopped
+    # Tool calls and results per assistant message live in the bounded session store
+    get_session_store().touch(st.session_state.thread_id)
+
+def record_stopped_run() -> None:
+    """Cancel a run whose script run was interrupted and keep its partial output.
+
+    Clicking Stop (or any other widget) while a response streams interrupts the
+    script run; the interrupted run is cancelled and this rerun adds what it had
+    produced to the chat history.
+    """
+    run = st.session_state.active_run
+    if run is None:
+        return
+    st.session_state.active_run = None
+    reason = USER if st.session_state.get("stop_run") else INTERRUPTED
+    get_cancellation_registry().cancel(run["run_id"], reason)
+    note = "_(Stopped - partial answer)_" if reason == USER else "_(Interrupted - partial answer)_"
+    content = f"{run['response']}\n\n{note}" if run["response"] else note
+    st.session_state.messages.append(AIMessage(content=content))
+    get_session_store().put(st.session_state.thread_id, len(st.session_state.messages) - 1, {
+        "tool_calls": run["tool_calls"],
+        "tool_results": run["tool_results"],
+    })
+    st.session_state.streaming_active = False
+
+def to_job_messages(messages: List) -> List[Dict[str, str]]:
+    """Convert chat history to the role/content dicts stored with a background job."""
+    roles = {HumanMessage: "user", AIMessage: "assistant"}
+    return [{"role": roles[type(m)], "content": m.content} for m in messages if type(m) in roles]
+
+def render_jobs_panel() -> None:
+    """List this session's background jobs with their status and results."""
+    jobs = get_job_runner().jobs(owner=st.session_state.thread_id, limit=10)
+    if not jobs:
+        st.caption("No background jobs yet")
+        return
+    icons = {SUCCEEDED: "✅", FAILED: "❌"}
+    for job in jobs:
+        prompt = job.request["messages"][-1]["content"]
+        label = f"{icons.get(job.status, '⏳')} {prompt[:40]}"
+        with st.expander(label, expanded=False):
+            st.caption(f"Job `{job.id[:8]}` · {job.status}")
+            if job.status == SUCCEEDED:
+                st.markdown(job.result.get("response") or "_No response generated_")
+            elif job.status == FAILED:
+                st.error(job.error)
+            else:
+                events = get_job_runner().events(job.id)
+                if events:
+                    latest = events[-1]
+                    st.caption(format_progress(latest) if latest["type"] == "progress"
+                               else f"{latest['type']}: {latest.get('tool', '')}")
 
 async def create_agent() -> CompiledStateGraph:
-    """Create a shopping agent."""
-    return await graph({})
+    """Create a shopping agent.
+
+    The writing agent's answer is streamed as the final answer, instead of the
+    supervisor generating it again after the handoff back.
+    """
+    return await graph({"configurable": {"terminal_agent": "writing_agent"}})
+
+def format_progress(progress: Dict[str, Any]) -> str:
+    """Format a tool progress event, e.g. '12/40 pages · 1.3 MB · ETA 20s'."""
+    parts = []
+    if progress.get("total"):
+        parts.append(f"{progress['done']}/{progress['total']} {progress['unit']}")
+    elif progress.get("done"):
+        parts.append(f"{progress['done']} {progress['unit']}")
+    if progress.get("bytes"):
+        parts.append(f"{progress['bytes'] / 1_000_000:.1f} MB")
+    parts.append(f"{progress['elapsed']:.0f}s elapsed")
+    if progress.get("eta") is not None:
+        parts.append(f"ETA {progress['eta']:.0f}s")
+    if progress.get("message"):
+        parts.append(progress["message"])
+    return " · ".join(parts)
 
-def render_tool_call(tool_call: Dict[str, Any], tool_id: str, is_live: bool = False) -> None:
-    """Render a tool call with collapsible formatting."""
+def render_tool_call(tool_call: Dict[str, Any], tool_id: str, is_live: bool = False,
+                     progress: Optional[Dict[str, Any]] = None) -> None:
+    """Render a tool call with collapsible formatting and its latest progress while running."""
     tool_name = tool_call.get('tool_name', 'Unknown')
     tool_args = tool_call.get('tool_args', {})
     tool_call_id = tool_call.get('tool_call_id', '')
@@ -206,14 +296,23 @@ def render_tool_call(tool_call: Dict[str, Any], tool_id: str, is_live: bool = Fa
     
     # Create collapsible section with status indicator
     status_indicator = "🔄" if is_live else "🔧"
+    # Progress goes in the header too, so it is visible while the expander is collapsed
+    progress_label = f" — {format_progress(progress)}" if is_live and progress else ""
     
-    with st.expander(f"{status_indicator} {tool_name} ({tool_call_id})", expanded=False):
+    with st.expander(f"{status_indicator} {tool_name} ({tool_call_id}){progress_label}", expanded=False):
         st.markdown(f"""
         <div class="tool-call">
             <strong>Tool:</strong> {tool_name}<br>
             <strong>Status:</strong> {'🔄 Running...' if is_live else '✅ Completed'}
         </div>
         """, unsafe_allow_html=True)
+
+        if is_live and progress:
+            total = progress.get("total")
+            if total:
+                st.progress(min(progress["done"] / total, 1.0), text=format_progress(progress))
+            else:
+                st.caption(format_progress(progress))
         
         if tool_args:
             st.markdown("**Parameters:**")
@@ -234,13 +333,33 @@ def render_tool_result(tool_result: Dict[str, Any], tool_id: str) -> None:
         </div>
         """, unsafe_allow_html=True)
         
-        if tool_result.get('content'):
+        content = tool_result.get('content')
+        spilled = tool_result.get('spilled')
+        loaded = False
+        if spilled:
+            # Large results were moved to disk; read them back only when asked for
+            st.caption(f"Full result ({spilled['bytes'] / 1024:,.0f} KB) is stored on disk")
+            if st.checkbox("Load full result", key=f"load_{tool_id}_{spilled['key']}"):
+                content = get_session_store().load(st.session_state.thread_id, spilled["key"])
+                if content is None:
+                    st.caption("_The full result is no longer available_")
+                    content = tool_result.get('content')
+                else:
+                    loaded = True
+
+        if content:
             st.markdown("**Content:**")
-            if isinstance(tool_result['content'], (dict, list)):
-                st.json(tool_result['content'])
+            if isinstance(content, (dict, list)):
+                st.json(content)
+            elif loaded:
+                # The user asked for the whole result: show it untruncated and offer it as a file
+                content = str(content)
+                st.code(content, language=None)
+                st.download_button("Download full result", content, file_name=f"{tool_name}_{tool_call_id}.txt",
+                                   mime="text/plain", key=f"download_{tool_id}_{spilled['key']}")
             else:
                 # Truncate very long text content
-                content = str(tool_result['content'])
+                content = str(content)
                 if len(content) > 2000:
                     st.text(content[:2000] + "...")
                     st.markdown("*Content truncated - expand to see full result*")
@@ -257,12 +376,12 @@ def render_message(message: Union[HumanMessage, AIMessage, ToolMessage], message
         # Render everything within the assistant chat message area
         with st.chat_message("assistant"):
             # First render tool calls and results (they happen before the AI response)
-            if (message_index is not None and 
-                message_index in st.session_state.message_tools and 
+            message_tools = (get_session_store().get(st.session_state.thread_id, message_index)
+                             if message_index is not None else None)
+            if (message_tools and
                 st.session_state.show_tools and
                 not st.session_state.streaming_active):
                 
-                message_tools = st.session_state.message_tools[message_index]
                 
                 # Render tool calls first
                 for i, tool_call in enumerate(message_tools.get("tool_calls", [])):
@@ -276,6 +395,12 @@ def render_message(message: Union[HumanMessage, AIMessage, ToolMessage], message
             
             # Finally render the AI message text
             st.markdown(f'<div class="assistant-message">{message.content}</div>', unsafe_allow_html=True)
+
+            # Context kept out of the supervisor by compact handoffs
+            savings = (message_tools or {}).get("handoff_savings")
+            if savings and savings["saved_tokens"] > 0:
+                st.caption(f"Compact handoffs saved ~{savings['saved_tokens']:,} tokens "
+                           f"({savings['handoffs']} handoffs)")
     
     elif isinstance(message, ToolMessage):
         # Tool messages are handled within AI messages
@@ -291,88 +416,150 @@ async def stream_agent_response(agent: CompiledStateGraph, user_input: str, conv
         
         # Initialize response tracking
         final_response = ""
+        streaming_final_answer = False  # Set once the terminal agent's tokens start arriving
         tool_calls = []
         tool_results = []
+        tool_run_ids = []  # run id of each entry in tool_calls, to attach progress events
+        last_progress_render = {}  # tool index -> time of the last progress re-render
         
         # Stream the response using astream_events for better event handling
-        async for event in agent.astream_events({"messages": messages}, version="v1"):
-            event_type = event.get("event", "")
+        # Each submission is a new run so per-run state (scraped page index etc.) starts fresh
+        run_config = new_run_config(thread_id=st.session_state.thread_id)
+        # Partial output survives an interruption of this script run (see record_stopped_run)
+        active_run = {"run_id": run_config["configurable"]["run_id"], "response": "",
+                      "tool_calls": tool_calls, "tool_results": tool_results}
+        st.session_state.active_run = active_run
+        # Wait for a run slot; the queue position replaces the thinking indicator meanwhile
+        def show_position(position: QueuePosition) -> None:
+            if response_container:
+                with response_container:
+                    st.markdown(f"⏳ **Waiting for a free slot** - position {position.position} of "
+                                f"{position.queued} (waited {position.waited:.0f}s)")
+
+        admission = get_admission_controller().admit(st.session_state.thread_id, on_position=show_position,
+                                                     config=run_config)
+        cancellation = get_cancellation_registry().track(run_config, owner=st.session_state.thread_id)
+        async with admission, cancellation:
+            if response_container:
+                with response_container:
+                    st.markdown("🤔 **Thinking...**")
+            async for event in agent.astream_events({"messages": messages}, config=run_config, version="v2"):
+                event_type = event.get("event", "")
             
-            if event_type == "on_chain_stream":
-                print(f"event : {event}")
-
-            # Handle AI message events (including tool calls)
-            if event_type == "on_chat_model_stream":
-                chunk = event.get("data", {}).get("chunk", {})
-                if hasattr(chunk, 'content') and chunk.content:
-                    final_response += chunk.content
-                    # Update response container in real-time
-                    if response_container:
-                        with response_container:
-                            st.markdown(f'<div class="assistant-message">{final_response}▊</div>', 
-                                      unsafe_allow_html=True)
+                if event_type == "on_chain_stream":
+                    trace("on_chain_stream", run_config, node=event.get("name"))
+
+                # Handle AI message events (including tool calls)
+                if event_type == "on_chat_model_stream":
+                    chunk = event.get("data", {}).get("chunk", {})
+                    # Once the terminal agent answers, its tokens replace anything streamed before
+                    is_final_answer = FINAL_ANSWER_TAG in event.get("tags", [])
+                    if is_final_answer and not streaming_final_answer:
+                        streaming_final_answer = True
+                        final_response = ""
+                    if streaming_final_answer and not is_final_answer:
+                        continue
+                    if hasattr(chunk, 'content') and chunk.content:
+                        final_response += chunk.content
+                        active_run["response"] = final_response
+                        # Update response container in real-time
+                        if response_container:
+                            with response_container:
+                                st.markdown(f'<div class="assistant-message">{final_response}▊</div>', 
+                                          unsafe_allow_html=True)
                     
-            # Handle tool start events
-            elif event_type == "on_tool_start":
-                tool_name = event.get("name", "")
-                tool_input = event.get("data", {}).get("input", {})
-                tool_id = event.get("run_id", "")
+                # Handle tool start events
+                elif event_type == "on_tool_start":
+                    tool_name = event.get("name", "")
+                    tool_input = event.get("data", {}).get("input", {})
+                    tool_id = event.get("run_id", "")
                 
-                # Create tool call object for better display
-                tool_call = {
-                    "tool_name": tool_name,
-                    "tool_args": tool_input,
-                    "tool_call_id": tool_id
-                }
+                    # Create tool call object for better display
+                    tool_call = {
+                        "tool_name": tool_name,
+                        "tool_args": tool_input,
+                        "tool_call_id": tool_id
+                    }
                 
-                # Only add if not already exists and has meaningful name
-                tool_calls.append(tool_call)
+                    # Only add if not already exists and has meaningful name
+                    tool_calls.append(tool_call)
+                    tool_run_ids.append(tool_id)
                 
-                # Display tool call immediately with "running" status
-                if (tool_call_containers is not None and 
-                    len(tool_calls) <= len(tool_call_containers) and 
-                    st.session_state.show_tools):
-                    with tool_call_containers[len(tool_calls) - 1]:
-                        render_tool_call(tool_call, f"streaming_call_{len(tool_calls) - 1}", is_live=True)
+                    # Display tool call immediately with "running" status
+                    if (tool_call_containers is not None and 
+                        len(tool_calls) <= len(tool_call_containers) and 
+                        st.session_state.show_tools):
+                        with tool_call_containers[len(tool_calls) - 1]:
+                            render_tool_call(tool_call, f"streaming_call_{len(tool_calls) - 1}", is_live=True)
             
-            # Handle tool end events (tool results)
-            elif event_type == "on_tool_end":
-                tool_name = event.get("name", "")
-                tool_output = event.get("data", {}).get("output", {})
-                tool_id = event.get("run_id", "")
+                # Handle progress events emitted by long-running tools
+                elif event_type == "on_custom_event" and event.get("name") == PROGRESS_EVENT:
+                    progress = event.get("data", {})
+                    finished = len(tool_results)
+                    # Parallel tool calls can share a run id; match on the tool name among running calls
+                    running = [i for i in range(finished, len(tool_calls))
+                               if tool_calls[i]["tool_name"] == progress.get("tool")]
+                    matching = [i for i in running if tool_run_ids[i] == event.get("run_id")] or running
+                    if not matching:
+                        continue
+                    tool_index = matching[-1]
+                    tool_calls[tool_index]["progress"] = progress
+
+                    # Throttle re-renders so fast-reporting tools don't flood the UI
+                    now = time.monotonic()
+                    if now - last_progress_render.get(tool_index, 0.0) < PROGRESS_RENDER_INTERVAL:
+                        continue
+                    last_progress_render[tool_index] = now
+                    if (tool_call_containers is not None and
+                        tool_index < len(tool_call_containers) and
+                        st.session_state.show_tools):
+                        with tool_call_containers[tool_index]:
+                            render_tool_call(tool_calls[tool_index], f"streaming_call_{tool_index}",
+                                             is_live=True, progress=progress)
+
+                # Handle tool end events (tool results)
+                elif event_type == "on_tool_end":
+                    tool_name = event.get("name", "")
+                    tool_output = event.get("data", {}).get("output", {})
+                    # v2 events carry the ToolMessage produced by the tool node
+                    if isinstance(tool_output, ToolMessage):
+                        tool_output = tool_output.content
+                    tool_id = event.get("run_id", "")
                 
-                # Create tool result from the output
-                tool_result = {
-                    "tool_call_id": tool_id,
-                    "content": tool_output,
-                    "tool_name": tool_name
-                }
-                tool_results.append(tool_result)
+                    # Create tool result from the output
+                    tool_result = {
+                        "tool_call_id": tool_id,
+                        "content": tool_output,
+                        "tool_name": tool_name
+                    }
+                    tool_results.append(tool_result)
                 
-                # Display tool result immediately and update corresponding tool call status
-                if (tool_result_containers is not None and 
-                    len(tool_results) <= len(tool_result_containers) and 
-                    st.session_state.show_tools):
-                    # Update tool call to completed status
-                    tool_call_index = len(tool_results) - 1
-                    if tool_call_index < len(tool_calls) and tool_call_containers is not None:
-                        with tool_call_containers[tool_call_index]:
-                            render_tool_call(tool_calls[tool_call_index], f"completed_call_{tool_call_index}", is_live=False)
+                    # Display tool result immediately and update corresponding tool call status
+                    if (tool_result_containers is not None and 
+                        len(tool_results) <= len(tool_result_containers) and 
+                        st.session_state.show_tools):
+                        # Update tool call to completed status
+                        tool_call_index = len(tool_results) - 1
+                        if tool_call_index < len(tool_calls) and tool_call_containers is not None:
+                            with tool_call_containers[tool_call_index]:
+                                render_tool_call(tool_calls[tool_call_index], f"completed_call_{tool_call_index}", is_live=False)
                     
-                    # Display tool result
-                    with tool_result_containers[len(tool_results) - 1]:
-                        render_tool_result(tool_result, f"streaming_result_{len(tool_results) - 1}")
+                        # Display tool result
+                        with tool_result_containers[len(tool_results) - 1]:
+                            render_tool_result(tool_result, f"streaming_result_{len(tool_results) - 1}")
             
-            # Handle chain/node end events for final responses
-            elif event_type == "on_chain_end":
-                chain_output = event.get("data", {}).get("output", {})
-                if isinstance(chain_output, dict) and "messages" in chain_output:
-                    messages_output = chain_output["messages"]
-                    if messages_output and isinstance(messages_output[-1], AIMessage):
-                        final_msg = messages_output[-1]
-                        if final_msg.content and not final_response:
-                            final_response = final_msg.content
+                # Handle chain/node end events for final responses
+                elif event_type == "on_chain_end":
+                    chain_output = event.get("data", {}).get("output", {})
+                    if isinstance(chain_output, dict) and "messages" in chain_output:
+                        messages_output = chain_output["messages"]
+                        if messages_output and isinstance(messages_output[-1], AIMessage):
+                            final_msg = messages_output[-1]
+                            if final_msg.content and not final_response:
+                                final_response = final_msg.content
         
+        st.session_state.active_run = None
+
         # Remove cursor from final response
         if response_container and final_response:
             with response_container:
@@ -382,10 +569,21 @@ async def stream_agent_response(agent: CompiledStateGraph, user_input: str, conv
         return {
             "response": final_response,
             "tool_calls": tool_calls,
-            "tool_results": tool_results
+            "tool_results": tool_results,
+            "handoff_savings": get_handoff_savings(run_config)
         }
         
+    except AdmissionRejected as e:
+        st.session_state.active_run = None
+        st.warning(e.message)
+        return {
+            "response": e.message,
+            "tool_calls": [],
+            "tool_results": []
+        }
+
     except Exception as e:
+        st.session_state.active_run = None
         st.error(f"Error during streaming: {str(e)}")
         return {
             "response": f"Error: {str(e)}",
@@ -396,6 +594,7 @@ async def stream_agent_response(agent: CompiledStateGraph, user_input: str, conv
 async def main():
     """Main application function."""
     init_session_state()
+    record_stopped_run()
     
     # Initialize agent automatically
     if st.session_state.agent is None:
@@ -425,16 +624,40 @@ async def main():
             help="Toggle visibility of tool calls and results"
         )
         
+        # Long requests can run as background jobs that survive disconnects
+        st.session_state.background_mode = st.checkbox(
+            "Run in Background",
+            value=st.session_state.background_mode,
+            help="Submit requests as background jobs; results appear under Background Jobs"
+        )
+
         # Clear chat history
         if st.button("🗑️ Clear Chat"):
             st.session_state.messages = []
-            st.session_state.message_tools = {}
+            get_session_store().clear(st.session_state.thread_id)
             st.rerun()
         
         # Agent status
         st.markdown("---")
         st.markdown("**Agent Status:** ✅ Ready")
         st.markdown("**Model:** Built-in Shopping Agent")
+        load = get_admission_controller().metrics()
+        st.markdown(f"**Load:** {load['running']}/{load['max_running']} running, {load['queued']} waiting")
+        cancelled = get_cancellation_registry().metrics()
+        if cancelled["cancelled"]:
+            st.caption(f"Stopped runs: {cancelled['cancelled']} (~{cancelled['saved_seconds']:.0f}s of work saved)")
+        usage = get_session_store().usage(st.session_state.thread_id)
+        memory = usage["memory_bytes"] + payload_size([m.content for m in st.session_state.messages])
+        st.markdown(f"**Session Memory:** {memory / 1024:,.0f} KB (tool data {usage['memory_bytes'] / 1024:,.0f}"
+                    f"/{usage['budget_bytes'] / 1024:,.0f} KB)")
+        if usage["spilled_bytes"]:
+            st.caption(f"{usage['spilled_bytes'] / 1024:,.0f} KB of tool results on disk, loaded when opened")
+
+        st.markdown("---")
+        st.markdown("**Background Jobs**")
+        if st.button("🔄 Refresh Jobs"):
+            st.rerun()
+        render_jobs_panel()
         st.markdown('</div>', unsafe_allow_html=True)
     
     # Display all chat history first
@@ -455,6 +678,18 @@ async def main():
         with st.chat_message("user"):
             st.markdown(f'<div class="user-message">{prompt}</div>', unsafe_allow_html=True)
         
+        # Background mode: hand the run to the job runner instead of streaming it here
+        if st.session_state.background_mode:
+            job = get_job_runner().submit(to_job_messages(st.session_state.messages),
+                                          owner=st.session_state.thread_id)
+            if job.status == SUCCEEDED:
+                # Identical request answered recently: show the cached result right away
+                content = job.result.get("response") or "_No response generated_"
+            else:
+                content = f"Started background job `{job.id[:8]}`. Track it under **Background Jobs** in the sidebar."
+            st.session_state.messages.append(AIMessage(content=content))
+            st.rerun()
+        
         # Set streaming active flag
         st.session_state.streaming_active = True
         
@@ -475,6 +710,10 @@ async def main():
                 
                 # Container for the final response
                 response_container = st.empty()
+
+                # Stop control: clicking it interrupts this script run, which cancels the graph run
+                stop_container = st.empty()
+                stop_container.button("⏹️ Stop", key="stop_run", help="Stop generating and keep the partial answer")
                 
                 # Start with thinking indicator
                 with response_container:
@@ -502,10 +741,11 @@ async def main():
                 
                 # Store tool calls and results for this message
                 message_index = len(st.session_state.messages) - 1
-                st.session_state.message_tools[message_index] = {
+                get_session_store().put(st.session_state.thread_id, message_index, {
                     "tool_calls": response_data["tool_calls"],
-                    "tool_results": response_data["tool_results"]
-                }
+                    "tool_results": response_data["tool_results"],
+                    "handoff_savings": response_data.get("handoff_savings")
+                })
                 
                 # Disable streaming flag
                 st.session_state.streaming_active = False
@@ -513,6 +753,7 @@ async def main():
                 # Clear streaming containers and rerun to switch to history mode
                 # This prevents duplication while maintaining tool call positions
                 response_container.empty()
+                stop_container.empty()
                 for container in tool_call_containers:
                     container.empty()
                 for container in tool_result_containers:
@@ -6,15 +6,29 @@
 # 3. Observe the results
 # 4. Repeat until the task is complete
 
-from datetime import datetime
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Optional
 from pydantic import BaseModel, Field
 
 from playground.utils.langsmith import get_prompt_with_fallback
+from playground.utils.prompt import DEFAULT_LOCALE, DEFAULT_TIMEZONE
 
 # Fallback system prompt when LangSmith prompt is unavailable
 DEFAULT_SYSTEM_PROMPT = "You are a helpful AI assistant."
 
+# Selectable models; the model field also accepts an ordered tier list of these
+ModelName = Literal[
+    # OpenAI Models
+    "openai/gpt-4.1",
+    "openai/gpt-4.1-mini",
+    "openai/gpt-4.1-nano",
+
+    "openrouter/x-ai/grok-4",
+    "openrouter/google/gemini-pro-1.5",
+
+    "openrouter/qwen/qwen-2.5-72b-instruct",
+    "openrouter/mistral/mistral-large",
+]
+
 class Configuration(BaseModel):
     """Configuration schema for the React agent.
     
@@ -27,42 +41,73 @@ class Configuration(BaseModel):
               "shopping_advisor",  # LangSmith prompt name
               DEFAULT_SYSTEM_PROMPT,  # Fallback if LangSmith unavailable
             #   "d2a18e1e"  # Optional: specific prompt version
-          ).format(today=datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        ),
+          ),
         description="The system prompt to use for the agent's interactions. "
         "This prompt sets the context and behavior for the agent. "
-        "Automatically injects current date/time into {today} placeholder."
+        "Kept static for provider prompt caching: the current date, locale and "
+        "currency are appended as run context at call time instead of formatted into {today}."
     )
 
     model: Annotated[
-            Literal[
-                # OpenAI Models
-                "openai/gpt-4.1",
-                "openai/gpt-4.1-mini",
-                "openai/gpt-4.1-nano",
-                
-                "openrouter/x-ai/grok-4",
-                "openrouter/google/gemini-pro-1.5",
-                
-                "openrouter/qwen/qwen-2.5-72b-instruct",
-                "openrouter/mistral/mistral-large",
-            ],
+            ModelName | list[ModelName],
             {"__template_metadata__": {"kind": "llm"}},  # LangGraph metadata
         ] = Field(
             default="openai/gpt-4.1-mini",  # Good balance for most use cases
             description="The name of the language model to use for the agent's main interactions. "
         "Should be in the form: provider/model-name. "
-        "OpenAI models for reliability, OpenRouter models for variety and cost options."
+        "OpenAI models for reliability, OpenRouter models for variety and cost options. "
+        "An ordered tier list (cheapest first) starts on the first model and "
+        "escalates only when a step fails validation."
     )
 
     selected_tools: list[Literal[
         "advanced_research_tool",  # Advanced web research with multiple sources
         "basic_research_tool",     # Basic web search functionality
         "scrape_with_firecrawl",   # Web scraping using Firecrawl API
-        "get_todays_date"          # Get current date/time
+        "scrape_relevant_pages",   # Map a site and scrape only the pages ranked for a query
+        "search_local_products",   # Local index of previously scraped products
+        "search_page_chunks",      # Query-aware retrieval over pages scraped in this run
+        "read_blob",               # Slices of large outputs offloaded to the blob store
+        "get_todays_date"          # Get current date (already given in the run context)
     ]] = Field(
-        default = ["scrape_with_firecrawl", "get_todays_date"],  # Default tools for shopping tasks
+        default = ["scrape_with_firecrawl"],  # Default tools for shopping tasks
         description="The list of tools to use for the agent's interactions. "
         "Tools define the actions the agent can take. "
         "Select tools based on the agent's intended use case."
-    )
\ No newline at end of file
+    )
+
+    max_parallel_tool_calls: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of this agent's tool calls that run at the same time "
+        "when the model requests several in one turn."
+    )
+
+    tool_timeout: Optional[float] = Field(
+        default=120.0,
+        description="Seconds a single tool call may take before it is reported to the "
+        "model as timed out (None for no limit)."
+    )
+
+    model_equivalents: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="Interchangeable models per model name, e.g. "
+        "{'openai/gpt-4.1-mini': ['openrouter/openai/gpt-4o-mini']}. Calls are routed to the candidate "
+        "with the lowest recent latency, skipping ones with many recent errors, with a small exploration rate."
+    )
+
+    # Run context appended to every model call (see playground.utils.prompt.run_context)
+    locale: str = Field(
+        default=DEFAULT_LOCALE,
+        description="User locale given to the agent in the run context, e.g. ko-KR."
+    )
+
+    timezone: str = Field(
+        default=DEFAULT_TIMEZONE,
+        description="IANA timezone used for the current date and time in the run context."
+    )
+
+    currency: Optional[str] = Field(
+        default=None,
+        description="Default currency for prices; derived from the locale when unset."
+    )
@@ -2,15 +2,33 @@
 # This module creates the LangGraph execution graph for the React agent.
 # The React pattern enables agents to reason about problems and take actions iteratively.
 
+from functools import lru_cache
+from typing import Any
+
 from langgraph.prebuilt import create_react_agent
 from langchain_core.runnables import RunnableConfig
 
 from playground.tools import get_tools
+from playground.tools.concurrency import ToolLimiter, limit_tools
+from playground.utils.budget import BudgetedChatModel
 from playground.utils.model import load_chat_model
+from playground.utils.prompt import build_prompt
+from playground.utils.tracing import trace
 from playground.agents.react.configuration import Configuration
 
-# Default configuration instance
-react_config = Configuration()
+@lru_cache(maxsize=1)
+def get_default_config() -> Configuration:
+    """Default configuration, built on first use.
+
+    Building it may pull the system prompt from LangSmith, so it is deferred
+    until a graph actually needs a default instead of happening at import.
+    """
+    return Configuration()
+
+
+def _setting(configurable: dict, key: str) -> Any:
+    """Configured value for key, falling back to the default configuration."""
+    return configurable[key] if key in configurable else getattr(get_default_config(), key)
 
 async def make_graph(config: RunnableConfig):
     """Create a React agent graph with the given configuration.
@@ -34,20 +52,26 @@ async def make_graph(config: RunnableConfig):
     configurable = config.get("configurable", {})
 
     # Get configuration values with fallbacks to defaults
-    llm = configurable.get("model", react_config.model)
-    selected_tools = configurable.get("selected_tools", react_config.selected_tools)
-    prompt = configurable.get("system_prompt", react_config.system_prompt)
-    print(f"prompt={prompt}")  # Debug: show the actual prompt being used
-    
+    llm = _setting(configurable, "model")
+    selected_tools = _setting(configurable, "selected_tools")
+    prompt = _setting(configurable, "system_prompt")
+    max_parallel_tool_calls = _setting(configurable, "max_parallel_tool_calls")
+    tool_timeout = _setting(configurable, "tool_timeout")
+    model_equivalents = _setting(configurable, "model_equivalents")
     # Agent name for identification (especially useful in supervisor architectures)
     name = configurable.get("name", "react_agent")
+    trace("make_graph", config, agent=name, model=llm, tools=selected_tools, prompt=prompt)
+
+    # Parallel tool calls of one turn run concurrently, capped and time-limited per agent
+    limiter = ToolLimiter(max_concurrency=max_parallel_tool_calls, timeout=tool_timeout, name=name)
 
     # Create the React agent using LangGraph's prebuilt function
     # This automatically handles the ReAct pattern implementation
     graph = create_react_agent(
-        model=load_chat_model(llm),           # Load the specified LLM
-        tools=get_tools(selected_tools),      # Get the requested tools
-        prompt=prompt,                        # System prompt with instructions
+        model=BudgetedChatModel(model=load_chat_model(llm, node=name, equivalents=model_equivalents),
+                                node=name),   # LLM (tier list or equivalents) under the run budget
+        tools=limit_tools(get_tools(selected_tools), limiter),  # Requested tools, run under the limiter
+        prompt=build_prompt(prompt),          # Static instructions + volatile run context
         config_schema=Configuration,          # Schema for configuration validation
         name=name                            # Agent identifier
     )
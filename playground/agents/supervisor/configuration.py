@@ -3,19 +3,19 @@
 # The Supervisor pattern orchestrates multiple specialized sub-agents to handle complex tasks.
 # Each sub-agent has specific capabilities and tools optimized for their domain.
 
-from datetime import datetime
-from typing import Annotated, Literal
+from typing import Annotated, Literal, Optional
 
 from pydantic import BaseModel, Field
 
-# Current date for dynamic prompt injection
-today = datetime.now().strftime("%Y-%m-%d")
+from playground.utils.prompt import DEFAULT_LOCALE, DEFAULT_TIMEZONE
+
+# Prompts below are static so they form a byte-stable, provider-cacheable prefix.
+# The current date and other volatile context are appended at call time by
+# playground.utils.prompt.build_prompt instead of being formatted in here.
 
 # Supervisor agent's main system prompt
 # This prompt defines the supervisor's role as an orchestrator of specialized sub-agents
-DEFAULT_SUPERVISOR_PROMPT = f"""today's date is {today}
-
-You are the Executive Content Director orchestrating a team of specialized AI agents to produce exceptional content for clients.
+DEFAULT_SUPERVISOR_PROMPT = """You are the Executive Content Director orchestrating a team of specialized AI agents to produce exceptional content for clients.
 
 Available agents:
 - scrape_agent: Specialized web scraping specialist that extracts and processes data from websites, APIs, and online sources
@@ -41,32 +41,91 @@ Always be strategic about which agents to use and in what order to produce the b
 
 # Scrape agent's system prompt
 # This agent specializes in web scraping and data extraction using Firecrawl tools
-DEFAULT_SCRAPE_SYSTEM_PROMPT = f"""today's date is {today}, You are an expert web scraping and data extraction assistant for a digital content agency.
-You have access to the following tools: scrape_with_firecrawl, crawl_with_firecrawl, map_with_firecrawl, and get_todays_date.
-First get today's date then continue.
+DEFAULT_SCRAPE_SYSTEM_PROMPT = """You are an expert web scraping and data extraction assistant for a digital content agency.
+You have access to the following tools: search_local_products, scrape_with_firecrawl, scrape_relevant_pages, crawl_with_firecrawl, map_with_firecrawl, search_page_chunks and read_blob.
+The current date, locale and default currency are given in the run context at the end of the conversation; do not call a tool for them.
+The search_local_products tool searches products already indexed from earlier scrapes; check it first and only scrape live when nothing fresh matches.
 The scrape_with_firecrawl tool is used to scrape single web pages and extract clean, structured content from URLs.
-The crawl_with_firecrawl tool is used to crawl multiple pages from a website systematically and extract content from all discovered pages.
-The map_with_firecrawl tool is used to map and discover the structure of a website, including all available pages and their relationships.
-The get_todays_date tool is used to get today's date.
+The scrape_relevant_pages tool maps a site, ranks its URLs against your query and scrapes only the best few pages in parallel; prefer it over crawling when you need specific pages such as a handful of products.
+The crawl_with_firecrawl tool is used to crawl multiple pages from a website systematically and extract content from all discovered pages; use it only when you really need every page.
+The map_with_firecrawl tool is used to map and discover the structure of a website; pass a query to list only the most relevant URLs.
+When you only need specific facts from a long page or site, pass a query to scrape_with_firecrawl or crawl_with_firecrawl to receive just the relevant chunks.
+The search_page_chunks tool searches the pages already scraped or crawled in this run; use it instead of scraping the same page again.
+Very large results come back as a blob handle (blob:...) with a preview; use read_blob with that handle to read further, or pass find to jump to a phrase.
+When you need several independent pages or searches, request all of those tool calls in a single turn; they run in parallel, so the step takes only as long as the slowest call.
 when you are done with your scraping and data extraction, return the processed data to the supervisor agent.
 """
 
 # Research agent's system prompt
 # This agent specializes in comprehensive web research using advanced search tools
-DEFAULT_RESEARCH_SYSTEM_PROMPT = f"""today's date is {today}, You are an general research agent. 
-You have access to the following tools: advanced_research and get_todays_date. 
-First get today's date then continue to use the advanced_research tool to search for general information on the topic you are given to research, when your done you return the research to the supervisor agent. 
+DEFAULT_RESEARCH_SYSTEM_PROMPT = """You are an general research agent. 
+You have access to the following tools: advanced_research and search_local_products. 
+The current date, locale and default currency are given in the run context at the end of the conversation; do not call a tool for them.
+Use the advanced_research tool to search for general information on the topic you are given to research, when your done you return the research to the supervisor agent. 
+For product and price questions, check search_local_products first for products already indexed from earlier runs.
+When a topic needs several searches, issue all the independent advanced_research calls in a single turn; they run in parallel, so the step takes only as long as the slowest search.
 YOU MUST USE THE ADVANCED_RESEARCH TOOL TO SEARCH FOR INFORMATION YOU NEED.
 """
 
 # Writing agent's system prompt
 # This agent specializes in creating polished, final content from research data
-DEFAULT_WRITING_SYSTEM_PROMPT = f"""You are an expert writing assistant.
+DEFAULT_WRITING_SYSTEM_PROMPT = """You are an expert writing assistant.
 Your primary responsibility is to help draft, edit,  and improve written content to ensure clarity,
 correctness, and engagement. You are strictly supposed to take in the content you are given and write the
 final content based on the requested format for the user, then return the final content to the supervisor agent.
 """
 
+# Model choices per agent
+# Each model field accepts a single model or an ordered tier list (cheapest first).
+# Tiered agents start on the first model and escalate to the next one only when a
+# step fails validation (malformed tool call, empty answer, exhausted recursion).
+SupervisorModel = Literal[
+    # OpenAI Models
+    "openai/gpt-4.1",
+    "openai/gpt-4.1-mini",
+    "openai/gpt-4.1-nano",
+
+    # OpenRouter Models
+    "openrouter/x-ai/grok-4",
+    "openrouter/google/gemini-pro-1.5",
+]
+
+ScrapeModel = Literal[
+    # OpenAI Models
+    "openai/gpt-4.1",
+    "openai/gpt-4.1-mini",
+    "openai/gpt-4.1-nano",
+
+    # OpenRouter Models - Good for Scraping
+    "openrouter/grok-4",
+    "openrouter/anthropic/claude-3-haiku",
+    "openrouter/meta-llama/llama-3.1-8b-instruct",
+]
+
+ResearchModel = Literal[
+    # OpenAI Models
+    "openai/gpt-4.1",
+    "openai/gpt-4.1-mini",
+    "openai/gpt-4.1-nano",
+
+    # OpenRouter Models - Good for Research
+    "openrouter/grok-4",
+    "openrouter/google/gemini-pro-1.5",
+    "openrouter/anthropic/claude-3-haiku",
+]
+
+WritingModel = Literal[
+    # OpenAI Models
+    "openai/gpt-4.1",
+    "openai/gpt-4.1-mini",
+    "openai/gpt-4.1-nano",
+
+    # OpenRouter Models - Good for Writing
+    "openrouter/grok-4",
+    "openrouter/google/gemini-pro-1.5",
+    "openrouter/anthropic/claude-3-haiku",
+]
+
 class Configuration(BaseModel):
     """Configuration schema for the Supervisor multi-agent system.
     
@@ -86,22 +145,30 @@ class Configuration(BaseModel):
     )
 
     supervisor_model: Annotated[
-        Literal[
-            # OpenAI Models
-            "openai/gpt-4.1",
-            "openai/gpt-4.1-mini",
-            "openai/gpt-4.1-nano",
-            
-            # OpenRouter Models
-            "openrouter/x-ai/grok-4",
-            "openrouter/google/gemini-pro-1.5",
-        ], 
+        SupervisorModel | list[SupervisorModel],
         {"__template_metadata__": {"kind": "llm"}}
     ] = Field(
         default="openai/gpt-4.1-mini",  # Good default for most supervisor tasks
         description="The name of the language model to use for the supervisor agent. "
         "Supervisor needs good reasoning for agent coordination. "
-        "grok-4 recommended for complex orchestration.",
+        "grok-4 recommended for complex orchestration. "
+        "An ordered tier list (cheapest first) escalates only on failed steps.",
+        json_schema_extra={"langgraph_nodes": ["supervisor"]}
+    )
+
+    handoff_mode: Literal["full", "last", "summary"] = Field(
+        default="last",
+        description="What a sub-agent hands back to the supervisor: its full history including tool calls "
+        "and raw tool output ('full'), only its final answer ('last'), or a structured summary with key facts "
+        "and sources ('summary'). The compact modes also strip tool messages from the shared state.",
+        json_schema_extra={"langgraph_nodes": ["supervisor"]}
+    )
+
+    terminal_agent: Optional[Literal["scrape_agent", "general_research_agent", "writing_agent"]] = Field(
+        default=None,
+        description="Sub-agent whose answer is the final answer: its tokens are streamed to the user and the "
+        "run ends when it finishes, without another supervisor turn. Typically 'writing_agent'. "
+        "None keeps every sub-agent reporting back to the supervisor.",
         json_schema_extra={"langgraph_nodes": ["supervisor"]}
     )
 
@@ -114,22 +181,14 @@ class Configuration(BaseModel):
     )
 
     scrape_model: Annotated[
-        Literal[
-            # OpenAI Models
-            "openai/gpt-4.1",
-            "openai/gpt-4.1-mini",
-            "openai/gpt-4.1-nano",
-            
-            # OpenRouter Models - Good for Scraping
-            "openrouter/grok-4",
-            "openrouter/anthropic/claude-3-haiku",
-            "openrouter/meta-llama/llama-3.1-8b-instruct",
-        ],
+        ScrapeModel | list[ScrapeModel],
         {"__template_metadata__": {"kind": "llm"}}
     ] = Field(
-        default="openai/gpt-4.1-mini",  # Good balance for scraping tasks
+        # Most scrape steps are fine on nano; escalate to mini only on failed steps
+        default_factory=lambda: ["openai/gpt-4.1-nano", "openai/gpt-4.1-mini"],
         description="The name of the language model to use for the scrape sub-agent. "
-        "Scraping requires good reasoning for data extraction.",
+        "Scraping requires good reasoning for data extraction. "
+        "An ordered tier list (cheapest first) escalates only on failed steps.",
         json_schema_extra={"langgraph_nodes": ["scrape_agent"]}            
     )
 
@@ -137,14 +196,40 @@ class Configuration(BaseModel):
         "scrape_with_firecrawl",  # Single page scraping
         "crawl_with_firecrawl",   # Multi-page crawling
         "map_with_firecrawl",     # Site structure mapping
-        "get_todays_date"         # Date utility
+        "scrape_relevant_pages",  # Map, rank and scrape only the top-N pages
+        "search_local_products",  # Local index of previously scraped products
+        "search_page_chunks",     # Query-aware retrieval over pages scraped in this run
+        "read_blob",              # Slices of large outputs offloaded to the blob store
+        "get_todays_date"         # Date utility (the date is already in the run context)
     ]] = Field(
-        default=["scrape_with_firecrawl", "crawl_with_firecrawl", "get_todays_date"],
+        default=["search_local_products", "scrape_with_firecrawl", "scrape_relevant_pages",
+                 "crawl_with_firecrawl", "search_page_chunks", "read_blob"],
         description="The list of tools to make available to the scrape sub-agent. "
         "These tools provide comprehensive web scraping capabilities.",
         json_schema_extra={"langgraph_nodes": ["scrape_agent"]}
     )
 
+    scrape_max_parallel_tool_calls: int = Field(
+        default=4,
+        ge=1,
+        description="Maximum number of the scrape sub-agent's tool calls that run at the same time. "
+        "Crawls hold a Firecrawl job each, so keep this modest.",
+        json_schema_extra={"langgraph_nodes": ["scrape_agent"]}
+    )
+
+    scrape_tool_timeout: Optional[float] = Field(
+        default=300.0,
+        description="Seconds a single scrape tool call may take before it is reported as timed out.",
+        json_schema_extra={"langgraph_nodes": ["scrape_agent"]}
+    )
+
+    scrape_memo_ttl: Optional[float] = Field(
+        default=None,
+        description="Seconds the scrape sub-agent's final answer is reused when the same task is handed to it again "
+        "with the same configuration. Keep it short; prices and stock change. None disables memoization.",
+        json_schema_extra={"langgraph_nodes": ["scrape_agent"]}
+    )
+
     # === RESEARCH AGENT CONFIGURATION ===
     research_system_prompt: str = Field(
         default=DEFAULT_RESEARCH_SYSTEM_PROMPT,
@@ -154,36 +239,50 @@ class Configuration(BaseModel):
     )
 
     research_model: Annotated[
-        Literal[
-            # OpenAI Models
-            "openai/gpt-4.1",
-            "openai/gpt-4.1-mini",
-            "openai/gpt-4.1-nano",
-            
-            # OpenRouter Models - Good for Research
-            "openrouter/grok-4",
-            "openrouter/google/gemini-pro-1.5",
-            "openrouter/anthropic/claude-3-haiku",
-        ],
+        ResearchModel | list[ResearchModel],
         {"__template_metadata__": {"kind": "llm"}}
     ] = Field(
-        default="openai/gpt-4.1-mini",  # Good balance for research tasks
+        # Most research steps are fine on nano; escalate to mini only on failed steps
+        default_factory=lambda: ["openai/gpt-4.1-nano", "openai/gpt-4.1-mini"],
         description="The name of the language model to use for the research sub-agent. "
-        "Research requires good reasoning for information synthesis.",
+        "Research requires good reasoning for information synthesis. "
+        "An ordered tier list (cheapest first) escalates only on failed steps.",
         json_schema_extra={"langgraph_nodes": ["general_research_agent"]}
     )
 
     research_tools : list[Literal[
         "basic_research",     # Simple web search
         "advanced_research",  # Multi-source research
-        "get_todays_date"     # Date utility
+        "search_local_products",  # Local index of previously scraped products
+        "get_todays_date"     # Date utility (the date is already in the run context)
     ]] = Field(
-        default=["advanced_research", "get_todays_date"],
+        default=["advanced_research", "search_local_products"],
         description="The list of tools to make available to the research sub-agent. "
         "Advanced research provides comprehensive information gathering capabilities.",
         json_schema_extra={"langgraph_nodes": ["general_research_agent"]}
     )
 
+    research_max_parallel_tool_calls: int = Field(
+        default=5,
+        ge=1,
+        description="Maximum number of the research sub-agent's tool calls that run at the same time. "
+        "Independent search queries of one turn run in parallel.",
+        json_schema_extra={"langgraph_nodes": ["general_research_agent"]}
+    )
+
+    research_tool_timeout: Optional[float] = Field(
+        default=60.0,
+        description="Seconds a single research tool call may take before it is reported as timed out.",
+        json_schema_extra={"langgraph_nodes": ["general_research_agent"]}
+    )
+
+    research_memo_ttl: Optional[float] = Field(
+        default=None,
+        description="Seconds the research sub-agent's final answer is reused when the same task is handed to it again "
+        "with the same configuration. A few hours suits general research topics. None disables memoization.",
+        json_schema_extra={"langgraph_nodes": ["general_research_agent"]}
+    )
+
     # === WRITING AGENT CONFIGURATION ===
     writing_system_prompt: str = Field(
         default=DEFAULT_WRITING_SYSTEM_PROMPT,
@@ -193,32 +292,91 @@ class Configuration(BaseModel):
     )
 
     writing_model: Annotated[
-        Literal[
-            # OpenAI Models
-            "openai/gpt-4.1",
-            "openai/gpt-4.1-mini",
-            "openai/gpt-4.1-nano",
-            
-            # OpenRouter Models - Good for Writing
-            "openrouter/grok-4",
-            "openrouter/google/gemini-pro-1.5",
-            "openrouter/anthropic/claude-3-haiku",
-        ],
+        WritingModel | list[WritingModel],
         {"__template_metadata__": {"kind": "llm"}}
     ] = Field(
         default="openai/gpt-4.1-mini",  # Good balance for writing tasks
         description="The name of the language model to use for the writing sub-agent. "
-        "Writing requires good language skills for content creation.",
+        "Writing requires good language skills for content creation. "
+        "An ordered tier list (cheapest first) escalates only on failed steps.",
         json_schema_extra={"langgraph_nodes": ["writing_agent"]}
     )
 
     writing_tools: list[Literal[
         "advanced_research",  # Additional research if needed
         "basic_research",     # Simple fact-checking
-        "get_todays_date"     # Date utility
+        "get_todays_date"     # Date utility (the date is already in the run context)
     ]] = Field(
-        default = ["advanced_research", "get_todays_date"],
+        default = ["advanced_research"],
         description="The list of tools to make available to the writing sub-agent. "
         "Writing agent can do additional research if needed for content creation.",
         json_schema_extra={"langgraph_nodes": ["writing_agent"]}
     )
+
+    writing_max_parallel_tool_calls: int = Field(
+        default=3,
+        ge=1,
+        description="Maximum number of the writing sub-agent's tool calls that run at the same time. "
+        "Fact-checking searches of one turn run in parallel.",
+        json_schema_extra={"langgraph_nodes": ["writing_agent"]}
+    )
+
+    writing_tool_timeout: Optional[float] = Field(
+        default=60.0,
+        description="Seconds a single writing tool call may take before it is reported as timed out.",
+        json_schema_extra={"langgraph_nodes": ["writing_agent"]}
+    )
+
+    writing_memo_ttl: Optional[float] = Field(
+        default=None,
+        description="Seconds the writing sub-agent's final answer is reused when the same task is handed to it again "
+        "with the same configuration. None disables memoization.",
+        json_schema_extra={"langgraph_nodes": ["writing_agent"]}
+    )
+
+    # === MODEL ROUTING ===
+    model_equivalents: dict[str, list[str]] = Field(
+        default_factory=dict,
+        description="Interchangeable models per model name, e.g. "
+        "{'openai/gpt-4.1-mini': ['openrouter/openai/gpt-4o-mini']}. Every agent using a listed model routes "
+        "each call to the candidate with the lowest recent latency, skipping ones with many recent errors, "
+        "with a small exploration rate.",
+        json_schema_extra={"langgraph_nodes": ["supervisor", "scrape_agent", "general_research_agent",
+                                               "writing_agent"]}
+    )
+
+    # === RUN BUDGET ===
+    # Shared by the supervisor and all sub-agents of a run
+    time_budget: Optional[float] = Field(
+        default=300.0,
+        description="Wall-clock seconds a whole run may take. Tool calls are cut off at the deadline, agents "
+        "are told to skip optional steps as it nears, and the best partial answer is returned when it passes. "
+        "None for no limit.",
+        json_schema_extra={"langgraph_nodes": ["supervisor"]}
+    )
+
+    step_budget: Optional[int] = Field(
+        default=40,
+        ge=1,
+        description="Model calls a whole run may make across the supervisor and all sub-agents. "
+        "When spent, the best partial answer is returned instead of looping to the recursion limit. "
+        "None for no limit.",
+        json_schema_extra={"langgraph_nodes": ["supervisor"]}
+    )
+
+    # === RUN CONTEXT ===
+    # Appended to every model call of the supervisor and its sub-agents
+    locale: str = Field(
+        default=DEFAULT_LOCALE,
+        description="User locale given to the agents in the run context, e.g. ko-KR."
+    )
+
+    timezone: str = Field(
+        default=DEFAULT_TIMEZONE,
+        description="IANA timezone used for the current date and time in the run context."
+    )
+
+    currency: Optional[str] = Field(
+        default=None,
+        description="Default currency for prices; derived from the locale when unset."
+    )
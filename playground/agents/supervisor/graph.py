@@ -4,11 +4,23 @@
 
 from langchain_core.runnables import RunnableConfig
 from playground.agents.supervisor.configuration import Configuration
+from playground.agents.supervisor.handoff import DEFAULT_HANDOFF_MODE, compact_handoff
 from playground.agents.supervisor.subagents import create_subagents
+from playground.utils.budget import BudgetedChatModel
 from playground.utils.model import load_chat_model
+from playground.utils.prompt import build_prompt
 
+from langgraph.graph import END
 from langgraph_supervisor import create_supervisor
 
+# Tag on the terminal agent's runs; clients stream tokens carrying it as the final answer
+FINAL_ANSWER_TAG = "final_answer"
+
+TERMINAL_AGENT_INSTRUCTIONS = """
+
+{agent} delivers the final answer: its response goes to the user as-is and ends the run, \
+so transfer to it last and only once it has everything it needs. Do not write the final answer yourself."""
+
 async def make_supervisor_graph(config: RunnableConfig):
     """Create a Supervisor multi-agent graph with specialized sub-agents.
     
@@ -21,6 +33,10 @@ async def make_supervisor_graph(config: RunnableConfig):
     
     The supervisor analyzes user requests and routes them to appropriate sub-agents,
     coordinating their work to produce comprehensive results.
+
+    With configurable terminal_agent set, that sub-agent's answer is the final
+    answer: its edge leads to END instead of back to the supervisor, and its runs
+    are tagged FINAL_ANSWER_TAG so clients can stream its tokens directly.
     
     Args:
         config (RunnableConfig): Configuration containing supervisor and sub-agent parameters
@@ -32,19 +48,51 @@ async def make_supervisor_graph(config: RunnableConfig):
     configurable = config.get("configurable", {})
     supervisor_model = configurable.get("supervisor_model", "openai/gpt-4.1")
     supervisor_system_prompt = configurable.get("supervisor_system_prompt", "You are a helpful supervisor agent.")
+    handoff_mode = configurable.get("handoff_mode", DEFAULT_HANDOFF_MODE)
+    defaults = Configuration.model_fields
+    time_budget = configurable.get("time_budget", defaults["time_budget"].default)
+    step_budget = configurable.get("step_budget", defaults["step_budget"].default)
+    terminal_agent = configurable.get("terminal_agent")
+    model_equivalents = configurable.get("model_equivalents") or {}
     
     # Create all sub-agents with their specialized configurations
     # This includes scrape_agent, research_agent, and writing_agent
     subagents = await create_subagents(configurable)
 
+    # Handoff policy: compact modes hand back only the answer (or a summary) and
+    # strip tool traffic from the shared state; the wrappers build the exact update
+    subagents = [compact_handoff(agent, handoff_mode) for agent in subagents]
+    compact = handoff_mode != "full"
+
+    # The terminal agent's runs carry the final answer tag (Pregel.with_config keeps the graph's name)
+    if terminal_agent is not None:
+        if terminal_agent not in {agent.name for agent in subagents}:
+            raise ValueError(f"Unknown terminal_agent: {terminal_agent}")
+        subagents = [agent.with_config(tags=[FINAL_ANSWER_TAG]) if agent.name == terminal_agent else agent
+                     for agent in subagents]
+        supervisor_system_prompt += TERMINAL_AGENT_INSTRUCTIONS.format(agent=terminal_agent)
+
     # Create the supervisor graph that orchestrates the sub-agents
     supervisor_graph = create_supervisor(
         agents=subagents,                         # List of specialized sub-agents
-        model=load_chat_model(supervisor_model),  # LLM for supervisor reasoning
-        prompt=supervisor_system_prompt,          # Instructions for coordination
-        config_schema=Configuration               # Configuration schema validation
+        model=BudgetedChatModel(model=load_chat_model(supervisor_model, node="supervisor",
+                                                      equivalents=model_equivalents),
+                                node="supervisor"),       # LLM for supervisor reasoning, under the run budget
+        prompt=build_prompt(supervisor_system_prompt),  # Static instructions + volatile run context
+        config_schema=Configuration,              # Configuration schema validation
+        output_mode="full_history",               # Sub-agent output as shaped by the handoff policy
+        add_handoff_back_messages=not compact     # Handoff-back tool pairs are noise in compact modes
     )
 
+    # The terminal agent ends the run instead of handing back to the supervisor
+    if terminal_agent is not None:
+        supervisor_graph.edges.discard((terminal_agent, "supervisor"))
+        supervisor_graph.add_edge(terminal_agent, END)
+
     # Compile the graph into an executable format
-    compiled_graph = supervisor_graph.compile()
+    # The run budget travels in configurable so sub-agents and tools see the same deadline;
+    # values passed at invocation time take precedence over these defaults
+    compiled_graph = supervisor_graph.compile().with_config(
+        configurable={"time_budget": time_budget, "step_budget": step_budget}
+    )
     return compiled_graph
\ No newline at end of file
@@ -0,0 +1,168 @@
+# Sub-Agent Handoff Policy
+# Controls what a sub-agent hands back to the supervisor's shared message state.
+#   full    - the sub-agent's whole history, tool calls and raw tool output included
+#   last    - only the sub-agent's final answer
+#   summary - a compact structured summary of the final answer: key facts and sources
+# In "last" and "summary" mode tool traffic (tool calls, tool results and the
+# supervisor's handoff messages) is also removed from the parent state, so the
+# supervisor and later agents don't re-read raw scrape and search dumps.
+
+import re
+from typing import Any, Literal, Optional, TypedDict
+
+from langchain_core.messages import AIMessage, AnyMessage, RemoveMessage, ToolMessage
+from langchain_core.messages.utils import count_tokens_approximately
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import END, START, StateGraph
+
+from playground.utils.cache import TTLCache
+from playground.utils.runs import get_run_id
+from playground.utils.tracing import trace
+
+HandoffMode = Literal["full", "last", "summary"]
+DEFAULT_HANDOFF_MODE: HandoffMode = "last"
+
+SUMMARY_CHARS = 600
+MAX_FACTS = 15
+MAX_SOURCES = 10
+
+_URL = re.compile(r"https?://[^\s)\]>\"']+")
+_FACT = re.compile(r"\d|https?://")
+
+# Token savings per run, kept for an hour
+_savings: TTLCache[str, dict[str, int]] = TTLCache(maxsize=1024, ttl=3600)
+
+
+class HandoffState(TypedDict):
+    # No reducer: the node's message list, removals included, is handed to the parent as-is
+    messages: list[AnyMessage]
+
+
+def is_tool_traffic(message: AnyMessage) -> bool:
+    """Tool results and AI messages that only carry tool calls."""
+    return isinstance(message, ToolMessage) or (
+        isinstance(message, AIMessage) and bool(message.tool_calls) and not _text(message)
+    )
+
+
+def _text(message: AnyMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content.strip()
+    return " ".join(block.get("text", "") for block in content if isinstance(block, dict)).strip()
+
+
+def _final_answer(messages: list[AnyMessage]) -> Optional[AIMessage]:
+    return next((m for m in reversed(messages) if isinstance(m, AIMessage) and _text(m)), None)
+
+
+def summarize_handoff(agent_name: str, messages: list[AnyMessage]) -> str:
+    """Structured summary of a sub-agent's work: answer excerpt, key facts and sources.
+
+    Facts are the lines of the final answer carrying numbers, prices or links;
+    sources are the URLs the agent's tools were called with or that it cited.
+
+    Args:
+        agent_name: Sub-agent name
+        messages: Messages the sub-agent produced
+
+    Returns:
+        Summary text
+    """
+    final = _final_answer(messages)
+    answer = _text(final) if final else ""
+    lines = [line.strip(" -*•\t") for line in answer.splitlines()]
+
+    excerpt = answer[:SUMMARY_CHARS]
+    if len(answer) > SUMMARY_CHARS:
+        # Cut at the last sentence or line end inside the limit
+        cut = max(excerpt.rfind(". "), excerpt.rfind("\n"))
+        excerpt = (excerpt[:cut + 1] if cut > SUMMARY_CHARS // 2 else excerpt).rstrip() + " …"
+
+    facts = list(dict.fromkeys(line for line in lines if line and _FACT.search(line)))[:MAX_FACTS]
+    urls = [str(call["args"].get("url")) for m in messages if isinstance(m, AIMessage)
+            for call in m.tool_calls if isinstance(call.get("args"), dict) and call["args"].get("url")]
+    sources = list(dict.fromkeys(urls + _URL.findall(answer)))[:MAX_SOURCES]
+
+    parts = [f"[{agent_name} summary]", excerpt or "(no answer)"]
+    if facts:
+        parts.append("Key facts:\n" + "\n".join(f"- {fact}" for fact in facts))
+    if sources:
+        parts.append("Sources:\n" + "\n".join(f"- {url}" for url in sources))
+    return "\n\n".join(parts)
+
+
+def get_handoff_savings(config: Optional[RunnableConfig]) -> dict[str, int]:
+    """Token savings of compact handoffs in the run a config belongs to.
+
+    Returns:
+        dict: {"handoffs", "full_tokens", "kept_tokens", "saved_tokens"} (approximate token counts)
+    """
+    return dict(_savings.get(get_run_id(config)) or
+                {"handoffs": 0, "full_tokens": 0, "kept_tokens": 0, "saved_tokens": 0})
+
+
+def _record_savings(config: RunnableConfig, agent_name: str, mode: str, full_tokens: int, kept_tokens: int) -> None:
+    run_id = get_run_id(config)
+    totals = get_handoff_savings(config)
+    totals["handoffs"] += 1
+    totals["full_tokens"] += full_tokens
+    totals["kept_tokens"] += kept_tokens
+    totals["saved_tokens"] = totals["full_tokens"] - totals["kept_tokens"]
+    _savings.set(run_id, totals)
+    trace("handoff", config, agent=agent_name, mode=mode, full_tokens=full_tokens, kept_tokens=kept_tokens,
+          run_saved_tokens=totals["saved_tokens"])
+
+
+def compact_handoff(agent: Any, mode: HandoffMode = DEFAULT_HANDOFF_MODE) -> Any:
+    """Wrap a sub-agent so it hands back only what the handoff mode allows.
+
+    Use with create_supervisor(output_mode="full_history", add_handoff_back_messages=False):
+    the wrapper's output already is the exact update for the parent state, including
+    RemoveMessage entries for the tool traffic stripped from it.
+
+    Args:
+        agent: Compiled sub-agent graph
+        mode: "full", "last" or "summary"
+
+    Returns:
+        The wrapped agent graph (same name), or the agent itself in "full" mode
+    """
+    if mode == "full":
+        return agent
+    name = agent.name
+
+    def compact(messages: list[AnyMessage], result: dict, config: RunnableConfig) -> dict:
+        seen = {m.id for m in messages}
+        produced = [m for m in result["messages"] if m.id not in seen]
+        final = _final_answer(produced)
+        if mode == "summary":
+            kept = [AIMessage(content=summarize_handoff(name, produced), name=name,
+                              response_metadata=final.response_metadata if final else {})]
+        else:
+            kept = ([AIMessage(content=final.content, name=name, id=final.id,
+                               response_metadata=final.response_metadata)] if final else [])
+
+        # Tool calls and results already in the parent state (handoffs, earlier agents)
+        removed = [RemoveMessage(id=m.id) for m in messages if m.id and is_tool_traffic(m)]
+        # AI messages with text and tool calls keep their text without the calls
+        trimmed = [AIMessage(content=m.content, name=m.name, id=m.id) for m in messages
+                   if isinstance(m, AIMessage) and m.tool_calls and not is_tool_traffic(m)]
+
+        stripped = [m for m in messages if m.id and is_tool_traffic(m)]
+        _record_savings(config, name, mode,
+                        full_tokens=count_tokens_approximately(produced + stripped),
+                        kept_tokens=count_tokens_approximately(kept))
+        return {"messages": removed + trimmed + kept}
+
+    def run(state: HandoffState, config: RunnableConfig) -> dict:
+        return compact(state["messages"], agent.invoke({"messages": state["messages"]}, config), config)
+
+    async def arun(state: HandoffState, config: RunnableConfig) -> dict:
+        return compact(state["messages"], await agent.ainvoke({"messages": state["messages"]}, config), config)
+
+    builder = StateGraph(HandoffState)
+    builder.add_node(name, RunnableLambda(run, afunc=arun, name=name))
+    builder.add_edge(START, name)
+    builder.add_edge(name, END)
+    return builder.compile(name=name)
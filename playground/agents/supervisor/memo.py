@@ -0,0 +1,160 @@
+# Sub-Agent Memoization
+# Repeated subtasks ("research current top-rated winter coats") are answered from
+# a cache instead of running the sub-agent's whole tool loop again. The key covers
+# the current turn plus a digest of the conversation before it, so a follow-up
+# like "and the cheaper one?" is only reused within the same conversation.
+
+import hashlib
+import json
+import re
+import threading
+import unicodedata
+from collections import Counter
+from typing import Any, Optional
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from playground.utils.cache import TTLCache
+from playground.utils.tracing import trace
+
+# Final answers of all sub-agents; each agent applies its own TTL on lookup
+_memo: TTLCache[str, str] = TTLCache(maxsize=512, ttl=None)
+_stats_lock = threading.Lock()
+_stats: Counter[tuple[str, str]] = Counter()
+
+# Marker langgraph_supervisor sets on its "transferring back" messages
+_HANDOFF_BACK = "__is_handoff_back"
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", unicodedata.normalize("NFKC", text)).strip().casefold()
+
+
+def _current_turn_start(messages: list[BaseMessage]) -> int:
+    return max((i for i, m in enumerate(messages) if isinstance(m, HumanMessage)), default=0)
+
+
+def _said(messages: list[BaseMessage]) -> list[str]:
+    """Normalized user and assistant text of messages, leaving out handoff traffic."""
+    parts = []
+    for message in messages:
+        if isinstance(message, AIMessage) and message.response_metadata.get(_HANDOFF_BACK):
+            continue
+        if isinstance(message, (HumanMessage, AIMessage)) and isinstance(message.content, str) and message.content:
+            parts.append(f"{message.type}: {_normalize(message.content)}")
+    return parts
+
+
+def handoff_task(messages: list[BaseMessage]) -> str:
+    """Normalized task a sub-agent is handed: the current user turn and what was said since.
+
+    Handoff tool calls and their tool messages are left out, so the same request
+    handed off in different runs produces the same task text.
+
+    Args:
+        messages: Messages the supervisor passes to the sub-agent
+
+    Returns:
+        Normalized task text
+    """
+    return "\n".join(_said(messages[_current_turn_start(messages):]))
+
+
+def conversation_digest(messages: list[BaseMessage]) -> str:
+    """Digest of the conversation before the current user turn (empty for a first turn).
+
+    Args:
+        messages: Messages the supervisor passes to the sub-agent
+
+    Returns:
+        Hex digest of the earlier turns' normalized text, or "" if there are none
+    """
+    earlier = _said(messages[:_current_turn_start(messages)])
+    return hashlib.sha256("\n".join(earlier).encode()).hexdigest()[:16] if earlier else ""
+
+
+def config_hash(configurable: dict[str, Any]) -> str:
+    """Stable hash of a sub-agent's configuration (model, prompt, tools, limits)."""
+    payload = json.dumps(configurable, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+
+def memo_key(agent_name: str, task: str, agent_config_hash: str, conversation: str = "") -> str:
+    return hashlib.sha256(f"{agent_name}\0{agent_config_hash}\0{conversation}\0{task}".encode()).hexdigest()
+
+
+def get_memo_stats() -> dict[str, dict[str, int]]:
+    """Memo hits and misses per sub-agent.
+
+    Returns:
+        dict: {agent: {"hits", "misses"}}
+    """
+    with _stats_lock:
+        agents = sorted({agent for agent, _ in _stats})
+        return {agent: {"hits": _stats[(agent, "hits")], "misses": _stats[(agent, "misses")]} for agent in agents}
+
+
+def _count(agent_name: str, outcome: str) -> None:
+    with _stats_lock:
+        _stats[(agent_name, outcome)] += 1
+
+
+def memoize_agent(agent: Any, ttl: Optional[float], configurable: dict[str, Any]) -> Any:
+    """Wrap a sub-agent so repeated tasks are answered from the memo.
+
+    A hit returns the cached final message at once, marked with
+    response_metadata["memo"] = {"hit": True, "age": seconds, "key": ...}; a miss
+    runs the agent and stores its final answer.
+
+    Args:
+        agent: Compiled sub-agent graph
+        ttl: Seconds a final answer is reused; None or 0 returns the agent unchanged
+        configurable: The agent's configuration, part of the memo key
+
+    Returns:
+        The wrapped agent graph (same name), or the agent itself when memoization is off
+    """
+    if not ttl:
+        return agent
+    name = agent.name
+    agent_config_hash = config_hash(configurable)
+
+    def lookup(state: MessagesState, config: RunnableConfig) -> tuple[str, Optional[dict]]:
+        messages = state["messages"]
+        key = memo_key(name, handoff_task(messages), agent_config_hash, conversation_digest(messages))
+        content = _memo.get(key, ttl=ttl)
+        if content is None:
+            _count(name, "misses")
+            trace("subagent_memo", config, agent=name, hit=False)
+            return key, None
+        age = round(_memo.age(key) or 0.0, 1)
+        _count(name, "hits")
+        trace("subagent_memo", config, agent=name, hit=True, age=age)
+        message = AIMessage(content=content, name=name,
+                            response_metadata={"memo": {"hit": True, "age": age, "key": key[:16]}})
+        return key, {"messages": [message]}
+
+    def remember(key: str, result: dict) -> dict:
+        final = result["messages"][-1] if result.get("messages") else None
+        # Only complete answers are reused: never a step that ended on a tool call, nor a
+        # partial answer cut short by the run budget (a hit would drop its partial flag)
+        if (isinstance(final, AIMessage) and not final.tool_calls and isinstance(final.content, str)
+                and final.content and not final.response_metadata.get("budget", {}).get("partial")):
+            _memo.set(key, final.content)
+        return {"messages": result["messages"]}
+
+    def run(state: MessagesState, config: RunnableConfig) -> dict:
+        key, hit = lookup(state, config)
+        return hit or remember(key, agent.invoke({"messages": state["messages"]}, config))
+
+    async def arun(state: MessagesState, config: RunnableConfig) -> dict:
+        key, hit = lookup(state, config)
+        return hit or remember(key, await agent.ainvoke({"messages": state["messages"]}, config))
+
+    builder = StateGraph(MessagesState)
+    builder.add_node(name, RunnableLambda(run, afunc=arun, name=name))
+    builder.add_edge(START, name)
+    builder.add_edge(name, END)
+    return builder.compile(name=name)
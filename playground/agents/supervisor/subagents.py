@@ -2,17 +2,24 @@
 # This module creates specialized sub-agents for the Supervisor multi-agent system.
 # Each sub-agent is a React agent with specific tools and prompts for their domain.
 
+from functools import lru_cache
+
 from langchain_core.runnables import RunnableConfig
 
 from playground.agents.react.graph import make_graph
 from playground.agents.supervisor.configuration import Configuration
+from playground.agents.supervisor.memo import memoize_agent
+from playground.utils.tracing import trace
 
 # Legacy constant - not currently used but kept for compatibility
 UNEDITABLE_SYSTEM_PROMPT = """UNEDITABLE_SYSTEM_PROMPT """
 
-# Default configuration instance for the supervisor system
-supervisor_config = Configuration()
-    
+@lru_cache(maxsize=1)
+def get_default_config() -> Configuration:
+    """Default configuration for the supervisor system, built on first use."""
+    return Configuration()
+
+
 async def create_subagents(configurable: dict = None):
     """Create all specialized sub-agents for the Supervisor system.
     
@@ -22,7 +29,8 @@ async def create_subagents(configurable: dict = None):
     3. Writing Agent: Content creation and formatting from research data
     
     Each sub-agent is configured with specific tools and prompts optimized
-    for their domain expertise.
+    for their domain expertise. Agents with a memo TTL configured answer
+    repeated tasks from the memo (see playground.agents.supervisor.memo).
     
     Args:
         configurable (dict, optional): Configuration overrides for sub-agents
@@ -31,10 +39,11 @@ async def create_subagents(configurable: dict = None):
         list: List of compiled sub-agent graphs ready for use by supervisor
     """
 
-    print(f"create_subagents configurable: {configurable}")
-
     if configurable is None:
         configurable = {}
+    trace("create_subagents", overrides=sorted(configurable))
+    supervisor_config = get_default_config()
+    model_equivalents = configurable.get("model_equivalents", supervisor_config.model_equivalents)
 
     # === CREATE SCRAPE AGENT ===
     # Specialized for web scraping and data extraction using Firecrawl tools
@@ -43,11 +52,19 @@ async def create_subagents(configurable: dict = None):
             "model": configurable.get("scrape_model", supervisor_config.scrape_model),
             "system_prompt": configurable.get("scrape_system_prompt", supervisor_config.scrape_system_prompt),
             "selected_tools": configurable.get("scrape_tools", supervisor_config.scrape_tools),
+            "max_parallel_tool_calls": configurable.get("scrape_max_parallel_tool_calls",
+                                                        supervisor_config.scrape_max_parallel_tool_calls),
+            "tool_timeout": configurable.get("scrape_tool_timeout", supervisor_config.scrape_tool_timeout),
+            "model_equivalents": model_equivalents,
             "name": "scrape_agent"  # Agent identifier for supervisor routing
         }
     )
 
-    scrape_agent = await make_graph(scrape_config)
+    scrape_agent = memoize_agent(
+        await make_graph(scrape_config),
+        configurable.get("scrape_memo_ttl", supervisor_config.scrape_memo_ttl),
+        scrape_config["configurable"],
+    )
 
     # === CREATE RESEARCH AGENT ===
     # Specialized for comprehensive web research and information gathering
@@ -56,10 +73,18 @@ async def create_subagents(configurable: dict = None):
             "model": configurable.get("research_model", supervisor_config.research_model),
             "system_prompt": configurable.get("research_system_prompt", supervisor_config.research_system_prompt),
             "selected_tools": configurable.get("research_tools", supervisor_config.research_tools),
+            "max_parallel_tool_calls": configurable.get("research_max_parallel_tool_calls",
+                                                        supervisor_config.research_max_parallel_tool_calls),
+            "tool_timeout": configurable.get("research_tool_timeout", supervisor_config.research_tool_timeout),
+            "model_equivalents": model_equivalents,
             "name": "general_research_agent"  # Agent identifier for supervisor routing
         }
     )
-    general_research_agent = await make_graph(research_config)
+    general_research_agent = memoize_agent(
+        await make_graph(research_config),
+        configurable.get("research_memo_ttl", supervisor_config.research_memo_ttl),
+        research_config["configurable"],
+    )
 
     # === CREATE WRITING AGENT ===
     # Specialized for content creation and formatting from research data
@@ -68,10 +93,18 @@ async def create_subagents(configurable: dict = None):
             "model": configurable.get("writing_model", supervisor_config.writing_model),
             "system_prompt": configurable.get("writing_system_prompt", supervisor_config.writing_system_prompt),
             "selected_tools": configurable.get("writing_tools", supervisor_config.writing_tools),
+            "max_parallel_tool_calls": configurable.get("writing_max_parallel_tool_calls",
+                                                        supervisor_config.writing_max_parallel_tool_calls),
+            "tool_timeout": configurable.get("writing_tool_timeout", supervisor_config.writing_tool_timeout),
+            "model_equivalents": model_equivalents,
             "name": "writing_agent"  # Agent identifier for supervisor routing
         }
     )
-    writing_agent = await make_graph(writing_config)
+    writing_agent = memoize_agent(
+        await make_graph(writing_config),
+        configurable.get("writing_memo_ttl", supervisor_config.writing_memo_ttl),
+        writing_config["configurable"],
+    )
     
     # Return all sub-agents for supervisor orchestration
     return [
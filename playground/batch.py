@@ -0,0 +1,249 @@
+"""
+Headless batch runner for bulk supervisor queries.
+
+Reads queries from a JSONL file, runs them concurrently through one compiled
+supervisor graph and appends each result to an output JSONL file as soon as it
+completes:
+
+    python -m playground.batch queries.jsonl results.jsonl --workers 8 \
+        --configurable '{"terminal_agent": "writing_agent"}'
+
+Each input line is {"query": "..."} or {"messages": [{"role", "content"}]},
+optionally with an "id" (default: the line number) and a "configurable" dict
+applied to that run. Graph-level settings (models, tools, handoff mode) come
+from --configurable and are fixed for the batch, since the graph is compiled once.
+
+Output lines carry the id, input line, status ("succeeded", "partial" or
+"failed"), response, tool calls, error and latency. Queries run under the
+background-job budget (playground.jobs.job_budget) unless --configurable or the
+query sets time_budget / step_budget; a query cut short by it is recorded as
+"partial". Rerunning the same command resumes: ids already in the output are
+skipped (failed and partial ones too, unless --retry-failed), and a line cut
+off by a crash is dropped. Throughput and latency statistics are
+printed to stderr while the batch runs and when it ends.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Any, Iterator, Optional, TextIO
+
+from playground.jobs import FAILED, SUCCEEDED, JobFunction, run_supervisor
+from playground.utils.stats import latency_summary
+from playground.utils.tracing import trace
+
+DEFAULT_WORKERS = 4
+# Status of a query whose run budget ran out before it finished
+PARTIAL = "partial"
+# Configurable keys of the run budget, passed per query so they override the job defaults
+_BUDGET_KEYS = ("time_budget", "step_budget")
+# Seconds between progress lines
+PROGRESS_INTERVAL = 10.0
+
+
+@dataclass
+class BatchStats:
+    """Counters and latencies of one batch invocation."""
+
+    skipped: int = 0
+    succeeded: int = 0
+    partial: int = 0
+    failed: int = 0
+    started: float = field(default_factory=time.monotonic)
+    latencies: list[float] = field(default_factory=list)
+
+    @property
+    def completed(self) -> int:
+        return self.succeeded + self.partial + self.failed
+
+    def summary(self) -> dict[str, Any]:
+        """Throughput and latency summary.
+
+        Returns:
+            dict: skipped/succeeded/partial/failed counts, wall time, queries per minute
+            and latency statistics in seconds
+        """
+        elapsed = time.monotonic() - self.started
+        return {
+            "skipped": self.skipped,
+            "succeeded": self.succeeded,
+            "partial": self.partial,
+            "failed": self.failed,
+            "elapsed_s": round(elapsed, 1),
+            "queries_per_min": round(self.completed / elapsed * 60, 2) if elapsed > 0 else None,
+            "latency_s": latency_summary(self.latencies),
+        }
+
+    def format(self) -> str:
+        summary = self.summary()
+        latency = summary["latency_s"]
+        line = (f"{self.completed} done ({self.succeeded} ok, {self.partial} partial, {self.failed} failed, "
+                f"{self.skipped} skipped) "
+                f"in {summary['elapsed_s']}s, {summary['queries_per_min']} queries/min")
+        if latency["count"]:
+            line += (f"; latency p50 {latency['p50']:.1f}s, p95 {latency['p95']:.1f}s, "
+                     f"p99 {latency['p99']:.1f}s, max {latency['max']:.1f}s")
+        return line
+
+
+def read_queries(path: str) -> Iterator[tuple[int, dict[str, Any]]]:
+    """Yield (line number, query record) for each non-blank line of a JSONL file.
+
+    Raises:
+        ValueError: A line is not a JSON object with "query" or "messages"
+    """
+    with open(path, encoding="utf-8") as f:
+        for line_no, line in enumerate(f, start=1):
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if not isinstance(record, dict) or not (record.get("query") or record.get("messages")):
+                raise ValueError(f"{path}:{line_no}: expected an object with 'query' or 'messages'")
+            # Ids are compared as strings, the form completed_ids reads back from the output
+            record["id"] = str(record.get("id", line_no))
+            yield line_no, record
+
+
+def completed_ids(path: str, retry_failed: bool = False) -> set[str]:
+    """Ids already recorded in an output file, dropping a last line cut off by a crash.
+
+    Args:
+        path: Output JSONL file (may not exist yet)
+        retry_failed: Leave failed and partial ids out, so they run again
+
+    Returns:
+        Ids to skip
+    """
+    if not os.path.exists(path):
+        return set()
+    with open(path, "rb+") as f:
+        data = f.read()
+        if data and not data.endswith(b"\n"):
+            # Partial write from an interrupted run: cut back to the last complete line
+            f.truncate(data.rfind(b"\n") + 1)
+            data = data[:data.rfind(b"\n") + 1]
+    ids = set()
+    for line in data.decode("utf-8").splitlines():
+        if not line.strip():
+            continue
+        result = json.loads(line)
+        if result.get("status") == SUCCEEDED or not retry_failed:
+            ids.add(str(result["id"]))
+    return ids
+
+
+def to_request(record: dict[str, Any]) -> dict[str, Any]:
+    """Job request for a query record: {"messages": [...], "configurable": {...}}."""
+    messages = record.get("messages") or [{"role": "user", "content": record["query"]}]
+    return {"messages": messages, "configurable": record.get("configurable") or {}}
+
+
+async def run_batch(input_path: str, output_path: str, run: JobFunction, workers: int = DEFAULT_WORKERS,
+                    retry_failed: bool = False, progress: Optional[TextIO] = sys.stderr,
+                    progress_interval: float = PROGRESS_INTERVAL) -> BatchStats:
+    """Run every pending query of an input file and append the results to the output file.
+
+    Args:
+        input_path: Input JSONL file
+        output_path: Output JSONL file, appended to
+        run: Coroutine function running one request (see playground.jobs.JobFunction)
+        workers: Queries executing at once
+        retry_failed: Run queries whose recorded result failed or was partial again
+        progress: Stream for progress lines (None for quiet)
+        progress_interval: Seconds between progress lines
+
+    Returns:
+        The batch statistics
+    """
+    stats = BatchStats()
+    done = completed_ids(output_path, retry_failed)
+    # Bounded, so a large input file is read as workers free up rather than all at once
+    queue: asyncio.Queue[Optional[tuple[int, dict[str, Any]]]] = asyncio.Queue(maxsize=2 * workers)
+    last_report = time.monotonic()
+
+    def record(output: TextIO, result: dict[str, Any]) -> None:
+        nonlocal last_report
+        output.write(json.dumps(result, ensure_ascii=False, default=str) + "\n")
+        output.flush()
+        now = time.monotonic()
+        if progress is not None and now - last_report >= progress_interval:
+            last_report = now
+            print(f"[batch] {stats.format()}", file=progress)
+
+    async def work(output: TextIO) -> None:
+        while (item := await queue.get()) is not None:
+            line_no, query = item
+            started = time.monotonic()
+            result = {"id": query["id"], "line": line_no}
+            try:
+                response = await run(to_request(query), lambda type, data: None)
+            except Exception as e:
+                stats.failed += 1
+                result.update(status=FAILED, error=repr(e))
+                trace("batch_query", level="error", id=query["id"], error=repr(e))
+            else:
+                if response.get("partial"):
+                    stats.partial += 1
+                    result.update(**response, status=PARTIAL)
+                else:
+                    stats.succeeded += 1
+                    result.update(**response, status=SUCCEEDED)
+            result["latency_s"] = round(time.monotonic() - started, 3)
+            stats.latencies.append(result["latency_s"])
+            record(output, result)
+
+    with open(output_path, "a", encoding="utf-8") as output:
+        tasks = [asyncio.create_task(work(output)) for _ in range(max(1, workers))]
+        try:
+            for line_no, query in read_queries(input_path):
+                if query["id"] in done:
+                    stats.skipped += 1
+                    continue
+                await queue.put((line_no, query))
+            for _ in tasks:
+                await queue.put(None)
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+    if progress is not None:
+        print(f"[batch] finished: {stats.format()}", file=progress)
+    return stats
+
+
+async def _main(args: argparse.Namespace) -> BatchStats:
+    from playground.agents.supervisor.graph import make_supervisor_graph
+
+    configurable = json.loads(args.configurable) if args.configurable else {}
+    # One compiled graph serves every query of the batch
+    graph = await make_supervisor_graph({"configurable": configurable})
+    budget = {key: configurable[key] for key in _BUDGET_KEYS if key in configurable}
+
+    async def run(request: dict[str, Any], emit: Any) -> dict[str, Any]:
+        request = {**request, "configurable": {**budget, **request["configurable"]}}
+        return await run_supervisor(request, emit, graph=graph)
+
+    return await run_batch(args.input, args.output, run, workers=args.workers, retry_failed=args.retry_failed)
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Run a JSONL file of queries through the supervisor graph.")
+    parser.add_argument("input", help="Input JSONL: one {'query'} or {'messages'} object per line")
+    parser.add_argument("output", help="Output JSONL, appended to; existing results are skipped on resume")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS, help="Queries executing at once")
+    parser.add_argument("--configurable", help="Graph configuration as JSON, e.g. '{\"handoff_mode\": \"summary\"}'")
+    parser.add_argument("--retry-failed", action="store_true", help="Run queries that failed or were cut short by the budget before again")
+    parser.add_argument("--stats-json", action="store_true", help="Print the final statistics as JSON to stdout")
+    args = parser.parse_args(argv)
+
+    stats = asyncio.run(_main(args))
+    if args.stats_json:
+        print(json.dumps(stats.summary()))
+
+
+if __name__ == "__main__":
+    main()
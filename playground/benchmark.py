@@ -0,0 +1,375 @@
+"""
+Concurrent latency and throughput benchmark for the configured models.
+
+Streams a prompt through every model listed in the ReAct and supervisor
+configurations at increasing concurrency levels and measures, per request,
+time to first token (TTFT), total latency and output tokens per second:
+
+    python -m playground.benchmark --concurrency 1 4 16 --requests 32
+    python -m playground.benchmark --stub            # offline, against a local stub
+    python -m playground.benchmark --compare .playground/benchmarks/<previous>.json
+
+Models whose provider key is missing are skipped. Each run is saved as JSON
+under .playground/benchmarks/ (stable key order, so two runs diff cleanly), and
+--compare prints the p50/p95 change against an earlier run.
+
+StubServer is a local OpenAI-compatible chat completions endpoint with a fixed
+TTFT and token rate; --stub points OPENAI_BASE_URL and OPENROUTER_BASE_URL at it
+so the benchmark (and its tests) run without network access or API keys.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Optional, get_args
+
+from playground.utils.model import load_chat_model
+from playground.utils.stats import latency_summary
+from playground.utils.storage import data_path
+
+DEFAULT_CONCURRENCY = (1, 4, 16)
+DEFAULT_PROMPT = "Recommend three winter coats under 200,000 won, one line each."
+
+_PROVIDER_KEYS = {"openai": "OPENAI_API_KEY", "openrouter": "OPENROUTER_API_KEY"}
+
+
+def configured_models() -> list[str]:
+    """Model names offered by the ReAct and supervisor configurations, in order, without duplicates."""
+    from playground.agents.react.configuration import ModelName
+    from playground.agents.supervisor.configuration import ResearchModel, ScrapeModel, SupervisorModel, WritingModel
+
+    names = [name for alias in (ModelName, SupervisorModel, ScrapeModel, ResearchModel, WritingModel)
+             for name in get_args(alias)]
+    return list(dict.fromkeys(names))
+
+
+def missing_key(model_name: str) -> Optional[str]:
+    """Name of the API key a model needs but the environment lacks, or None."""
+    key = _PROVIDER_KEYS.get(model_name.split("/", 1)[0])
+    return key if key and not os.getenv(key) else None
+
+
+@dataclass
+class Sample:
+    """One streamed request."""
+
+    latency: float
+    ttft: Optional[float] = None
+    output_tokens: int = 0
+    error: Optional[str] = None
+
+    @property
+    def tokens_per_second(self) -> Optional[float]:
+        """Output tokens per second after the first token."""
+        if self.ttft is None or self.output_tokens < 2 or self.latency <= self.ttft:
+            return None
+        return (self.output_tokens - 1) / (self.latency - self.ttft)
+
+
+async def measure(model: Any, prompt: str) -> Sample:
+    """Stream one completion and time it."""
+    started = time.perf_counter()
+    ttft, chunks, output_tokens = None, 0, 0
+    try:
+        async for chunk in model.astream(prompt):
+            if chunk.content:
+                chunks += 1
+                if ttft is None:
+                    ttft = time.perf_counter() - started
+            usage = getattr(chunk, "usage_metadata", None)
+            if usage and usage.get("output_tokens"):
+                output_tokens = usage["output_tokens"]
+    except Exception as e:
+        return Sample(latency=time.perf_counter() - started, error=repr(e))
+    # Providers without streamed usage: count content chunks instead
+    return Sample(latency=time.perf_counter() - started, ttft=ttft, output_tokens=output_tokens or chunks)
+
+
+def _rounded(summary: dict[str, Optional[float]]) -> dict[str, Optional[float]]:
+    return {key: round(value, 4) if isinstance(value, float) else value for key, value in summary.items()}
+
+
+async def run_level(model: Any, concurrency: int, requests: int, prompt: str) -> dict[str, Any]:
+    """Send requests with at most concurrency in flight and summarize them.
+
+    Returns:
+        dict: concurrency, requests, errors, ttft_s / latency_s / tokens_per_s
+        summaries (count, mean, p50, p95, p99, max) and aggregate throughput
+    """
+    slots = asyncio.Semaphore(concurrency)
+
+    async def one() -> Sample:
+        async with slots:
+            return await measure(model, prompt)
+
+    started = time.perf_counter()
+    samples = await asyncio.gather(*(one() for _ in range(requests)))
+    wall = time.perf_counter() - started
+    ok = [sample for sample in samples if sample.error is None]
+    errors = [sample.error for sample in samples if sample.error is not None]
+    return {
+        "concurrency": concurrency,
+        "requests": requests,
+        "errors": len(errors),
+        "first_error": errors[0] if errors else None,
+        "ttft_s": _rounded(latency_summary(s.ttft for s in ok if s.ttft is not None)),
+        "latency_s": _rounded(latency_summary(s.latency for s in ok)),
+        "tokens_per_s": _rounded(latency_summary(s.tokens_per_second for s in ok
+                                                 if s.tokens_per_second is not None)),
+        "throughput": {
+            "requests_per_s": round(len(ok) / wall, 3),
+            "output_tokens_per_s": round(sum(s.output_tokens for s in ok) / wall, 1),
+        },
+    }
+
+
+async def run_benchmark(models: Optional[list[str]] = None, concurrency: tuple[int, ...] = DEFAULT_CONCURRENCY,
+                        requests: Optional[int] = None, prompt: str = DEFAULT_PROMPT) -> dict[str, Any]:
+    """Sweep every model over the concurrency levels.
+
+    Args:
+        models: Fully specified model names (default: configured_models())
+        concurrency: Concurrency levels, run in order
+        requests: Requests per level (default: twice the level, at least 4)
+        prompt: Prompt streamed by every request
+
+    Returns:
+        dict: run metadata, {"results": {model: [level summaries]}, "skipped": {model: reason}}
+    """
+    run = {
+        "run_id": uuid.uuid4().hex[:8],
+        "started_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "prompt": prompt,
+        "concurrency": list(concurrency),
+        "base_urls": {name: os.getenv(name) for name in ("OPENAI_BASE_URL", "OPENROUTER_BASE_URL")
+                      if os.getenv(name)},
+        "results": {},
+        "skipped": {},
+    }
+    for model_name in models or configured_models():
+        key = missing_key(model_name)
+        if key:
+            run["skipped"][model_name] = f"{key} not set"
+            continue
+        model = load_chat_model(model_name, node="benchmark")
+        run["results"][model_name] = [
+            await run_level(model, level, requests or max(4, 2 * level), prompt) for level in concurrency
+        ]
+    return run
+
+
+def save_results(run: dict[str, Any], path: Optional[Path] = None) -> Path:
+    """Write a benchmark run as JSON (default: .playground/benchmarks/<time>-<run id>.json)."""
+    if path is None:
+        stamp = run["started_at"][:19].replace(":", "").replace("-", "")
+        path = data_path("benchmarks", f"{stamp}-{run['run_id']}.json")
+    Path(path).write_text(json.dumps(run, indent=2, sort_keys=True, ensure_ascii=False) + "\n", encoding="utf-8")
+    return Path(path)
+
+
+def compare_runs(previous: dict[str, Any], current: dict[str, Any]) -> list[str]:
+    """Changes in p50/p95 TTFT and latency for models and levels present in both runs."""
+    lines = []
+    for model_name, levels in current["results"].items():
+        before = {level["concurrency"]: level for level in previous.get("results", {}).get(model_name, [])}
+        for level in levels:
+            old = before.get(level["concurrency"])
+            if old is None:
+                continue
+            changes = []
+            for metric in ("ttft_s", "latency_s"):
+                for quantile in ("p50", "p95"):
+                    new_value, old_value = level[metric][quantile], old[metric][quantile]
+                    if new_value is not None and old_value:
+                        changes.append(f"{metric[:-2]} {quantile} {(new_value - old_value) / old_value:+.0%}")
+            if changes:
+                lines.append(f"{model_name} @{level['concurrency']}: " + ", ".join(changes))
+    return lines
+
+
+def format_results(run: dict[str, Any]) -> str:
+    """Results as a plain text table."""
+    header = (f"{'model':<45} {'conc':>4} {'ttft p50':>9} {'ttft p95':>9} {'lat p50':>8} {'lat p95':>8} "
+              f"{'lat p99':>8} {'tok/s':>7} {'req/s':>6} {'err':>4}")
+    lines = [header, "-" * len(header)]
+
+    def cell(value: Optional[float], width: int) -> str:
+        return f"{value:>{width}.2f}" if value is not None else f"{'-':>{width}}"
+
+    for model_name, levels in run["results"].items():
+        for level in levels:
+            lines.append(
+                f"{model_name:<45} {level['concurrency']:>4} {cell(level['ttft_s']['p50'], 9)} "
+                f"{cell(level['ttft_s']['p95'], 9)} {cell(level['latency_s']['p50'], 8)} "
+                f"{cell(level['latency_s']['p95'], 8)} {cell(level['latency_s']['p99'], 8)} "
+                f"{cell(level['tokens_per_s']['p50'], 7)} {level['throughput']['requests_per_s']:>6.2f} "
+                f"{level['errors']:>4}"
+            )
+    lines += [f"skipped {model_name}: {reason}" for model_name, reason in run["skipped"].items()]
+    return "\n".join(lines)
+
+
+# === LOCAL OPENAI-COMPATIBLE STUB ===
+
+class StubServer:
+    """Local OpenAI-compatible /chat/completions endpoint with predictable timing.
+
+    Every completion answers with a fixed number of tokens after ttft seconds,
+    then one token every token_interval seconds; streamed responses end with a
+    usage chunk when the client asks for it. Requests are served concurrently.
+
+    Args:
+        ttft: Seconds before the first token
+        token_interval: Seconds between tokens
+        tokens: Tokens per completion
+        port: Port to listen on (0 picks a free one)
+    """
+
+    def __init__(self, ttft: float = 0.05, token_interval: float = 0.005, tokens: int = 32, port: int = 0) -> None:
+        self.ttft = ttft
+        self.token_interval = token_interval
+        self.tokens = tokens
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", port), self._handler())
+        self._server.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Base URL to use as OPENAI_BASE_URL / OPENROUTER_BASE_URL."""
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def start(self) -> "StubServer":
+        self._thread = threading.Thread(target=self._server.serve_forever, name="llm-stub", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> "StubServer":
+        return self.start()
+
+    def __exit__(self, *exc: Any) -> None:
+        self.stop()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+            def do_POST(self) -> None:
+                if not self.path.rstrip("/").endswith("/chat/completions"):
+                    self.send_error(404)
+                    return
+                body = json.loads(self.rfile.read(int(self.headers.get("Content-Length") or 0)) or b"{}")
+                with stub._lock:
+                    stub.requests += 1
+                if body.get("stream"):
+                    self._stream(body)
+                else:
+                    self._complete(body)
+
+            def _chunk(self, body: dict, delta: dict, finish_reason: Optional[str] = None, **extra: Any) -> dict:
+                return {"id": "chatcmpl-stub", "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": body.get("model", "stub"),
+                        "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}], **extra}
+
+            def _usage(self, body: dict) -> dict:
+                prompt_tokens = sum(len(str(m.get("content", "")).split()) for m in body.get("messages", []))
+                return {"prompt_tokens": prompt_tokens, "completion_tokens": stub.tokens,
+                        "total_tokens": prompt_tokens + stub.tokens}
+
+            def _stream(self, body: dict) -> None:
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.send_header("Cache-Control", "no-cache")
+                self.end_headers()
+
+                def send(payload: Any) -> None:
+                    data = payload if isinstance(payload, str) else json.dumps(payload)
+                    self.wfile.write(f"data: {data}\n\n".encode())
+                    self.wfile.flush()
+
+                send(self._chunk(body, {"role": "assistant", "content": ""}))
+                time.sleep(stub.ttft)
+                for i in range(stub.tokens):
+                    if i:
+                        time.sleep(stub.token_interval)
+                    send(self._chunk(body, {"content": f"tok{i} "}))
+                send(self._chunk(body, {}, "stop"))
+                if (body.get("stream_options") or {}).get("include_usage"):
+                    send({**self._chunk(body, {}), "choices": [], "usage": self._usage(body)})
+                send("[DONE]")
+
+            def _complete(self, body: dict) -> None:
+                time.sleep(stub.ttft + stub.token_interval * (stub.tokens - 1))
+                payload = json.dumps({
+                    "id": "chatcmpl-stub", "object": "chat.completion", "created": int(time.time()),
+                    "model": body.get("model", "stub"),
+                    "choices": [{"index": 0, "finish_reason": "stop",
+                                 "message": {"role": "assistant",
+                                             "content": "".join(f"tok{i} " for i in range(stub.tokens))}}],
+                    "usage": self._usage(body),
+                }).encode()
+                self.send_response(200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(payload)))
+                self.end_headers()
+                self.wfile.write(payload)
+
+        return Handler
+
+
+def use_stub(stub: StubServer) -> None:
+    """Route both providers to a stub server for this process, with placeholder keys if none are set."""
+    for variable in ("OPENAI_BASE_URL", "OPENROUTER_BASE_URL"):
+        os.environ[variable] = stub.url
+    for key in _PROVIDER_KEYS.values():
+        os.environ.setdefault(key, "stub")
+
+
+def main(argv: Optional[list[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Benchmark configured models under concurrency.")
+    parser.add_argument("--models", nargs="+", help="Fully specified model names (default: all configured)")
+    parser.add_argument("--concurrency", nargs="+", type=int, default=list(DEFAULT_CONCURRENCY),
+                        help="Concurrency levels to sweep")
+    parser.add_argument("--requests", type=int, help="Requests per level (default: twice the level, at least 4)")
+    parser.add_argument("--prompt", default=DEFAULT_PROMPT)
+    parser.add_argument("--stub", action="store_true", help="Run offline against a local OpenAI-compatible stub")
+    parser.add_argument("--output", type=Path, help="Results file (default: .playground/benchmarks/...)")
+    parser.add_argument("--compare", type=Path, help="Earlier results file to compare against")
+    args = parser.parse_args(argv)
+
+    stub = StubServer().start() if args.stub else None
+    if stub is not None:
+        use_stub(stub)
+    try:
+        run = asyncio.run(run_benchmark(args.models, tuple(args.concurrency), args.requests, args.prompt))
+    finally:
+        if stub is not None:
+            stub.stop()
+
+    print(format_results(run))
+    print(f"\nSaved to {save_results(run, args.output)}")
+    if args.compare:
+        changes = compare_runs(json.loads(args.compare.read_text(encoding="utf-8")), run)
+        print(f"\nCompared with {args.compare}:")
+        print("\n".join(changes) or "No common models and concurrency levels")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,485 @@
+"""
+Background jobs for long supervisor runs.
+
+Requests like "crawl this brand's whole catalog and compare prices" can take
+minutes. Instead of streaming them over a live UI connection they can be
+submitted as jobs: the run executes on a worker pool in a background thread,
+its progress and result are persisted in a local SQLite job store, and the
+caller polls, streams or fetches the result later by job id.
+
+Identical submissions (same messages and configuration) are served from the
+most recent successful job within the cache TTL, and join a job that is still
+queued or running instead of starting a second one; the job is then listed for
+every owner that submitted it. Jobs wait for a slot from the admission
+controller like interactive runs do, and jobs interrupted by a restart are
+queued again when the runner starts.
+
+Background runs are expected to be long, so they get their own run budget
+instead of the interactive defaults (see playground.utils.budget); a request's
+configurable can still set time_budget / step_budget. A run cut short by its
+budget is recorded with partial=True and is never served from the cache.
+
+Settings come from the environment:
+    PLAYGROUND_JOB_WORKERS       Jobs executing at once (default 2)
+    PLAYGROUND_JOB_CACHE_TTL     Seconds a finished result is reused (default 3600, 0 disables)
+    PLAYGROUND_JOB_TIME_BUDGET   Wall-clock seconds a background run may take (default 3600, "none" for no limit)
+    PLAYGROUND_JOB_STEP_BUDGET   Model calls a background run may make (default 200, "none" for no limit)
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from playground.utils.admission import AdmissionController, get_admission_controller
+from playground.utils.budget import get_budget
+from playground.utils.progress import PROGRESS_EVENT
+from playground.utils.runs import new_run_config
+from playground.utils.storage import data_path
+from playground.utils.tracing import trace
+
+DEFAULT_WORKERS = 2
+DEFAULT_CACHE_TTL = 3600.0
+DEFAULT_JOB_TIME_BUDGET = 3600.0
+DEFAULT_JOB_STEP_BUDGET = 200
+
+QUEUED, RUNNING, SUCCEEDED, FAILED = "queued", "running", "succeeded", "failed"
+FINISHED = (SUCCEEDED, FAILED)
+
+# Configurable keys that identify a run rather than change its result
+_VOLATILE_KEYS = {"run_id", "thread_id"}
+
+Emit = Callable[[str, dict[str, Any]], None]
+JobFunction = Callable[[dict[str, Any], Emit], Awaitable[dict[str, Any]]]
+
+
+@dataclass
+class Job:
+    """A submitted run and its outcome."""
+
+    id: str
+    key: str
+    status: str
+    request: dict[str, Any]
+    result: Optional[dict[str, Any]] = None
+    error: Optional[str] = None
+    owner: Optional[str] = None
+    created_at: float = 0.0
+    started_at: Optional[float] = None
+    finished_at: Optional[float] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED
+
+    @property
+    def partial(self) -> bool:
+        """Whether the run was cut short by its budget and returned a partial answer."""
+        return bool((self.result or {}).get("partial"))
+
+
+def request_key(request: dict[str, Any]) -> str:
+    """Cache key of a submission: its messages and result-affecting configuration."""
+    configurable = {key: value for key, value in (request.get("configurable") or {}).items()
+                    if key not in _VOLATILE_KEYS}
+    messages = [{"role": m["role"], "content": " ".join(str(m["content"]).split())}
+                for m in request.get("messages", [])]
+    payload = json.dumps({"messages": messages, "configurable": configurable}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _budget_setting(name: str, default: Optional[float]) -> Optional[float]:
+    value = os.getenv(name, "").strip().lower()
+    if not value:
+        return default
+    return None if value == "none" else float(value)
+
+
+def job_budget() -> dict[str, Any]:
+    """Run budget for background and batch runs, as configurable time_budget / step_budget."""
+    step_budget = _budget_setting("PLAYGROUND_JOB_STEP_BUDGET", DEFAULT_JOB_STEP_BUDGET)
+    return {
+        "time_budget": _budget_setting("PLAYGROUND_JOB_TIME_BUDGET", DEFAULT_JOB_TIME_BUDGET),
+        "step_budget": int(step_budget) if step_budget is not None else None,
+    }
+
+
+# === STORE ===
+
+class JobStore:
+    """SQLite store of jobs and their progress events.
+
+    Args:
+        path: Database file path (":memory:" for a throwaway store)
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    key TEXT NOT NULL,
+                    status TEXT NOT NULL,
+                    request TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    owner TEXT,
+                    created_at REAL NOT NULL,
+                    started_at REAL,
+                    finished_at REAL,
+                    partial INTEGER NOT NULL DEFAULT 0
+                )"""
+            )
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(jobs)")}
+            if "partial" not in columns:
+                self._conn.execute("ALTER TABLE jobs ADD COLUMN partial INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS jobs_key ON jobs (key, finished_at)")
+            # Owners that submitted a job, including those that joined an identical one
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS job_owners (
+                    job_id TEXT NOT NULL,
+                    owner TEXT NOT NULL,
+                    joined_at REAL NOT NULL,
+                    PRIMARY KEY (job_id, owner)
+                )"""
+            )
+            self._conn.execute(
+                """INSERT OR IGNORE INTO job_owners (job_id, owner, joined_at)
+                   SELECT id, owner, created_at FROM jobs WHERE owner IS NOT NULL"""
+            )
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS job_events (
+                    job_id TEXT NOT NULL,
+                    seq INTEGER NOT NULL,
+                    ts REAL NOT NULL,
+                    type TEXT NOT NULL,
+                    data TEXT NOT NULL,
+                    PRIMARY KEY (job_id, seq)
+                )"""
+            )
+
+    @staticmethod
+    def _job(row: sqlite3.Row) -> Job:
+        return Job(
+            id=row["id"], key=row["key"], status=row["status"], request=json.loads(row["request"]),
+            result=json.loads(row["result"]) if row["result"] else None, error=row["error"],
+            owner=row["owner"], created_at=row["created_at"], started_at=row["started_at"],
+            finished_at=row["finished_at"],
+        )
+
+    def create(self, request: dict[str, Any], key: str, owner: Optional[str] = None) -> Job:
+        job = Job(id=uuid.uuid4().hex, key=key, status=QUEUED, request=request, owner=owner,
+                  created_at=time.time())
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT INTO jobs (id, key, status, request, owner, created_at) VALUES (?, ?, ?, ?, ?, ?)",
+                (job.id, key, QUEUED, json.dumps(request, default=str), owner, job.created_at),
+            )
+            if owner is not None:
+                self._conn.execute("INSERT INTO job_owners (job_id, owner, joined_at) VALUES (?, ?, ?)",
+                                   (job.id, owner, job.created_at))
+        return job
+
+    def add_owner(self, job_id: str, owner: str) -> None:
+        """List an existing job for another owner that submitted the same request."""
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO job_owners (job_id, owner, joined_at) VALUES (?, ?, ?)",
+                               (job_id, owner, time.time()))
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone()
+        return self._job(row) if row else None
+
+    def find(self, key: str, max_age: float) -> Optional[Job]:
+        """Latest job for a key that is still pending, or succeeded with a complete answer within max_age seconds."""
+        with self._lock:
+            row = self._conn.execute(
+                """SELECT * FROM jobs WHERE key = ?
+                   AND (status IN (?, ?) OR (status = ? AND partial = 0 AND finished_at >= ?))
+                   ORDER BY created_at DESC LIMIT 1""",
+                (key, QUEUED, RUNNING, SUCCEEDED, time.time() - max_age),
+            ).fetchone()
+        return self._job(row) if row else None
+
+    def recent(self, owner: Optional[str] = None, limit: int = 20) -> list[Job]:
+        """Most recent jobs first, optionally only those one owner submitted or joined."""
+        if owner is None:
+            sql, params = "SELECT * FROM jobs ORDER BY created_at DESC LIMIT ?", [limit]
+        else:
+            sql = """SELECT jobs.* FROM jobs JOIN job_owners ON job_owners.job_id = jobs.id
+                     WHERE job_owners.owner = ? ORDER BY job_owners.joined_at DESC LIMIT ?"""
+            params = [owner, limit]
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [self._job(row) for row in rows]
+
+    def requeue_unfinished(self) -> list[str]:
+        """Queue jobs interrupted while running again; return all queued ids, oldest first."""
+        with self._lock, self._conn:
+            self._conn.execute("UPDATE jobs SET status = ?, started_at = NULL WHERE status = ?", (QUEUED, RUNNING))
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = ? ORDER BY created_at",
+                                      (QUEUED,)).fetchall()
+        return [row["id"] for row in rows]
+
+    def claim(self, job_id: str) -> bool:
+        """Mark a queued job as running; False if another worker already took it."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("UPDATE jobs SET status = ?, started_at = ? WHERE id = ? AND status = ?",
+                                        (RUNNING, time.time(), job_id, QUEUED))
+        return cursor.rowcount == 1
+
+    def finish(self, job_id: str, result: Optional[dict[str, Any]] = None, error: Optional[str] = None) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                "UPDATE jobs SET status = ?, result = ?, error = ?, finished_at = ?, partial = ? WHERE id = ?",
+                (FAILED if error else SUCCEEDED, json.dumps(result, default=str) if result is not None else None,
+                 error, time.time(), int(bool((result or {}).get("partial"))), job_id),
+            )
+
+    def add_event(self, job_id: str, type: str, data: dict[str, Any]) -> int:
+        """Append a progress event and return its sequence number."""
+        with self._lock, self._conn:
+            seq = self._conn.execute("SELECT COALESCE(MAX(seq), 0) + 1 FROM job_events WHERE job_id = ?",
+                                     (job_id,)).fetchone()[0]
+            self._conn.execute("INSERT INTO job_events (job_id, seq, ts, type, data) VALUES (?, ?, ?, ?, ?)",
+                               (job_id, seq, time.time(), type, json.dumps(data, default=str)))
+        return seq
+
+    def events(self, job_id: str, after: int = 0) -> list[dict[str, Any]]:
+        """Progress events of a job with a sequence number above after."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT seq, ts, type, data FROM job_events WHERE job_id = ? AND seq > ? ORDER BY seq",
+                (job_id, after),
+            ).fetchall()
+        return [{"seq": row["seq"], "ts": row["ts"], "type": row["type"], **json.loads(row["data"])}
+                for row in rows]
+
+
+# === RUNS ===
+
+async def run_supervisor(request: dict[str, Any], emit: Emit, graph: Optional[Any] = None) -> dict[str, Any]:
+    """Run the supervisor graph for a job, emitting tool and progress events.
+
+    The run gets job_budget() unless the request's configurable sets its own
+    time_budget / step_budget.
+
+    Args:
+        request: {"messages": [{"role", "content"}], "configurable": {...}}
+        emit: Records a progress event for the job
+        graph: Compiled supervisor graph to reuse (default: built from the request's configurable)
+
+    Returns:
+        {"response": final answer, "tool_calls": [{"tool_name", "tool_args"}], "handoff_savings": {...},
+        "partial": whether the budget cut the run short, "reason": "time" | "steps" | None}
+    """
+    from playground.agents.supervisor.graph import make_supervisor_graph
+    from playground.agents.supervisor.handoff import get_handoff_savings
+
+    config = new_run_config(**{**job_budget(), **(request.get("configurable") or {})})
+    if graph is None:
+        graph = await make_supervisor_graph(config)
+    response, tool_calls, flagged = "", [], {}
+    async for event in graph.astream_events({"messages": request["messages"]}, config=config, version="v2"):
+        kind = event.get("event")
+        if kind == "on_tool_start":
+            tool_calls.append({"tool_name": event["name"], "tool_args": event.get("data", {}).get("input")})
+            emit("tool_start", {"tool": event["name"]})
+        elif kind == "on_tool_end":
+            output = event.get("data", {}).get("output")
+            emit("tool_end", {"tool": event["name"],
+                              "status": getattr(output, "status", "success") if isinstance(output, ToolMessage)
+                              else "success"})
+        elif kind == "on_custom_event" and event.get("name") == PROGRESS_EVENT:
+            emit("progress", dict(event.get("data") or {}))
+        elif kind == "on_chain_end" and not event.get("parent_ids"):
+            # End of the root run: its output is the final graph state
+            messages = (event.get("data", {}).get("output") or {}).get("messages") or []
+            final = next((m for m in reversed(messages) if isinstance(m, AIMessage) and m.content), None)
+            if final is not None:
+                response = final.content
+                flagged = final.response_metadata.get("budget") or {}
+    budget = get_budget(config)
+    reason = flagged.get("reason") or (budget.exhausted if budget is not None else None)
+    return {"response": response, "tool_calls": tool_calls, "handoff_savings": get_handoff_savings(config),
+            "partial": bool(flagged.get("partial") or reason), "reason": reason}
+
+
+class JobRunner:
+    """Executes jobs on an asyncio worker pool in a background thread.
+
+    The thread and its event loop start on first use (start or submit), so
+    creating a runner is cheap. Jobs left unfinished by a previous process are
+    queued again when it starts.
+
+    Args:
+        store: Job store
+        run: Coroutine function executing one job (default: run_supervisor)
+        workers: Jobs executing at once
+        cache_ttl: Seconds a successful result is reused for identical submissions
+        admission: Controller granting run slots (default: the process-wide one)
+    """
+
+    def __init__(self, store: JobStore, run: JobFunction = run_supervisor, workers: int = DEFAULT_WORKERS,
+                 cache_ttl: float = DEFAULT_CACHE_TTL, admission: Optional[AdmissionController] = None) -> None:
+        self.store = store
+        self.run = run
+        self.workers = max(1, workers)
+        self.cache_ttl = cache_ttl
+        self.admission = admission
+        self.cache_hits = 0
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._queue: Optional[asyncio.Queue[str]] = None
+        self._done: dict[str, threading.Event] = {}
+
+    def start(self) -> asyncio.AbstractEventLoop:
+        """Start the worker thread if needed and return its event loop."""
+        with self._lock:
+            if self._loop is None:
+                ready = threading.Event()
+                threading.Thread(target=self._serve, args=(ready,), name="playground-jobs", daemon=True).start()
+                ready.wait()
+            return self._loop
+
+    def _serve(self, ready: threading.Event) -> None:
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
+        self._queue = asyncio.Queue()
+        for job_id in self.store.requeue_unfinished():
+            self._queue.put_nowait(job_id)
+        for i in range(self.workers):
+            loop.create_task(self._work(), name=f"job-worker-{i}")
+        self._loop = loop
+        ready.set()
+        loop.run_forever()
+
+    async def _work(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._execute(job_id)
+            finally:
+                self._queue.task_done()
+
+    async def _execute(self, job_id: str) -> None:
+        if not self.store.claim(job_id):
+            return
+        job = self.store.get(job_id)
+        started = time.monotonic()
+        admission = self.admission or get_admission_controller()
+        try:
+            # Background runs share the run slots and per-user limits of interactive runs
+            async with admission.admit(job.owner):
+                result = await self.run(job.request, lambda type, data: self.store.add_event(job_id, type, data))
+        except Exception as e:
+            self.store.finish(job_id, error=repr(e))
+            trace("job", level="error", job_id=job_id, error=repr(e))
+        else:
+            self.store.finish(job_id, result=result)
+            trace("job", job_id=job_id, duration_s=round(time.monotonic() - started, 2),
+                  partial=bool(result.get("partial")))
+        with self._lock:
+            done = self._done.pop(job_id, None)
+        if done is not None:
+            done.set()
+
+    def submit(self, messages: list[dict[str, Any]], configurable: Optional[dict[str, Any]] = None,
+               owner: Optional[str] = None, use_cache: bool = True) -> Job:
+        """Submit a supervisor run.
+
+        Args:
+            messages: Conversation as [{"role", "content"}], ending with the user's request
+            configurable: Graph configuration for the run
+            owner: User or session the job belongs to, for listing
+            use_cache: Reuse a pending or recent successful, complete job with the same request
+
+        Returns:
+            The new job, or the existing job serving an identical request
+        """
+        request = {"messages": messages, "configurable": configurable or {}}
+        key = request_key(request)
+        if use_cache and self.cache_ttl > 0:
+            existing = self.store.find(key, self.cache_ttl)
+            if existing is not None:
+                self.cache_hits += 1
+                if owner is not None:
+                    self.store.add_owner(existing.id, owner)
+                trace("job_cache_hit", job_id=existing.id, status=existing.status)
+                return existing
+        job = self.store.create(request, key, owner)
+        loop = self.start()
+        loop.call_soon_threadsafe(self._queue.put_nowait, job.id)
+        return job
+
+    def get(self, job_id: str) -> Optional[Job]:
+        """Poll a job's status and result."""
+        return self.store.get(job_id)
+
+    def events(self, job_id: str, after: int = 0) -> list[dict[str, Any]]:
+        """Progress events of a job after a sequence number."""
+        return self.store.events(job_id, after)
+
+    def jobs(self, owner: Optional[str] = None, limit: int = 20) -> list[Job]:
+        """Most recent jobs, optionally only those one owner submitted or joined."""
+        return self.store.recent(owner, limit)
+
+    async def stream(self, job_id: str, poll_interval: float = 0.5) -> AsyncIterator[dict[str, Any]]:
+        """Yield a job's progress events as they are recorded, until it finishes.
+
+        Usable from any event loop; a final {"type": "finished", "status"} event ends the stream.
+        """
+        after = 0
+        while True:
+            job = self.store.get(job_id)
+            for event in self.store.events(job_id, after):
+                after = event["seq"]
+                yield event
+            if job is None or job.finished:
+                yield {"type": "finished", "status": job.status if job else None}
+                return
+            await asyncio.sleep(poll_interval)
+
+    def result(self, job_id: str, timeout: Optional[float] = None) -> Optional[Job]:
+        """Wait for a job to finish and return it (still unfinished if the timeout passes)."""
+        with self._lock:
+            done = self._done.setdefault(job_id, threading.Event())
+        job = self.store.get(job_id)
+        if job is None or job.finished:
+            with self._lock:
+                self._done.pop(job_id, None)
+            return job
+        done.wait(timeout)
+        return self.store.get(job_id)
+
+
+_runner: Optional[JobRunner] = None
+_runner_lock = threading.Lock()
+
+
+def get_job_runner() -> JobRunner:
+    """Return the process-wide job runner over the on-disk job store, started."""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = JobRunner(
+                JobStore(str(data_path("jobs.db"))),
+                workers=int(os.getenv("PLAYGROUND_JOB_WORKERS", str(DEFAULT_WORKERS))),
+                cache_ttl=float(os.getenv("PLAYGROUND_JOB_CACHE_TTL", str(DEFAULT_CACHE_TTL))),
+            )
+            # Pick up jobs a previous process left unfinished
+            _runner.start()
+        return _runner
@@ -0,0 +1,71 @@
+"""
+LangGraph server entry points.
+
+langgraph.json serves the ReAct agent through make_graph, which puts every run
+behind the process-wide admission controller and registers it for cancellation, and mounts app, which exports
+queue, run and cancellation metrics:
+
+    GET /admission/metrics     Prometheus text format (admission and cancellation)
+    GET /admission/stats       JSON
+    GET /cancellation/stats    JSON: cancelled runs and estimated time saved
+    GET /models/routes         JSON: live latency and error stats of adaptive model candidates
+    GET /scrape/stats          JSON: local fetches, conditional re-fetch hits and bytes saved
+"""
+
+from typing import Any
+
+from langchain_core.runnables import RunnableConfig
+
+from playground.agents.react.configuration import Configuration
+from playground.agents.react.graph import make_graph as make_react_graph
+from playground.utils.admission import admitted_graph, get_admission_controller
+from playground.utils.cancellation import get_cancellation_registry
+from playground.utils.model import get_route_stats
+
+
+async def make_graph(config: RunnableConfig):
+    """Create the ReAct agent graph behind admission control.
+
+    Args:
+        config (RunnableConfig): Configuration containing agent parameters
+
+    Returns:
+        CompiledGraph: The agent graph, admitted per run
+    """
+    return admitted_graph(await make_react_graph(config), config_schema=Configuration)
+
+
+def _metrics_app() -> Any:
+    from starlette.applications import Starlette
+    from starlette.responses import JSONResponse, PlainTextResponse
+    from starlette.routing import Route
+
+    async def metrics(request):
+        return PlainTextResponse(get_admission_controller().render_metrics()
+                                 + get_cancellation_registry().render_metrics(),
+                                 media_type="text/plain; version=0.0.4")
+
+    async def stats(request):
+        return JSONResponse(get_admission_controller().metrics())
+
+    async def cancellation_stats(request):
+        return JSONResponse(get_cancellation_registry().metrics())
+
+    async def model_routes(request):
+        return JSONResponse(get_route_stats())
+
+    async def scrape_stats(request):
+        from playground.tools.crawl import scrape_engine
+
+        return JSONResponse(scrape_engine.fetch_stats())
+
+    return Starlette(routes=[Route("/admission/metrics", metrics), Route("/admission/stats", stats),
+                             Route("/cancellation/stats", cancellation_stats),
+                             Route("/models/routes", model_routes), Route("/scrape/stats", scrape_stats)])
+
+
+def __getattr__(name: str) -> Any:
+    # Starlette ships with the LangGraph server; build the app only when the server asks for it
+    if name == "app":
+        return _metrics_app()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
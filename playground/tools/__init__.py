@@ -3,50 +3,82 @@ Tools module for the Agent Playground.
 
 This module provides a collection of tools used by all agent architectures
 for various tasks including financial research, web search, and utility functions.
+Scraped pages and search results are also indexed into a local product store
+that agents can query with search_local_products. Large scrape and crawl outputs
+are offloaded to a blob store and read back in slices with read_blob.
+
+Tool modules are imported lazily: importing this package is cheap and touches
+no network, and get_tools only imports the modules of the tools it returns.
 """
 
+from importlib import import_module
 from typing import Callable, List, Any
 
-# Import all tools
-from .search import advanced_research_tool, basic_research_tool
-from .utility import get_todays_date
-from .crawl import crawl_with_firecrawl, map_with_firecrawl, scrape_with_firecrawl
+# Tool name -> (module, attribute), in the canonical order tools are returned in
+TOOL_REGISTRY = {
+    "advanced_research": (".search", "advanced_research_tool"),
+    "basic_research": (".search", "basic_research_tool"),
+    "get_todays_date": (".utility", "get_todays_date"),
+
+    "scrape_with_firecrawl": (".crawl", "scrape_with_firecrawl"),
+    "crawl_with_firecrawl": (".crawl", "crawl_with_firecrawl"),
+    "map_with_firecrawl": (".crawl", "map_with_firecrawl"),
+    "scrape_relevant_pages": (".crawl", "scrape_relevant_pages"),
+
+    "search_local_products": (".products", "search_local_products"),
+    "search_page_chunks": (".retrieval", "search_page_chunks"),
+    "read_blob": (".blobs", "read_blob"),
+}
+
+# Tools whose large outputs are offloaded to the blob store; selecting any of
+# them also selects read_blob, so an agent can always read past the preview
+OFFLOADING_TOOLS = {"scrape_with_firecrawl", "crawl_with_firecrawl"}
+
+# Exported attribute -> module it lives in
+_LAZY_EXPORTS = {attribute: module for module, attribute in TOOL_REGISTRY.values()}
+
+
+def __getattr__(name: str) -> Any:
+    """Import tool modules on first attribute access (PEP 562)."""
+    if name in _LAZY_EXPORTS:
+        return getattr(import_module(_LAZY_EXPORTS[name], __name__), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
 
 def get_tools(selected_tools: List[str]) -> List[Callable[..., Any]]:
     """
     Get tools by name for any agent architecture.
-    
+
+    read_blob is added whenever a tool that offloads large outputs is selected.
+
     Args:
         selected_tools: List of tool names to retrieve
-        
+
     Returns:
         List of tool functions
     """
-    tool_map = {
-        "advanced_research": advanced_research_tool,
-        "basic_research": basic_research_tool,
-        "get_todays_date": get_todays_date,
-
-        "scrape_with_firecrawl": scrape_with_firecrawl,
-        "crawl_with_firecrawl": crawl_with_firecrawl,
-        "map_with_firecrawl": map_with_firecrawl,
-    }
-    
-    tools = []
-    for tool_name in selected_tools:
-        if tool_name in tool_map:
-            tools.append(tool_map[tool_name])
-    
-    return tools
+    # Tools are returned in the canonical registry order regardless of selection
+    # order, so the tool schemas sent to the provider stay a byte-stable prefix.
+    selected = set(selected_tools)
+    if selected & OFFLOADING_TOOLS:
+        selected.add("read_blob")
+    return [
+        getattr(import_module(module, __name__), attribute)
+        for tool_name, (module, attribute) in TOOL_REGISTRY.items()
+        if tool_name in selected
+    ]
 
 
 __all__ = [
-    "advanced_research_tool", 
+    "advanced_research_tool",
     "basic_research_tool",
     "scrape_with_firecrawl",
     "crawl_with_firecrawl",
     "map_with_firecrawl",
+    "scrape_relevant_pages",
     "get_todays_date",
+    "search_local_products",
+    "search_page_chunks",
+    "read_blob",
     "get_tools",
-]
\ No newline at end of file
+]
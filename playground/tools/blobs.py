@@ -0,0 +1,38 @@
+"""
+Reading large tool outputs that were offloaded to the blob store.
+
+Scrape and crawl tools return a handle and a preview instead of outputs above
+the blob threshold (see playground.utils.blobstore); read_blob fetches slices
+of them on demand.
+"""
+
+from typing import Optional
+
+from langchain_core.tools import tool
+
+from playground.utils.blobstore import DEFAULT_READ_BYTES, MAX_READ_BYTES, BlobNotFound, get_blob_store
+
+
+@tool
+def read_blob(handle: str, offset: int = 0, length: int = DEFAULT_READ_BYTES, find: Optional[str] = None) -> str:
+    """
+    Read part of a large tool result that was stored as a blob handle (blob:...).
+
+    Args:
+        handle: The blob handle given in the tool result
+        offset: Byte offset to start reading at
+        length: Number of bytes to read (at most 32000)
+        find: Start at the first occurrence of this text (at or after offset) instead
+
+    Returns:
+        The requested slice with its byte range and the offset to continue from
+    """
+    length = max(1, min(length, MAX_READ_BYTES))
+    try:
+        text, start, total = get_blob_store().read(handle, offset, length, find)
+    except BlobNotFound as e:
+        return f"Error reading blob: {e}"
+    end = min(start + length, total)
+    footer = (f"[End of {handle}.]" if end >= total
+              else f"[{total - end:,} more bytes; continue with offset={end}.]")
+    return f"[{handle} bytes {start:,}-{end:,} of {total:,}]\n{text}\n{footer}"
@@ -0,0 +1,293 @@
+"""
+Concurrency cap and per-call timeout for an agent's tools.
+
+When a model emits several tool calls in one turn they are executed together.
+Each agent gets a ToolLimiter: at most max_concurrency of its tool calls run at
+once, each call is bounded by a timeout, and sync tools (Firecrawl, local
+scraping) run on the limiter's own thread pool so they never block the event
+loop or queue behind unrelated work in the default executor. When the run has
+a time budget (playground.utils.budget), calls are also cut off at its deadline;
+calls belonging to a cancelled run (playground.utils.cancellation) are skipped.
+
+A thread cannot be stopped from outside, so a sync tool that times out keeps
+running until it returns. Its call config carries a ToolStop signal
+(tool_stop()) that is set at the timeout; long-running sync tools poll it and
+wind down, e.g. by cancelling a remote crawl. The call keeps its concurrency
+slot until its thread actually returns, so the cap bounds the work really in
+flight, not just the calls being waited on.
+"""
+
+import asyncio
+import contextvars
+import threading
+import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Any, Callable, Optional
+
+from langchain_core.callbacks import AsyncCallbackManagerForToolRun, CallbackManagerForToolRun
+from langchain_core.messages import ToolMessage
+from langchain_core.runnables import RunnableConfig, patch_config
+from langchain_core.tools import BaseTool, StructuredTool
+from pydantic import ConfigDict
+
+from playground.utils.budget import get_budget
+from playground.utils.cancellation import get_cancellation_registry
+from playground.utils.tracing import trace
+
+DEFAULT_MAX_CONCURRENCY = 4
+DEFAULT_TIMEOUT = 120.0
+# Configurable key carrying a sync tool call's ToolStop
+TOOL_STOP_KEY = "tool_stop"
+
+
+class ToolStop:
+    """Stop signal for one sync tool call: set when the call times out, or its deadline passes.
+
+    Args:
+        deadline: time.monotonic() value the call must finish by (None for no limit)
+    """
+
+    def __init__(self, deadline: Optional[float] = None) -> None:
+        self.deadline = deadline
+        self._event = threading.Event()
+
+    def set(self) -> None:
+        self._event.set()
+
+    @property
+    def stopped(self) -> bool:
+        return self._event.is_set() or (self.deadline is not None and time.monotonic() >= self.deadline)
+
+
+def tool_stop(config: Optional[RunnableConfig]) -> Optional[ToolStop]:
+    """Stop signal of the tool call a config belongs to, if it runs under a ToolLimiter."""
+    stop = ((config or {}).get("configurable") or {}).get(TOOL_STOP_KEY)
+    return stop if isinstance(stop, ToolStop) else None
+
+
+def _with_stop(config: Optional[RunnableConfig], stop: ToolStop) -> RunnableConfig:
+    config = dict(config or {})
+    config["configurable"] = {**(config.get("configurable") or {}), TOOL_STOP_KEY: stop}
+    return config
+
+
+def is_async_tool(tool: BaseTool) -> bool:
+    """Whether a tool has a native coroutine implementation."""
+    if isinstance(tool, StructuredTool):
+        return tool.coroutine is not None
+    return type(tool)._arun is not BaseTool._arun
+
+
+class ToolLimiter:
+    """Per-agent concurrency cap and timeout for tool calls.
+
+    Args:
+        max_concurrency: Maximum number of tool calls running at once
+        timeout: Seconds a single tool call may take (None for no limit)
+        name: Agent name, used for thread names and traces
+    """
+
+    def __init__(self, max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+                 timeout: Optional[float] = DEFAULT_TIMEOUT, name: str = "agent") -> None:
+        self.max_concurrency = max(1, max_concurrency)
+        self.timeout = timeout
+        self.name = name
+        self.timeouts = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._thread_slots = threading.BoundedSemaphore(self.max_concurrency)
+        # asyncio primitives are bound to one event loop, so keep one semaphore per loop
+        self._loop_slots: weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore] = (
+            weakref.WeakKeyDictionary()
+        )
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool for sync tools, created on first use.
+
+        Twice the cap: calls hold their slot until their thread returns, so this
+        leaves room for the sync and async paths of one limiter to share it.
+        """
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=2 * self.max_concurrency,
+                                                    thread_name_prefix=f"{self.name}-tools")
+            return self._executor
+
+    def _slots(self) -> asyncio.Semaphore:
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            slots = self._loop_slots.get(loop)
+            if slots is None:
+                slots = self._loop_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+            return slots
+
+    def _timeout(self, config: Optional[RunnableConfig]) -> tuple[Optional[float], bool]:
+        """Timeout for a call: the tool timeout, capped at the run budget's time left.
+
+        Returns:
+            (timeout, whether the run budget is the binding limit)
+        """
+        budget = get_budget(config)
+        remaining = budget.remaining_time() if budget else None
+        if remaining is not None and (self.timeout is None or remaining < self.timeout):
+            return remaining, True
+        return self.timeout, False
+
+    def _timed_out(self, tool: BaseTool, input: Any, config: Optional[RunnableConfig],
+                   timeout: Optional[float] = None, budget_limited: bool = False, stopped: bool = True) -> Any:
+        """Error result for a call that hit its timeout; stopped says whether the call itself was stopped."""
+        timeout = self.timeout if timeout is None else timeout
+        with self._lock:
+            self.timeouts += 1
+        trace("tool_timeout", config, level="error", agent=self.name, tool=tool.name, timeout=timeout,
+              budget_limited=budget_limited, stopped=stopped)
+        if budget_limited:
+            outcome = "was cancelled" if stopped else "timed out"
+            message = (f"Error: {tool.name} {outcome} because the run's time budget ran out. "
+                       "Answer with the information you already have.")
+        else:
+            message = (f"Error: {tool.name} did not finish within {timeout:.0f}s. "
+                       "Try a narrower request or a different tool.")
+        return _error(tool, input, message)
+
+    def _cancelled(self, tool: BaseTool, input: Any, config: Optional[RunnableConfig]) -> Any:
+        trace("tool_skipped", config, agent=self.name, tool=tool.name, reason="run_cancelled")
+        return _error(tool, input, f"Error: {tool.name} was not run because the run was cancelled.")
+
+    def _submit(self, tool: BaseTool, input: Any, config: Optional[RunnableConfig],
+                timeout: Optional[float]) -> tuple[Future, ToolStop]:
+        """Start a sync tool call on the limiter's threads with a stop signal in its config."""
+        stop = ToolStop(time.monotonic() + timeout if timeout is not None else None)
+        context = contextvars.copy_context()
+        return self.executor.submit(context.run, tool.invoke, input, _with_stop(config, stop)), stop
+
+    async def arun(self, tool: BaseTool, input: Any, config: Optional[RunnableConfig]) -> Any:
+        """Run a tool call on the event loop under the cap and timeout."""
+        slots = self._slots()
+        await slots.acquire()
+        # A sync call hands its slot over to its thread, which releases it on return
+        handed_off = False
+        try:
+            if get_cancellation_registry().is_cancelled(config):
+                return self._cancelled(tool, input, config)
+            timeout, budget_limited = self._timeout(config)
+            if budget_limited and timeout <= 0:
+                return self._timed_out(tool, input, config, timeout, budget_limited)
+            if is_async_tool(tool):
+                try:
+                    return await asyncio.wait_for(tool.ainvoke(input, config), timeout)
+                except asyncio.TimeoutError:
+                    return self._timed_out(tool, input, config, timeout, budget_limited)
+            future, stop = self._submit(tool, input, config, timeout)
+            future.add_done_callback(_release_on(asyncio.get_running_loop(), slots))
+            handed_off = True
+            try:
+                return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+            except asyncio.TimeoutError:
+                stop.set()
+                return self._timed_out(tool, input, config, timeout, budget_limited, stopped=future.done())
+        finally:
+            if not handed_off:
+                slots.release()
+
+    def run(self, tool: BaseTool, input: Any, config: Optional[RunnableConfig]) -> Any:
+        """Run a tool call from a sync caller under the cap and timeout."""
+        self._thread_slots.acquire()
+        handed_off = False
+        try:
+            if get_cancellation_registry().is_cancelled(config):
+                return self._cancelled(tool, input, config)
+            timeout, budget_limited = self._timeout(config)
+            if budget_limited and timeout <= 0:
+                return self._timed_out(tool, input, config, timeout, budget_limited)
+            future, stop = self._submit(tool, input, config, timeout)
+            future.add_done_callback(lambda _: self._thread_slots.release())
+            handed_off = True
+            try:
+                return future.result(timeout=timeout)
+            except FutureTimeoutError:
+                stop.set()
+                return self._timed_out(tool, input, config, timeout, budget_limited, stopped=future.done())
+        finally:
+            if not handed_off:
+                self._thread_slots.release()
+
+
+def _release_on(loop: asyncio.AbstractEventLoop, slots: asyncio.Semaphore) -> Callable[[Future], None]:
+    """Done callback releasing an asyncio semaphore from the thread that finished the call."""
+    def release(_: Future) -> None:
+        try:
+            loop.call_soon_threadsafe(slots.release)
+        except RuntimeError:
+            # The loop has closed; nothing waits on its semaphore any more
+            pass
+
+    return release
+
+
+def _error(tool: BaseTool, input: Any, message: str) -> Any:
+    """Error result in the form the caller expects: a ToolMessage for tool calls, else the text."""
+    if isinstance(input, dict) and input.get("type") == "tool_call":
+        return ToolMessage(content=message, tool_call_id=input["id"], name=tool.name, status="error")
+    return message
+
+
+class LimitedTool(BaseTool):
+    """A tool executed through a ToolLimiter.
+
+    Exposes the wrapped tool's name, description and argument schema, so the
+    model sees the same tool, and delegates the call (including callbacks and
+    injected config) to it.
+    """
+
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
+    tool: BaseTool
+    limiter: ToolLimiter
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return self.limiter.run(self.tool, input, config)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> Any:
+        return await self.limiter.arun(self.tool, input, config)
+
+    # BaseTool.run/arun (and callers that use them directly) parse the arguments
+    # and open a tool run, then call these; delegate the same way invoke does.
+    def _run(self, config: RunnableConfig, run_manager: Optional[CallbackManagerForToolRun] = None,
+             **kwargs: Any) -> Any:
+        if run_manager is not None:
+            config = patch_config(config, callbacks=run_manager.get_child())
+        return self.limiter.run(self.tool, kwargs, config)
+
+    async def _arun(self, config: RunnableConfig, run_manager: Optional[AsyncCallbackManagerForToolRun] = None,
+                    **kwargs: Any) -> Any:
+        if run_manager is not None:
+            config = patch_config(config, callbacks=run_manager.get_child())
+        return await self.limiter.arun(self.tool, kwargs, config)
+
+
+def limit_tools(tools: list[BaseTool], limiter: ToolLimiter) -> list[BaseTool]:
+    """Wrap an agent's tools so their calls share one concurrency cap and timeout.
+
+    Args:
+        tools: The agent's tools
+        limiter: The agent's limiter
+
+    Returns:
+        Wrapped tools in the same order
+    """
+    return [
+        LimitedTool(
+            name=tool.name,
+            description=tool.description,
+            args_schema=tool.args_schema,
+            return_direct=tool.return_direct,
+            response_format=tool.response_format,
+            tool=tool,
+            limiter=limiter,
+        )
+        for tool in tools
+    ]
@@ -1,20 +1,77 @@
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 
-from firecrawl import FirecrawlApp
 from langchain.tools import tool
-from dotenv import load_dotenv
+from langchain_core.runnables import RunnableConfig
 
-load_dotenv()
+from playground.utils.blobstore import get_blob_store
+from playground.utils.budget import get_budget
+from playground.utils.cancellation import get_cancellation_registry
+from playground.utils.env import load_env
+from playground.utils.progress import ProgressReporter
+from playground.utils.tracing import trace
 
-firecrawl = FirecrawlApp(api_key=os.getenv("FIRECRAWL_API_KEY"))
+from .concurrency import tool_stop
+from .dedup import duplicate_reference, get_run_memory
+from .fetch import PageStore, ScrapedPage, ScrapeEngine
+from .products import index_page
+from .retrieval import format_chunks, get_run_index, select_relevant
+from .sitemap import DEFAULT_TOP_N, SiteMapCache, rank_urls
+
+if TYPE_CHECKING:
+    from firecrawl import FirecrawlApp
+
+
+@lru_cache(maxsize=1)
+def get_firecrawl() -> "FirecrawlApp":
+    """Create the Firecrawl client on first use, so importing the tools needs no API key."""
+    from firecrawl import FirecrawlApp
+
+    load_env()
+    return FirecrawlApp(api_key=os.getenv("FIRECRAWL_API_KEY"))
+
+
+def _firecrawl_markdown(url: str) -> str:
+    """Scrape a single page with Firecrawl and return its markdown."""
+    result = get_firecrawl().scrape_url(url, formats=["markdown"])
+    return getattr(result, "markdown", None) or str(result)
+
+
+def _firecrawl_links(url: str) -> list[str]:
+    """Map a site with Firecrawl and return the discovered URLs."""
+    result = get_firecrawl().map_url(url)
+    links = getattr(result, "links", None)
+    if links is None and isinstance(result, dict):
+        links = result.get("links")
+    return [link if isinstance(link, str) else getattr(link, "url", str(link)) for link in links or []]
+
+
+# Static pages are fetched locally; JS-rendered or blocked pages escalate to Firecrawl.
+# Revisited local pages are revalidated against .playground/pages.db instead of re-downloaded.
+scrape_engine = ScrapeEngine(remote=_firecrawl_markdown, pages=PageStore())
+site_maps = SiteMapCache(mapper=_firecrawl_links, session=scrape_engine.session)
 
 @tool
-def scrape_with_firecrawl(url: str) -> str:
-    """Use this to scrape a website with firecrawl"""
+def scrape_with_firecrawl(url: str, config: RunnableConfig, query: Optional[str] = None) -> str:
+    """
+    Use this to scrape a website with firecrawl.
+    Pass query to get only the parts of a long page relevant to what you are looking for.
+    """
     try:
-        scrape_status = firecrawl.scrape_url(url, formats=["markdown"])
-        print(f"scrape_with_firecrawl: {scrape_status}")
-        return scrape_status
+        page = scrape_engine.scrape(url)
+        trace("scrape_with_firecrawl", config, url=page.url, tier=page.tier, elapsed=page.elapsed,
+              markdown=page.markdown)
+        index_page(page.url, page.html, page.markdown, page.title, unchanged=page.unchanged)
+        original = get_run_memory(config).check(page.url, page.markdown)
+        if original is not None:
+            # Already in the run's chunk index under the first copy's URL
+            hits = get_run_index(config).search(query, urls=[original.url]) if query else []
+            return format_chunks(hits, duplicate_reference(page.url, original))
+        return get_blob_store().offload(select_relevant(page.url, page.markdown, query, config),
+                                        label=f"Page {page.url}")
     except Exception as e:
         return f"Error scrapping website: {e}"
     
@@ -25,35 +82,169 @@ def scrape_with_fireagent(url: str) -> str:
     For difficult collection requests, use that tool.
     """
     try:
-        scrape_result = firecrawl.scrape_url(url, 
+        scrape_result = get_firecrawl().scrape_url(url, 
             formats=["markdown", "html"],
             agent={
                 'model': 'FIRE-1',
                 "prompt": "Search until you get detailed results that satisfy your user requests."
             }
         )
-        print(f"scrape_with_fire1: {scrape_result}")
-        return scrape_result
+        trace("scrape_with_fireagent", url=url, result=scrape_result)
+        markdown = getattr(scrape_result, "markdown", None)
+        html = getattr(scrape_result, "html", None)
+        content = (f"## Markdown\n\n{markdown or ''}\n\n## HTML\n\n{html or ''}"
+                   if markdown or html else str(scrape_result))
+        # Markdown plus raw HTML is large; keep it out of the message and graph state
+        return get_blob_store().offload(content, label=f"Agent scrape of {url}")
     except Exception as e:
         return f"Error scrapping website: {e}"
 
 
+# Seconds between crawl status polls
+CRAWL_POLL_INTERVAL = 2.0
+# Pages scrape_relevant_pages fetches at once, however large top_n is
+MAX_SCRAPE_WORKERS = 8
+
+
+def _crawl_with_progress(url: str, progress: ProgressReporter, config: Optional[RunnableConfig] = None):
+    """Start a Firecrawl crawl and poll it, reporting pages and bytes as they arrive.
+
+    If the run is cancelled the crawl job is cancelled on Firecrawl too, so it
+    stops spending credits, and polling ends with RunCancelled. The same
+    happens, ending with TimeoutError, once the run's time budget is spent or
+    the tool call's limiter timeout passes.
+    """
+    firecrawl = get_firecrawl()
+    job = firecrawl.async_crawl_url(url, formats=["markdown"])
+    cancellation = get_cancellation_registry()
+    remove_cleanup = cancellation.on_cancel(config, lambda: firecrawl.cancel_crawl(job.id))
+    budget, stop = get_budget(config), tool_stop(config)
+    seen_bytes = 0
+    try:
+        while True:
+            cancellation.raise_if_cancelled(config)
+            if (stop is not None and stop.stopped) or (budget is not None and budget.remaining_time() == 0.0):
+                firecrawl.cancel_crawl(job.id)
+                raise TimeoutError(f"crawl of {url} ran out of time and was cancelled")
+            status = firecrawl.check_crawl_status(job.id)
+            received = sum(len((getattr(document, "markdown", None) or "").encode())
+                           for document in status.data or [])
+            finished = status.status in ("completed", "failed", "cancelled")
+            progress.update(done=status.completed, total=status.total or None,
+                            bytes_received=max(received - seen_bytes, 0),
+                            message=f"Crawling {url}: {status.status}", final=finished)
+            seen_bytes = max(received, seen_bytes)
+            if finished:
+                if status.status != "completed":
+                    raise RuntimeError(f"crawl {status.status}")
+                return status
+            time.sleep(CRAWL_POLL_INTERVAL)
+    finally:
+        remove_cleanup()
+
+
 @tool
-def crawl_with_firecrawl(url: str) -> str:
-    """Use this to crawl a website with firecrawl"""
+def crawl_with_firecrawl(url: str, config: RunnableConfig, query: Optional[str] = None) -> str:
+    """
+    Use this to crawl a website with firecrawl.
+    Pass query to get only the parts of the crawled pages relevant to what you are looking for.
+    """
     try:
-        crawl_status = firecrawl.crawl_url(url, formats=["markdown"])
-        print(f"crawl_with_firecrawl: {crawl_status}")
-        return crawl_status
+        crawl_status = _crawl_with_progress(url, ProgressReporter("crawl_with_firecrawl", config), config)
+        trace("crawl_with_firecrawl", config, url=url, pages=crawl_status.completed, total=crawl_status.total)
+        index = get_run_index(config)
+        memory = get_run_memory(config)
+        page_urls = []
+        pages = []
+        for document in getattr(crawl_status, "data", None) or []:
+            metadata = getattr(document, "metadata", None) or {}
+            if not isinstance(metadata, dict):
+                metadata = vars(metadata)
+            page_url = metadata.get("sourceURL") or metadata.get("url") or url
+            markdown = getattr(document, "markdown", None) or ""
+            index_page(page_url, markdown=markdown, title=metadata.get("title") or "")
+            original = memory.check(page_url, markdown)
+            if original is not None:
+                pages.append(duplicate_reference(page_url, original))
+                continue
+            index.add_page(page_url, markdown)
+            page_urls.append(page_url)
+            pages.append(f"## Page: {page_url}\n\n{markdown}")
+        if query:
+            hits = index.search(query, urls=page_urls)
+            return format_chunks(hits, f"Crawled {len(pages)} pages from {url} ({len(pages) - len(page_urls)} "
+                                       f"already seen); showing the {len(hits)} chunks most relevant to "
+                                       f"{query!r}. Use search_page_chunks for more.")
+        if not pages:
+            return f"Crawl of {url} returned no pages."
+        return get_blob_store().offload("\n\n".join(pages), label=f"Crawl of {url} ({len(pages)} pages)")
     except Exception as e:
         return f"Error crawling website: {e}"
     
 @tool
-def map_with_firecrawl(url: str) -> str:
-    """Use this to map a website with firecrawl"""
+def map_with_firecrawl(url: str, query: Optional[str] = None, limit: int = 50) -> str:
+    """
+    Use this to map a website with firecrawl.
+    Pass query to list only the URLs most relevant to what you are looking for.
+    """
     try:
-        map_status = firecrawl.map_url(url, formats=["markdown"])
-        print(f"map_with_firecrawl: {map_status}")
-        return map_status
+        site_map = site_maps.get(url)
+        links = rank_urls(query, site_map.links, site_map.anchors, top_n=limit) if query else site_map.links[:limit]
+        trace("map_with_firecrawl", url=url, query=query, domain=site_map.domain, links=len(site_map.links))
+        header = f"{len(site_map.links)} URLs on {site_map.domain}" + (f", best matches for {query!r}" if query else "")
+        return "\n".join([f"{header}:", *links])
     except Exception as e:
         return f"Error mapping website: {e}"
+
+
+def _scrape_or_none(url: str) -> Optional[ScrapedPage]:
+    try:
+        return scrape_engine.scrape(url)
+    except Exception:
+        return None
+
+
+@tool
+def scrape_relevant_pages(url: str, query: str, config: RunnableConfig, top_n: int = DEFAULT_TOP_N) -> str:
+    """
+    Use this instead of crawling a whole site when you need specific pages (e.g. a few product pages).
+    Maps the site, ranks its URLs against the query and scrapes only the top_n best matches in parallel.
+    Returns the parts of those pages relevant to the query.
+    """
+    try:
+        site_map = site_maps.get(url)
+        targets = rank_urls(query, site_map.links, site_map.anchors, top_n=top_n) or [url]
+        progress = ProgressReporter("scrape_relevant_pages", config, total=len(targets))
+        results: dict[str, Optional[ScrapedPage]] = {}
+        with ThreadPoolExecutor(max_workers=min(len(targets), MAX_SCRAPE_WORKERS)) as pool:
+            futures = {pool.submit(_scrape_or_none, target): target for target in targets}
+            for future in as_completed(futures):
+                page = results[futures[future]] = future.result()
+                progress.update(done=len(results), bytes_received=len(page.markdown.encode()) if page else 0,
+                                message=f"Scraped {futures[future]}", final=len(results) == len(targets))
+        pages = [results[target] for target in targets]
+        trace("scrape_relevant_pages", config, url=url, query=query, domain=site_map.domain,
+              links=len(site_map.links), targets=targets)
+
+        index = get_run_index(config)
+        memory = get_run_memory(config)
+        page_urls, notes = [], []
+        for target, page in zip(targets, pages):
+            if page is None:
+                notes.append(f"[Could not scrape {target}]")
+                continue
+            index_page(page.url, page.html, page.markdown, page.title, unchanged=page.unchanged)
+            original = memory.check(page.url, page.markdown)
+            if original is not None:
+                notes.append(duplicate_reference(page.url, original))
+                page_urls.append(original.url)
+                continue
+            index.add_page(page.url, page.markdown)
+            page_urls.append(page.url)
+
+        hits = index.search(query, urls=page_urls)
+        header = (f"Scraped {len(targets)} of {len(site_map.links)} URLs on {site_map.domain} ranked for "
+                  f"{query!r}: {', '.join(targets)}. Use search_page_chunks for more.")
+        return format_chunks(hits, "\n".join([header, *notes]))
+    except Exception as e:
+        return f"Error scraping relevant pages: {e}"
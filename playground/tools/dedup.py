@@ -0,0 +1,180 @@
+"""
+Duplicate elimination for search results and scraped pages.
+
+Syndicated articles and mirrored product listings show up again and again across
+searches and crawls, and every copy costs prompt tokens downstream. URLs are
+canonicalized and page text is fingerprinted with SimHash; anything already seen
+earlier in the same run is replaced by a short reference to the first copy.
+"""
+
+import hashlib
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import numpy as np
+from langchain_core.runnables import RunnableConfig
+
+from playground.utils.cache import TTLCache
+from playground.utils.runs import get_run_id
+
+# Maximum Hamming distance between 64-bit SimHashes to count as near-duplicates
+DEFAULT_THRESHOLD = int(os.getenv("PLAYGROUND_DEDUP_THRESHOLD", "3"))
+# Texts with fewer shingles than this are too short to fingerprint reliably
+MIN_SHINGLES = 8
+SHINGLE_SIZE = 3
+
+_TRACKING_PARAMS = re.compile(
+    r"^(utm_\w+|gclid|fbclid|msclkid|igshid|mc_cid|mc_eid|ref|ref_src|spm|_ga|_gl|amp)$", re.IGNORECASE
+)
+_MIRROR_PREFIXES = ("www.", "m.", "mobile.", "amp.")
+_DEFAULT_PORTS = {"http": ":80", "https": ":443"}
+
+
+def canonicalize_url(url: str) -> str:
+    """Canonicalize a URL so mirrors and tracking variants compare equal.
+
+    Lowercases scheme and host, drops www./m./amp. prefixes, default ports,
+    fragments, tracking parameters, AMP path suffixes and trailing slashes, and
+    sorts the remaining query parameters.
+
+    Args:
+        url: URL as found in a search result or link
+
+    Returns:
+        Canonical form of the URL
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower() or "https"
+    host = parts.netloc.lower().removesuffix(_DEFAULT_PORTS.get(scheme, "\0"))
+    for prefix in _MIRROR_PREFIXES:
+        if host.startswith(prefix):
+            host = host[len(prefix):]
+            break
+    path = re.sub(r"/amp/?$", "", parts.path) or "/"
+    if len(path) > 1:
+        path = path.rstrip("/")
+    query = urlencode(sorted(
+        (key, value) for key, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _TRACKING_PARAMS.match(key)
+    ))
+    # Scheme is not part of the identity: http and https copies are the same page
+    return urlunsplit(("https", host, path, query, ""))
+
+
+def simhash(text: str) -> Optional[int]:
+    """64-bit SimHash of a text over word shingles.
+
+    Args:
+        text: Page or snippet text
+
+    Returns:
+        Fingerprint, or None if the text is too short to fingerprint
+    """
+    words = re.findall(r"\w+", text.lower())
+    shingles = {" ".join(words[i:i + SHINGLE_SIZE]) for i in range(max(len(words) - SHINGLE_SIZE + 1, 0))}
+    if len(shingles) < MIN_SHINGLES:
+        return None
+    hashes = np.fromiter(
+        (int.from_bytes(hashlib.blake2b(s.encode(), digest_size=8).digest(), "big") for s in shingles),
+        dtype=np.uint64,
+        count=len(shingles),
+    )
+    bits = (hashes[:, None] >> np.arange(64, dtype=np.uint64)) & np.uint64(1)
+    votes = bits.sum(axis=0) * 2 > len(shingles)
+    # Python ints: a numpy int64 shift would wrap bit 63 into a negative fingerprint
+    return sum(1 << int(i) for i in np.flatnonzero(votes))
+
+
+def hamming(a: int, b: int) -> int:
+    """Number of differing bits between two fingerprints."""
+    return (a ^ b).bit_count()
+
+
+@dataclass
+class SeenItem:
+    url: str
+    canonical_url: str
+    fingerprint: Optional[int]
+
+
+class DedupMemory:
+    """Content seen so far in a run.
+
+    Args:
+        threshold: Maximum Hamming distance for two texts to count as near-duplicates
+    """
+
+    def __init__(self, threshold: int = DEFAULT_THRESHOLD) -> None:
+        self.threshold = threshold
+        self._lock = threading.Lock()
+        self._by_url: dict[str, SeenItem] = {}
+        self._items: list[SeenItem] = []
+
+    def check(self, url: str, text: str = "") -> Optional[SeenItem]:
+        """Return the earlier copy of this URL or text, remembering it if it is new.
+
+        Args:
+            url: URL of the result or page
+            text: Its text; texts too short to fingerprint are matched by URL only
+
+        Returns:
+            The first item seen with the same canonical URL or a near-identical text, or None
+        """
+        canonical = canonicalize_url(url)
+        fingerprint = simhash(text) if text else None
+        with self._lock:
+            seen = self._by_url.get(canonical)
+            if seen is None and fingerprint is not None:
+                seen = next(
+                    (item for item in self._items
+                     if item.fingerprint is not None and hamming(item.fingerprint, fingerprint) <= self.threshold),
+                    None,
+                )
+            if seen is None:
+                item = SeenItem(url=url, canonical_url=canonical, fingerprint=fingerprint)
+                self._by_url[canonical] = item
+                self._items.append(item)
+            return seen
+
+
+_run_memories: TTLCache[str, DedupMemory] = TTLCache(maxsize=64, ttl=3600)
+
+
+def get_run_memory(config: Optional[RunnableConfig]) -> DedupMemory:
+    """Return the dedup memory of the run a config belongs to."""
+    return _run_memories.get_or_create(get_run_id(config), DedupMemory)
+
+
+def duplicate_reference(url: str, original: SeenItem) -> str:
+    """Short stand-in text for content already returned earlier in the run."""
+    if canonicalize_url(url) == original.canonical_url:
+        return f"[Already retrieved earlier in this run: {original.url}]"
+    return f"[{url} duplicates {original.url}, already retrieved earlier in this run]"
+
+
+def dedupe_results(results: Any, config: Optional[RunnableConfig]) -> Any:
+    """Replace search results already seen in this run with short references.
+
+    Args:
+        results: Search results, a list of dicts with url/content (other values pass through)
+        config: Config of the calling tool, used to find the run's memory
+
+    Returns:
+        Results with duplicates reduced to {"url", "duplicate_of"}
+    """
+    if not isinstance(results, list):
+        return results
+    memory = get_run_memory(config)
+    deduped = []
+    for result in results:
+        if not isinstance(result, dict) or not result.get("url"):
+            deduped.append(result)
+            continue
+        text = f"{result.get('title', '')} {result.get('content', '')}"
+        original = memory.check(result["url"], text)
+        deduped.append(result if original is None else {"url": result["url"], "duplicate_of": original.url})
+    return deduped
@@ -0,0 +1,505 @@
+"""
+Local fast-path fetching for the scrape tools.
+
+Static pages (most product and category pages) are fetched with a pooled HTTP
+session and converted to markdown locally, which takes tens of milliseconds.
+Pages that turn out to be JavaScript-rendered, blocked or empty are escalated
+to the remote scraper (Firecrawl), and the tier that worked is remembered per
+domain so later pages on that domain go straight to it. A domain pinned to the
+remote tier is tried locally again once the pin is older than its TTL, so a
+single blocked or JS-heavy page does not send the whole domain to Firecrawl
+for the life of the process.
+
+URLs come from the model, so local fetches only go to public addresses: hosts
+that resolve to private, loopback, link-local or otherwise reserved addresses
+are rejected, and redirects are followed by hand so each hop is checked too.
+
+Locally fetched pages are kept in a PageStore together with their validators
+(ETag, Last-Modified and a hash of the body). Revisits send a conditional
+request; on 304 Not Modified, or a 200 whose body hashes the same, the stored
+markdown is reused and the page is not converted again.
+"""
+
+import hashlib
+import ipaddress
+import re
+import socket
+import sqlite3
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Optional
+from urllib.parse import urljoin, urlparse
+
+import requests
+from bs4 import BeautifulSoup, Comment, NavigableString, Tag
+from requests.adapters import HTTPAdapter
+
+from playground.utils.storage import data_path
+
+# Tier names recorded per domain
+LOCAL_TIER = "local"
+REMOTE_TIER = "firecrawl"
+
+# Seconds before a domain pinned to the remote tier is tried locally again
+REMOTE_TIER_TTL = 3600.0
+# Redirect hops followed by a local fetch
+MAX_REDIRECTS = 5
+
+# Pages whose markdown is shorter than this are treated as empty shells
+MIN_CONTENT_CHARS = 200
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/124.0 Safari/537.36"
+    ),
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Language": "ko-KR,ko;q=0.9,en-US;q=0.8,en;q=0.7",
+}
+
+_SKIP_TAGS = ["script", "style", "noscript", "template", "svg", "iframe", "canvas",
+              "form", "button", "select", "nav", "footer", "aside", "head"]
+_HEADINGS = {"h1": 1, "h2": 2, "h3": 3, "h4": 4, "h5": 5, "h6": 6}
+_BLOCK_TAGS = ["p", "div", "section", "article", "main", "header", "ul", "ol", "table",
+               "pre", "blockquote", "hr", "dl", "figure", *_HEADINGS]
+_SPA_ROOT = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt|svelte)[\"'][^>]*>\s*</div>", re.IGNORECASE
+)
+_NOSCRIPT_HINTS = ("enable javascript", "javascript is required", "requires javascript",
+                   "자바스크립트를 활성화")
+
+
+class UnsafeURL(ValueError):
+    """A URL is not http(s) or its host resolves to a non-public address."""
+
+
+def check_public_url(url: str) -> None:
+    """Make sure a URL is http(s) and every address its host resolves to is public.
+
+    Raises:
+        UnsafeURL: The scheme is not http(s), the host does not resolve, or it
+            resolves to a private, loopback, link-local or reserved address
+    """
+    parsed = urlparse(url)
+    if parsed.scheme not in ("http", "https") or not parsed.hostname:
+        raise UnsafeURL(f"Not an http(s) URL: {url}")
+    try:
+        infos = socket.getaddrinfo(parsed.hostname, parsed.port or None, proto=socket.IPPROTO_TCP)
+    except (socket.gaierror, UnicodeError, ValueError) as e:
+        raise UnsafeURL(f"Cannot resolve {parsed.hostname}: {e}") from None
+    for info in infos:
+        address = ipaddress.ip_address(info[4][0].split("%")[0])
+        if not address.is_global or address.is_multicast:
+            raise UnsafeURL(f"{parsed.hostname} resolves to non-public address {address}")
+
+
+@dataclass
+class ScrapedPage:
+    """Result of scraping a single URL."""
+
+    url: str
+    markdown: str
+    tier: str
+    status_code: Optional[int] = None
+    title: str = ""
+    html: str = ""
+    elapsed: float = 0.0
+    # True when the stored copy was reused because the page had not changed
+    unchanged: bool = False
+
+
+def create_session(pool_size: int = 32) -> requests.Session:
+    """Create a pooled HTTP session with browser-like default headers."""
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=1)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    session.headers.update(DEFAULT_HEADERS)
+    return session
+
+
+# === HTML TO MARKDOWN ===
+
+def _collapse(text: str) -> str:
+    return re.sub(r"\s+", " ", text)
+
+
+def _inline(node: object, base_url: str) -> str:
+    """Render a node's inline content as markdown."""
+    if isinstance(node, Comment):
+        return ""
+    if isinstance(node, NavigableString):
+        return _collapse(str(node))
+    if not isinstance(node, Tag):
+        return ""
+
+    if node.name == "br":
+        return "\n"
+    if node.name == "img":
+        src = node.get("src") or node.get("data-src")
+        return f"![{node.get('alt', '').strip()}]({urljoin(base_url, src)})" if src else ""
+
+    text = "".join(_inline(child, base_url) for child in node.children)
+    if node.name == "a":
+        href = node.get("href", "")
+        label = text.strip()
+        if href and label and not href.startswith(("javascript:", "#")):
+            return f"[{label}]({urljoin(base_url, href)})"
+        return text
+    if node.name in ("strong", "b") and text.strip():
+        return f"**{text.strip()}**"
+    if node.name in ("em", "i") and text.strip():
+        return f"*{text.strip()}*"
+    if node.name == "code" and text.strip():
+        return f"`{text.strip()}`"
+    return text
+
+
+def _list(node: Tag, base_url: str, depth: int = 0) -> str:
+    lines = []
+    ordered = node.name == "ol"
+    for index, item in enumerate(node.find_all("li", recursive=False), start=1):
+        nested = [child for child in item.find_all(["ul", "ol"], recursive=False)]
+        for child in nested:
+            child.extract()
+        marker = f"{index}." if ordered else "-"
+        text = _inline(item, base_url).strip()
+        if text:
+            lines.append(f"{'  ' * depth}{marker} {text}")
+        lines.extend(_list(child, base_url, depth + 1) for child in nested)
+    return "\n".join(line for line in lines if line)
+
+
+def _table(node: Tag, base_url: str) -> str:
+    rows = []
+    for row in node.find_all("tr"):
+        cells = [_inline(cell, base_url).strip().replace("|", "\\|") for cell in row.find_all(["th", "td"])]
+        if any(cells):
+            rows.append(cells)
+    if not rows:
+        return ""
+    width = max(len(row) for row in rows)
+    lines = [f"| {' | '.join(row + [''] * (width - len(row)))} |" for row in rows]
+    lines.insert(1, f"|{' --- |' * width}")
+    return "\n".join(lines)
+
+
+def _blocks(node: Tag, base_url: str, out: list[str]) -> None:
+    """Append the markdown blocks of a node's children to out."""
+    for child in node.children:
+        if isinstance(child, Comment):
+            continue
+        if isinstance(child, NavigableString):
+            text = _collapse(str(child)).strip()
+            if text:
+                out.append(text)
+            continue
+        if not isinstance(child, Tag):
+            continue
+
+        name = child.name
+        if name in _HEADINGS:
+            text = _inline(child, base_url).strip()
+            if text:
+                out.append(f"{'#' * _HEADINGS[name]} {text}")
+        elif name in ("ul", "ol"):
+            out.append(_list(child, base_url))
+        elif name == "table":
+            out.append(_table(child, base_url))
+        elif name == "pre":
+            out.append(f"```\n{child.get_text().strip()}\n```")
+        elif name == "hr":
+            out.append("---")
+        elif name == "blockquote":
+            inner: list[str] = []
+            _blocks(child, base_url, inner)
+            out.append("\n".join(f"> {line}" for block in inner for line in block.splitlines()))
+        elif name != "p" and child.find(_BLOCK_TAGS) is not None:
+            _blocks(child, base_url, out)
+        else:
+            text = _inline(child, base_url).strip()
+            if text:
+                out.append(text)
+
+
+def html_to_markdown(html: str, base_url: str = "") -> str:
+    """Convert an HTML document to markdown.
+
+    Scripts, styles, navigation and other chrome are dropped; headings, paragraphs,
+    lists, tables, links and images are kept, with links made absolute.
+
+    Args:
+        html: HTML document
+        base_url: URL the document was fetched from, used to resolve relative links
+
+    Returns:
+        Markdown text
+    """
+    soup = BeautifulSoup(html, "html.parser")
+    for tag in soup(_SKIP_TAGS):
+        tag.decompose()
+    blocks: list[str] = []
+    _blocks(soup.body or soup, base_url, blocks)
+    markdown = "\n\n".join(block for block in blocks if block.strip())
+    return re.sub(r"\n{3,}", "\n\n", markdown).strip()
+
+
+def page_title(html: str) -> str:
+    """Return the document title, or an empty string."""
+    match = re.search(r"<title[^>]*>(.*?)</title>", html, re.IGNORECASE | re.DOTALL)
+    return _collapse(match.group(1)).strip() if match else ""
+
+
+def looks_js_rendered(html: str, markdown: str) -> bool:
+    """Heuristically detect pages that need a browser to render their content.
+
+    Args:
+        html: Raw HTML as fetched
+        markdown: Markdown converted from the HTML
+
+    Returns:
+        True if the page looks like a JavaScript shell or has no usable content
+    """
+    if len(markdown) < MIN_CONTENT_CHARS:
+        return True
+    if _SPA_ROOT.search(html):
+        return True
+    lowered = html.lower()
+    if len(markdown) < 2000 and any(hint in lowered for hint in _NOSCRIPT_HINTS):
+        return True
+    script_chars = sum(len(match) for match in re.findall(r"<script\b.*?</script>", lowered, re.DOTALL))
+    return len(markdown) < 1500 and script_chars > 0.6 * len(html)
+
+
+# === CONDITIONAL RE-FETCH ===
+
+@dataclass
+class StoredPage:
+    """A locally scraped page with the validators needed to revalidate it."""
+
+    url: str
+    markdown: str
+    title: str
+    html: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+    content_hash: str
+    fetched_at: float
+
+
+@dataclass
+class FetchStats:
+    """Counters of local fetches and how many were served from stored pages."""
+
+    fetches: int = 0
+    not_modified: int = 0
+    unchanged: int = 0
+    changed: int = 0
+    bytes_fetched: int = 0
+    bytes_saved: int = 0
+    conversion_seconds: float = 0.0
+
+    def as_dict(self) -> dict[str, Any]:
+        return asdict(self)
+
+
+class PageStore:
+    """SQLite store of processed pages and their validators, keyed by URL.
+
+    Args:
+        path: Database file path (":memory:" for a throwaway store); defaults to
+            .playground/pages.db, opened on first use
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self._conn = sqlite3.connect(self.path or str(data_path("pages.db")), check_same_thread=False)
+            self._conn.row_factory = sqlite3.Row
+            with self._conn:
+                self._conn.execute("PRAGMA journal_mode=WAL")
+                self._conn.execute(
+                    """CREATE TABLE IF NOT EXISTS pages (
+                        url TEXT PRIMARY KEY,
+                        markdown TEXT NOT NULL,
+                        title TEXT NOT NULL,
+                        html TEXT NOT NULL,
+                        etag TEXT,
+                        last_modified TEXT,
+                        content_hash TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )"""
+                )
+        return self._conn
+
+    def get(self, url: str) -> Optional[StoredPage]:
+        with self._lock:
+            row = self._connection().execute("SELECT * FROM pages WHERE url = ?", (url,)).fetchone()
+        return StoredPage(**dict(row)) if row else None
+
+    def put(self, page: StoredPage) -> None:
+        with self._lock, self._connection() as conn:
+            conn.execute(
+                """INSERT OR REPLACE INTO pages
+                (url, markdown, title, html, etag, last_modified, content_hash, fetched_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (page.url, page.markdown, page.title, page.html, page.etag, page.last_modified,
+                 page.content_hash, page.fetched_at),
+            )
+
+
+def conditional_headers(stored: Optional[StoredPage]) -> dict[str, str]:
+    """If-None-Match / If-Modified-Since headers revalidating a stored page."""
+    headers = {}
+    if stored is not None and stored.etag:
+        headers["If-None-Match"] = stored.etag
+    if stored is not None and stored.last_modified:
+        headers["If-Modified-Since"] = stored.last_modified
+    return headers
+
+
+# === TIERED SCRAPE ENGINE ===
+
+class ScrapeEngine:
+    """Scrape URLs locally first, escalating to a remote scraper when needed.
+
+    Args:
+        remote: Callable returning markdown for a URL via the remote scraper
+        session: HTTP session for local fetches (a pooled one is created if omitted)
+        timeout: Timeout in seconds for local fetches
+        pages: Store of processed pages for conditional re-fetches (None fetches in full every time)
+        remote_tier_ttl: Seconds a domain stays pinned to the remote tier before a local retry
+        allow_private_hosts: Fetch private and loopback hosts locally (for tests and local fixtures only)
+    """
+
+    def __init__(self, remote: Callable[[str], str], session: Optional[requests.Session] = None,
+                 timeout: float = 10.0, pages: Optional[PageStore] = None,
+                 remote_tier_ttl: float = REMOTE_TIER_TTL, allow_private_hosts: bool = False) -> None:
+        self.remote = remote
+        self.session = session or create_session()
+        self.timeout = timeout
+        self.pages = pages
+        self.remote_tier_ttl = remote_tier_ttl
+        self.allow_private_hosts = allow_private_hosts
+        self.stats = FetchStats()
+        self._lock = threading.Lock()
+        # domain -> (tier, time.monotonic() when it was recorded)
+        self._domain_tiers: dict[str, tuple[str, float]] = {}
+
+    def domain_tier(self, url: str) -> Optional[str]:
+        """Return the tier that last worked for the URL's domain, if known and not expired."""
+        domain = urlparse(url).netloc.lower()
+        with self._lock:
+            entry = self._domain_tiers.get(domain)
+            if entry is None:
+                return None
+            tier, recorded = entry
+            if tier == REMOTE_TIER and time.monotonic() - recorded > self.remote_tier_ttl:
+                del self._domain_tiers[domain]
+                return None
+            return tier
+
+    def _remember(self, url: str, tier: str) -> None:
+        with self._lock:
+            self._domain_tiers[urlparse(url).netloc.lower()] = (tier, time.monotonic())
+
+    def _get(self, url: str, headers: dict[str, str]) -> requests.Response:
+        """GET a URL, following redirects by hand so every hop passes check_public_url."""
+        for _ in range(MAX_REDIRECTS + 1):
+            if not self.allow_private_hosts:
+                check_public_url(url)
+            response = self.session.get(url, timeout=self.timeout, headers=headers, allow_redirects=False)
+            location = response.headers.get("Location")
+            if not response.is_redirect or not location:
+                return response
+            url = urljoin(url, location)
+        raise requests.TooManyRedirects(f"More than {MAX_REDIRECTS} redirects")
+
+    def fetch_stats(self) -> dict[str, Any]:
+        """Local fetch counters: fetches, not_modified, unchanged, changed, bytes and conversion time."""
+        with self._lock:
+            return self.stats.as_dict()
+
+    def _count(self, **increments: float) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                setattr(self.stats, name, getattr(self.stats, name) + value)
+
+    def _reuse(self, stored: StoredPage, status_code: int, started: float) -> ScrapedPage:
+        return ScrapedPage(url=stored.url, markdown=stored.markdown, tier=LOCAL_TIER, status_code=status_code,
+                           title=stored.title, html=stored.html, elapsed=time.perf_counter() - started,
+                           unchanged=True)
+
+    def fetch_local(self, url: str) -> Optional[ScrapedPage]:
+        """Fetch and convert a page locally, revalidating a stored copy if there is one.
+
+        Returns:
+            The scraped page, or None if the page is unusable without a browser
+
+        Raises:
+            UnsafeURL: The URL, or a redirect from it, points at a non-public address
+        """
+        started = time.perf_counter()
+        stored = self.pages.get(url) if self.pages is not None else None
+        try:
+            response = self._get(url, conditional_headers(stored))
+        except requests.RequestException:
+            return None
+        self._count(fetches=1, bytes_fetched=len(response.content))
+        if response.status_code == 304 and stored is not None:
+            self._count(not_modified=1, bytes_saved=len(stored.html.encode("utf-8")))
+            return self._reuse(stored, response.status_code, started)
+        content_type = response.headers.get("Content-Type", "")
+        if response.status_code != 200 or "html" not in content_type:
+            return None
+
+        content_hash = hashlib.sha256(response.content).hexdigest()
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        if stored is not None and stored.content_hash == content_hash:
+            # Same body without validator support: skip the conversion, refresh the validators
+            self._count(unchanged=1)
+            self.pages.put(StoredPage(**{**asdict(stored), "etag": etag, "last_modified": last_modified,
+                                         "fetched_at": time.time()}))
+            return self._reuse(stored, response.status_code, started)
+
+        converting = time.perf_counter()
+        html = response.text
+        markdown = html_to_markdown(html, response.url)
+        js_rendered = looks_js_rendered(html, markdown)
+        self._count(conversion_seconds=time.perf_counter() - converting)
+        if js_rendered:
+            return None
+        page = ScrapedPage(
+            url=url,
+            markdown=markdown,
+            tier=LOCAL_TIER,
+            status_code=response.status_code,
+            title=page_title(html),
+            html=html,
+            elapsed=time.perf_counter() - started,
+        )
+        if self.pages is not None:
+            self._count(changed=1)
+            self.pages.put(StoredPage(url=url, markdown=markdown, title=page.title, html=html, etag=etag,
+                                      last_modified=last_modified, content_hash=content_hash,
+                                      fetched_at=time.time()))
+        return page
+
+    def scrape(self, url: str) -> ScrapedPage:
+        """Scrape a URL with the cheapest tier that works for its domain."""
+        if self.domain_tier(url) != REMOTE_TIER:
+            page = self.fetch_local(url)
+            if page is not None:
+                self._remember(url, LOCAL_TIER)
+                return page
+
+        started = time.perf_counter()
+        markdown = self.remote(url)
+        self._remember(url, REMOTE_TIER)
+        return ScrapedPage(url=url, markdown=markdown, tier=REMOTE_TIER,
+                           elapsed=time.perf_counter() - started)
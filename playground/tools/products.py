@@ -0,0 +1,431 @@
+"""
+Local product index over everything the agents scrape and search.
+
+Product pages and search results are normalized (title, price, currency, brand)
+and stored in a SQLite database with an FTS5 full-text index, so agents can
+answer questions like "top 5 winter coats under X" from fresh indexed data in
+milliseconds before falling back to live scraping.
+"""
+
+import json
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from dataclasses import dataclass
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Iterable, Optional
+
+from bs4 import BeautifulSoup
+from langchain_core.tools import tool
+
+from playground.utils.storage import data_path
+from playground.utils.tracing import trace
+
+CURRENCY_SYMBOLS = {"$": "USD", "€": "EUR", "£": "GBP", "¥": "JPY", "₩": "KRW", "원": "KRW"}
+CURRENCY_CODES = ("KRW", "USD", "EUR", "GBP", "JPY")
+
+_NUMBER = r"\d{1,3}(?:,\d{3})+(?:\.\d{1,2})?|\d+(?:\.\d{1,2})?"
+_PRICE = re.compile(
+    rf"(?P<symbol>[$€£¥₩])\s?(?P<amount>{_NUMBER})"
+    rf"|(?P<code>{'|'.join(CURRENCY_CODES)})\s?(?P<code_amount>{_NUMBER})"
+    rf"|(?P<suffix_amount>{_NUMBER})\s?(?P<suffix>원|{'|'.join(CURRENCY_CODES)})"
+)
+_TITLE_SUFFIX = re.compile(r"\s+[|｜]\s+[^|｜]+$")
+# A magnitude right after an amount ("$5 million", "$2bn") means it is not a product price
+_MAGNITUDE = re.compile(r"\s*(?:(?:million|billion|trillion|mn|bn|[kmb])\b|[만억조])", re.IGNORECASE)
+# Signals that a search result is a product page rather than news or a report quoting a figure
+_PRODUCT_URL = re.compile(
+    r"/(?:products?|items?|goods|dp|sku|catalog|shop)(?:/|[-_.=]|$)|[?&](?:product|item|goods|sku)[_-]?(?:id|no)?=",
+    re.IGNORECASE,
+)
+_SHOPPING_CUES = re.compile(
+    r"\b(?:price|sale|buy|in stock|add to (?:cart|bag)|free shipping|size)\b|가격|판매가|할인|구매|장바구니|배송|재고",
+    re.IGNORECASE,
+)
+
+
+@dataclass
+class ProductRecord:
+    """A normalized product observation."""
+
+    title: str
+    url: str
+    price: Optional[float] = None
+    currency: Optional[str] = None
+    brand: Optional[str] = None
+    source: str = "scrape"
+    fetched_at: float = 0.0
+
+    @property
+    def normalized_title(self) -> str:
+        return normalize_title(self.title).lower()
+
+
+# === NORMALIZATION ===
+
+def normalize_title(title: str) -> str:
+    """Normalize a product title: NFKC, collapsed whitespace, trailing site name removed."""
+    title = re.sub(r"\s+", " ", unicodedata.normalize("NFKC", title)).strip()
+    return _TITLE_SUFFIX.sub("", title) or title
+
+
+def parse_price(text: str) -> tuple[Optional[float], Optional[str]]:
+    """Find the first price in a text.
+
+    Args:
+        text: Text containing a price such as "₩189,000", "189,000원" or "USD 12.50"
+
+    Returns:
+        (amount, ISO currency code), or (None, None) if no price was found
+    """
+    match = _PRICE.search(text)
+    if not match:
+        return None, None
+    amount = match.group("amount") or match.group("code_amount") or match.group("suffix_amount")
+    unit = match.group("symbol") or match.group("code") or match.group("suffix")
+    return float(amount.replace(",", "")), CURRENCY_SYMBOLS.get(unit, unit)
+
+
+def looks_like_product_result(url: str, content: str) -> bool:
+    """Whether a search result is plausibly a product listing worth indexing.
+
+    The first price in the content must be a plain amount (not "$5 million"),
+    and either the URL looks like a product page or the content has shopping
+    cues such as "price", "add to cart" or "판매가".
+    """
+    match = _PRICE.search(content)
+    if match is None or _MAGNITUDE.match(content, match.end()):
+        return False
+    return bool(_PRODUCT_URL.search(url) or _SHOPPING_CUES.search(content))
+
+
+def _currency(value: Any) -> Optional[str]:
+    """ISO currency code in upper case, as the search filter compares it, or None."""
+    code = str(value).strip().upper() if value else ""
+    return code or None
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        return float(str(value).replace(",", ""))
+    except (TypeError, ValueError):
+        return None
+
+
+def _json_ld_products(data: Any) -> Iterable[dict]:
+    """Yield schema.org Product objects from parsed JSON-LD."""
+    if isinstance(data, list):
+        for item in data:
+            yield from _json_ld_products(item)
+    elif isinstance(data, dict):
+        types = data.get("@type")
+        types = types if isinstance(types, list) else [types]
+        if "Product" in types:
+            yield data
+        for key in ("@graph", "itemListElement", "item"):
+            if key in data:
+                yield from _json_ld_products(data[key])
+
+
+def _record_from_json_ld(product: dict, url: str) -> Optional[ProductRecord]:
+    title = product.get("name")
+    if not title:
+        return None
+    offers = product.get("offers") or {}
+    if isinstance(offers, list):
+        offers = offers[0] if offers else {}
+    price = _to_float(offers.get("price", offers.get("lowPrice")))
+    brand = product.get("brand")
+    if isinstance(brand, dict):
+        brand = brand.get("name")
+    return ProductRecord(
+        title=str(title),
+        url=product.get("url") or offers.get("url") or url,
+        price=price,
+        currency=_currency(offers.get("priceCurrency")),
+        brand=brand if isinstance(brand, str) else None,
+    )
+
+
+def extract_products(url: str, html: str = "", markdown: str = "", title: str = "") -> list[ProductRecord]:
+    """Extract product records from a scraped page.
+
+    Structured data (JSON-LD Product, Open Graph product meta tags) is preferred;
+    otherwise the page title and the first price in its text are used.
+
+    Args:
+        url: Page URL
+        html: Raw HTML, if available
+        markdown: Page markdown, if available
+        title: Page title, if known
+
+    Returns:
+        Product records found on the page (possibly empty)
+    """
+    records: list[ProductRecord] = []
+    if html:
+        soup = BeautifulSoup(html, "html.parser")
+        for script in soup.find_all("script", type="application/ld+json"):
+            try:
+                data = json.loads(script.string or "")
+            except ValueError:
+                continue
+            records.extend(filter(None, (_record_from_json_ld(p, url) for p in _json_ld_products(data))))
+        if records:
+            return records
+
+        meta = {
+            tag.get("property") or tag.get("name"): tag.get("content")
+            for tag in soup.find_all("meta")
+            if tag.get("content")
+        }
+        amount = _to_float(meta.get("product:price:amount") or meta.get("og:price:amount"))
+        if amount is not None:
+            return [ProductRecord(
+                title=meta.get("og:title") or title,
+                url=url,
+                price=amount,
+                currency=_currency(meta.get("product:price:currency") or meta.get("og:price:currency")),
+                brand=meta.get("product:brand") or meta.get("og:brand"),
+            )]
+
+    heading = re.search(r"^#\s+(.+)$", markdown, re.MULTILINE)
+    title = title or (heading.group(1) if heading else "")
+    price, currency = parse_price(markdown[:2000])
+    if title and price is not None:
+        records.append(ProductRecord(title=title, url=url, price=price, currency=currency))
+    return records
+
+
+# === STORE ===
+
+class ProductStore:
+    """SQLite product store with an FTS5 index over titles and brands.
+
+    Args:
+        path: Database file path (":memory:" for a throwaway store)
+    """
+
+    def __init__(self, path: str) -> None:
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.row_factory = sqlite3.Row
+        with self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS products (
+                    url TEXT PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    normalized_title TEXT NOT NULL,
+                    price REAL,
+                    currency TEXT,
+                    brand TEXT,
+                    source TEXT,
+                    fetched_at REAL NOT NULL
+                )"""
+            )
+            self._conn.execute(
+                """CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+                    url UNINDEXED, normalized_title, brand, tokenize='porter unicode61'
+                )"""
+            )
+            # Products found on each scraped page, so an unchanged page can refresh them without re-parsing
+            self._conn.execute(
+                """CREATE TABLE IF NOT EXISTS page_products (
+                    page_url TEXT NOT NULL,
+                    product_url TEXT NOT NULL,
+                    PRIMARY KEY (page_url, product_url)
+                )"""
+            )
+
+    def upsert(self, records: Iterable[ProductRecord], page_url: Optional[str] = None) -> int:
+        """Insert or refresh product records, keyed by URL.
+
+        Args:
+            records: Product records
+            page_url: Scraped page the records were extracted from, if any
+
+        Returns:
+            Number of records written
+        """
+        rows = [record for record in records if record.title and record.url]
+        now = time.time()
+        with self._lock, self._conn:
+            if page_url is not None:
+                self._conn.execute("DELETE FROM page_products WHERE page_url = ?", (page_url,))
+                self._conn.executemany("INSERT OR IGNORE INTO page_products (page_url, product_url) VALUES (?, ?)",
+                                       [(page_url, record.url) for record in rows])
+            for record in rows:
+                # A price and its currency are one observation: keep or replace them together
+                self._conn.execute(
+                    """INSERT INTO products (url, title, normalized_title, price, currency, brand, source, fetched_at)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT(url) DO UPDATE SET
+                        title=excluded.title, normalized_title=excluded.normalized_title,
+                        currency=CASE WHEN excluded.price IS NOT NULL THEN excluded.currency
+                                      ELSE products.currency END,
+                        price=COALESCE(excluded.price, products.price),
+                        brand=COALESCE(excluded.brand, products.brand),
+                        source=excluded.source, fetched_at=excluded.fetched_at""",
+                    (record.url, normalize_title(record.title), record.normalized_title, record.price,
+                     _currency(record.currency), record.brand, record.source, record.fetched_at or now),
+                )
+                self._conn.execute("DELETE FROM products_fts WHERE url = ?", (record.url,))
+                self._conn.execute(
+                    "INSERT INTO products_fts (url, normalized_title, brand) VALUES (?, ?, ?)",
+                    (record.url, record.normalized_title, (record.brand or "").lower()),
+                )
+        return len(rows)
+
+    def refresh_page(self, page_url: str) -> int:
+        """Mark the products found on a page as freshly fetched, for a page that has not changed.
+
+        Returns:
+            Number of products refreshed
+        """
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                """UPDATE products SET fetched_at = ?
+                   WHERE url IN (SELECT product_url FROM page_products WHERE page_url = ?)""",
+                (time.time(), page_url),
+            )
+        return cursor.rowcount
+
+    def search(self, query: str, max_price: Optional[float] = None, currency: Optional[str] = None,
+               limit: int = 5, max_age_hours: Optional[float] = None) -> list[dict[str, Any]]:
+        """Full-text search over indexed products.
+
+        Args:
+            query: Search terms, matched (stemmed, as prefixes) against titles and brands
+            max_price: Only return products at or below this price (requires currency)
+            currency: Only return products priced in this ISO currency
+            limit: Maximum number of products
+            max_age_hours: Only return products fetched within this many hours
+
+        Returns:
+            Matching products, most relevant first
+
+        Raises:
+            ValueError: max_price was given without a currency; prices in
+                different currencies cannot be compared
+        """
+        if max_price is not None and not currency:
+            raise ValueError("max_price needs a currency (e.g. 'KRW' or 'USD') to compare prices against")
+        terms = re.findall(r"\w+", normalize_title(query).lower())
+        if not terms:
+            return []
+        # Any term may match; bm25 ranks products matching more terms first. Every term is an
+        # FTS string literal, so punctuation and operator words in the query are matched as text
+        match = " OR ".join('"{}"*'.format(term.replace('"', '""')) for term in terms)
+        sql = """SELECT p.*, bm25(products_fts) AS rank FROM products_fts
+                 JOIN products p ON p.url = products_fts.url
+                 WHERE products_fts MATCH ?"""
+        params: list[Any] = [match]
+        if max_price is not None:
+            sql += " AND p.price IS NOT NULL AND p.price <= ?"
+            params.append(max_price)
+        if currency:
+            sql += " AND p.currency = ?"
+            params.append(currency.upper())
+        if max_age_hours is not None:
+            sql += " AND p.fetched_at >= ?"
+            params.append(time.time() - max_age_hours * 3600)
+        sql += " ORDER BY rank, p.price LIMIT ?"
+        params.append(limit)
+
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [
+            {
+                "title": row["title"],
+                "price": row["price"],
+                "currency": row["currency"],
+                "brand": row["brand"],
+                "url": row["url"],
+                "fetched_at": datetime.fromtimestamp(row["fetched_at"]).isoformat(timespec="seconds"),
+            }
+            for row in rows
+        ]
+
+
+@lru_cache(maxsize=1)
+def get_product_store() -> ProductStore:
+    """Return the shared on-disk product store."""
+    return ProductStore(str(data_path("products.db")))
+
+
+def index_page(url: str, html: str = "", markdown: str = "", title: str = "", unchanged: bool = False) -> int:
+    """Index the products found on a scraped page. Never raises.
+
+    A page revalidated as unchanged is not parsed again; the products found on
+    it last time are only marked as freshly fetched.
+
+    Returns:
+        Number of products indexed or refreshed
+    """
+    try:
+        if unchanged:
+            return get_product_store().refresh_page(url)
+        return get_product_store().upsert(extract_products(url, html, markdown, title), page_url=url)
+    except Exception as e:
+        trace("index_page", level="error", url=url, error=repr(e))
+        return 0
+
+
+def index_search_results(results: Any) -> int:
+    """Index search results (dicts with url/title/content) that look like product listings. Never raises.
+
+    Only results passing looks_like_product_result are indexed, so figures in
+    news or reports ("raised $5 million") do not become products.
+
+    Returns:
+        Number of products indexed
+    """
+    if not isinstance(results, list):
+        return 0
+    records = []
+    for result in results:
+        if not isinstance(result, dict) or not result.get("url") or not result.get("title"):
+            continue
+        content = result.get("content") or ""
+        if not looks_like_product_result(result["url"], content):
+            continue
+        price, currency = parse_price(content)
+        if price is not None:
+            records.append(ProductRecord(title=result["title"], url=result["url"], price=price,
+                                         currency=currency, source="search"))
+    try:
+        return get_product_store().upsert(records)
+    except Exception as e:
+        trace("index_search_results", level="error", error=repr(e))
+        return 0
+
+
+@tool
+def search_local_products(query: str, max_price: Optional[float] = None, currency: Optional[str] = None,
+                          limit: int = 5, max_age_hours: float = 72) -> Any:
+    """
+    Search products already collected from earlier scrapes and searches.
+    Use this before live scraping; fall back to scraping when nothing fresh matches.
+
+    Args:
+        query: Product search terms, e.g. "winter coat"
+        max_price: Only return products at or below this price; requires currency
+        currency: ISO currency code of max_price, e.g. "KRW" or "USD"
+        limit: Maximum number of products to return
+        max_age_hours: Only return products fetched within this many hours
+
+    Returns:
+        Matching products with title, price, currency, brand, url and fetch time
+    """
+    try:
+        products = get_product_store().search(query, max_price, currency, limit, max_age_hours)
+    except (ValueError, sqlite3.Error) as e:
+        return f"Error searching products: {e}"
+    if not products:
+        return "No indexed products matched. Fall back to live scraping or search."
+    return products
+
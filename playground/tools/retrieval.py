@@ -0,0 +1,277 @@
+"""
+Query-aware retrieval over pages scraped during a run.
+
+Scraped and crawled markdown is split into chunks and indexed in memory per run.
+Instead of putting a whole category page into the agent's context, the scrape
+tools return only the chunks most relevant to the agent's query, ranked with a
+vectorized BM25 scorer; the rest stays retrievable with search_page_chunks.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+from typing import Collection, Optional
+
+import numpy as np
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+
+from playground.utils.cache import TTLCache
+from playground.utils.runs import get_run_id
+
+# Pages longer than this are answered with top-k chunks when a query is given
+MAX_INLINE_CHARS = 4000
+CHUNK_CHARS = 1200
+DEFAULT_TOP_K = 5
+
+_TOKEN = re.compile(r"\w+", re.UNICODE)
+
+
+@dataclass
+class Chunk:
+    """A contiguous piece of a scraped page."""
+
+    url: str
+    index: int
+    total: int
+    text: str
+
+
+def tokenize(text: str) -> list[str]:
+    """Lowercase word tokens of a text."""
+    return _TOKEN.findall(text.lower())
+
+
+def chunk_markdown(markdown: str, max_chars: int = CHUNK_CHARS) -> list[str]:
+    """Split markdown into chunks of roughly max_chars along block boundaries.
+
+    Every chunk starts with the nearest preceding heading so it stays
+    understandable on its own.
+
+    Args:
+        markdown: Page markdown
+        max_chars: Target chunk size in characters
+
+    Returns:
+        Chunk texts in page order
+    """
+    chunks: list[str] = []
+    heading = ""
+    current: list[str] = []
+    size = 0
+
+    def flush() -> None:
+        nonlocal current, size
+        if current:
+            body = "\n\n".join(current)
+            chunks.append(body if not heading or body.startswith(heading) else f"{heading}\n\n{body}")
+        current, size = [], 0
+
+    for block in re.split(r"\n\s*\n", markdown):
+        block = block.strip()
+        if not block:
+            continue
+        if block.startswith("#"):
+            flush()
+            heading = block.splitlines()[0]
+        # Oversized blocks (long tables, walls of text) are cut into pieces
+        pieces = [block[i:i + max_chars] for i in range(0, len(block), max_chars)]
+        for piece in pieces:
+            if size and size + len(piece) > max_chars:
+                flush()
+            current.append(piece)
+            size += len(piece)
+    flush()
+    return chunks
+
+
+class BM25Index:
+    """In-memory BM25 index over page chunks.
+
+    Term counts are kept as flat (row, column, count) arrays; at query time they
+    are scattered into a chunks x query-terms matrix and scored with NumPy.
+
+    Args:
+        k1: BM25 term-frequency saturation
+        b: BM25 length normalization
+    """
+
+    def __init__(self, k1: float = 1.5, b: float = 0.75) -> None:
+        self.k1 = k1
+        self.b = b
+        self.chunks: list[Chunk] = []
+        self.pages: dict[str, list[int]] = {}
+        self._vocab: dict[str, int] = {}
+        self._rows: list[np.ndarray] = []
+        self._cols: list[np.ndarray] = []
+        self._counts: list[np.ndarray] = []
+        self._lengths: list[int] = []
+        self._matrix: Optional[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = None
+        self._lock = threading.RLock()
+
+    def add_page(self, url: str, markdown: str) -> list[Chunk]:
+        """Chunk and index a page, replacing an earlier version of the same URL.
+
+        Returns:
+            The page's chunks
+        """
+        with self._lock:
+            return self._add_page(url, markdown)
+
+    def _add_page(self, url: str, markdown: str) -> list[Chunk]:
+        if url in self.pages:
+            # Re-scraped page: keep the old rows but stop returning them
+            for row in self.pages[url]:
+                self._lengths[row] = 0
+                self.chunks[row].text = ""
+        texts = chunk_markdown(markdown)
+        rows = []
+        for index, text in enumerate(texts):
+            row = len(self.chunks)
+            tokens = tokenize(text)
+            terms, counts = np.unique(
+                [self._vocab.setdefault(token, len(self._vocab)) for token in tokens] or [0],
+                return_counts=True,
+            )
+            if not tokens:
+                counts = np.zeros_like(counts)
+            self._rows.append(np.full(len(terms), row, dtype=np.int32))
+            self._cols.append(terms.astype(np.int32))
+            self._counts.append(counts.astype(np.float32))
+            self._lengths.append(len(tokens))
+            self.chunks.append(Chunk(url=url, index=index, total=len(texts), text=text))
+            rows.append(row)
+        self.pages[url] = rows
+        self._matrix = None
+        return [self.chunks[row] for row in rows]
+
+    def _arrays(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        if self._matrix is None:
+            self._matrix = (
+                np.concatenate(self._rows),
+                np.concatenate(self._cols),
+                np.concatenate(self._counts),
+                np.asarray(self._lengths, dtype=np.float32),
+            )
+        return self._matrix
+
+    def scores(self, query: str) -> np.ndarray:
+        """BM25 score of every chunk for a query."""
+        if not self.chunks:
+            return np.zeros(0, dtype=np.float32)
+        query_terms = sorted({self._vocab[token] for token in tokenize(query) if token in self._vocab})
+        if not query_terms:
+            return np.zeros(len(self.chunks), dtype=np.float32)
+
+        rows, cols, counts, lengths = self._arrays()
+        terms = np.asarray(query_terms, dtype=np.int32)
+        mask = np.isin(cols, terms)
+        tf = np.zeros((len(self.chunks), len(terms)), dtype=np.float32)
+        np.add.at(tf, (rows[mask], np.searchsorted(terms, cols[mask])), counts[mask])
+
+        live = lengths > 0
+        n_docs = max(int(live.sum()), 1)
+        df = (tf[live] > 0).sum(axis=0)
+        idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+        avg_length = lengths[live].mean() if live.any() else 1.0
+        norm = self.k1 * (1 - self.b + self.b * lengths / avg_length)
+        scores = (tf * (self.k1 + 1) / (tf + norm[:, None])) @ idf
+        return np.where(live, scores, 0)
+
+    def search(self, query: str, k: int = DEFAULT_TOP_K, urls: Optional[Collection[str]] = None,
+               neighbours: int = 0) -> list[Chunk]:
+        """Return the top-k chunks for a query, optionally with neighbouring chunks.
+
+        Args:
+            query: What the agent is looking for
+            k: Number of top-ranked chunks
+            urls: Only search chunks of these pages
+            neighbours: Also include this many chunks before and after each hit
+
+        Returns:
+            Chunks in page order
+        """
+        with self._lock:
+            return self._search(query, k, urls, neighbours)
+
+    def _search(self, query: str, k: int, urls: Optional[Collection[str]], neighbours: int) -> list[Chunk]:
+        scores = self.scores(query)
+        if urls is not None:
+            allowed = np.zeros(len(self.chunks), dtype=bool)
+            for url in urls:
+                allowed[self.pages.get(url, [])] = True
+            scores = np.where(allowed, scores, 0)
+        hits = [int(row) for row in np.argsort(-scores, kind="stable")[:k] if scores[row] > 0]
+
+        selected: set[int] = set()
+        for row in hits:
+            page_rows = self.pages[self.chunks[row].url]
+            position = self.chunks[row].index
+            window = page_rows[max(0, position - neighbours):position + neighbours + 1]
+            selected.update(window)
+        return [self.chunks[row] for row in sorted(selected) if self.chunks[row].text]
+
+
+# Per-run indexes; runs that stop querying are dropped after an hour
+_run_indexes: TTLCache[str, BM25Index] = TTLCache(maxsize=64, ttl=3600)
+
+
+def get_run_index(config: Optional[RunnableConfig]) -> BM25Index:
+    """Return the chunk index of the run a config belongs to."""
+    return _run_indexes.get_or_create(get_run_id(config), BM25Index)
+
+
+def format_chunks(chunks: list[Chunk], header: str = "") -> str:
+    """Render chunks for a tool response."""
+    parts = [header] if header else []
+    parts.extend(f"[{chunk.url} chunk {chunk.index + 1}/{chunk.total}]\n{chunk.text}" for chunk in chunks)
+    return "\n\n".join(parts)
+
+
+def select_relevant(url: str, markdown: str, query: Optional[str], config: Optional[RunnableConfig],
+                    k: int = DEFAULT_TOP_K) -> str:
+    """Index a scraped page and return either the whole page or its top-k chunks.
+
+    Short pages, and calls without a query, get the full markdown.
+
+    Args:
+        url: Page URL
+        markdown: Page markdown
+        query: What the agent is looking for on the page
+        config: Config of the calling tool, used to find the run's index
+        k: Number of chunks to return
+
+    Returns:
+        Text to hand back to the agent
+    """
+    index = get_run_index(config)
+    chunks = index.add_page(url, markdown)
+    if not query or len(markdown) <= MAX_INLINE_CHARS:
+        return markdown
+    hits = index.search(query, k=k, urls=[url]) or chunks[:k]
+    header = (
+        f"{url}: showing {len(hits)} of {len(chunks)} chunks relevant to {query!r}. "
+        "Use search_page_chunks for more."
+    )
+    return format_chunks(hits, header)
+
+
+@tool
+def search_page_chunks(query: str, config: RunnableConfig, url: Optional[str] = None,
+                       k: int = DEFAULT_TOP_K, neighbours: int = 0) -> str:
+    """
+    Search the pages already scraped or crawled in this run and return only the relevant parts.
+
+    Args:
+        query: What you are looking for
+        url: Only search this page (omit to search every page from this run)
+        k: Number of most relevant chunks to return
+        neighbours: Also return this many chunks before and after each match for context
+
+    Returns:
+        The matching chunks with their page URL and position
+    """
+    chunks = get_run_index(config).search(query, k=k, urls=[url] if url else None, neighbours=neighbours)
+    if not chunks:
+        return "No scraped content from this run matched. Scrape the page first."
+    return format_chunks(chunks)
@@ -2,12 +2,18 @@
 Search tools for web research and information retrieval.
 """
 
-from langchain_community.tools.tavily_search import TavilySearchResults
+from langchain_core.runnables import RunnableConfig
 from langchain_core.tools import tool
 
+from playground.utils.progress import ProgressReporter
+from playground.utils.tracing import trace
+
+from .dedup import dedupe_results
+from .products import index_search_results
+
 
 @tool
-async def advanced_research_tool(query: str):
+async def advanced_research_tool(query: str, config: RunnableConfig):
     """
     Perform comprehensive web searches for detailed research.
     
@@ -15,19 +21,28 @@ async def advanced_research_tool(query: str):
         query: The search query string
         
     Returns:
-        Search results with detailed information
+        Search results with detailed information; results already seen in this
+        run are reduced to their url and the url they duplicate
     """
+    # Imported on first call: langchain_community is slow to import
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
     tavily_tool = TavilySearchResults(
         max_results=10,
         search_depth="advanced"
     )
-    result = await tavily_tool.ainvoke({"query": query})
-    print(f"advanced_research_tool result: {result}")
-    return result
+    progress = ProgressReporter("advanced_research_tool", config, unit="results")
+    async with progress.heartbeat(f"Searching: {query}"):
+        result = await tavily_tool.ainvoke({"query": query})
+    await progress.aupdate(done=len(result) if isinstance(result, list) else 0,
+                           bytes_received=len(str(result).encode()), final=True)
+    trace("advanced_research_tool", config, query=query, result=result)
+    index_search_results(result)
+    return dedupe_results(result, config)
 
 
 @tool
-async def basic_research_tool(query: str):
+async def basic_research_tool(query: str, config: RunnableConfig):
     """
     Research trending topics for social media content.
     
@@ -37,6 +52,8 @@ async def basic_research_tool(query: str):
     Returns:
         Trending search results
     """
+    from langchain_community.tools.tavily_search import TavilySearchResults
+
     tavily_tool = TavilySearchResults(
         max_results=5,
         search_depth="basic",
@@ -44,6 +61,11 @@ async def basic_research_tool(query: str):
         include_images=True
     )
     enhanced_query = f"trending {query}"
-    result = await tavily_tool.ainvoke({"query": enhanced_query})
-    print(f"basic_research_tool result: {result}")
-    return result
\ No newline at end of file
+    progress = ProgressReporter("basic_research_tool", config, unit="results")
+    async with progress.heartbeat(f"Searching: {enhanced_query}"):
+        result = await tavily_tool.ainvoke({"query": enhanced_query})
+    await progress.aupdate(done=len(result) if isinstance(result, list) else 0,
+                           bytes_received=len(str(result).encode()), final=True)
+    trace("basic_research_tool", config, query=enhanced_query, result=result)
+    index_search_results(result)
+    return dedupe_results(result, config)
\ No newline at end of file
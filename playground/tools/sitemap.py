@@ -0,0 +1,149 @@
+"""
+Cached site maps and query-ranked URL selection.
+
+Crawling a whole shop to find a handful of product pages fetches hundreds of
+pages the agent never reads. Instead, the site's URL map is fetched once per
+domain and cached, every URL is scored against the agent's query from its path
+tokens and the anchor text linking to it from the landing page, and only the
+top-ranked pages are scraped.
+"""
+
+import os
+import re
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from urllib.parse import unquote, urljoin, urlparse
+
+import numpy as np
+import requests
+from bs4 import BeautifulSoup
+
+from playground.utils.cache import TTLCache
+
+from .dedup import canonicalize_url
+from .retrieval import BM25Index
+
+# Site maps change slowly; refetch at most every few hours per domain
+SITE_MAP_TTL = float(os.getenv("PLAYGROUND_SITE_MAP_TTL", str(6 * 3600)))
+DEFAULT_TOP_N = 5
+
+# Path segments that say nothing about page content
+_PATH_NOISE = {"www", "html", "htm", "php", "asp", "aspx", "jsp", "index", "en", "ko", "kr", "us"}
+
+
+@dataclass
+class SiteMap:
+    """URLs discovered on a site, with the anchor text linking to them."""
+
+    domain: str
+    links: list[str]
+    anchors: dict[str, str] = field(default_factory=dict)
+    fetched_at: float = field(default_factory=time.time)
+
+
+def site_key(url: str) -> str:
+    """Cache key of the site a URL belongs to."""
+    return urlparse(canonicalize_url(url)).netloc
+
+
+def url_text(url: str) -> str:
+    """Words in a URL's path and query, e.g. /men/winter-coats?color=navy -> 'men winter coats color navy'."""
+    parts = urlparse(url)
+    words = re.split(r"[\W_]+", unquote(f"{parts.path} {parts.query}").lower())
+    return " ".join(word for word in words if word and word not in _PATH_NOISE)
+
+
+def landing_anchors(html: str, base_url: str) -> dict[str, str]:
+    """Map every same-site link on a page to the text of the anchors pointing at it.
+
+    Args:
+        html: Landing page HTML
+        base_url: URL the HTML was fetched from
+
+    Returns:
+        Absolute URL -> anchor text (title attributes included)
+    """
+    domain = site_key(base_url)
+    anchors: dict[str, str] = {}
+    for anchor in BeautifulSoup(html, "html.parser").find_all("a", href=True):
+        href = urljoin(base_url, anchor["href"]).split("#")[0]
+        if not href.startswith("http") or site_key(href) != domain:
+            continue
+        text = " ".join(filter(None, [anchor.get_text(" ", strip=True), anchor.get("title", "")]))
+        if text:
+            anchors[href] = f"{anchors[href]} {text}" if href in anchors else text
+    return anchors
+
+
+def rank_urls(query: str, links: list[str], anchors: Optional[dict[str, str]] = None,
+              top_n: int = DEFAULT_TOP_N) -> list[str]:
+    """Rank URLs against a query by BM25 over their path tokens and anchor text.
+
+    Args:
+        query: What the agent is looking for
+        links: Candidate URLs
+        anchors: Anchor text per URL, where known
+        top_n: Number of URLs to return
+
+    Returns:
+        The top_n best matching URLs (one per canonical URL), best first; URLs
+        with no matching term are left out
+    """
+    anchor_text = {canonicalize_url(link): text for link, text in (anchors or {}).items()}
+    index = BM25Index()
+    unique: dict[str, str] = {}
+    for link in links:
+        unique.setdefault(canonicalize_url(link), link)
+    for canonical, link in unique.items():
+        index.add_page(link, f"{url_text(link)} {anchor_text.get(canonical, '')}")
+
+    scores = index.scores(query)
+    best: dict[str, float] = {}
+    for link, rows in index.pages.items():
+        if rows:
+            best[link] = float(np.max(scores[rows]))
+    ranked = sorted((link for link, score in best.items() if score > 0), key=lambda link: -best[link])
+    return ranked[:top_n]
+
+
+class SiteMapCache:
+    """Per-domain cache of site maps.
+
+    Args:
+        mapper: Callable returning the list of URLs on a site (e.g. Firecrawl map)
+        session: HTTP session used to fetch the landing page for anchor text
+        ttl: Seconds a site map stays valid
+        timeout: Timeout in seconds for the landing page fetch
+    """
+
+    def __init__(self, mapper: Callable[[str], list[str]], session: Optional[requests.Session] = None,
+                 ttl: float = SITE_MAP_TTL, timeout: float = 10.0) -> None:
+        self.mapper = mapper
+        self.session = session or requests.Session()
+        self.timeout = timeout
+        self._maps: TTLCache[str, SiteMap] = TTLCache(maxsize=256, ttl=ttl)
+
+    def _anchors(self, url: str) -> dict[str, str]:
+        try:
+            response = self.session.get(url, timeout=self.timeout)
+        except requests.RequestException:
+            return {}
+        if response.status_code != 200 or "html" not in response.headers.get("Content-Type", ""):
+            return {}
+        return landing_anchors(response.text, response.url)
+
+    def get(self, url: str) -> SiteMap:
+        """Return the cached site map for the URL's domain, mapping the site on a miss."""
+        key = site_key(url)
+        site_map = self._maps.get(key)
+        if site_map is None:
+            # Built outside the cache lock so slow maps don't block other domains
+            anchors = self._anchors(url)
+            links = list(dict.fromkeys([*self.mapper(url), *anchors]))
+            site_map = SiteMap(domain=key, links=links, anchors=anchors)
+            self._maps.set(key, site_map)
+        return site_map
+
+    def invalidate(self, url: str) -> None:
+        self._maps.pop(site_key(url))
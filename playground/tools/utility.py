@@ -10,6 +10,7 @@ from langchain_core.tools import tool
 async def get_todays_date() -> str:
     """
     Get the current date in YYYY-MM-DD format.
+    Only needed when the date is not already given in the run context.
     
     Returns:
         Current date as string
@@ -0,0 +1,407 @@
+"""
+Admission control and fair queuing for concurrent graph runs.
+
+Every run (a Streamlit submission or a LangGraph server invocation) asks the
+process-wide AdmissionController for a slot before the graph executes:
+
+- at most max_running runs execute at once, and at most max_running_per_user of
+  them belong to the same user or session;
+- runs that cannot start wait in a bounded queue, served round-robin across
+  users so one busy session cannot starve the others, and are told their
+  position while they wait;
+- a run is rejected immediately when the queue is full, and shed with a clear
+  message once it has waited longer than the queue timeout.
+
+Queue and run metrics are available from metrics() and render_metrics().
+
+Settings come from the environment:
+    PLAYGROUND_MAX_RUNNING_RUNS    Runs executing at once (default 8)
+    PLAYGROUND_MAX_RUNS_PER_USER   Runs executing at once per user/session (default 2)
+    PLAYGROUND_MAX_QUEUED_RUNS     Runs allowed to wait for a slot (default 32)
+    PLAYGROUND_QUEUE_TIMEOUT       Seconds a run may wait before it is shed (default 60)
+"""
+
+import asyncio
+import contextlib
+import inspect
+import os
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, Union
+
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langgraph.graph import START, END, MessagesState, StateGraph
+
+from playground.utils.cancellation import get_cancellation_registry
+from playground.utils.runs import get_thread_id
+from playground.utils.stats import latency_summary
+from playground.utils.tracing import trace
+
+DEFAULT_MAX_RUNNING = 8
+DEFAULT_MAX_PER_USER = 2
+DEFAULT_MAX_QUEUED = 32
+DEFAULT_QUEUE_TIMEOUT = 60.0
+# Seconds between position updates sent to a waiting run
+POSITION_INTERVAL = 1.0
+# Latency samples kept for the wait/run percentiles
+WINDOW = 1000
+ANONYMOUS = "anonymous"
+
+
+class AdmissionRejected(Exception):
+    """A run was not admitted.
+
+    Args:
+        reason: "queue_full" or "queue_timeout"
+        message: User-facing explanation
+    """
+
+    def __init__(self, reason: str, message: str) -> None:
+        super().__init__(message)
+        self.reason = reason
+        self.message = message
+
+
+@dataclass
+class QueuePosition:
+    """Where a waiting run stands in the queue."""
+
+    position: int
+    queued: int
+    waited: float
+    timeout_in: float
+
+
+@dataclass
+class _Ticket:
+    user: str
+    loop: asyncio.AbstractEventLoop
+    future: asyncio.Future
+    enqueued: float = field(default_factory=time.monotonic)
+    granted: bool = False
+
+
+PositionCallback = Callable[[QueuePosition], Union[None, Awaitable[None]]]
+
+
+class AdmissionController:
+    """Limits concurrent runs, queues the rest fairly and sheds what waits too long.
+
+    Thread-safe: the Streamlit app runs each session's script on its own thread
+    and event loop, so state is guarded by a lock and waiters are woken on their
+    own loop.
+
+    Args:
+        max_running: Runs executing at once
+        max_running_per_user: Runs executing at once for a single user/session
+        max_queued: Runs allowed to wait for a slot; further runs are rejected
+        queue_timeout: Seconds a run may wait before it is shed
+    """
+
+    def __init__(self, max_running: int = DEFAULT_MAX_RUNNING, max_running_per_user: int = DEFAULT_MAX_PER_USER,
+                 max_queued: int = DEFAULT_MAX_QUEUED, queue_timeout: float = DEFAULT_QUEUE_TIMEOUT) -> None:
+        self.max_running = max(1, max_running)
+        self.max_running_per_user = max(1, max_running_per_user)
+        self.max_queued = max(0, max_queued)
+        self.queue_timeout = queue_timeout
+        self._lock = threading.Lock()
+        self._running: Counter[str] = Counter()
+        # Waiting tickets per user; the first user is served next and moves to the back
+        self._waiting: OrderedDict[str, deque[_Ticket]] = OrderedDict()
+        self._wait_times: deque[float] = deque(maxlen=WINDOW)
+        self._run_times: deque[float] = deque(maxlen=WINDOW)
+        self._counts: Counter[str] = Counter()
+
+    @property
+    def running(self) -> int:
+        with self._lock:
+            return sum(self._running.values())
+
+    @property
+    def queued(self) -> int:
+        with self._lock:
+            return self._queued_locked()
+
+    def _queued_locked(self) -> int:
+        return sum(len(tickets) for tickets in self._waiting.values())
+
+    def _can_start_locked(self, user: str) -> bool:
+        return (sum(self._running.values()) < self.max_running
+                and self._running[user] < self.max_running_per_user)
+
+    def _dispatch_locked(self) -> None:
+        """Grant free slots to waiting runs, one user at a time in round-robin order."""
+        while sum(self._running.values()) < self.max_running:
+            user = next((u for u in self._waiting if self._running[u] < self.max_running_per_user), None)
+            if user is None:
+                return
+            tickets = self._waiting[user]
+            ticket = tickets.popleft()
+            if tickets:
+                self._waiting.move_to_end(user)
+            else:
+                del self._waiting[user]
+            ticket.granted = True
+            self._running[user] += 1
+            ticket.loop.call_soon_threadsafe(_wake, ticket.future)
+
+    def _order_locked(self) -> list[_Ticket]:
+        """Waiting tickets in the order round-robin dispatch would serve them."""
+        queues = list(self._waiting.values())
+        depth = max((len(tickets) for tickets in queues), default=0)
+        return [tickets[i] for i in range(depth) for tickets in queues if i < len(tickets)]
+
+    def _position_locked(self, ticket: _Ticket) -> QueuePosition:
+        order = self._order_locked()
+        waited = time.monotonic() - ticket.enqueued
+        return QueuePosition(
+            position=order.index(ticket) + 1 if ticket in order else 0,
+            queued=len(order),
+            waited=waited,
+            timeout_in=max(0.0, self.queue_timeout - waited),
+        )
+
+    def _remove_locked(self, ticket: _Ticket) -> None:
+        tickets = self._waiting.get(ticket.user)
+        if tickets is not None and ticket in tickets:
+            tickets.remove(ticket)
+            if not tickets:
+                del self._waiting[ticket.user]
+
+    def _return_slot_locked(self, user: str) -> None:
+        self._running[user] -= 1
+        if self._running[user] <= 0:
+            del self._running[user]
+        self._dispatch_locked()
+
+    def _release(self, user: str, started: float) -> None:
+        with self._lock:
+            self._run_times.append(time.monotonic() - started)
+            self._counts["completed"] += 1
+            self._return_slot_locked(user)
+
+    async def _wait(self, ticket: _Ticket, on_position: Optional[PositionCallback],
+                    config: Optional[RunnableConfig]) -> None:
+        """Wait until the ticket is granted, reporting its position; shed it at the deadline."""
+        deadline = ticket.enqueued + self.queue_timeout
+        while True:
+            with self._lock:
+                if ticket.granted:
+                    return
+                if time.monotonic() >= deadline:
+                    self._remove_locked(ticket)
+                    self._counts["shed"] += 1
+                    position = None
+                else:
+                    position = self._position_locked(ticket)
+            if position is None:
+                trace("admission_shed", config, level="error", user=ticket.user, waited=self.queue_timeout)
+                raise AdmissionRejected(
+                    "queue_timeout",
+                    f"The assistant is busy and your request waited {self.queue_timeout:.0f}s without "
+                    "getting a slot. Please try again in a moment.",
+                )
+            if on_position is not None:
+                result = on_position(position)
+                if inspect.isawaitable(result):
+                    await result
+            remaining = deadline - time.monotonic()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(asyncio.shield(ticket.future), max(0.0, min(POSITION_INTERVAL, remaining)))
+
+    @contextlib.asynccontextmanager
+    async def admit(self, user: Optional[str] = None, on_position: Optional[PositionCallback] = None,
+                    config: Optional[RunnableConfig] = None) -> AsyncIterator[None]:
+        """Hold a run slot for the duration of the block.
+
+        Args:
+            user: User or session the run belongs to, for per-user limits and fairness
+            on_position: Called (sync or async) with the run's QueuePosition while it waits
+            config: Config of the run, for traces
+
+        Raises:
+            AdmissionRejected: The queue is full, or the run waited longer than the queue timeout
+        """
+        user = user or ANONYMOUS
+        ticket = None
+        rejected = False
+        with self._lock:
+            # Start right away unless this user already has runs queued, so those keep their turn.
+            # Waiting runs of other users are blocked by their own per-user cap (dispatch grants
+            # every ticket that could start), so a free slot is not held back for them.
+            if self._can_start_locked(user) and user not in self._waiting:
+                self._running[user] += 1
+            elif self._queued_locked() >= self.max_queued:
+                self._counts["rejected"] += 1
+                rejected = True
+            else:
+                loop = asyncio.get_running_loop()
+                ticket = _Ticket(user=user, loop=loop, future=loop.create_future())
+                self._waiting.setdefault(user, deque()).append(ticket)
+                self._counts["enqueued"] += 1
+                self._dispatch_locked()
+        if rejected:
+            trace("admission_rejected", config, level="error", user=user, max_queued=self.max_queued)
+            raise AdmissionRejected(
+                "queue_full",
+                "The assistant is at capacity and the waiting line is full. Please try again in a moment.",
+            )
+
+        if ticket is not None:
+            try:
+                await self._wait(ticket, on_position, config)
+            except BaseException:
+                with self._lock:
+                    if ticket.granted:
+                        # Granted while being cancelled: hand the slot straight back
+                        self._return_slot_locked(user)
+                    else:
+                        self._remove_locked(ticket)
+                raise
+            waited = time.monotonic() - ticket.enqueued
+        else:
+            waited = 0.0
+
+        with self._lock:
+            self._wait_times.append(waited)
+            self._counts["admitted"] += 1
+        trace("admission_admitted", config, user=user, waited=round(waited, 3))
+        started = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release(user, started)
+
+    def metrics(self) -> dict[str, Any]:
+        """Current queue and run metrics.
+
+        Returns:
+            Limits, running/queued gauges (total and per user), admitted/enqueued/rejected/
+            shed/completed counters and wait/run latency summaries
+        """
+        with self._lock:
+            return {
+                "max_running": self.max_running,
+                "max_running_per_user": self.max_running_per_user,
+                "max_queued": self.max_queued,
+                "queue_timeout": self.queue_timeout,
+                "running": sum(self._running.values()),
+                "queued": self._queued_locked(),
+                "running_by_user": dict(self._running),
+                "queued_by_user": {user: len(tickets) for user, tickets in self._waiting.items()},
+                **{name: self._counts[name] for name in ("admitted", "enqueued", "rejected", "shed", "completed")},
+                "wait_seconds": latency_summary(self._wait_times),
+                "run_seconds": latency_summary(self._run_times),
+            }
+
+    def render_metrics(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        stats = self.metrics()
+        lines = [
+            "# TYPE playground_runs_running gauge",
+            f"playground_runs_running {stats['running']}",
+            "# TYPE playground_runs_queued gauge",
+            f"playground_runs_queued {stats['queued']}",
+        ]
+        for name in ("admitted", "enqueued", "rejected", "shed", "completed"):
+            lines += [f"# TYPE playground_runs_{name}_total counter", f"playground_runs_{name}_total {stats[name]}"]
+        for metric in ("wait_seconds", "run_seconds"):
+            summary = stats[metric]
+            lines.append(f"# TYPE playground_run_{metric} summary")
+            for quantile in ("p50", "p95", "p99"):
+                if summary[quantile] is not None:
+                    value = summary[quantile]
+                    lines.append(f'playground_run_{metric}{{quantile="0.{quantile[1:]}"}} {value:.6f}')
+            lines.append(f"playground_run_{metric}_count {summary['count']}")
+        return "\n".join(lines) + "\n"
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+_controller: Optional[AdmissionController] = None
+_controller_lock = threading.Lock()
+
+
+def get_admission_controller() -> AdmissionController:
+    """Return the process-wide controller, created from the environment on first use."""
+    global _controller
+    with _controller_lock:
+        if _controller is None:
+            _controller = AdmissionController(
+                max_running=int(os.getenv("PLAYGROUND_MAX_RUNNING_RUNS", str(DEFAULT_MAX_RUNNING))),
+                max_running_per_user=int(os.getenv("PLAYGROUND_MAX_RUNS_PER_USER", str(DEFAULT_MAX_PER_USER))),
+                max_queued=int(os.getenv("PLAYGROUND_MAX_QUEUED_RUNS", str(DEFAULT_MAX_QUEUED))),
+                queue_timeout=float(os.getenv("PLAYGROUND_QUEUE_TIMEOUT", str(DEFAULT_QUEUE_TIMEOUT))),
+            )
+        return _controller
+
+
+def run_owner(config: Optional[RunnableConfig]) -> str:
+    """User or session a run is accounted to.
+
+    Uses the authenticated user of the LangGraph server when present, then an
+    explicit user_id, then the conversation thread.
+    """
+    configurable = (config or {}).get("configurable") or {}
+    owner = (configurable.get("langgraph_auth_user_id") or configurable.get("user_id")
+             or get_thread_id(config))
+    return str(owner) if owner else ANONYMOUS
+
+
+def admitted_graph(graph: Any, controller: Optional[AdmissionController] = None,
+                   config_schema: Optional[type] = None) -> Any:
+    """Wrap a compiled graph so each invocation waits for admission first.
+
+    The wrapper is a one-node graph that runs the original as a subgraph once a
+    slot is granted, so its streamed tokens and events still reach the caller.
+    While it executes the run is registered for cancellation, so a cancelled or
+    disconnected run also stops the tool work it started. Queue positions are written to the custom stream as {"admission": {...}};
+    a rejected or shed run ends with an AI message explaining why.
+
+    Args:
+        graph: Compiled graph taking and returning {"messages": [...]}
+        controller: Controller to use (default: the process-wide one)
+        config_schema: Configuration schema exposed by the wrapper (default: the wrapped graph's),
+            so the server API and Studio still show the agent's configurable settings
+
+    Returns:
+        Compiled wrapper graph with the same name
+    """
+    from langgraph.config import get_stream_writer
+
+    async def run(state: MessagesState, config: RunnableConfig) -> dict:
+        controller_ = controller or get_admission_controller()
+        try:
+            writer = get_stream_writer()
+        except (RuntimeError, KeyError):
+            writer = None
+
+        def report(position: QueuePosition) -> None:
+            if writer is not None:
+                writer({"admission": {"position": position.position, "queued": position.queued,
+                                      "waited": round(position.waited, 1),
+                                      "timeout_in": round(position.timeout_in, 1)}})
+
+        try:
+            owner = run_owner(config)
+            async with (controller_.admit(owner, on_position=report, config=config),
+                        get_cancellation_registry().track(config, owner)):
+                result = await graph.ainvoke({"messages": state["messages"]}, config)
+        except AdmissionRejected as e:
+            return {"messages": [AIMessage(content=e.message, name=graph.name)]}
+        return {"messages": result["messages"]}
+
+    if config_schema is None:
+        config_schema = getattr(getattr(graph, "builder", None), "context_schema", None)
+    builder = (StateGraph(MessagesState, config_schema=config_schema) if config_schema is not None
+               else StateGraph(MessagesState))
+    builder.add_node(graph.name, run)
+    builder.add_edge(START, graph.name)
+    builder.add_edge(graph.name, END)
+    return builder.compile(name=graph.name)
@@ -0,0 +1,186 @@
+"""
+Content-addressed blob store for large tool outputs.
+
+Tool results become ToolMessage content in graph state, which is copied through
+every node, checkpoint and stream event. Tools therefore hand outputs above a
+size threshold to offload(): the payload is written once to a file named after
+its SHA-256 digest (identical payloads share one file) and the message carries
+only a handle, the payload size and a compact preview. The read_blob tool reads
+slices back by handle, memory-mapping the file so a slice costs the same
+whatever the size of the blob, and state size stays flat however large the
+scraped page or crawled site is.
+
+Blobs live under .playground/blobs. Reading or storing a blob refreshes its
+modification time, and blobs unused for the time-to-live are pruned when the
+store is created.
+
+Settings come from the environment:
+    PLAYGROUND_BLOB_THRESHOLD    Tool outputs larger than this many bytes are offloaded (default 16384)
+    PLAYGROUND_BLOB_TTL          Seconds an unused blob is kept on disk (default 604800, a week)
+"""
+
+import hashlib
+import mmap
+import os
+import re
+import threading
+import time
+from pathlib import Path
+from typing import Optional, Union
+
+from playground.utils.storage import data_path
+
+DEFAULT_THRESHOLD = 16 * 1024
+DEFAULT_TTL = 7 * 24 * 3600.0
+# Characters of an offloaded payload shown inline
+PREVIEW_CHARS = 1500
+# Bytes returned by a read when no length is given
+DEFAULT_READ_BYTES = 8000
+# Largest slice read_blob returns, so one call cannot pull a whole blob back into state
+MAX_READ_BYTES = 4 * DEFAULT_READ_BYTES
+HANDLE_PREFIX = "blob:"
+
+_HANDLE = re.compile(r"^blob:([0-9a-f]{32})$")
+
+
+class BlobNotFound(Exception):
+    """A handle is malformed or its blob has been pruned."""
+
+
+class BlobStore:
+    """Content-addressed file store returning handles for payloads.
+
+    Args:
+        directory: Directory holding the blob files
+        threshold: Payloads larger than this many bytes are offloaded by offload()
+        ttl: Seconds an unused blob is kept (None keeps blobs forever)
+    """
+
+    def __init__(self, directory: Path, threshold: int = DEFAULT_THRESHOLD, ttl: Optional[float] = DEFAULT_TTL) -> None:
+        self.directory = Path(directory)
+        self.threshold = threshold
+        self.ttl = ttl
+        self.directory.mkdir(parents=True, exist_ok=True)
+        if ttl is not None:
+            self.prune(ttl)
+
+    def _path(self, handle: str) -> Path:
+        match = _HANDLE.match(handle.strip())
+        if match is None:
+            raise BlobNotFound(f"Not a blob handle: {handle!r}")
+        digest = match.group(1)
+        return self.directory / digest[:2] / digest
+
+    def put(self, data: Union[str, bytes]) -> str:
+        """Store a payload and return its handle; storing the same payload again reuses the file."""
+        if isinstance(data, str):
+            data = data.encode("utf-8")
+        handle = HANDLE_PREFIX + hashlib.sha256(data).hexdigest()[:32]
+        path = self._path(handle)
+        if path.exists():
+            os.utime(path)
+            return handle
+        path.parent.mkdir(parents=True, exist_ok=True)
+        # Write under a temporary name so concurrent readers never see a partial blob
+        temporary = path.with_name(f"{path.name}.{threading.get_ident()}.tmp")
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+        return handle
+
+    def size(self, handle: str) -> int:
+        """Size of a blob in bytes.
+
+        Raises:
+            BlobNotFound: The handle is malformed or unknown
+        """
+        try:
+            return self._path(handle).stat().st_size
+        except FileNotFoundError:
+            raise BlobNotFound(f"Unknown or expired blob: {handle}") from None
+
+    def read(self, handle: str, offset: int = 0, length: int = DEFAULT_READ_BYTES,
+             find: Optional[str] = None) -> tuple[str, int, int]:
+        """Read a slice of a blob as text.
+
+        Args:
+            handle: Blob handle
+            offset: Byte offset to start at
+            length: Bytes to read
+            find: Start at the first occurrence of this text at or after offset instead
+
+        Returns:
+            (text, start offset, total size); characters cut by the slice edges are dropped
+
+        Raises:
+            BlobNotFound: The handle is malformed or unknown, or find does not occur
+        """
+        path = self._path(handle)
+        try:
+            with open(path, "rb") as f:
+                total = os.fstat(f.fileno()).st_size
+                if total == 0:
+                    return "", 0, 0
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as view:
+                    start = max(0, min(offset, total))
+                    if find:
+                        start = view.find(find.encode("utf-8"), start)
+                        if start < 0:
+                            raise BlobNotFound(f"{find!r} does not occur in {handle} after byte {offset}")
+                    data = view[start:start + max(0, length)]
+        except FileNotFoundError:
+            raise BlobNotFound(f"Unknown or expired blob: {handle}") from None
+        os.utime(path)
+        return data.decode("utf-8", errors="ignore"), start, total
+
+    def offload(self, text: str, label: str = "Result") -> str:
+        """Return text unchanged if it is small, otherwise store it and return a handle with a preview.
+
+        Args:
+            text: Tool output
+            label: What the output is, e.g. "Page https://shop.test/coats"
+
+        Returns:
+            Text to put in the tool message
+        """
+        size = len(text.encode("utf-8"))
+        if size <= self.threshold:
+            return text
+        handle = self.put(text)
+        preview = text[:PREVIEW_CHARS].rstrip()
+        return (f"{label} is {size:,} bytes, stored as {handle}. Preview:\n\n{preview}\n\n"
+                f"[... {size - len(preview.encode('utf-8')):,} more bytes. Call read_blob with "
+                f"handle={handle!r} and an offset, or find= a phrase, to read further.]")
+
+    def prune(self, max_age: float) -> int:
+        """Delete blobs not stored or read for max_age seconds.
+
+        Returns:
+            Number of blobs deleted
+        """
+        cutoff = time.time() - max_age
+        removed = 0
+        for path in self.directory.glob("*/*"):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                continue
+        return removed
+
+
+_store: Optional[BlobStore] = None
+_store_lock = threading.Lock()
+
+
+def get_blob_store() -> BlobStore:
+    """Return the process-wide blob store, configured from the environment on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore(
+                data_path("blobs"),
+                threshold=int(os.getenv("PLAYGROUND_BLOB_THRESHOLD", str(DEFAULT_THRESHOLD))),
+                ttl=float(os.getenv("PLAYGROUND_BLOB_TTL", str(DEFAULT_TTL))),
+            )
+        return _store
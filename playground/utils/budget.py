@@ -0,0 +1,236 @@
+"""
+Per-run time and step budgets with graceful partial answers.
+
+A run gets a wall-clock budget (time_budget seconds) and a step budget
+(step_budget model calls, counted across the supervisor and every sub-agent).
+Both are read from configurable, so they propagate to sub-agents and tools
+through the config, and are tracked per run id.
+
+- While a budget runs low, the run context tells agents to skip optional steps.
+- Tool calls are capped at the time left; calls still running at the deadline
+  are cancelled and reported as errors.
+- Once a budget is spent, model calls stop calling the provider and answer with
+  the best partial result gathered so far, flagged in
+  response_metadata["budget"] = {"partial": True, "reason": "time" | "steps", ...}.
+"""
+
+import asyncio
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Optional, Sequence
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+from playground.utils.cache import TTLCache
+from playground.utils.model import DelegatingChatModel
+from playground.utils.runs import DEFAULT_RUN_ID, get_run_id
+from playground.utils.tracing import trace
+
+# A budget is running low below this share of its time or with this many steps left
+LOW_TIME_FRACTION = 0.2
+LOW_STEPS = 2
+# Longest tool output used as a partial answer when no agent has answered yet
+PARTIAL_TOOL_CHARS = 2000
+
+# Markers langgraph_supervisor sets on its handoff messages ("Successfully transferred ...")
+_HANDOFF_KEYS = ("__handoff_destination", "__is_handoff_back")
+
+_budgets: TTLCache[str, "RunBudget"] = TTLCache(maxsize=1024, ttl=24 * 3600)
+_budgets_lock = threading.Lock()
+
+
+@dataclass
+class RunBudget:
+    """Time and step budget of one run.
+
+    Args:
+        time_budget: Wall-clock seconds for the whole run (None for no limit)
+        step_budget: Model calls for the whole run (None for no limit)
+    """
+
+    time_budget: Optional[float] = None
+    step_budget: Optional[int] = None
+    started: float = field(default_factory=time.monotonic)
+    steps: int = 0
+    exhausted: Optional[str] = None
+    _lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def elapsed(self) -> float:
+        return time.monotonic() - self.started
+
+    def remaining_time(self) -> Optional[float]:
+        """Seconds left, or None without a time budget."""
+        if self.time_budget is None:
+            return None
+        return max(0.0, self.time_budget - self.elapsed())
+
+    def remaining_steps(self) -> Optional[int]:
+        if self.step_budget is None:
+            return None
+        return max(0, self.step_budget - self.steps)
+
+    @property
+    def low(self) -> bool:
+        """Whether the run should skip optional steps and wrap up."""
+        remaining_time = self.remaining_time()
+        remaining_steps = self.remaining_steps()
+        return ((remaining_time is not None and remaining_time < self.time_budget * LOW_TIME_FRACTION)
+                or (remaining_steps is not None and remaining_steps <= LOW_STEPS))
+
+    def take_step(self) -> Optional[str]:
+        """Count a model call; return why the budget is spent ("time" or "steps"), or None."""
+        with self._lock:
+            if self.exhausted is None:
+                if self.remaining_time() == 0.0:
+                    self.exhausted = "time"
+                elif self.step_budget is not None and self.steps >= self.step_budget:
+                    self.exhausted = "steps"
+                else:
+                    self.steps += 1
+            return self.exhausted
+
+    def expire(self, reason: str = "time") -> None:
+        """Mark the budget as spent, e.g. when a call was cut off at the deadline."""
+        with self._lock:
+            self.exhausted = self.exhausted or reason
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "partial": self.exhausted is not None,
+            "reason": self.exhausted,
+            "elapsed_s": round(self.elapsed(), 1),
+            "steps": self.steps,
+        }
+
+
+def get_budget(config: Optional[RunnableConfig]) -> Optional[RunBudget]:
+    """Return the budget of the run a config belongs to, starting it on first use.
+
+    The budget comes from configurable time_budget / step_budget. Runs without a
+    run id (see playground.utils.runs) or without either setting have no budget.
+
+    Args:
+        config: Config passed to a node, model or tool
+
+    Returns:
+        The run's budget, or None
+    """
+    configurable = (config or {}).get("configurable") or {}
+    time_budget = configurable.get("time_budget")
+    step_budget = configurable.get("step_budget")
+    run_id = get_run_id(config)
+    if (time_budget is None and step_budget is None) or run_id == DEFAULT_RUN_ID:
+        return None
+    with _budgets_lock:
+        budget = _budgets.get(run_id)
+        if budget is None:
+            budget = RunBudget(time_budget=time_budget, step_budget=step_budget)
+            _budgets.set(run_id, budget)
+        return budget
+
+
+def budget_context(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Run context line describing the budget left, or None without a budget."""
+    budget = get_budget(config)
+    if budget is None:
+        return None
+    parts = []
+    remaining_time = budget.remaining_time()
+    if remaining_time is not None:
+        parts.append(f"{remaining_time:.0f}s of {budget.time_budget:.0f}s")
+    remaining_steps = budget.remaining_steps()
+    if remaining_steps is not None:
+        parts.append(f"{remaining_steps} of {budget.step_budget} steps")
+    line = f"- Budget left: {', '.join(parts)}"
+    if budget.low:
+        line += ("\n- The budget is running out: skip optional steps (extra searches, pages or handoffs) "
+                 "and answer now with what you have")
+    return line
+
+
+def _text(message: BaseMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content.strip()
+    return " ".join(block.get("text", "") for block in content if isinstance(block, dict)).strip()
+
+
+def partial_answer(messages: Sequence[BaseMessage], budget: RunBudget) -> AIMessage:
+    """Best answer available from the messages so far, flagged as partial.
+
+    Uses the latest AI answer for the current request (e.g. a sub-agent's
+    result), else the latest tool output, else an apology.
+    """
+    from playground.utils.prompt import is_run_context
+
+    metadata = {"budget": budget.summary()}
+    body = "No results were gathered before the budget ran out."
+    for message in reversed(messages):
+        if is_run_context(message):
+            continue
+        if isinstance(message, HumanMessage):
+            # Only what was gathered for the current request counts
+            break
+        if any(message.response_metadata.get(key) for key in _HANDOFF_KEYS):
+            continue
+        if isinstance(message, AIMessage) and _text(message) and not message.tool_calls:
+            if message.response_metadata.get("budget", {}).get("partial"):
+                # Already a partial answer from a sub-agent: hand it on unchanged
+                return AIMessage(content=message.content, response_metadata=metadata)
+            body = _text(message)
+            break
+        if isinstance(message, ToolMessage) and _text(message):
+            body = _text(message)[:PARTIAL_TOOL_CHARS]
+            break
+    limit = "time" if budget.exhausted == "time" else "step"
+    return AIMessage(
+        content=f"{body}\n\n_(Partial answer: this run used up its {limit} budget before finishing.)_",
+        response_metadata=metadata,
+    )
+
+
+class BudgetedChatModel(DelegatingChatModel):
+    """Chat model that enforces the run budget around a wrapped model.
+
+    Each call counts as one step. When the budget is spent the provider is not
+    called and a flagged partial answer is returned instead; async calls are
+    also cut off at the deadline.
+    """
+
+    model: Any
+    node: str = "default"
+
+    @property
+    def _llm_type(self) -> str:
+        return "budgeted"
+
+    def bind_tools(self, tools: Sequence[Any], *, parallel_tool_calls: Optional[bool] = None, **kwargs: Any) -> "BudgetedChatModel":
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.model_copy(update={"model": self.model.bind_tools(tools, **kwargs)})
+
+    def _spent(self, input: Any, config: Optional[RunnableConfig]) -> tuple[Optional[RunBudget], Optional[AIMessage]]:
+        budget = get_budget(config)
+        if budget is None or budget.take_step() is None:
+            return budget, None
+        trace("budget_exhausted", config, node=self.node, **budget.summary())
+        messages = input if isinstance(input, list) else getattr(input, "messages", [])
+        return budget, partial_answer([m for m in messages if isinstance(m, BaseMessage)], budget)
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        _, partial = self._spent(input, config)
+        return partial or self.model.invoke(input, config, **kwargs)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        budget, partial = self._spent(input, config)
+        if partial is not None:
+            return partial
+        remaining = budget.remaining_time() if budget else None
+        try:
+            return await asyncio.wait_for(self.model.ainvoke(input, config, **kwargs), remaining)
+        except asyncio.TimeoutError:
+            budget.expire("time")
+            _, partial = self._spent(input, config)
+            return partial
@@ -0,0 +1,85 @@
+"""
+Small in-process caches shared by the tools and agents.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Generic, Hashable, Optional, TypeVar
+
+K = TypeVar("K", bound=Hashable)
+V = TypeVar("V")
+
+
+class TTLCache(Generic[K, V]):
+    """Thread-safe LRU cache whose entries expire after a time-to-live.
+
+    Args:
+        maxsize: Maximum number of entries; the least recently used entry is evicted first
+        ttl: Seconds an entry stays valid after it was set (None keeps entries until evicted)
+    """
+
+    def __init__(self, maxsize: int = 128, ttl: Optional[float] = 3600.0) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._lock = threading.RLock()
+        self._data: OrderedDict[K, tuple[float, V]] = OrderedDict()
+
+    def _expired(self, stored_at: float, ttl: Optional[float]) -> bool:
+        return ttl is not None and time.monotonic() - stored_at > ttl
+
+    def get(self, key: K, default: Optional[V] = None, ttl: Optional[float] = None) -> Optional[V]:
+        """Return a live entry, or default if it is missing or expired.
+
+        Args:
+            key: Cache key
+            default: Value returned on a miss
+            ttl: Override of the cache-wide time-to-live for this lookup
+        """
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            if self._expired(entry[0], self.ttl if ttl is None else ttl):
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return entry[1]
+
+    def age(self, key: K) -> Optional[float]:
+        """Seconds since the entry was set, or None if it is missing."""
+        with self._lock:
+            entry = self._data.get(key)
+            return None if entry is None else time.monotonic() - entry[0]
+
+    def set(self, key: K, value: V) -> None:
+        with self._lock:
+            self._data[key] = (time.monotonic(), value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_create(self, key: K, factory: Callable[[], V]) -> V:
+        """Return the live entry for key, creating and storing it with factory on a miss."""
+        with self._lock:
+            value = self.get(key)
+            if value is None:
+                value = factory()
+                self.set(key, value)
+            return value
+
+    def pop(self, key: K, default: Optional[V] = None) -> Optional[V]:
+        with self._lock:
+            entry = self._data.pop(key, None)
+            return default if entry is None else entry[1]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: K) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._data)
@@ -0,0 +1,296 @@
+"""
+Cancellation of in-flight runs.
+
+Entry points (the Streamlit app, the LangGraph server wrapper) register each
+run with the process-wide CancellationRegistry while it executes. Cancelling a
+run, explicitly with cancel() or because its caller went away (the asyncio task
+was cancelled, or Streamlit interrupted the script for a Stop click or a rerun):
+
+- cancels the run's task, which aborts in-flight async HTTP requests to the
+  model providers and Tavily;
+- runs the cleanup callbacks tools registered with on_cancel, e.g. cancelling
+  a Firecrawl crawl job on Firecrawl's side;
+- makes is_cancelled() true for the run, so sync tools polling in worker threads
+  stop and tool calls that have not started yet are skipped.
+
+The run's task usually unwinds before its worker threads notice, so cancelled
+run ids are remembered for CANCELLED_TTL seconds after the run is unregistered;
+until then is_cancelled() and raise_if_cancelled() still report the
+cancellation to work left behind in threads.
+
+The registry counts cancellations and estimates the run time they saved from
+the median duration of runs that completed.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from collections import Counter, OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import AsyncIterator, Callable, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+from playground.utils.runs import DEFAULT_RUN_ID, get_run_id
+from playground.utils.stats import latency_summary, percentile
+from playground.utils.tracing import trace
+
+# Run durations kept for the saved-time estimate
+HISTORY_SIZE = 256
+# Seconds a cancelled run id is remembered after the run is unregistered
+CANCELLED_TTL = 300.0
+
+# Reasons a run was cancelled
+USER = "user"
+INTERRUPTED = "interrupted"
+
+
+class RunCancelled(Exception):
+    """Raised by raise_if_cancelled inside work belonging to a cancelled run."""
+
+    def __init__(self, run_id: str, reason: str) -> None:
+        super().__init__(f"Run {run_id} was cancelled ({reason})")
+        self.run_id = run_id
+        self.reason = reason
+
+
+@dataclass
+class RunScope:
+    """A registered run: its task, owner and cleanup callbacks."""
+
+    run_id: str
+    owner: Optional[str]
+    task: Optional[asyncio.Task]
+    loop: Optional[asyncio.AbstractEventLoop]
+    started: float = field(default_factory=time.monotonic)
+    reason: Optional[str] = None
+    callbacks: list[Callable[[], None]] = field(default_factory=list)
+
+    @property
+    def cancelled(self) -> bool:
+        return self.reason is not None
+
+
+class CancellationRegistry:
+    """Process-wide registry of cancellable runs."""
+
+    def __init__(self, history_size: int = HISTORY_SIZE, cancelled_ttl: float = CANCELLED_TTL) -> None:
+        self._lock = threading.Lock()
+        self._runs: dict[str, RunScope] = {}
+        self._cancelled_ttl = cancelled_ttl
+        self._history_size = history_size
+        # run_id -> (reason, time.monotonic() it expires) for cancelled runs that have been unregistered
+        self._recently_cancelled: OrderedDict[str, tuple[str, float]] = OrderedDict()
+        self._durations: deque[float] = deque(maxlen=history_size)
+        self._cancelled_after: deque[float] = deque(maxlen=history_size)
+        self._reasons: Counter[str] = Counter()
+        self._completed = 0
+        self._saved_seconds = 0.0
+        # Cleanup callbacks make blocking API calls; keep them off the caller's event loop
+        self._cleanup = ThreadPoolExecutor(max_workers=2, thread_name_prefix="run-cancel")
+
+    @contextlib.asynccontextmanager
+    async def track(self, config: Optional[RunnableConfig], owner: Optional[str] = None) -> AsyncIterator[RunScope]:
+        """Register the current task as the run a config belongs to while the block executes.
+
+        Leaving the block through a task cancellation or a control-flow exception
+        (anything but a regular error) cancels the run, so work it started in
+        worker threads and remote jobs stops too.
+
+        Args:
+            config: Config of the run
+            owner: User or session the run belongs to
+
+        Yields:
+            The run's scope
+        """
+        try:
+            task, loop = asyncio.current_task(), asyncio.get_running_loop()
+        except RuntimeError:
+            task, loop = None, None
+        scope = RunScope(run_id=get_run_id(config), owner=owner, task=task, loop=loop)
+        with self._lock:
+            self._runs[scope.run_id] = scope
+            self._recently_cancelled.pop(scope.run_id, None)
+        try:
+            yield scope
+        except Exception:
+            raise
+        except BaseException:
+            # Task cancelled or script interrupted: the caller is gone, stop the work
+            self._cancel(scope, INTERRUPTED, config)
+            raise
+        finally:
+            with self._lock:
+                if self._runs.get(scope.run_id) is scope:
+                    del self._runs[scope.run_id]
+                    # The shared default id is used by untracked work too; never leave it cancelled
+                    if scope.cancelled and scope.run_id != DEFAULT_RUN_ID:
+                        self._remember_cancelled_locked(scope)
+                if not scope.cancelled:
+                    self._completed += 1
+                    self._durations.append(time.monotonic() - scope.started)
+
+    def cancel(self, run_id: str, reason: str = USER) -> bool:
+        """Cancel a running run.
+
+        Args:
+            run_id: Run to cancel
+            reason: Why, for metrics and traces
+
+        Returns:
+            Whether a running, not yet cancelled run was found
+        """
+        with self._lock:
+            scope = self._runs.get(run_id)
+        if scope is None or not self._cancel(scope, reason):
+            return False
+        task = scope.task
+        if task is not None and not task.done():
+            try:
+                current = asyncio.current_task()
+            except RuntimeError:
+                current = None
+            if task is not current:
+                scope.loop.call_soon_threadsafe(task.cancel)
+        return True
+
+    def cancel_owner(self, owner: str, reason: str = USER) -> int:
+        """Cancel every run of a user or session; returns how many were cancelled."""
+        with self._lock:
+            run_ids = [scope.run_id for scope in self._runs.values() if scope.owner == owner]
+        return sum(self.cancel(run_id, reason) for run_id in run_ids)
+
+    def _cancel(self, scope: RunScope, reason: str, config: Optional[RunnableConfig] = None) -> bool:
+        with self._lock:
+            if scope.cancelled:
+                return False
+            scope.reason = reason
+            elapsed = time.monotonic() - scope.started
+            expected = percentile(list(self._durations), 50)
+            saved = max(0.0, expected - elapsed) if expected is not None else 0.0
+            self._reasons[reason] += 1
+            self._saved_seconds += saved
+            self._cancelled_after.append(elapsed)
+            callbacks, scope.callbacks = scope.callbacks, []
+        for callback in callbacks:
+            self._cleanup.submit(_run_callback, callback)
+        trace("run_cancelled", config or {"configurable": {"run_id": scope.run_id}}, reason=reason,
+              elapsed=round(elapsed, 3), saved_seconds=round(saved, 3), cleanups=len(callbacks))
+        return True
+
+    def _remember_cancelled_locked(self, scope: RunScope) -> None:
+        self._recently_cancelled[scope.run_id] = (scope.reason, time.monotonic() + self._cancelled_ttl)
+        self._recently_cancelled.move_to_end(scope.run_id)
+        while len(self._recently_cancelled) > self._history_size:
+            self._recently_cancelled.popitem(last=False)
+
+    def _cancel_reason(self, run_id: str) -> Optional[str]:
+        """Why a registered or recently unregistered run was cancelled, or None if it was not."""
+        with self._lock:
+            scope = self._runs.get(run_id)
+            if scope is not None:
+                return scope.reason
+            now = time.monotonic()
+            while self._recently_cancelled:
+                oldest, (_, expires) = next(iter(self._recently_cancelled.items()))
+                if expires > now:
+                    break
+                del self._recently_cancelled[oldest]
+            entry = self._recently_cancelled.get(run_id)
+            return entry[0] if entry is not None else None
+
+    def is_cancelled(self, config: Optional[RunnableConfig]) -> bool:
+        """Whether the run a config belongs to has been cancelled."""
+        return self._cancel_reason(get_run_id(config)) is not None
+
+    def raise_if_cancelled(self, config: Optional[RunnableConfig]) -> None:
+        """Raise RunCancelled if the run a config belongs to has been cancelled."""
+        run_id = get_run_id(config)
+        reason = self._cancel_reason(run_id)
+        if reason is not None:
+            raise RunCancelled(run_id, reason)
+
+    def on_cancel(self, config: Optional[RunnableConfig], callback: Callable[[], None]) -> Callable[[], None]:
+        """Register cleanup to run if the run a config belongs to is cancelled.
+
+        The callback runs on a background thread; if the run is already
+        cancelled, or was cancelled and has since been unregistered, it is
+        scheduled right away. Runs that are not tracked never call it.
+
+        Args:
+            config: Config of the run
+            callback: Cleanup, e.g. cancelling a remote job
+
+        Returns:
+            Function that unregisters the callback once the work is done
+        """
+        with self._lock:
+            scope = self._runs.get(get_run_id(config))
+            if scope is not None and not scope.cancelled:
+                scope.callbacks.append(callback)
+        if (scope is not None and scope.cancelled) or (scope is None and self.is_cancelled(config)):
+            self._cleanup.submit(_run_callback, callback)
+
+        def remove() -> None:
+            with self._lock:
+                if scope is not None and callback in scope.callbacks:
+                    scope.callbacks.remove(callback)
+
+        return remove
+
+    def metrics(self) -> dict:
+        """Snapshot of cancellation counters.
+
+        Returns:
+            dict: active, completed and cancelled runs, cancellations by reason,
+            estimated seconds of run time saved, and a summary of how long
+            cancelled runs had been running
+        """
+        with self._lock:
+            return {
+                "active": len(self._runs),
+                "completed": self._completed,
+                "cancelled": sum(self._reasons.values()),
+                "cancelled_by_reason": dict(self._reasons),
+                "saved_seconds": round(self._saved_seconds, 3),
+                "cancelled_after_seconds": latency_summary(list(self._cancelled_after)),
+            }
+
+    def render_metrics(self) -> str:
+        """Metrics in the Prometheus text exposition format."""
+        stats = self.metrics()
+        lines = [
+            "# TYPE playground_runs_active gauge",
+            f"playground_runs_active {stats['active']}",
+            "# TYPE playground_runs_cancelled_total counter",
+        ]
+        lines += [f'playground_runs_cancelled_total{{reason="{reason}"}} {count}'
+                  for reason, count in sorted(stats["cancelled_by_reason"].items())]
+        lines += [
+            "# TYPE playground_runs_cancel_saved_seconds_total counter",
+            f"playground_runs_cancel_saved_seconds_total {stats['saved_seconds']:.6f}",
+        ]
+        return "\n".join(lines) + "\n"
+
+
+def _run_callback(callback: Callable[[], None]) -> None:
+    try:
+        callback()
+    except Exception as e:
+        trace("cancel_cleanup_failed", level="error", error=str(e))
+
+
+_registry: Optional[CancellationRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_cancellation_registry() -> CancellationRegistry:
+    """Return the process-wide registry."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = CancellationRegistry()
+        return _registry
@@ -0,0 +1,16 @@
+"""
+Lazy loading of the .env file.
+
+Importing playground modules does not read .env; the first code path that
+needs an API key calls load_env, and later calls are free.
+"""
+
+from functools import lru_cache
+
+
+@lru_cache(maxsize=1)
+def load_env() -> None:
+    """Load variables from .env into the environment once (existing variables win)."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
@@ -1,25 +1,49 @@
 import os
-from typing import Optional
+from typing import TYPE_CHECKING, Optional
 from functools import lru_cache
-from langsmith import Client
-from datetime import datetime
 
-langsmith_client = Client(api_key=os.getenv("LANGSMITH_API_KEY"))
+from playground.utils.cache import TTLCache
+from playground.utils.env import load_env
+from playground.utils.tracing import trace
+
+if TYPE_CHECKING:
+    from langsmith import Client
+
+# Pulled prompts are reused for a few minutes instead of hitting the Hub per config
+_prompts: TTLCache[str, str] = TTLCache(maxsize=64, ttl=300)
+
+
+@lru_cache(maxsize=1)
+def get_langsmith_client() -> "Client":
+    """Create the LangSmith client on first use, so importing this module touches no network."""
+    from langsmith import Client
+
+    return Client(api_key=os.getenv("LANGSMITH_API_KEY"))
 
 
 def pull_prompt(prompt_name: str, version: Optional[str] = None) -> str:
     """Pull prompt from LangSmith Hub"""
+    load_env()
+    if not os.getenv("LANGSMITH_API_KEY"):
+        # No credentials: skip the network round trip and use the fallback
+        return None
+
+    # 버전 지정 시 포함
+    full_name = f"{prompt_name}:{version}" if version else prompt_name
+    cached = _prompts.get(full_name)
+    if cached is not None:
+        return cached
     try:
-        # 버전 지정 시 포함
-        full_name = f"{prompt_name}:{version}" if version else prompt_name
-        prompt = langsmith_client.pull_prompt(full_name)
-        return prompt.format_messages()[0].content
+        prompt = get_langsmith_client().pull_prompt(full_name)
+        content = prompt.format_messages()[0].content
+        _prompts.set(full_name, content)
+        return content
 
     except Exception as e:
-        print(f"Failed to pull prompt {prompt_name}: {e}")
+        trace("pull_prompt", level="error", prompt=prompt_name, error=repr(e))
         return None
 
 def get_prompt_with_fallback(prompt_name: str, fallback_prompt: str, version: Optional[str] = None) -> str:
     """Pull prompt with fallback to default if failed"""
     langsmith_prompt = pull_prompt(prompt_name, version)
-    return langsmith_prompt if langsmith_prompt else fallback_prompt
\ No newline at end of file
+    return langsmith_prompt if langsmith_prompt else fallback_prompt
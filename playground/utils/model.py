@@ -1,38 +1,509 @@
 import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict, deque
+from typing import Any, Mapping, Optional, Sequence, Union
+
 from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import BaseTool
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langchain.chat_models import init_chat_model
+from pydantic import Field
+
+from playground.utils.env import load_env
+from playground.utils.stats import percentile
+from playground.utils.tracing import trace
+from playground.utils.usage import UsageCallbackHandler
+
+OPENROUTER_BASE_URL = "https://openrouter.ai/api/v1"
+
+# A fully specified model name, or an ordered list of them (cheapest tier first)
+ModelSpec = Union[str, Sequence[str]]
 
-def load_chat_model(fully_specified_name: str) -> BaseChatModel:
+
+def load_chat_model(fully_specified_name: ModelSpec, node: Optional[str] = None,
+                    equivalents: Optional[Mapping[str, Sequence[str]]] = None) -> BaseChatModel:
     """Load a chat model from a fully specified name.
-    
+
     Supports both OpenAI and OpenRouter models with automatic API key handling.
-    
+    OPENAI_BASE_URL and OPENROUTER_BASE_URL point a provider at another
+    OpenAI-compatible endpoint, e.g. a proxy or the local benchmark stub.
+    When an ordered list of names is given, a TieredChatModel is returned that
+    starts on the first (cheapest) tier and escalates on failed validation.
+    When equivalents lists interchangeable models for a name, an
+    AdaptiveChatModel routes each call to the fastest healthy one of them.
+
     Args:
-        fully_specified_name (str): String in the format 'provider/model'.
-        
+        fully_specified_name (str | list[str]): String in the format 'provider/model',
+            or an ordered tier list of such strings.
+        node (str, optional): Graph node the model serves, used for per-node statistics.
+        equivalents (dict, optional): Model name -> equivalent model names, e.g.
+            {"openai/gpt-4.1-mini": ["openrouter/openai/gpt-4o-mini"]}. Candidates
+            whose API key is missing are left out.
+
     Examples:
         - "openai/gpt-4.1-mini"
         - "openrouter/anthropic/claude-3.5-sonnet"
-        
+        - ["openai/gpt-4.1-nano", "openai/gpt-4.1-mini"]
+
     Raises:
         ValueError: If required API key is not found in environment variables.
     """
+    if not isinstance(fully_specified_name, str):
+        tiers = list(fully_specified_name)
+        if not tiers:
+            raise ValueError("Model tier list must contain at least one model")
+        if len(tiers) == 1:
+            return load_chat_model(tiers[0], node, equivalents)
+        return TieredChatModel(
+            tiers=[load_chat_model(tier, node, equivalents) for tier in tiers],
+            tier_names=tiers,
+            node=node or "default",
+        )
+
+    alternatives = [name for name in (equivalents or {}).get(fully_specified_name, ())
+                    if name != fully_specified_name]
+    if alternatives:
+        return _load_adaptive([fully_specified_name, *alternatives], node)
+
     provider, model = fully_specified_name.split("/", maxsplit=1)
-    
-    kwargs = {}
+    load_env()
+
+    # Usage (incl. cached prompt tokens) is recorded per node, also when streaming
+    kwargs = {
+        "callbacks": [UsageCallbackHandler(node or "default")],
+        "stream_usage": True,
+    }
 
     # Check for required API keys
     if provider == "openrouter":
         if not os.getenv("OPENROUTER_API_KEY"):
             raise ValueError("OPENROUTER_API_KEY not found in environment variables")
-        print(f"Loading OpenRouter model: {model}")
+        trace("load_chat_model", provider="openrouter", model=model, node=node)
         provider = "openai"
-        kwargs["base_url"] = "https://openrouter.ai/api/v1"
+        kwargs["base_url"] = os.getenv("OPENROUTER_BASE_URL", OPENROUTER_BASE_URL)
         kwargs["openai_api_key"] = os.getenv("OPENROUTER_API_KEY")
 
     elif provider == "openai":
         if not os.getenv("OPENAI_API_KEY"):
             raise ValueError("OPENAI_API_KEY not found in environment variables")
-        print(f"Loading OpenAI model: {model}")
-    
-    return init_chat_model(model, model_provider=provider, **kwargs)
\ No newline at end of file
+        trace("load_chat_model", provider="openai", model=model, node=node)
+        if os.getenv("OPENAI_BASE_URL"):
+            kwargs["base_url"] = os.getenv("OPENAI_BASE_URL")
+
+    return init_chat_model(model, model_provider=provider, **kwargs)
+
+
+class DelegatingChatModel(BaseChatModel):
+    """Base for chat models that route each call to wrapped models.
+
+    Subclasses implement invoke/ainvoke (and bind_tools); the generate paths
+    used by batch() and generate() go through them too.
+    """
+
+    def _generate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=self.invoke(messages, stop=stop, **kwargs))])
+
+    async def _agenerate(self, messages: list[BaseMessage], stop: Optional[list[str]] = None, run_manager: Any = None, **kwargs: Any) -> ChatResult:
+        return ChatResult(generations=[ChatGeneration(message=await self.ainvoke(messages, stop=stop, **kwargs))])
+
+
+# === MODEL TIER ESCALATION ===
+
+class _TierStats:
+    """Thread-safe per-node counters of which tier served each call and why tiers escalated."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._calls: Counter = Counter()
+        self._served: dict[str, Counter] = defaultdict(Counter)
+        self._reasons: dict[str, Counter] = defaultdict(Counter)
+        self._transitions: dict[str, Counter] = defaultdict(Counter)
+
+    def record_call(self, node: str, served_by: str) -> None:
+        with self._lock:
+            self._calls[node] += 1
+            self._served[node][served_by] += 1
+
+    def record_escalation(self, node: str, source: str, target: str, reason: str) -> None:
+        with self._lock:
+            self._reasons[node][reason] += 1
+            self._transitions[node][f"{source} -> {target}"] += 1
+
+    def snapshot(self) -> dict[str, dict[str, Any]]:
+        with self._lock:
+            return {
+                node: {
+                    "calls": calls,
+                    "served_by": dict(self._served[node]),
+                    "escalations": sum(self._reasons[node].values()),
+                    "reasons": dict(self._reasons[node]),
+                    "transitions": dict(self._transitions[node]),
+                }
+                for node, calls in self._calls.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._calls.clear()
+            self._served.clear()
+            self._reasons.clear()
+            self._transitions.clear()
+
+
+_tier_stats = _TierStats()
+
+
+def get_escalation_stats() -> dict[str, dict[str, Any]]:
+    """Return per-node tier usage and escalation counts recorded so far.
+
+    Returns:
+        dict: {node: {"calls", "served_by", "escalations", "reasons", "transitions"}}
+    """
+    return _tier_stats.snapshot()
+
+
+def reset_escalation_stats() -> None:
+    """Clear all recorded tier statistics."""
+    _tier_stats.reset()
+
+
+def _tool_name(tool: Any) -> Optional[str]:
+    """Best-effort name of a tool passed to bind_tools."""
+    if isinstance(tool, BaseTool):
+        return tool.name
+    try:
+        return convert_to_openai_tool(tool)["function"]["name"]
+    except Exception:
+        return None
+
+
+def _has_text(message: AIMessage) -> bool:
+    """Whether a message carries any non-whitespace text content."""
+    if isinstance(message.content, str):
+        return bool(message.content.strip())
+    return any(
+        (part if isinstance(part, str) else str(part.get("text", ""))).strip()
+        for part in message.content
+    )
+
+
+def _remaining_steps(config: Optional[RunnableConfig]) -> Optional[int]:
+    """Approximate the steps left before the graph hits its recursion limit."""
+    if not config:
+        return None
+    limit = config.get("recursion_limit")
+    step = (config.get("metadata") or {}).get("langgraph_step")
+    if limit is None or step is None:
+        return None
+    return limit - step
+
+
+class TieredChatModel(DelegatingChatModel):
+    """Chat model that escalates through an ordered list of model tiers.
+
+    Every call starts on the first (cheapest, fastest) tier. The response is
+    validated and the call is retried on the next tier only when the step fails:
+
+    - malformed_tool_call: unparsable tool arguments or an unknown tool name
+    - empty_answer: neither text content nor tool calls
+    - recursion_exhausted: the model still wants tools with no steps left
+
+    The last tier's response is always returned. Escalations are recorded per
+    node (see get_escalation_stats) and on the response's metadata.
+    """
+
+    tiers: list[Any]
+    tier_names: list[str]
+    node: str = "default"
+    tool_names: list[str] = Field(default_factory=list)
+
+    @property
+    def _llm_type(self) -> str:
+        return "tiered"
+
+    def bind_tools(self, tools: Sequence[Any], *, parallel_tool_calls: Optional[bool] = None, **kwargs: Any) -> "TieredChatModel":
+        """Bind the same tools to every tier."""
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.model_copy(update={
+            "tiers": [tier.bind_tools(tools, **kwargs) for tier in self.tiers],
+            "tool_names": [name for name in map(_tool_name, tools) if name],
+        })
+
+    def _failure_reason(self, response: BaseMessage, config: Optional[RunnableConfig]) -> Optional[str]:
+        """Return why a tier's response fails validation, or None if it is acceptable."""
+        if not isinstance(response, AIMessage):
+            return None
+        if response.invalid_tool_calls:
+            return "malformed_tool_call"
+        if self.tool_names and any(call["name"] not in self.tool_names for call in response.tool_calls):
+            return "malformed_tool_call"
+        if not response.tool_calls:
+            return None if _has_text(response) else "empty_answer"
+        remaining = _remaining_steps(config)
+        if remaining is not None and remaining < 2:
+            return "recursion_exhausted"
+        return None
+
+    def _accept(self, response: BaseMessage, config: Optional[RunnableConfig], index: int, reasons: list[str]) -> bool:
+        """Validate a tier's response, recording the outcome. Returns True to stop escalating."""
+        reason = self._failure_reason(response, config)
+        if reason is not None and index < len(self.tiers) - 1:
+            _tier_stats.record_escalation(self.node, self.tier_names[index], self.tier_names[index + 1], reason)
+            reasons.append(reason)
+            return False
+
+        _tier_stats.record_call(self.node, self.tier_names[index])
+        if isinstance(response, AIMessage):
+            response.response_metadata["model_tier"] = {
+                "model": self.tier_names[index],
+                "tier": index,
+                "escalations": reasons,
+            }
+        return True
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, *, stop: Optional[list[str]] = None, **kwargs: Any) -> BaseMessage:
+        if stop is not None:
+            kwargs["stop"] = stop
+        reasons: list[str] = []
+        for index, tier in enumerate(self.tiers):
+            response = tier.invoke(input, config, **kwargs)
+            if self._accept(response, config, index, reasons):
+                return response
+        return response
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, *, stop: Optional[list[str]] = None, **kwargs: Any) -> BaseMessage:
+        if stop is not None:
+            kwargs["stop"] = stop
+        reasons: list[str] = []
+        for index, tier in enumerate(self.tiers):
+            response = await tier.ainvoke(input, config, **kwargs)
+            if self._accept(response, config, index, reasons):
+                return response
+        return response
+
+
+# === ADAPTIVE ROUTING ===
+
+# Calls per candidate kept for the rolling latency and error rate
+ROUTE_WINDOW = 50
+# Share of calls sent to a random healthy candidate other than the fastest
+DEFAULT_EXPLORE_RATE = 0.05
+# A candidate is unhealthy above this error rate over its window (with at least MIN_ERROR_SAMPLES calls) ...
+MAX_ERROR_RATE = 0.5
+MIN_ERROR_SAMPLES = 4
+# ... or for COOLDOWN seconds after this many consecutive errors
+MAX_CONSECUTIVE_ERRORS = 3
+COOLDOWN = 60.0
+
+
+class _CandidateStats:
+    """Rolling latency and outcomes of one candidate model on one node."""
+
+    def __init__(self) -> None:
+        self.latencies: deque[float] = deque(maxlen=ROUTE_WINDOW)
+        self.outcomes: deque[bool] = deque(maxlen=ROUTE_WINDOW)
+        self.calls = 0
+        self.errors = 0
+        self.consecutive_errors = 0
+        self.down_until = 0.0
+
+    def error_rate(self) -> float:
+        return self.outcomes.count(False) / len(self.outcomes) if self.outcomes else 0.0
+
+    def healthy(self, now: float) -> bool:
+        if now < self.down_until:
+            return False
+        return len(self.outcomes) < MIN_ERROR_SAMPLES or self.error_rate() <= MAX_ERROR_RATE
+
+    def latency(self) -> Optional[float]:
+        """Median latency over the window (None until the candidate has succeeded once)."""
+        return percentile(self.latencies, 50)
+
+
+class _RouteStats:
+    """Thread-safe per-node, per-candidate routing statistics."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._stats: dict[str, dict[str, _CandidateStats]] = defaultdict(lambda: defaultdict(_CandidateStats))
+
+    def ranked(self, node: str, names: Sequence[str]) -> list[str]:
+        """Candidates in routing order: healthy before unhealthy, untried first, then by median latency."""
+        now = time.monotonic()
+        with self._lock:
+            stats = self._stats[node]
+
+            def key(name: str) -> tuple[bool, float]:
+                latency = stats[name].latency()
+                if latency is None:
+                    # Never called: measure it first; only failures so far: after the rest
+                    latency = -1.0 if not stats[name].calls else float("inf")
+                return not stats[name].healthy(now), latency
+
+            return sorted(names, key=key)
+
+    def healthy(self, node: str, name: str) -> bool:
+        with self._lock:
+            return self._stats[node][name].healthy(time.monotonic())
+
+    def record(self, node: str, name: str, latency: float, ok: bool) -> None:
+        with self._lock:
+            stats = self._stats[node][name]
+            stats.calls += 1
+            stats.outcomes.append(ok)
+            if ok:
+                stats.latencies.append(latency)
+                stats.consecutive_errors = 0
+                return
+            stats.errors += 1
+            stats.consecutive_errors += 1
+            if stats.consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                stats.down_until = time.monotonic() + COOLDOWN
+
+    def snapshot(self) -> dict[str, dict[str, dict[str, Any]]]:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                node: {
+                    name: {
+                        "calls": stats.calls,
+                        "errors": stats.errors,
+                        "error_rate": round(stats.error_rate(), 3),
+                        "p50_s": stats.latency(),
+                        "p95_s": percentile(stats.latencies, 95),
+                        "healthy": stats.healthy(now),
+                        "cooldown_s": round(max(0.0, stats.down_until - now), 1),
+                    }
+                    for name, stats in candidates.items()
+                }
+                for node, candidates in self._stats.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._stats.clear()
+
+
+_route_stats = _RouteStats()
+
+
+def get_route_stats() -> dict[str, dict[str, dict[str, Any]]]:
+    """Return live per-node, per-candidate routing statistics.
+
+    Returns:
+        dict: {node: {candidate: {"calls", "errors", "error_rate", "p50_s", "p95_s", "healthy", "cooldown_s"}}}
+    """
+    return _route_stats.snapshot()
+
+
+def reset_route_stats() -> None:
+    """Clear all recorded routing statistics."""
+    _route_stats.reset()
+
+
+def _load_adaptive(names: list[str], node: Optional[str]) -> BaseChatModel:
+    """Load the candidates that have API keys; wrap them when more than one is usable."""
+    candidates, loaded, first_error = [], [], None
+    for name in names:
+        try:
+            candidates.append(load_chat_model(name, node))
+            loaded.append(name)
+        except ValueError as e:
+            first_error = first_error or e
+            trace("adaptive_candidate_skipped", model=name, node=node, reason=str(e))
+    if not candidates:
+        raise first_error
+    if len(candidates) == 1:
+        return candidates[0]
+    return AdaptiveChatModel(candidates=candidates, candidate_names=loaded, node=node or "default")
+
+
+class AdaptiveChatModel(DelegatingChatModel):
+    """Chat model that routes each call to the fastest healthy of equivalent models.
+
+    Candidates are ranked by median latency over their last ROUTE_WINDOW calls;
+    candidates without data are tried first, and explore_rate of the calls go to
+    a random other healthy candidate so recovering endpoints get measured again.
+    A candidate with a high error rate, or one that failed several times in a
+    row (for COOLDOWN seconds), is skipped while a healthy one is left. A failed
+    call falls over to the next candidate; the last error is raised when all fail.
+
+    The serving candidate is recorded on the response's metadata as
+    response_metadata["model_route"] and in get_route_stats().
+    """
+
+    candidates: list[Any]
+    candidate_names: list[str]
+    node: str = "default"
+    explore_rate: float = DEFAULT_EXPLORE_RATE
+
+    @property
+    def _llm_type(self) -> str:
+        return "adaptive"
+
+    def bind_tools(self, tools: Sequence[Any], *, parallel_tool_calls: Optional[bool] = None, **kwargs: Any) -> "AdaptiveChatModel":
+        """Bind the same tools to every candidate."""
+        if parallel_tool_calls is not None:
+            kwargs["parallel_tool_calls"] = parallel_tool_calls
+        return self.model_copy(update={"candidates": [c.bind_tools(tools, **kwargs) for c in self.candidates]})
+
+    def _route(self) -> tuple[list[int], bool]:
+        """Candidate indexes in the order to try them, and whether the first is an exploration pick."""
+        order = _route_stats.ranked(self.node, self.candidate_names)
+        others = [name for name in order[1:] if _route_stats.healthy(self.node, name)]
+        explored = bool(others) and random.random() < self.explore_rate
+        if explored:
+            pick = random.choice(others)
+            order = [pick] + [name for name in order if name != pick]
+        return [self.candidate_names.index(name) for name in order], explored
+
+    def _served(self, response: BaseMessage, index: int, explored: bool, failovers: list[str]) -> BaseMessage:
+        if isinstance(response, AIMessage):
+            response.response_metadata["model_route"] = {
+                "model": self.candidate_names[index],
+                "explored": explored,
+                "failovers": failovers,
+            }
+        return response
+
+    def _failed(self, index: int, started: float, error: Exception, failovers: list[str]) -> None:
+        name = self.candidate_names[index]
+        _route_stats.record(self.node, name, time.monotonic() - started, ok=False)
+        failovers.append(name)
+        trace("model_failover", level="error", node=self.node, model=name, error=repr(error))
+
+    def invoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        order, explored = self._route()
+        failovers: list[str] = []
+        for position, index in enumerate(order):
+            started = time.monotonic()
+            try:
+                response = self.candidates[index].invoke(input, config, **kwargs)
+            except Exception as e:
+                self._failed(index, started, e, failovers)
+                if position == len(order) - 1:
+                    raise
+                continue
+            _route_stats.record(self.node, self.candidate_names[index], time.monotonic() - started, ok=True)
+            return self._served(response, index, explored, failovers)
+
+    async def ainvoke(self, input: Any, config: Optional[RunnableConfig] = None, **kwargs: Any) -> BaseMessage:
+        order, explored = self._route()
+        failovers: list[str] = []
+        for position, index in enumerate(order):
+            started = time.monotonic()
+            try:
+                response = await self.candidates[index].ainvoke(input, config, **kwargs)
+            except Exception as e:
+                self._failed(index, started, e, failovers)
+                if position == len(order) - 1:
+                    raise
+                continue
+            _route_stats.record(self.node, self.candidate_names[index], time.monotonic() - started, ok=True)
+            return self._served(response, index, explored, failovers)
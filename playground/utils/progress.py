@@ -0,0 +1,151 @@
+"""
+Structured progress events for long-running tools.
+
+Tools report progress (pages fetched, bytes received, ETA) through a
+ProgressReporter. Every update is written to LangGraph's custom stream
+(stream_mode="custom") and dispatched as a "tool_progress" custom event, which
+astream_events surfaces as on_custom_event, so both LangGraph server clients
+and the Streamlit UI can render it while the tool is still running.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import Any, AsyncIterator, Optional
+
+from langchain_core.callbacks.manager import adispatch_custom_event, dispatch_custom_event
+from langchain_core.runnables import RunnableConfig
+from langgraph.config import get_stream_writer
+
+PROGRESS_EVENT = "tool_progress"
+
+# Updates closer together than this are dropped (the final update always goes out)
+MIN_INTERVAL = 0.25
+
+# Rolling average duration per tool, used for ETAs of calls without countable units
+_durations: dict[str, float] = {}
+_durations_lock = threading.Lock()
+
+
+def expected_duration(tool: str) -> Optional[float]:
+    """Average duration of recent calls of a tool, if any finished yet."""
+    with _durations_lock:
+        return _durations.get(tool)
+
+
+def _record_duration(tool: str, seconds: float) -> None:
+    with _durations_lock:
+        previous = _durations.get(tool)
+        _durations[tool] = seconds if previous is None else 0.7 * previous + 0.3 * seconds
+
+
+class ProgressReporter:
+    """Emit progress events for one tool call.
+
+    Args:
+        tool: Tool name shown in the UI
+        config: Config of the calling tool; needed to attach events to its run
+        total: Number of units expected, if known
+        unit: What is being counted (pages, results, ...)
+    """
+
+    def __init__(self, tool: str, config: Optional[RunnableConfig] = None,
+                 total: Optional[int] = None, unit: str = "pages") -> None:
+        self.tool = tool
+        self.config = config
+        self.total = total
+        self.unit = unit
+        self.done = 0
+        self.bytes = 0
+        self.started = time.monotonic()
+        self._last_sent = 0.0
+
+    def eta(self) -> Optional[float]:
+        """Seconds left, from the unit rate so far or the tool's usual duration."""
+        elapsed = time.monotonic() - self.started
+        if self.total and self.done:
+            return max(elapsed / self.done * (self.total - self.done), 0.0)
+        expected = expected_duration(self.tool)
+        return max(expected - elapsed, 0.0) if expected is not None else None
+
+    def payload(self, message: str = "", final: bool = False) -> dict[str, Any]:
+        return {
+            "tool": self.tool,
+            "done": self.done,
+            "total": self.total,
+            "unit": self.unit,
+            "bytes": self.bytes,
+            "elapsed": round(time.monotonic() - self.started, 2),
+            "eta": None if final else self.eta(),
+            "message": message,
+            "final": final,
+        }
+
+    def _advance(self, done: Optional[int], total: Optional[int], bytes_received: int, final: bool) -> bool:
+        if total is not None:
+            self.total = total
+        if done is not None:
+            self.done = done
+        self.bytes += bytes_received
+        if final:
+            _record_duration(self.tool, time.monotonic() - self.started)
+        now = time.monotonic()
+        if not final and now - self._last_sent < MIN_INTERVAL:
+            return False
+        self._last_sent = now
+        return True
+
+    def _write_stream(self, payload: dict[str, Any]) -> None:
+        try:
+            get_stream_writer()({PROGRESS_EVENT: payload})
+        except (RuntimeError, KeyError):
+            pass  # Not running inside a graph (e.g. tool invoked directly)
+
+    def update(self, done: Optional[int] = None, total: Optional[int] = None, bytes_received: int = 0,
+               message: str = "", final: bool = False) -> None:
+        """Record progress and emit an event (throttled to MIN_INTERVAL).
+
+        Args:
+            done: Units completed so far
+            total: Units expected, if it became known
+            bytes_received: Bytes received since the previous update
+            message: Short human-readable status
+            final: Whether the tool is finished
+        """
+        if not self._advance(done, total, bytes_received, final):
+            return
+        payload = self.payload(message, final)
+        self._write_stream(payload)
+        with contextlib.suppress(RuntimeError):
+            dispatch_custom_event(PROGRESS_EVENT, payload, config=self.config)
+
+    async def aupdate(self, done: Optional[int] = None, total: Optional[int] = None, bytes_received: int = 0,
+                      message: str = "", final: bool = False) -> None:
+        """Async variant of update, for tools running on the event loop."""
+        if not self._advance(done, total, bytes_received, final):
+            return
+        payload = self.payload(message, final)
+        self._write_stream(payload)
+        with contextlib.suppress(RuntimeError):
+            await adispatch_custom_event(PROGRESS_EVENT, payload, config=self.config)
+
+    @contextlib.asynccontextmanager
+    async def heartbeat(self, message: str, interval: float = 1.0) -> AsyncIterator["ProgressReporter"]:
+        """Emit elapsed/ETA updates every interval while a single awaited call runs.
+
+        For calls that have nothing countable (e.g. one search request); the
+        ETA comes from the tool's recent average duration.
+        """
+        async def beat() -> None:
+            while True:
+                await self.aupdate(message=message)
+                await asyncio.sleep(interval)
+
+        task = asyncio.create_task(beat())
+        try:
+            yield self
+        finally:
+            task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await task
@@ -0,0 +1,118 @@
+"""
+Prompt assembly for provider-side prefix caching.
+
+Providers cache the longest byte-identical prefix of a request (tool schemas,
+system prompt, earlier turns). Anything that changes between calls, such as the
+current date, therefore has to come after the stable parts. Prompts built here
+are laid out as:
+
+    [static system instructions] [conversation history] [volatile run context]
+
+so the instructions and the growing history stay cacheable across calls. The
+run context is a trailing user-role message wrapped in <run_context> tags,
+not a second system message: several providers reject or merge system
+messages that do not come first. It is named RUN_CONTEXT_NAME so code that
+reads model inputs (e.g. partial answers in playground.utils.budget) can tell
+it apart from what the user said.
+"""
+
+import os
+from datetime import datetime
+from typing import Any, Callable, Optional
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from langchain_core.messages import BaseMessage, HumanMessage, SystemMessage
+from langchain_core.runnables import RunnableConfig
+
+from playground.utils.budget import budget_context
+
+# Placeholders that older prompt templates format in place; they are replaced by a
+# stable pointer to the run context so the instructions never change byte-wise.
+VOLATILE_PLACEHOLDERS = {
+    "{today}": "the current date given in the run context",
+}
+
+# Name of the message carrying the run context
+RUN_CONTEXT_NAME = "run_context"
+
+# Defaults for the run context; override per run with configurable locale/timezone/currency
+DEFAULT_LOCALE = os.getenv("PLAYGROUND_LOCALE", "ko-KR")
+DEFAULT_TIMEZONE = os.getenv("PLAYGROUND_TIMEZONE", "Asia/Seoul")
+
+# Currency assumed for prices when the user names none, by locale region
+REGION_CURRENCIES = {"KR": "KRW", "US": "USD", "JP": "JPY", "GB": "GBP", "CN": "CNY", "DE": "EUR", "FR": "EUR"}
+
+
+def static_instructions(template: str) -> str:
+    """Strip volatile placeholders from a prompt template.
+
+    Args:
+        template: System prompt text, possibly containing placeholders like {today}
+
+    Returns:
+        Prompt text that is identical for every call
+    """
+    for placeholder, replacement in VOLATILE_PLACEHOLDERS.items():
+        template = template.replace(placeholder, replacement)
+    return template
+
+
+def _timezone(name: str) -> Optional[ZoneInfo]:
+    try:
+        return ZoneInfo(name)
+    except (ZoneInfoNotFoundError, ValueError):
+        return None
+
+
+def run_context(config: Optional[RunnableConfig] = None) -> str:
+    """Build the volatile context block appended after the conversation.
+
+    Gives agents the current date, time, locale and default currency up front,
+    so they never spend a model call plus a tool call asking for them, and the
+    run budget left when the run has one.
+
+    Args:
+        config: Config of the current run (configurable locale, timezone, currency)
+
+    Returns:
+        Context text computed at call time
+    """
+    configurable = (config or {}).get("configurable") or {}
+    locale = configurable.get("locale") or DEFAULT_LOCALE
+    zone = _timezone(configurable.get("timezone") or DEFAULT_TIMEZONE)
+    currency = configurable.get("currency") or REGION_CURRENCIES.get(locale.split("-")[-1].upper(), "USD")
+    now = datetime.now(zone) if zone else datetime.now().astimezone()
+    context = (
+        "Run context:\n"
+        f"- Current date: {now:%Y-%m-%d} ({now:%A})\n"
+        f"- Current time: {now:%H:%M} {now.tzname()}\n"
+        f"- User locale: {locale}\n"
+        f"- Default currency: {currency}"
+    )
+    budget = budget_context(config)
+    return f"{context}\n{budget}" if budget else context
+
+
+def is_run_context(message: BaseMessage) -> bool:
+    """Whether a model input message is the run context added by build_prompt."""
+    return isinstance(message, HumanMessage) and message.name == RUN_CONTEXT_NAME
+
+
+def build_prompt(instructions: str) -> Callable[..., list[BaseMessage]]:
+    """Create a prompt callable for create_react_agent / create_supervisor.
+
+    Args:
+        instructions: System prompt for the agent
+
+    Returns:
+        Callable mapping the agent state to the model input messages
+    """
+    system_message = SystemMessage(content=static_instructions(instructions))
+
+    def prompt(state: Any, config: RunnableConfig) -> list[BaseMessage]:
+        messages = state["messages"] if isinstance(state, dict) else state.messages
+        context = HumanMessage(content=f"<run_context>\n{run_context(config)}\n</run_context>",
+                               name=RUN_CONTEXT_NAME)
+        return [system_message, *messages, context]
+
+    return prompt
@@ -0,0 +1,52 @@
+"""
+Run identification helpers.
+
+Per-run state (scraped page indexes, dedup memory, traces) is keyed by the run
+identifier found in the RunnableConfig. The LangGraph server sets
+configurable.run_id for every run; the Streamlit app and other entry points set
+it with new_run_config.
+"""
+
+import uuid
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+
+DEFAULT_RUN_ID = "default"
+
+
+def get_run_id(config: Optional[RunnableConfig]) -> str:
+    """Return the identifier of the run a config belongs to.
+
+    Falls back to the thread id, then to a shared default scope.
+
+    Args:
+        config: Config passed to a node or tool
+
+    Returns:
+        Run identifier
+    """
+    configurable = (config or {}).get("configurable") or {}
+    return str(configurable.get("run_id") or configurable.get("thread_id") or DEFAULT_RUN_ID)
+
+
+def get_thread_id(config: Optional[RunnableConfig]) -> Optional[str]:
+    """Return the conversation thread id of a config, if any."""
+    thread_id = ((config or {}).get("configurable") or {}).get("thread_id")
+    return str(thread_id) if thread_id else None
+
+
+def new_run_config(thread_id: Optional[str] = None, **configurable: Any) -> RunnableConfig:
+    """Create a config for a new top-level run with a fresh run id.
+
+    Args:
+        thread_id: Conversation thread the run belongs to
+        configurable: Additional configurable values
+
+    Returns:
+        RunnableConfig with configurable.run_id (and thread_id) set
+    """
+    configurable["run_id"] = str(uuid.uuid4())
+    if thread_id:
+        configurable["thread_id"] = thread_id
+    return RunnableConfig(configurable=configurable)
@@ -0,0 +1,242 @@
+"""
+Bounded per-session storage for the chat UI's tool calls and results.
+
+Streamlit keeps session state in memory for as long as the server runs, so
+tool results held there (full Firecrawl scrapes, Tavily result lists) would
+make a long-lived session grow without bound. The chat UI keeps them in the
+process-wide SessionStore instead, keyed by the session's thread id:
+
+- a tool result larger than the spill threshold is written to disk right away
+  and replaced by a short preview; the full result is read back only when it
+  is asked for (load());
+- when a session's in-memory data exceeds its memory budget, its oldest tool
+  results are spilled as well, until the session fits again;
+- sessions not used for the idle time-to-live are evicted, in memory and on
+  disk, so abandoned browser tabs do not hold memory forever.
+
+Spilled results live under .playground/sessions and are removed when their
+session is cleared or evicted; sessions do not outlive the process, so the
+directory is emptied when the store is created.
+
+Settings come from the environment:
+    PLAYGROUND_SESSION_BUDGET_KB    In-memory tool data per session (default 2048)
+    PLAYGROUND_SESSION_SPILL_KB     Tool results larger than this go to disk (default 64)
+    PLAYGROUND_SESSION_IDLE_TTL     Seconds before an unused session is evicted (default 3600)
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import threading
+import time
+import uuid
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Optional
+
+from playground.utils.storage import data_path
+from playground.utils.tracing import trace
+
+DEFAULT_BUDGET_KB = 2048
+DEFAULT_SPILL_KB = 64
+DEFAULT_IDLE_TTL = 3600.0
+# Characters of a spilled result kept in memory as its preview
+PREVIEW_CHARS = 500
+
+
+def _jsonable(value: Any) -> Any:
+    """JSON fallback for tool outputs: pydantic models (Firecrawl documents) are dumped, the rest str()-ed."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump()
+    return str(value)
+
+
+def payload_size(value: Any) -> int:
+    """Approximate memory footprint of a value: the size of its UTF-8 JSON encoding."""
+    if isinstance(value, str):
+        return len(value.encode("utf-8"))
+    return len(json.dumps(value, default=_jsonable, ensure_ascii=False).encode("utf-8"))
+
+
+@dataclass
+class _Session:
+    last_used: float = field(default_factory=time.monotonic)
+    # message index -> {"tool_calls": [...], "tool_results": [...], ...}
+    entries: dict[int, dict[str, Any]] = field(default_factory=dict)
+    sizes: dict[int, int] = field(default_factory=dict)
+    spilled_bytes: int = 0
+
+    @property
+    def memory_bytes(self) -> int:
+        return sum(self.sizes.values())
+
+
+class SessionStore:
+    """Per-session tool calls and results with a memory budget, disk spill and idle eviction.
+
+    Args:
+        directory: Directory for spilled tool results (emptied on creation)
+        budget_bytes: In-memory tool data allowed per session
+        spill_threshold: Tool results larger than this many bytes are spilled immediately
+        idle_ttl: Seconds an unused session is kept
+    """
+
+    def __init__(self, directory: Path, budget_bytes: int = DEFAULT_BUDGET_KB * 1024,
+                 spill_threshold: int = DEFAULT_SPILL_KB * 1024, idle_ttl: float = DEFAULT_IDLE_TTL) -> None:
+        self.directory = Path(directory)
+        self.budget_bytes = budget_bytes
+        self.spill_threshold = spill_threshold
+        self.idle_ttl = idle_ttl
+        self._lock = threading.RLock()
+        self._sessions: dict[str, _Session] = {}
+        self.evicted = 0
+        shutil.rmtree(self.directory, ignore_errors=True)
+
+    def _session_dir(self, session_id: str) -> Path:
+        # Session ids come from the client; hash them into a safe directory name
+        return self.directory / hashlib.sha256(session_id.encode("utf-8")).hexdigest()[:32]
+
+    def _session(self, session_id: str) -> _Session:
+        session = self._sessions.get(session_id)
+        if session is None:
+            session = self._sessions[session_id] = _Session()
+        session.last_used = time.monotonic()
+        return session
+
+    def touch(self, session_id: str) -> None:
+        """Mark a session as in use and evict sessions that have been idle too long."""
+        with self._lock:
+            self._session(session_id)
+        self.evict_idle()
+
+    def _spill(self, session_id: str, session: _Session, result: dict[str, Any]) -> dict[str, Any]:
+        """Write a tool result's content to disk and return the result with a preview in its place."""
+        content = result.get("content")
+        encoded = json.dumps({"content": content}, default=_jsonable, ensure_ascii=False)
+        key = uuid.uuid4().hex
+        path = self._session_dir(session_id) / f"{key}.json"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(encoded, encoding="utf-8")
+        size = len(encoded.encode("utf-8"))
+        session.spilled_bytes += size
+        text = content if isinstance(content, str) else json.dumps(content, default=_jsonable, ensure_ascii=False)
+        preview = text[:PREVIEW_CHARS] + ("..." if len(text) > PREVIEW_CHARS else "")
+        return {**result, "content": preview, "spilled": {"key": key, "bytes": size}}
+
+    def put(self, session_id: str, index: int, entry: dict[str, Any]) -> None:
+        """Store the tool calls and results of one assistant message.
+
+        Large results are spilled to disk, then the session's oldest results
+        until it fits its memory budget.
+
+        Args:
+            session_id: Session (thread) id
+            index: Index of the assistant message in the chat history
+            entry: {"tool_calls": [...], "tool_results": [...]} plus any small extras
+        """
+        with self._lock:
+            session = self._session(session_id)
+            results = []
+            for result in entry.get("tool_results") or []:
+                if result and payload_size(result.get("content")) > self.spill_threshold:
+                    result = self._spill(session_id, session, result)
+                results.append(result)
+            entry = {**entry, "tool_results": results}
+            session.entries[index] = entry
+            session.sizes[index] = payload_size(entry)
+            self._fit_budget(session_id, session)
+        self.evict_idle()
+
+    def _fit_budget(self, session_id: str, session: _Session) -> None:
+        """Spill the oldest in-memory tool results until the session fits its budget."""
+        for index in sorted(session.entries):
+            if session.memory_bytes <= self.budget_bytes:
+                return
+            entry = session.entries[index]
+            results = [self._spill(session_id, session, result)
+                       if result and "spilled" not in result else result
+                       for result in entry.get("tool_results") or []]
+            session.entries[index] = {**entry, "tool_results": results}
+            session.sizes[index] = payload_size(session.entries[index])
+
+    def get(self, session_id: str, index: int) -> Optional[dict[str, Any]]:
+        """Tool calls and results stored for a message; spilled results carry only a preview."""
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            session.last_used = time.monotonic()
+            return session.entries.get(index)
+
+    def load(self, session_id: str, key: str) -> Any:
+        """Read a spilled tool result's full content back from disk.
+
+        Returns:
+            The content, or None if its session has been cleared or evicted
+        """
+        path = self._session_dir(session_id) / f"{key}.json"
+        try:
+            return json.loads(path.read_text(encoding="utf-8"))["content"]
+        except FileNotFoundError:
+            return None
+
+    def clear(self, session_id: str) -> None:
+        """Drop a session's tool data from memory and disk."""
+        with self._lock:
+            self._sessions.pop(session_id, None)
+        shutil.rmtree(self._session_dir(session_id), ignore_errors=True)
+
+    def evict_idle(self) -> list[str]:
+        """Evict sessions unused for longer than the idle time-to-live.
+
+        Returns:
+            Ids of the evicted sessions
+        """
+        now = time.monotonic()
+        with self._lock:
+            idle = [session_id for session_id, session in self._sessions.items()
+                    if now - session.last_used > self.idle_ttl]
+            for session_id in idle:
+                self.clear(session_id)
+            self.evicted += len(idle)
+        for session_id in idle:
+            trace("session_evicted", session=session_id)
+        return idle
+
+    def usage(self, session_id: str) -> dict[str, int]:
+        """Memory and disk use of one session.
+
+        Returns:
+            dict: memory_bytes, spilled_bytes, budget_bytes and messages (entries stored)
+        """
+        with self._lock:
+            session = self._sessions.get(session_id) or _Session()
+            return {"memory_bytes": session.memory_bytes, "spilled_bytes": session.spilled_bytes,
+                    "budget_bytes": self.budget_bytes, "messages": len(session.entries)}
+
+    def metrics(self) -> dict[str, int]:
+        """Process-wide totals: sessions, memory_bytes, spilled_bytes and evicted sessions."""
+        with self._lock:
+            return {"sessions": len(self._sessions),
+                    "memory_bytes": sum(s.memory_bytes for s in self._sessions.values()),
+                    "spilled_bytes": sum(s.spilled_bytes for s in self._sessions.values()),
+                    "evicted": self.evicted}
+
+
+_store: Optional[SessionStore] = None
+_store_lock = threading.Lock()
+
+
+def get_session_store() -> SessionStore:
+    """Return the process-wide session store, configured from the environment on first use."""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = SessionStore(
+                data_path("sessions"),
+                budget_bytes=int(os.getenv("PLAYGROUND_SESSION_BUDGET_KB", str(DEFAULT_BUDGET_KB))) * 1024,
+                spill_threshold=int(os.getenv("PLAYGROUND_SESSION_SPILL_KB", str(DEFAULT_SPILL_KB))) * 1024,
+                idle_ttl=float(os.getenv("PLAYGROUND_SESSION_IDLE_TTL", str(DEFAULT_IDLE_TTL))),
+            )
+        return _store
@@ -0,0 +1,46 @@
+"""
+Small statistics helpers for latency and throughput metrics.
+"""
+
+import math
+from typing import Iterable, Optional
+
+
+def percentile(values: Iterable[float], q: float) -> Optional[float]:
+    """Return the q-th percentile of values by linear interpolation.
+
+    Args:
+        values: Samples, in any order
+        q: Percentile between 0 and 100
+
+    Returns:
+        The percentile, or None when there are no samples
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return None
+    rank = (len(ordered) - 1) * min(max(q, 0.0), 100.0) / 100.0
+    lower, upper = math.floor(rank), math.ceil(rank)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+def latency_summary(values: Iterable[float]) -> dict[str, Optional[float]]:
+    """Summarize latency samples.
+
+    Args:
+        values: Durations in seconds
+
+    Returns:
+        {"count", "mean", "p50", "p95", "p99", "max"}; statistics are None without samples
+    """
+    samples = list(values)
+    if not samples:
+        return {"count": 0, "mean": None, "p50": None, "p95": None, "p99": None, "max": None}
+    return {
+        "count": len(samples),
+        "mean": sum(samples) / len(samples),
+        "p50": percentile(samples, 50),
+        "p95": percentile(samples, 95),
+        "p99": percentile(samples, 99),
+        "max": max(samples),
+    }
@@ -0,0 +1,22 @@
+"""
+Local storage locations for persistent playground data.
+"""
+
+import os
+from pathlib import Path
+
+
+def data_path(*parts: str) -> Path:
+    """Return a path inside the playground data directory, creating parent directories.
+
+    The directory defaults to ./.playground and can be moved with PLAYGROUND_DATA_DIR.
+
+    Args:
+        parts: Path components below the data directory
+
+    Returns:
+        Absolute path to the requested location
+    """
+    path = Path(os.getenv("PLAYGROUND_DATA_DIR", ".playground")).expanduser().resolve().joinpath(*parts)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path
@@ -0,0 +1,267 @@
+"""
+Sampled, size-capped structured tracing.
+
+Tools and graph builders record trace events instead of printing their payloads.
+Events are tagged with the run and thread of the config they belong to, sampled
+per run, have large payloads reduced to a preview plus a hash, and are written
+as JSON lines by a background thread, so recording never blocks on I/O.
+
+Settings come from the environment (or configure_tracing):
+    PLAYGROUND_TRACE_PATH        JSONL output file, "-" for stderr, "off" to disable
+                                 (default: traces.jsonl in the playground data directory)
+    PLAYGROUND_TRACE_SAMPLE      Fraction of runs traced, 0.0-1.0 (default 1.0);
+                                 errors are always recorded
+    PLAYGROUND_TRACE_MAX_CHARS   Longest string kept verbatim in a payload (default 500)
+"""
+
+import atexit
+import contextlib
+import hashlib
+import json
+import os
+import queue
+import sys
+import threading
+import time
+import uuid
+import zlib
+from typing import Any, Iterator, Optional, TextIO
+
+from langchain_core.runnables import RunnableConfig
+
+from playground.utils.runs import get_run_id, get_thread_id
+from playground.utils.storage import data_path
+
+DEFAULT_MAX_CHARS = 500
+QUEUE_SIZE = 10_000
+
+
+def summarize(value: Any, max_chars: int = DEFAULT_MAX_CHARS) -> Any:
+    """Reduce a payload to something cheap to log.
+
+    Strings longer than max_chars become {"chars", "sha256", "preview"}; lists and
+    dicts are summarized recursively (long lists keep only their first items).
+
+    Args:
+        value: Payload to summarize
+        max_chars: Longest string kept verbatim
+
+    Returns:
+        A JSON-serializable summary
+    """
+    if value is None or isinstance(value, (bool, int, float)):
+        return value
+    if isinstance(value, str):
+        if len(value) <= max_chars:
+            return value
+        return {
+            "chars": len(value),
+            "sha256": hashlib.sha256(value.encode("utf-8", "replace")).hexdigest()[:16],
+            "preview": value[:max_chars],
+        }
+    if isinstance(value, dict):
+        return {str(key): summarize(item, max_chars) for key, item in list(value.items())[:50]}
+    if isinstance(value, (list, tuple, set)):
+        items = list(value)
+        summary = [summarize(item, max_chars) for item in items[:5]]
+        return summary if len(items) <= 5 else {"items": len(items), "head": summary}
+    return summarize(str(value), max_chars)
+
+
+class TraceWriter:
+    """Background writer appending JSON lines from a bounded queue.
+
+    Events are dropped (and counted) rather than blocking when the queue is full.
+
+    Args:
+        stream: Open text stream to write to
+    """
+
+    def __init__(self, stream: TextIO) -> None:
+        self.stream = stream
+        self.dropped = 0
+        self._queue: queue.Queue[Optional[dict[str, Any]]] = queue.Queue(maxsize=QUEUE_SIZE)
+        self._thread = threading.Thread(target=self._run, name="playground-trace-writer", daemon=True)
+        self._thread.start()
+
+    def put(self, event: dict[str, Any]) -> None:
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            # Drain whatever else is queued so bursts become a single write
+            batch = [self._queue.get()]
+            while len(batch) < 512:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            events = [event for event in batch if event is not None]
+            if events:
+                self._write(events)
+            for _ in batch:
+                self._queue.task_done()
+            if len(events) < len(batch):
+                return
+
+    def _write(self, events: list[dict[str, Any]]) -> None:
+        try:
+            self.stream.write("".join(json.dumps(event, ensure_ascii=False, default=str) + "\n" for event in events))
+            self.stream.flush()
+        except (OSError, ValueError):
+            self.dropped += len(events)
+
+    def flush(self) -> None:
+        """Block until every queued event has been written."""
+        self._queue.join()
+
+    def close(self) -> None:
+        self._queue.put(None)
+        self._thread.join(timeout=5)
+        if self.stream not in (sys.stdout, sys.stderr):
+            self.stream.close()
+
+
+class Tracer:
+    """Records sampled trace events for runs.
+
+    Args:
+        path: JSONL output file, "-" for stderr, or None to disable tracing
+        sample_rate: Fraction of runs traced (errors are always recorded)
+        max_chars: Longest string kept verbatim in payloads
+    """
+
+    def __init__(self, path: Optional[str], sample_rate: float = 1.0, max_chars: int = DEFAULT_MAX_CHARS) -> None:
+        self.path = path
+        self.sample_rate = sample_rate
+        self.max_chars = max_chars
+        self._writer: Optional[TraceWriter] = None
+        self._lock = threading.Lock()
+
+    @property
+    def writer(self) -> Optional[TraceWriter]:
+        """The writer, started on the first recorded event."""
+        if self.path is None:
+            return None
+        with self._lock:
+            if self._writer is None:
+                stream = sys.stderr if self.path == "-" else open(self.path, "a", encoding="utf-8")
+                self._writer = TraceWriter(stream)
+            return self._writer
+
+    def sampled(self, run_id: str) -> bool:
+        """Whether a run is traced; decided by its id, so a run is traced whole or not at all."""
+        if self.sample_rate >= 1.0:
+            return True
+        return zlib.crc32(run_id.encode()) / 0xFFFFFFFF < self.sample_rate
+
+    def record(self, name: str, config: Optional[RunnableConfig] = None, level: str = "info",
+               span_id: Optional[str] = None, **fields: Any) -> None:
+        """Record one event (dropped if the run is not sampled, unless level is error)."""
+        if self.path is None:
+            return
+        run_id = get_run_id(config)
+        if level != "error" and not self.sampled(run_id):
+            return
+        event = {
+            "ts": round(time.time(), 3),
+            "name": name,
+            "level": level,
+            "run_id": run_id,
+            "thread_id": get_thread_id(config),
+            "span_id": span_id or uuid.uuid4().hex[:16],
+        }
+        event.update({key: summarize(value, self.max_chars) for key, value in fields.items()})
+        self.writer.put(event)
+
+    def flush(self) -> None:
+        if self._writer is not None:
+            self._writer.flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._writer is not None:
+                self._writer.close()
+                self._writer = None
+
+
+_tracer: Optional[Tracer] = None
+_tracer_lock = threading.Lock()
+
+
+def _tracer_from_env() -> Tracer:
+    path = os.getenv("PLAYGROUND_TRACE_PATH") or str(data_path("traces.jsonl"))
+    return Tracer(
+        path=None if path.lower() == "off" else path,
+        sample_rate=float(os.getenv("PLAYGROUND_TRACE_SAMPLE", "1.0")),
+        max_chars=int(os.getenv("PLAYGROUND_TRACE_MAX_CHARS", str(DEFAULT_MAX_CHARS))),
+    )
+
+
+def get_tracer() -> Tracer:
+    """Return the process-wide tracer, created from the environment on first use."""
+    global _tracer
+    with _tracer_lock:
+        if _tracer is None:
+            _tracer = _tracer_from_env()
+        return _tracer
+
+
+def configure_tracing(path: Optional[str], sample_rate: float = 1.0, max_chars: int = DEFAULT_MAX_CHARS) -> Tracer:
+    """Replace the process-wide tracer, e.g. in tests or entry points.
+
+    Args:
+        path: JSONL output file, "-" for stderr, or None to disable tracing
+        sample_rate: Fraction of runs traced
+        max_chars: Longest string kept verbatim in payloads
+
+    Returns:
+        The new tracer
+    """
+    global _tracer
+    with _tracer_lock:
+        if _tracer is not None:
+            _tracer.close()
+        _tracer = Tracer(path, sample_rate, max_chars)
+        return _tracer
+
+
+@atexit.register
+def _close_tracer() -> None:
+    """Write out queued events when the process exits."""
+    if _tracer is not None:
+        _tracer.close()
+
+
+def trace(name: str, config: Optional[RunnableConfig] = None, level: str = "info", **fields: Any) -> None:
+    """Record a trace event for the run a config belongs to.
+
+    Args:
+        name: Event name, usually the tool or function
+        config: Config of the caller, used for run/thread ids and sampling
+        level: "info" or "error" (errors bypass sampling)
+        fields: Payload; large values are truncated and hashed
+    """
+    get_tracer().record(name, config, level, **fields)
+
+
+@contextlib.contextmanager
+def span(name: str, config: Optional[RunnableConfig] = None, **fields: Any) -> Iterator[dict[str, Any]]:
+    """Time a block and record it as one event when it ends.
+
+    Yields a dict the block can add result fields to. Exceptions are recorded
+    with level "error" and re-raised.
+    """
+    attributes: dict[str, Any] = dict(fields)
+    started = time.perf_counter()
+    try:
+        yield attributes
+    except Exception as e:
+        attributes["error"] = repr(e)
+        trace(name, config, level="error", duration_ms=round((time.perf_counter() - started) * 1000, 1),
+              **attributes)
+        raise
+    trace(name, config, duration_ms=round((time.perf_counter() - started) * 1000, 1), **attributes)
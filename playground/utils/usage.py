@@ -0,0 +1,72 @@
+"""
+Per-node token usage tracking.
+
+Collects provider usage data from every model call, including cached input
+tokens, so the prompt cache hit ratio of each graph node can be measured.
+"""
+
+import threading
+from collections import defaultdict
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+_lock = threading.Lock()
+_usage: dict[str, dict[str, int]] = defaultdict(
+    lambda: {"calls": 0, "input_tokens": 0, "cached_tokens": 0, "output_tokens": 0}
+)
+
+
+class UsageCallbackHandler(BaseCallbackHandler):
+    """Record usage metadata of every model call made for a graph node."""
+
+    def __init__(self, node: str) -> None:
+        self.node = node
+
+    def on_llm_end(self, response: LLMResult, **kwargs: Any) -> None:
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    record_usage(self.node, usage)
+
+
+def record_usage(node: str, usage: dict[str, Any]) -> None:
+    """Add one call's usage metadata to the node's totals.
+
+    Args:
+        node: Graph node that made the call
+        usage: LangChain usage_metadata of the response
+    """
+    details = usage.get("input_token_details") or {}
+    with _lock:
+        totals = _usage[node]
+        totals["calls"] += 1
+        totals["input_tokens"] += usage.get("input_tokens", 0)
+        totals["cached_tokens"] += details.get("cache_read", 0) or 0
+        totals["output_tokens"] += usage.get("output_tokens", 0)
+
+
+def get_usage_stats() -> dict[str, dict[str, Any]]:
+    """Return token totals and prompt cache hit ratio per node.
+
+    Returns:
+        dict: {node: {"calls", "input_tokens", "cached_tokens", "output_tokens", "cache_hit_ratio"}}
+    """
+    with _lock:
+        return {
+            node: {
+                **totals,
+                "cache_hit_ratio": (
+                    totals["cached_tokens"] / totals["input_tokens"] if totals["input_tokens"] else 0.0
+                ),
+            }
+            for node, totals in _usage.items()
+        }
+
+
+def reset_usage_stats() -> None:
+    """Clear all recorded usage."""
+    with _lock:
+        _usage.clear()
@@ -0,0 +1,194 @@
+"""
+실행 승인 제어 테스트
+동시 실행 상한, 사용자 간 공정 대기열, 대기 위치 안내, 부하 차단 검증
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from playground.utils.admission import AdmissionController, AdmissionRejected, admitted_graph
+from playground.utils.stats import percentile
+
+
+async def hold(controller, user, order, release, positions=None):
+    """슬롯을 얻으면 순서를 기록하고 release 이벤트까지 점유"""
+    async with controller.admit(user, on_position=positions.append if positions is not None else None):
+        order.append(user)
+        await release.wait()
+
+
+class TestAdmissionController:
+    """승인 제어 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_runs_beyond_the_cap_wait_for_a_slot(self):
+        controller = AdmissionController(max_running=2, max_running_per_user=2, queue_timeout=5)
+        order, release = [], asyncio.Event()
+
+        tasks = [asyncio.create_task(hold(controller, f"user-{i}", order, release)) for i in range(3)]
+        await asyncio.sleep(0.05)
+
+        assert order == ["user-0", "user-1"]
+        assert controller.metrics()["queued"] == 1
+        release.set()
+        await asyncio.gather(*tasks)
+        assert order[-1] == "user-2"
+        assert controller.metrics()["completed"] == 3
+
+    @pytest.mark.asyncio
+    async def test_queue_is_served_round_robin_across_users(self):
+        """한 사용자가 많이 제출해도 다른 사용자가 차례를 받음"""
+        controller = AdmissionController(max_running=1, max_running_per_user=1, queue_timeout=5)
+        order = []
+        events = {}
+
+        async def run(user, key):
+            events[key] = asyncio.Event()
+            async with controller.admit(user):
+                order.append(key)
+                await events[key].wait()
+
+        first = asyncio.create_task(run("busy", "busy-0"))
+        await asyncio.sleep(0.01)
+        queued = [asyncio.create_task(run("busy", f"busy-{i}")) for i in (1, 2)]
+        await asyncio.sleep(0.01)
+        queued.append(asyncio.create_task(run("other", "other-0")))
+        await asyncio.sleep(0.01)
+
+        for _ in range(4):
+            events[order[-1]].set()
+            await asyncio.sleep(0.02)
+        await asyncio.gather(first, *queued)
+
+        assert order == ["busy-0", "busy-1", "other-0", "busy-2"]
+
+    @pytest.mark.asyncio
+    async def test_user_at_cap_does_not_block_other_users(self):
+        """사용자별 상한으로 대기 중인 실행이 있어도 다른 사용자는 빈 슬롯에서 바로 시작"""
+        controller = AdmissionController(max_running=8, max_running_per_user=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+
+        first = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0.01)
+        blocked = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0.01)
+        other = asyncio.create_task(hold(controller, "b", order, release))
+        await asyncio.sleep(0.01)
+
+        assert order == ["a", "b"]
+        assert controller.metrics()["queued_by_user"] == {"a": 1}
+        release.set()
+        await asyncio.gather(first, blocked, other)
+        assert order == ["a", "b", "a"] and controller.metrics()["shed"] == 0
+
+    @pytest.mark.asyncio
+    async def test_waiting_runs_get_their_position(self):
+        controller = AdmissionController(max_running=1, queue_timeout=5)
+        order, release, positions = [], asyncio.Event(), []
+
+        first = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0.01)
+        second = asyncio.create_task(hold(controller, "b", order, release, positions))
+        await asyncio.sleep(0.01)
+        release.set()
+        await asyncio.gather(first, second)
+
+        assert positions[0].position == 1 and positions[0].queued == 1
+
+    @pytest.mark.asyncio
+    async def test_full_queue_rejects_immediately(self):
+        """대기열이 가득 차면 즉시 거절"""
+        controller = AdmissionController(max_running=1, max_queued=1, queue_timeout=5)
+        order, release = [], asyncio.Event()
+        tasks = [asyncio.create_task(hold(controller, f"user-{i}", order, release)) for i in range(2)]
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as rejected:
+            async with controller.admit("late"):
+                pass
+
+        assert rejected.value.reason == "queue_full"
+        release.set()
+        await asyncio.gather(*tasks)
+        assert controller.metrics()["rejected"] == 1
+
+    @pytest.mark.asyncio
+    async def test_runs_waiting_past_the_deadline_are_shed(self):
+        """대기 시간 초과 시 안내 메시지와 함께 차단되고 슬롯은 유지"""
+        controller = AdmissionController(max_running=1, queue_timeout=0.1)
+        order, release = [], asyncio.Event()
+        first = asyncio.create_task(hold(controller, "a", order, release))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(AdmissionRejected) as shed:
+            async with controller.admit("b"):
+                pass
+
+        assert shed.value.reason == "queue_timeout" and "try again" in shed.value.message
+        release.set()
+        await first
+        stats = controller.metrics()
+        assert stats["shed"] == 1 and stats["queued"] == 0 and stats["running"] == 0
+
+    @pytest.mark.asyncio
+    async def test_metrics_are_exported_in_prometheus_format(self):
+        controller = AdmissionController()
+        async with controller.admit("a"):
+            pass
+
+        text = controller.render_metrics()
+
+        assert "playground_runs_admitted_total 1" in text
+        assert 'playground_run_wait_seconds{quantile="0.95"}' in text
+
+
+class TestAdmittedGraph:
+    """그래프 래퍼 테스트"""
+
+    def echo_graph(self):
+        """입력 메시지에 답하는 단일 노드 그래프"""
+        builder = StateGraph(MessagesState)
+        builder.add_node("reply", lambda state: {"messages": [AIMessage("done")]})
+        builder.add_edge(START, "reply")
+        builder.add_edge("reply", END)
+        return builder.compile(name="agent")
+
+    @pytest.mark.asyncio
+    async def test_admitted_run_returns_the_graph_output(self):
+        graph = admitted_graph(self.echo_graph(), AdmissionController())
+
+        result = await graph.ainvoke({"messages": [HumanMessage("hi")]})
+
+        assert [m.content for m in result["messages"]] == ["hi", "done"]
+
+    def test_wrapper_keeps_the_configuration_schema(self):
+        """서버에 노출되는 래퍼 그래프도 에이전트 설정 스키마를 유지"""
+        from playground.agents.react.configuration import Configuration
+
+        graph = admitted_graph(self.echo_graph(), AdmissionController(), config_schema=Configuration)
+
+        assert "model" in graph.config_schema().model_json_schema()["$defs"]["Configuration"]["properties"]
+
+    @pytest.mark.asyncio
+    async def test_shed_run_ends_with_an_explanation(self):
+        controller = AdmissionController(max_running=1, queue_timeout=0.05)
+        graph = admitted_graph(self.echo_graph(), controller)
+        order, release = [], asyncio.Event()
+        blocker = asyncio.create_task(hold(controller, "other", order, release))
+        await asyncio.sleep(0.01)
+
+        result = await graph.ainvoke({"messages": [HumanMessage("hi")]},
+                                     {"configurable": {"thread_id": "thread-1"}})
+
+        assert "busy" in result["messages"][-1].content
+        release.set()
+        await blocker
+
+
+class TestPercentile:
+    def test_interpolates_between_samples(self):
+        assert percentile([1, 2, 3, 4], 50) == 2.5
+        assert percentile([], 95) is None
@@ -0,0 +1,117 @@
+"""
+배치 실행기 테스트
+동시 실행 수 제한, 완료 순서대로 결과 기록, 중단 후 재개, 통계 검증
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from playground.batch import completed_ids, run_batch
+
+
+def write_queries(path, queries):
+    path.write_text("\n".join(json.dumps(query) for query in queries) + "\n", encoding="utf-8")
+
+
+def read_results(path):
+    return [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+
+
+class FakeRun:
+    """동시 실행 수를 기록하고 'fail'이 들어간 질의는 실패시키는 가짜 실행 함수"""
+
+    def __init__(self):
+        self.running = 0
+        self.peak = 0
+        self.queries = []
+
+    async def __call__(self, request, emit):
+        query = request["messages"][-1]["content"]
+        self.queries.append(query)
+        self.running += 1
+        self.peak = max(self.peak, self.running)
+        try:
+            await asyncio.sleep(0.2 if "slow" in query else 0.01)
+            if "fail" in query:
+                raise RuntimeError("provider error")
+            if "huge" in query:
+                return {"response": f"part of {query}", "tool_calls": [], "partial": True, "reason": "steps"}
+            return {"response": f"answer to {query}", "tool_calls": []}
+        finally:
+            self.running -= 1
+
+
+class TestRunBatch:
+    """배치 실행 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_results_are_streamed_as_they_complete(self, tmp_path):
+        """워커 수만큼 동시에 실행하고 완료된 순서대로 결과를 기록"""
+        queries, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+        write_queries(queries, [{"query": "slow coats"}, {"query": "boots"}, {"query": "fail hats"},
+                                {"id": "scarves", "query": "scarves"}])
+        run = FakeRun()
+
+        stats = await run_batch(str(queries), str(output), run, workers=2, progress=None)
+
+        results = read_results(output)
+        assert run.peak == 2
+        assert results[0]["id"] == "2" and results[-1]["id"] == "1"
+        assert {r["id"]: r["status"] for r in results} == {"1": "succeeded", "2": "succeeded",
+                                                         "3": "failed", "scarves": "succeeded"}
+        assert results[-1]["response"] == "answer to slow coats" and results[-1]["line"] == 1
+        summary = stats.summary()
+        assert (summary["succeeded"], summary["failed"]) == (3, 1)
+        assert summary["latency_s"]["count"] == 4 and summary["queries_per_min"] > 0
+
+    @pytest.mark.asyncio
+    async def test_resume_skips_completed_queries(self, tmp_path):
+        """재실행하면 이미 기록된 질의는 건너뛰고 중단으로 잘린 마지막 줄은 버림"""
+        queries, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+        write_queries(queries, [{"query": "coats"}, {"query": "boots"}, {"query": "hats"}])
+        output.write_text(json.dumps({"id": "1", "status": "succeeded"}) + '\n{"id": "2", "sta',
+                          encoding="utf-8")
+        run = FakeRun()
+
+        stats = await run_batch(str(queries), str(output), run, progress=None)
+
+        assert sorted(run.queries) == ["boots", "hats"]
+        assert stats.skipped == 1
+        assert [r["id"] for r in read_results(output)][0] == "1" and len(read_results(output)) == 3
+
+    @pytest.mark.asyncio
+    async def test_resume_matches_numeric_ids(self, tmp_path):
+        """숫자 id도 결과 파일의 문자열 id와 같게 비교해 재개 시 건너뜀"""
+        queries, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+        write_queries(queries, [{"id": 7, "query": "coats"}, {"id": 8, "query": "boots"}])
+        run = FakeRun()
+
+        await run_batch(str(queries), str(output), run, progress=None)
+        await run_batch(str(queries), str(output), run, progress=None)
+
+        assert sorted(run.queries) == ["boots", "coats"]
+        assert sorted(r["id"] for r in read_results(output)) == ["7", "8"]
+
+    @pytest.mark.asyncio
+    async def test_partial_answers_are_marked_and_retried(self, tmp_path):
+        """예산으로 잘린 질의는 partial로 기록되고 --retry-failed 때 다시 실행"""
+        queries, output = tmp_path / "queries.jsonl", tmp_path / "results.jsonl"
+        write_queries(queries, [{"query": "coats"}, {"query": "huge catalog"}])
+        run = FakeRun()
+
+        stats = await run_batch(str(queries), str(output), run, progress=None)
+        retried = await run_batch(str(queries), str(output), run, retry_failed=True, progress=None)
+
+        assert {r["id"]: r["status"] for r in read_results(output)[:2]} == {"1": "succeeded", "2": "partial"}
+        assert (stats.succeeded, stats.partial) == (1, 1)
+        assert run.queries.count("huge catalog") == 2 and retried.skipped == 1
+
+    def test_failed_queries_are_retried_on_request(self, tmp_path):
+        output = tmp_path / "results.jsonl"
+        output.write_text(json.dumps({"id": "1", "status": "succeeded"}) + "\n"
+                          + json.dumps({"id": "2", "status": "failed"}) + "\n", encoding="utf-8")
+
+        assert completed_ids(str(output)) == {"1", "2"}
+        assert completed_ids(str(output), retry_failed=True) == {"1"}
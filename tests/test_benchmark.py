@@ -0,0 +1,64 @@
+"""
+모델 벤치마크 테스트
+로컬 OpenAI 호환 스텁으로 TTFT, 초당 토큰, 동시성 스윕, 결과 저장/비교 검증
+"""
+
+import json
+
+import pytest
+
+from playground.benchmark import StubServer, compare_runs, configured_models, run_benchmark, save_results
+
+
+@pytest.fixture
+def stub(monkeypatch):
+    """로컬 스텁 서버로 OpenAI 요청을 보내도록 환경 설정"""
+    with StubServer(ttft=0.05, token_interval=0.002, tokens=20) as server:
+        monkeypatch.setenv("OPENAI_BASE_URL", server.url)
+        monkeypatch.setenv("OPENAI_API_KEY", "stub")
+        yield server
+
+
+class TestBenchmark:
+    """벤치마크 실행 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_sweep_measures_ttft_and_token_rate(self, stub):
+        """동시성 단계별로 TTFT, 지연 백분위수, 처리량 측정"""
+        run = await run_benchmark(["openai/gpt-4.1-nano"], concurrency=(1, 4), requests=8)
+
+        single, parallel = run["results"]["openai/gpt-4.1-nano"]
+        assert stub.requests == 16
+        assert single["errors"] == 0 and single["latency_s"]["count"] == 8
+        assert 0.05 <= single["ttft_s"]["p50"] < single["latency_s"]["p50"]
+        assert single["latency_s"]["p50"] <= single["latency_s"]["p95"] <= single["latency_s"]["p99"]
+        assert single["tokens_per_s"]["p50"] > 100
+        assert parallel["throughput"]["requests_per_s"] > 2 * single["throughput"]["requests_per_s"]
+
+    @pytest.mark.asyncio
+    async def test_models_without_keys_are_skipped(self, stub, monkeypatch):
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+
+        run = await run_benchmark(["openrouter/x-ai/grok-4"], concurrency=(1,), requests=1)
+
+        assert run["results"] == {}
+        assert run["skipped"] == {"openrouter/x-ai/grok-4": "OPENROUTER_API_KEY not set"}
+
+    @pytest.mark.asyncio
+    async def test_saved_runs_can_be_compared(self, stub, tmp_path):
+        """저장된 결과를 다시 읽어 이전 실행과 p50/p95 변화 비교"""
+        previous = await run_benchmark(["openai/gpt-4.1-nano"], concurrency=(1,), requests=4)
+        stub.ttft = 0.15
+        current = await run_benchmark(["openai/gpt-4.1-nano"], concurrency=(1,), requests=4)
+
+        path = save_results(previous, tmp_path / "previous.json")
+        changes = compare_runs(json.loads(path.read_text(encoding="utf-8")), current)
+
+        assert len(changes) == 1 and changes[0].startswith("openai/gpt-4.1-nano @1: ttft p50 +")
+
+    def test_models_come_from_both_configurations(self):
+        models = configured_models()
+
+        assert "openrouter/qwen/qwen-2.5-72b-instruct" in models
+        assert "openrouter/anthropic/claude-3-haiku" in models
+        assert len(models) == len(set(models))
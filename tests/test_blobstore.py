@@ -0,0 +1,94 @@
+"""
+블롭 저장소 테스트
+큰 도구 결과를 핸들과 미리보기로 대체하고 read_blob으로 구간을 읽는지 검증
+"""
+
+import os
+import time
+
+import pytest
+
+from playground.tools import blobs
+from playground.utils.blobstore import MAX_READ_BYTES, BlobNotFound, BlobStore
+
+PAGE = "\n\n".join(f"## Product {i}\n\nWool coat number {i}, price {100 + i} EUR." for i in range(2000))
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    store = BlobStore(tmp_path / "blobs", threshold=1024)
+    monkeypatch.setattr(blobs, "get_blob_store", lambda: store)
+    return store
+
+
+class TestBlobStore:
+    """블롭 저장소 테스트"""
+
+    def test_small_outputs_stay_inline(self, store):
+        assert store.offload("short page") == "short page"
+
+    def test_large_outputs_are_replaced_by_a_handle(self, store):
+        """메시지 크기는 페이지 크기와 무관하게 일정"""
+        small = store.offload(PAGE, label="Page https://shop.test")
+        large = store.offload(PAGE * 10, label="Page https://shop.test")
+
+        assert "blob:" in small and small.startswith("Page https://shop.test is")
+        assert small.count("\n") < 200 and abs(len(large) - len(small)) < 20
+        assert store.put(PAGE) == store.put(PAGE)
+        assert len(list(store.directory.glob("*/*"))) == 2
+
+    def test_read_slices_by_offset_and_phrase(self, store):
+        """오프셋과 검색어로 필요한 구간만 읽음"""
+        handle = store.put(PAGE)
+
+        text, start, total = store.read(handle, offset=0, length=50)
+        assert text == PAGE.encode()[:50].decode() and (start, total) == (0, len(PAGE.encode()))
+        text, start, _ = store.read(handle, length=40, find="## Product 1500")
+        assert text.startswith("## Product 1500") and start == PAGE.index("## Product 1500")
+        with pytest.raises(BlobNotFound):
+            store.read(handle, find="Product 5000")
+        with pytest.raises(BlobNotFound):
+            store.read("blob:../../etc/passwd")
+
+    def test_read_blob_tool(self, store):
+        """read_blob 도구는 구간과 다음 오프셋을 알려줌"""
+        handle = store.put(PAGE)
+
+        first = blobs.read_blob.invoke({"handle": handle, "length": 100})
+        last = blobs.read_blob.invoke({"handle": handle, "offset": len(PAGE.encode()) - 10})
+
+        assert first.startswith(f"[{handle} bytes 0-100 of") and "continue with offset=100" in first
+        assert last.endswith(f"[End of {handle}.]")
+        assert blobs.read_blob.invoke({"handle": "blob:" + "0" * 32}).startswith("Error reading blob")
+
+    def test_read_blob_length_is_capped(self, store):
+        """한 번의 호출로 블롭 전체를 다시 가져올 수 없음"""
+        handle = store.put(PAGE)
+
+        result = blobs.read_blob.invoke({"handle": handle, "length": 10 ** 9})
+
+        assert result.startswith(f"[{handle} bytes 0-{MAX_READ_BYTES:,} of")
+
+    def test_unused_blobs_are_pruned(self, store):
+        old, fresh = store.put("old page"), store.put("fresh page")
+        stale = time.time() - 3600
+        os.utime(store._path(old), (stale, stale))
+
+        assert store.prune(60) == 1
+        with pytest.raises(BlobNotFound):
+            store.size(old)
+        assert store.size(fresh) == len("fresh page")
+
+
+class TestToolSelection:
+    """도구 선택 테스트"""
+
+    def test_offloading_tools_bring_read_blob(self):
+        """결과를 블롭으로 넘기는 도구를 고르면 read_blob이 함께 제공됨"""
+        from playground.agents.react.configuration import Configuration
+        from playground.tools import get_tools
+
+        names = [tool.name for tool in get_tools(Configuration().selected_tools)]
+
+        assert names == ["scrape_with_firecrawl", "read_blob"]
+        assert [tool.name for tool in get_tools(["get_todays_date"])] == ["get_todays_date"]
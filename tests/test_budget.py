@@ -0,0 +1,120 @@
+"""
+실행 예산 테스트
+시간/단계 예산 전파, 도구 취소, 부분 답변 플래그 검증
+"""
+
+import asyncio
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from playground.agents.supervisor import graph as supervisor_graph
+from playground.tools.concurrency import ToolLimiter, limit_tools
+from playground.utils.budget import BudgetedChatModel, RunBudget, get_budget, partial_answer
+from playground.utils.prompt import build_prompt, run_context
+
+
+class ToolCallingFake(FakeMessagesListChatModel):
+    """도구 바인딩을 무시하고 정해진 응답을 순서대로 돌려주는 가짜 모델"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+async def slow_crawl(url: str) -> str:
+    """Crawl a whole site."""
+    await asyncio.sleep(2)
+    return "every page"
+
+
+def handoff(i):
+    return AIMessage("", tool_calls=[{"name": "transfer_to_scrape_agent", "args": {}, "id": f"handoff-{i}"}])
+
+
+def crawl_call(i):
+    return AIMessage("", tool_calls=[{"name": "slow_crawl", "args": {"url": "https://shop.example"},
+                                      "id": f"crawl-{i}"}])
+
+
+async def run(monkeypatch, supervisor_responses, agent_responses, run_id, **configurable):
+    """가짜 모델로 슈퍼바이저 그래프 실행"""
+    supervisor_model = ToolCallingFake(responses=supervisor_responses)
+    agent_model = BudgetedChatModel(model=ToolCallingFake(responses=agent_responses), node="scrape_agent")
+
+    async def fake_subagents(configurable):
+        tools = limit_tools([slow_crawl], ToolLimiter(timeout=10))
+        return [create_react_agent(agent_model, tools, name="scrape_agent")]
+
+    monkeypatch.setattr(supervisor_graph, "create_subagents", fake_subagents)
+    monkeypatch.setattr(supervisor_graph, "load_chat_model", lambda *args, **kwargs: supervisor_model)
+    graph = await supervisor_graph.make_supervisor_graph({"configurable": configurable})
+    config = {"configurable": {"run_id": run_id}}
+    result = await graph.ainvoke({"messages": [HumanMessage("Compare coat prices")]}, config)
+    return result["messages"], config
+
+
+class TestRunBudget:
+    """예산 집행 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_step_budget_returns_best_partial_answer(self, monkeypatch):
+        """단계 예산을 다 쓰면 루프 대신 지금까지의 답변을 부분 답변으로 반환"""
+        messages, _ = await run(
+            monkeypatch,
+            supervisor_responses=[handoff(i) for i in range(10)],
+            agent_responses=[AIMessage(f"coats found, round {i}") for i in range(10)],
+            run_id="budget-steps", step_budget=3,
+        )
+
+        final = messages[-1]
+        assert final.response_metadata["budget"]["partial"] is True
+        assert final.response_metadata["budget"]["reason"] == "steps"
+        assert final.content.startswith("coats found, round 0")
+        assert final.response_metadata["budget"]["steps"] == 3
+
+    @pytest.mark.asyncio
+    async def test_time_budget_cancels_in_flight_tools(self, monkeypatch):
+        """마감 시각에 실행 중인 도구를 취소하고 부분 답변 반환"""
+        started = asyncio.get_running_loop().time()
+
+        messages, _ = await run(
+            monkeypatch,
+            supervisor_responses=[handoff(0), AIMessage("done")],
+            agent_responses=[crawl_call(0), AIMessage("unused")],
+            run_id="budget-time", time_budget=0.3, step_budget=None,
+        )
+
+        assert asyncio.get_running_loop().time() - started < 1.5
+        assert messages[-1].response_metadata["budget"]["reason"] == "time"
+        assert "time budget" in messages[-1].content
+
+
+class TestBudgetHints:
+    def test_run_context_warns_when_budget_runs_low(self):
+        config = {"configurable": {"run_id": "budget-hint", "step_budget": 3}}
+        budget = get_budget(config)
+        budget.take_step()
+
+        assert "Budget left: 2 of 3 steps" in run_context(config)
+        assert "skip optional steps" in run_context(config)
+
+    def test_partial_answer_ignores_earlier_turns(self):
+        budget = RunBudget(step_budget=1)
+        budget.expire("steps")
+
+        answer = partial_answer([AIMessage("last turn's answer"), HumanMessage("new question")], budget)
+
+        assert "last turn" not in answer.content
+
+    def test_partial_answer_looks_past_the_run_context(self):
+        """모델 입력 끝의 실행 컨텍스트 메시지는 사용자 요청으로 보지 않음"""
+        budget = RunBudget(step_budget=1)
+        budget.expire("steps")
+        messages = build_prompt("You are a shopping agent.")(
+            {"messages": [HumanMessage("winter coats"), AIMessage("coats found")]}, {"configurable": {}})
+
+        assert partial_answer(messages, budget).content.startswith("coats found")
@@ -0,0 +1,180 @@
+"""
+실행 취소 테스트
+취소 시 태스크 중단, 정리 콜백(Firecrawl 크롤 취소), 도구 건너뛰기, 취소 통계 검증
+"""
+
+import asyncio
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from langchain_core.tools import tool
+
+from playground.tools import crawl
+from playground.tools.concurrency import ToolLimiter
+from playground.utils.cancellation import INTERRUPTED, USER, CancellationRegistry, RunCancelled
+from playground.utils.progress import ProgressReporter
+
+
+class ScriptStopped(BaseException):
+    """Streamlit이 스크립트 실행을 중단할 때 던지는 제어 예외 대용"""
+
+
+class FakeFirecrawl:
+    """끝나지 않는 크롤 작업을 흉내 내고 취소 요청을 기록"""
+
+    def __init__(self):
+        self.polls = 0
+        self.cancelled = threading.Event()
+
+    def async_crawl_url(self, url, formats):
+        return SimpleNamespace(id="crawl-1")
+
+    def check_crawl_status(self, job_id):
+        self.polls += 1
+        return SimpleNamespace(status="scraping", completed=self.polls, total=100, data=[])
+
+    def cancel_crawl(self, job_id):
+        self.cancelled.set()
+
+
+def run_config(run_id):
+    return {"configurable": {"run_id": run_id}}
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return "found"
+
+
+class TestCancellationRegistry:
+    """취소 레지스트리 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_cancel_stops_the_running_task(self):
+        """취소하면 진행 중인 실행 태스크가 CancelledError로 중단되고 통계에 기록"""
+        registry = CancellationRegistry()
+        async with registry.track(run_config("finished")):
+            await asyncio.sleep(0.2)
+
+        async def long_run():
+            async with registry.track(run_config("long"), owner="session-1"):
+                await asyncio.sleep(10)
+
+        task = asyncio.create_task(long_run())
+        await asyncio.sleep(0.05)
+        assert registry.cancel_owner("session-1") == 1
+
+        with pytest.raises(asyncio.CancelledError):
+            await task
+        metrics = registry.metrics()
+        assert metrics["cancelled_by_reason"] == {USER: 1}
+        assert metrics["completed"] == 1 and metrics["active"] == 0
+        assert 0.05 < metrics["saved_seconds"] < 0.2
+
+    @pytest.mark.asyncio
+    async def test_interrupted_caller_cancels_the_run(self):
+        """호출 측이 제어 예외로 중단되면 실행을 취소하고 정리 콜백 실행"""
+        registry = CancellationRegistry()
+        cleaned_up = threading.Event()
+
+        with pytest.raises(ScriptStopped):
+            async with registry.track(run_config("interrupted")):
+                registry.on_cancel(run_config("interrupted"), cleaned_up.set)
+                raise ScriptStopped()
+
+        assert cleaned_up.wait(1)
+        assert registry.metrics()["cancelled_by_reason"] == {INTERRUPTED: 1}
+
+    @pytest.mark.asyncio
+    async def test_errors_are_not_cancellations(self):
+        registry = CancellationRegistry()
+
+        with pytest.raises(ValueError):
+            async with registry.track(run_config("failed")):
+                raise ValueError("boom")
+
+        assert registry.metrics()["cancelled"] == 0
+
+    @pytest.mark.asyncio
+    async def test_cancellation_outlives_the_run_scope(self, monkeypatch):
+        """실행이 끝난 뒤에도 워커 스레드가 취소 상태를 볼 수 있고 TTL이 지나면 잊음"""
+        registry = CancellationRegistry(cancelled_ttl=60)
+        config = run_config("stopped")
+
+        with pytest.raises(ScriptStopped):
+            async with registry.track(config):
+                raise ScriptStopped()
+
+        assert registry.is_cancelled(config) and not registry.is_cancelled(run_config("other"))
+        with pytest.raises(RunCancelled):
+            registry.raise_if_cancelled(config)
+        cleaned_up = threading.Event()
+        registry.on_cancel(config, cleaned_up.set)
+        assert cleaned_up.wait(1)
+        later = time.monotonic() + 61
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        assert not registry.is_cancelled(config)
+
+    def test_untracked_runs_cannot_be_cancelled(self):
+        assert CancellationRegistry().cancel("unknown") is False
+
+
+class TestCancelledWork:
+    """취소된 실행의 도구 작업 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_crawl_is_cancelled_on_firecrawl(self, monkeypatch):
+        """실행이 취소되면 Firecrawl 크롤 작업도 취소하고 폴링 중단"""
+        registry = CancellationRegistry()
+        firecrawl = FakeFirecrawl()
+        monkeypatch.setattr(crawl, "get_firecrawl", lambda: firecrawl)
+        monkeypatch.setattr(crawl, "get_cancellation_registry", lambda: registry)
+        monkeypatch.setattr(crawl, "CRAWL_POLL_INTERVAL", 0.01)
+        config = run_config("crawl")
+
+        async with registry.track(config):
+            polling = asyncio.get_running_loop().run_in_executor(
+                None, crawl._crawl_with_progress, "https://shop.example", ProgressReporter("crawl", config), config)
+            await asyncio.sleep(0.05)
+            registry.cancel("crawl")
+
+            with pytest.raises(RunCancelled):
+                await polling
+
+        assert firecrawl.cancelled.wait(1)
+
+    @pytest.mark.parametrize("limited", [False, True])
+    def test_crawl_is_cancelled_at_the_deadline(self, monkeypatch, limited):
+        """실행 시간 예산이나 도구 타임아웃이 지나면 끝나지 않는 크롤도 Firecrawl에서 취소"""
+        firecrawl = FakeFirecrawl()
+        monkeypatch.setattr(crawl, "get_firecrawl", lambda: firecrawl)
+        monkeypatch.setattr(crawl, "CRAWL_POLL_INTERVAL", 0.01)
+        call = {"url": "https://shop.example"}
+        if limited:
+            limiter = ToolLimiter(timeout=0.05)
+            result = limiter.run(crawl.crawl_with_firecrawl, call, run_config("limited-crawl"))
+            limiter.executor.shutdown(wait=True)
+        else:
+            config = {"configurable": {"run_id": "budgeted-crawl", "time_budget": 0.05}}
+            result = crawl.crawl_with_firecrawl.invoke(call, config)
+
+        assert firecrawl.cancelled.is_set() and "Error" in result
+        polls = firecrawl.polls
+        time.sleep(0.05)
+        assert firecrawl.polls == polls
+
+    @pytest.mark.asyncio
+    async def test_pending_tool_calls_are_skipped(self, monkeypatch):
+        registry = CancellationRegistry()
+        monkeypatch.setattr("playground.tools.concurrency.get_cancellation_registry", lambda: registry)
+        config = run_config("skipped")
+        call = {"type": "tool_call", "name": "lookup", "args": {"query": "coats"}, "id": "call-1"}
+
+        async with registry.track(config):
+            registry.cancel("skipped")
+            result = await ToolLimiter().arun(lookup, call, config)
+
+        assert result.status == "error" and "cancelled" in result.content
@@ -0,0 +1,92 @@
+"""
+중복 제거 테스트
+URL 정규화와 SimHash 기반 유사 중복 검출 검증
+"""
+
+from playground.tools.dedup import (
+    DedupMemory,
+    canonicalize_url,
+    dedupe_results,
+    hamming,
+    simhash,
+)
+
+ARTICLE = (
+    "The best winter parkas of the season were tested in sub-zero conditions. "
+    "Our reviewers wore each parka for a week of commuting, hiking and city walks, "
+    "rating warmth, weight, pocket layout, hood design and water resistance. "
+    "The top pick balances a high fill-power down insulation with a recycled shell."
+)
+
+
+def run_config(run_id):
+    """run_id가 지정된 설정"""
+    return {"configurable": {"run_id": run_id}}
+
+
+class TestCanonicalizeUrl:
+    """URL 정규화 테스트"""
+
+    def test_tracking_and_mirror_variants_are_equal(self):
+        """추적 파라미터, www/m 접두사, 프래그먼트 제거"""
+        variants = [
+            "https://www.shop.example/coats/?utm_source=news&color=navy&size=m#reviews",
+            "http://m.shop.example/coats?size=m&color=navy&gclid=abc",
+            "https://SHOP.example:443/coats?color=navy&size=m",
+        ]
+
+        assert len({canonicalize_url(url) for url in variants}) == 1
+
+    def test_different_pages_stay_different(self):
+        assert canonicalize_url("https://shop.example/coats?page=2") != canonicalize_url("https://shop.example/coats")
+
+
+class TestSimHash:
+    """SimHash 지문 테스트"""
+
+    def test_near_duplicate_texts_are_close(self):
+        """문구 일부만 다른 재배포 기사는 해밍 거리가 작음"""
+        syndicated = ARTICLE.replace("Our reviewers", "The reviewers") + " Originally published by Outdoor Weekly."
+        unrelated = "Trench coats in beige and navy, tailored from water resistant cotton gabardine for spring."
+
+        assert hamming(simhash(ARTICLE), simhash(syndicated)) < hamming(simhash(ARTICLE), simhash(unrelated))
+
+    def test_fingerprints_are_unsigned_64_bit(self):
+        """최상위 비트(63)가 켜진 지문도 음수가 되지 않고 해밍 거리가 정확함"""
+        fingerprints = [simhash(f"{ARTICLE} Variant {i} of the review.") for i in range(40)]
+
+        assert all(0 <= fingerprint < 1 << 64 for fingerprint in fingerprints)
+        high = [fingerprint for fingerprint in fingerprints if fingerprint >> 63]
+        assert high
+        assert all(hamming(fingerprint, fingerprint ^ (1 << 63) ^ 1) == 2 for fingerprint in high)
+
+    def test_short_text_has_no_fingerprint(self):
+        assert simhash("winter parka") is None
+
+
+class TestDedupMemory:
+    """실행(run)별 중복 기억 테스트"""
+
+    def test_same_text_at_another_url_is_duplicate(self):
+        memory = DedupMemory(threshold=3)
+
+        assert memory.check("https://news.example/parkas", ARTICLE) is None
+        original = memory.check("https://mirror.example/best-parkas", ARTICLE)
+
+        assert original.url == "https://news.example/parkas"
+
+    def test_search_results_seen_earlier_become_references(self):
+        """같은 실행에서 다시 나온 결과는 참조로 축약, 다른 실행은 영향 없음"""
+        first = [{"url": "https://news.example/parkas", "title": "Best parkas", "content": ARTICLE}]
+        second = [
+            {"url": "https://www.news.example/parkas/?utm_campaign=feed", "title": "Best parkas", "content": "..."},
+            {"url": "https://other.example/fleece", "title": "Fleece", "content": "Zip-up fleece for hiking."},
+        ]
+
+        dedupe_results(first, run_config("dedup-a"))
+        deduped = dedupe_results(second, run_config("dedup-a"))
+        fresh = dedupe_results(second, run_config("dedup-b"))
+
+        assert deduped[0] == {"url": second[0]["url"], "duplicate_of": "https://news.example/parkas"}
+        assert deduped[1] == second[1]
+        assert fresh == second
@@ -0,0 +1,130 @@
+"""
+서브 에이전트 핸드오프 정책 테스트
+full/last/summary 모드, 부모 상태의 도구 메시지 제거, 토큰 절감 집계 검증
+"""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.prebuilt import create_react_agent
+
+from playground.agents.supervisor import graph as supervisor_graph
+from playground.agents.supervisor.handoff import get_handoff_savings, summarize_handoff
+
+RAW_PAGE = "<div>raw scraped catalog</div>" * 500
+ANSWER = "Top coats on shop.example:\n- Down Coat: ₩99,000\n- Winter Parka: ₩189,000\nBoth are in stock."
+
+
+class ToolCallingFake(FakeMessagesListChatModel):
+    """도구 바인딩을 무시하고 정해진 응답을 순서대로 돌려주는 가짜 모델"""
+
+    def bind_tools(self, tools, **kwargs):
+        return self
+
+
+@tool
+def scrape_page(url: str) -> str:
+    """Scrape a page."""
+    return RAW_PAGE
+
+
+def scrape_agent():
+    """도구를 한 번 호출하고 답하는 서브 에이전트"""
+    model = ToolCallingFake(responses=[
+        AIMessage("", tool_calls=[{"name": "scrape_page", "args": {"url": "https://shop.example/coats"},
+                                   "id": "scrape-1"}]),
+        AIMessage(ANSWER),
+    ])
+    return create_react_agent(model, [scrape_page], name="scrape_agent")
+
+
+def fake_supervisor(monkeypatch):
+    """scrape_agent에 한 번 위임한 뒤 답하는 가짜 슈퍼바이저 모델과 서브 에이전트 설치"""
+    supervisor_model = ToolCallingFake(responses=[
+        AIMessage("", tool_calls=[{"name": "transfer_to_scrape_agent", "args": {}, "id": "handoff-1"}]),
+        AIMessage("Here are the coats."),
+    ])
+
+    async def fake_subagents(configurable):
+        return [scrape_agent()]
+
+    monkeypatch.setattr(supervisor_graph, "create_subagents", fake_subagents)
+    monkeypatch.setattr(supervisor_graph, "load_chat_model", lambda *args, **kwargs: supervisor_model)
+    return supervisor_model
+
+
+async def run_supervisor(monkeypatch, mode, run_id):
+    """scrape_agent에 한 번 위임하고 끝나는 슈퍼바이저 실행"""
+    fake_supervisor(monkeypatch)
+    graph = await supervisor_graph.make_supervisor_graph({"configurable": {"handoff_mode": mode}})
+    config = {"configurable": {"run_id": run_id}}
+    return (await graph.ainvoke({"messages": [HumanMessage("Find winter coats")]}, config))["messages"], config
+
+
+class TestHandoffModes:
+    """핸드오프 모드별 부모 상태 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_full_mode_keeps_the_whole_history(self, monkeypatch):
+        messages, _ = await run_supervisor(monkeypatch, "full", "handoff-full")
+
+        assert any(isinstance(m, ToolMessage) and m.content == RAW_PAGE for m in messages)
+
+    @pytest.mark.asyncio
+    async def test_last_mode_strips_tool_traffic(self, monkeypatch):
+        """last 모드는 최종 답변만 남기고 도구 메시지를 부모 상태에서 제거"""
+        messages, config = await run_supervisor(monkeypatch, "last", "handoff-last")
+
+        assert not any(isinstance(m, ToolMessage) for m in messages)
+        assert not any(isinstance(m, AIMessage) and m.tool_calls for m in messages)
+        assert [m.content for m in messages] == ["Find winter coats", ANSWER, "Here are the coats."]
+        savings = get_handoff_savings(config)
+        assert savings["handoffs"] == 1 and savings["saved_tokens"] > 1000
+
+    @pytest.mark.asyncio
+    async def test_summary_mode_hands_back_facts_and_sources(self, monkeypatch):
+        messages, _ = await run_supervisor(monkeypatch, "summary", "handoff-summary")
+
+        handed_back = messages[1].content
+        assert handed_back.startswith("[scrape_agent summary]")
+        assert "- Down Coat: ₩99,000" in handed_back
+        assert "- https://shop.example/coats" in handed_back
+        assert not any(isinstance(m, ToolMessage) for m in messages)
+
+
+class TestTerminalAgent:
+    """터미널 에이전트 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_terminal_agent_answer_ends_the_run(self, monkeypatch):
+        """터미널 에이전트의 답변이 최종 답변이 되고 슈퍼바이저는 다시 생성하지 않음"""
+        supervisor_model = fake_supervisor(monkeypatch)
+        graph = await supervisor_graph.make_supervisor_graph({"configurable": {"terminal_agent": "scrape_agent"}})
+
+        tagged, result = [], None
+        async for event in graph.astream_events({"messages": [HumanMessage("Find winter coats")]},
+                                                {"configurable": {"run_id": "terminal"}}, version="v2"):
+            if event["event"] == "on_chat_model_end" and supervisor_graph.FINAL_ANSWER_TAG in event["tags"]:
+                tagged.append(event["data"]["output"].content)
+            if event["event"] == "on_chain_end" and not event["parent_ids"]:
+                result = event["data"]["output"]["messages"]
+
+        assert result[-1].content == ANSWER
+        assert supervisor_model.i == 1
+        assert tagged[-1] == ANSWER
+
+    @pytest.mark.asyncio
+    async def test_unknown_terminal_agent_is_rejected(self, monkeypatch):
+        fake_supervisor(monkeypatch)
+
+        with pytest.raises(ValueError, match="terminal_agent"):
+            await supervisor_graph.make_supervisor_graph({"configurable": {"terminal_agent": "nobody"}})
+
+
+class TestSummarizeHandoff:
+    def test_long_answers_are_cut_at_a_sentence(self):
+        summary = summarize_handoff("research_agent", [AIMessage("Coats are warm. " * 100)])
+
+        excerpt = summary.split("\n\n")[1]
+        assert excerpt.endswith("warm. …") and len(excerpt) <= 610
@@ -0,0 +1,147 @@
+"""
+백그라운드 작업 테스트
+SQLite 작업 저장소, 작업자 풀 실행, 진행 스트리밍, 동일 요청 캐시 검증
+"""
+
+import asyncio
+
+import pytest
+
+from playground.jobs import FAILED, QUEUED, SUCCEEDED, JobRunner, JobStore, request_key
+from playground.utils.admission import AdmissionController
+
+calls = []
+
+
+async def fake_run(request, emit):
+    """진행 이벤트를 남기고 마지막 메시지를 되돌려주는 가짜 실행"""
+    calls.append(request)
+    prompt = request["messages"][-1]["content"]
+    if prompt == "fail":
+        raise RuntimeError("crawl failed")
+    emit("tool_start", {"tool": "crawl_with_firecrawl"})
+    await asyncio.sleep(0.05)
+    emit("progress", {"tool": "crawl_with_firecrawl", "done": 1, "total": 1, "unit": "pages"})
+    return {"response": f"answer: {prompt}", "tool_calls": []}
+
+
+def user(prompt):
+    return [{"role": "user", "content": prompt}]
+
+
+@pytest.fixture
+def runner(tmp_path):
+    """임시 DB를 쓰는 작업 실행기"""
+    calls.clear()
+    return JobRunner(JobStore(str(tmp_path / "jobs.db")), run=fake_run, workers=2)
+
+
+class TestJobRunner:
+    """작업 실행 테스트"""
+
+    def test_submitted_job_runs_in_background(self, runner):
+        job = runner.submit(user("compare coat prices"), owner="session-1")
+
+        assert job.status == QUEUED
+        done = runner.result(job.id, timeout=5)
+        assert done.status == SUCCEEDED
+        assert done.result["response"] == "answer: compare coat prices"
+        assert [j.id for j in runner.jobs(owner="session-1")] == [job.id]
+
+    def test_failures_are_recorded(self, runner):
+        job = runner.result(runner.submit(user("fail")).id, timeout=5)
+
+        assert job.status == FAILED and "crawl failed" in job.error
+
+    def test_identical_submissions_are_served_from_cache(self, runner):
+        """같은 요청은 실행 중이든 완료됐든 기존 작업을 재사용"""
+        first = runner.submit(user("catalog  of acme"))
+        joined = runner.submit(user("catalog of acme"), configurable={"thread_id": "other"})
+        runner.result(first.id, timeout=5)
+        cached = runner.submit(user("catalog of acme"))
+        fresh = runner.submit(user("catalog of acme"), use_cache=False)
+        runner.result(fresh.id, timeout=5)
+
+        assert joined.id == first.id and cached.id == first.id
+        assert fresh.id != first.id
+        assert len(calls) == 2 and runner.cache_hits == 2
+
+    def test_joined_job_is_listed_for_every_owner(self, runner):
+        """다른 사용자가 같은 요청을 제출하면 그 사용자의 작업 목록에도 표시"""
+        first = runner.submit(user("catalog of acme"), owner="session-1")
+        joined = runner.submit(user("catalog of acme"), owner="session-2")
+
+        assert joined.id == first.id
+        assert [j.id for j in runner.jobs(owner="session-2")] == [first.id]
+        assert [j.id for j in runner.jobs(owner="session-1")] == [first.id]
+        runner.result(first.id, timeout=5)
+
+    def test_jobs_wait_for_admission(self, tmp_path):
+        """작업도 대화형 실행과 같은 승인 제어를 거침"""
+        calls.clear()
+        admission = AdmissionController(max_running=1)
+        runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), run=fake_run, workers=2, admission=admission)
+
+        jobs = [runner.submit(user(f"crawl {i}"), owner=f"session-{i}") for i in range(2)]
+
+        assert all(runner.result(job.id, timeout=5).status == SUCCEEDED for job in jobs)
+        stats = admission.metrics()
+        assert stats["admitted"] == 2 and stats["enqueued"] == 1
+
+    @pytest.mark.asyncio
+    async def test_progress_can_be_streamed(self, runner):
+        job = runner.submit(user("crawl"))
+
+        events = [event async for event in runner.stream(job.id, poll_interval=0.01)]
+
+        assert [e["type"] for e in events] == ["tool_start", "progress", "finished"]
+        assert events[-1]["status"] == SUCCEEDED
+
+    def test_unfinished_jobs_resume_after_restart(self, tmp_path):
+        """이전 프로세스에서 끝나지 않은 작업은 재시작 시 다시 실행"""
+        store = JobStore(str(tmp_path / "jobs.db"))
+        request = {"messages": user("resume me"), "configurable": {}}
+        job = store.create(request, request_key(request))
+        store.claim(job.id)  # interrupted while running
+
+        runner = JobRunner(JobStore(str(tmp_path / "jobs.db")), run=fake_run)
+        runner.start()
+
+        assert runner.result(job.id, timeout=5).result["response"] == "answer: resume me"
+
+
+class TestPartialJobs:
+    """예산 부족으로 잘린 작업 테스트"""
+
+    def test_partial_result_is_not_reused(self, tmp_path, monkeypatch):
+        """단계 예산 1로 잘린 부분 답변은 partial로 기록되고 캐시로 재사용되지 않음"""
+        from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+        from langchain_core.messages import AIMessage
+        from langgraph.prebuilt import create_react_agent
+
+        from playground.agents.supervisor import graph as supervisor_graph
+        from playground.utils.budget import BudgetedChatModel
+
+        class ToolCallingFake(FakeMessagesListChatModel):
+            def bind_tools(self, tools, **kwargs):
+                return self
+
+        handoff = AIMessage("", tool_calls=[{"name": "transfer_to_scrape_agent", "args": {}, "id": "handoff"}])
+        agent_model = BudgetedChatModel(model=ToolCallingFake(responses=[AIMessage("coats found")]),
+                                        node="scrape_agent")
+
+        async def fake_subagents(configurable):
+            return [create_react_agent(agent_model, [], name="scrape_agent")]
+
+        monkeypatch.setattr(supervisor_graph, "create_subagents", fake_subagents)
+        monkeypatch.setattr(supervisor_graph, "load_chat_model",
+                            lambda *args, **kwargs: ToolCallingFake(responses=[handoff]))
+        runner = JobRunner(JobStore(str(tmp_path / "jobs.db")))
+
+        first = runner.result(runner.submit(user("compare coats"), {"step_budget": 1}).id, timeout=10)
+        second = runner.submit(user("compare coats"), {"step_budget": 1})
+
+        assert first.status == SUCCEEDED and first.partial
+        assert first.result["reason"] == "steps"
+        assert second.id != first.id and runner.cache_hits == 0
+        assert runner.result(second.id, timeout=10).partial
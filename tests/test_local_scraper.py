@@ -0,0 +1,329 @@
+"""
+로컬 스크래퍼 테스트
+로컬 HTTP 서버의 픽스처 페이지로 fast-path 스크래핑, Firecrawl 에스컬레이션,
+ETag/Last-Modified 조건부 재요청 검증
+"""
+
+import hashlib
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from playground.tools.fetch import (
+    LOCAL_TIER,
+    REMOTE_TIER,
+    PageStore,
+    ScrapeEngine,
+    UnsafeURL,
+    check_public_url,
+    html_to_markdown,
+    looks_js_rendered,
+)
+
+PRODUCT_PAGE = """<!doctype html>
+<html><head><title>Winter Parka | Shop</title><script>var tracking = 1;</script></head>
+<body>
+<nav><a href="/">Home</a><a href="/men">Men</a></nav>
+<main>
+  <h1>Winter Parka</h1>
+  <p>Price: <strong>₩189,000</strong></p>
+  <p>A warm, water-resistant parka with a detachable hood and recycled down filling.
+     Designed for city commutes in sub-zero temperatures.</p>
+  <ul><li>Color: Black</li><li>Sizes: S, M, L, XL</li></ul>
+  <table><tr><th>Size</th><th>Chest</th></tr><tr><td>M</td><td>110cm</td></tr></table>
+  <a href="/products/parka-2">Similar parka</a>
+</main>
+<footer>Company info</footer>
+</body></html>"""
+
+SPA_PAGE = """<!doctype html>
+<html><head><title>App</title></head>
+<body><noscript>You need to enable JavaScript to run this app.</noscript>
+<div id="root"></div><script src="/static/app.js"></script></body></html>"""
+
+FIXTURE_PAGES = {
+    "/product": (200, PRODUCT_PAGE),
+    "/spa": (200, SPA_PAGE),
+    "/blocked": (403, "<html><body>Access denied</body></html>"),
+}
+
+
+class FixtureHandler(BaseHTTPRequestHandler):
+    """픽스처 페이지를 제공하는 핸들러"""
+
+    hits = []
+
+    def do_GET(self):
+        FixtureHandler.hits.append(self.path)
+        status, body = FIXTURE_PAGES.get(self.path, (404, "not found"))
+        payload = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture(scope="module")
+def fixture_server():
+    """로컬 HTTP 서버 픽스처"""
+    server = ThreadingHTTPServer(("127.0.0.1", 0), FixtureHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+class CatalogHandler(BaseHTTPRequestHandler):
+    """검증자를 지원하는 카탈로그 페이지와 검증자 없이 같은 본문을 주는 페이지"""
+
+    body = PRODUCT_PAGE
+    requests = []
+
+    def do_GET(self):
+        payload = CatalogHandler.body.encode("utf-8")
+        etag = f'"{hashlib.md5(payload).hexdigest()}"'
+        CatalogHandler.requests.append((self.path, self.headers.get("If-None-Match"),
+                                        self.headers.get("If-Modified-Since")))
+        if self.path == "/catalog" and self.headers.get("If-None-Match") == etag:
+            self.send_response(304)
+            self.send_header("ETag", etag)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(payload)))
+        if self.path == "/catalog":
+            self.send_header("ETag", etag)
+            self.send_header("Last-Modified", "Mon, 06 Oct 2025 09:00:00 GMT")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def catalog_server():
+    """조건부 요청을 처리하는 로컬 HTTP 서버"""
+    CatalogHandler.body = PRODUCT_PAGE
+    CatalogHandler.requests = []
+    server = ThreadingHTTPServer(("127.0.0.1", 0), CatalogHandler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+@pytest.fixture
+def remote_calls():
+    """원격(Firecrawl) 호출 기록"""
+    return []
+
+
+@pytest.fixture
+def engine(remote_calls):
+    """원격 호출을 기록하는 ScrapeEngine"""
+    def remote(url):
+        remote_calls.append(url)
+        return f"# Rendered by remote\n\n{url}"
+
+    return ScrapeEngine(remote=remote, timeout=5.0, allow_private_hosts=True)
+
+
+class TestHtmlToMarkdown:
+    """HTML → 마크다운 변환 테스트"""
+
+    def test_converts_structure(self):
+        """헤딩, 리스트, 테이블, 링크 변환"""
+        markdown = html_to_markdown(PRODUCT_PAGE, "https://shop.example/products/parka")
+
+        assert "# Winter Parka" in markdown
+        assert "**₩189,000**" in markdown
+        assert "- Color: Black" in markdown
+        assert "| Size | Chest |" in markdown
+        assert "[Similar parka](https://shop.example/products/parka-2)" in markdown
+
+    def test_drops_chrome_and_scripts(self):
+        """내비게이션, 푸터, 스크립트 제거"""
+        markdown = html_to_markdown(PRODUCT_PAGE)
+
+        assert "tracking" not in markdown
+        assert "Company info" not in markdown
+        assert "Men" not in markdown
+
+
+class TestJsDetection:
+    """JS 렌더링 페이지 감지 테스트"""
+
+    def test_static_page_is_not_js_rendered(self):
+        assert not looks_js_rendered(PRODUCT_PAGE, html_to_markdown(PRODUCT_PAGE))
+
+    def test_spa_shell_is_js_rendered(self):
+        assert looks_js_rendered(SPA_PAGE, html_to_markdown(SPA_PAGE))
+
+
+class TestScrapeEngine:
+    """티어드 스크래핑 엔진 테스트"""
+
+    def test_static_page_uses_local_tier(self, fixture_server, engine, remote_calls):
+        """정적 페이지는 로컬에서 처리"""
+        page = engine.scrape(f"{fixture_server}/product")
+
+        assert page.tier == LOCAL_TIER
+        assert page.title == "Winter Parka | Shop"
+        assert "# Winter Parka" in page.markdown
+        assert remote_calls == []
+        assert engine.domain_tier(fixture_server) == LOCAL_TIER
+
+    def test_js_page_escalates_and_is_remembered(self, fixture_server, engine, remote_calls):
+        """JS 페이지는 Firecrawl로 에스컬레이션하고 도메인별로 기억"""
+        page = engine.scrape(f"{fixture_server}/spa")
+        assert page.tier == REMOTE_TIER
+        assert remote_calls == [f"{fixture_server}/spa"]
+
+        FixtureHandler.hits.clear()
+        page = engine.scrape(f"{fixture_server}/product")
+
+        assert page.tier == REMOTE_TIER
+        assert FixtureHandler.hits == []
+
+    def test_blocked_page_escalates(self, fixture_server, engine, remote_calls):
+        """차단된 페이지는 에스컬레이션"""
+        page = engine.scrape(f"{fixture_server}/blocked")
+
+        assert page.tier == REMOTE_TIER
+        assert remote_calls == [f"{fixture_server}/blocked"]
+
+    def test_remote_pin_expires(self, fixture_server, engine, remote_calls, monkeypatch):
+        """원격 티어 고정은 TTL이 지나면 풀려 로컬을 다시 시도"""
+        engine.scrape(f"{fixture_server}/spa")
+        assert engine.scrape(f"{fixture_server}/product").tier == REMOTE_TIER
+
+        later = time.monotonic() + engine.remote_tier_ttl + 1
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+        page = engine.scrape(f"{fixture_server}/product")
+
+        assert page.tier == LOCAL_TIER and engine.domain_tier(fixture_server) == LOCAL_TIER
+
+    def test_private_hosts_are_rejected(self, fixture_server, remote_calls):
+        """사설·루프백·링크로컬 주소는 요청 전에 거부"""
+        engine = ScrapeEngine(remote=remote_calls.append, timeout=5.0)
+        FixtureHandler.hits.clear()
+
+        with pytest.raises(UnsafeURL):
+            engine.scrape(f"{fixture_server}/product")
+        for url in ("http://10.0.0.8/admin", "http://169.254.169.254/latest/meta-data/",
+                    "http://[::1]:8080/", "file:///etc/passwd"):
+            with pytest.raises(UnsafeURL):
+                check_public_url(url)
+        check_public_url("https://93.184.215.14/products/parka")
+        assert FixtureHandler.hits == [] and remote_calls == []
+
+
+class TestConditionalRefetch:
+    """ETag/Last-Modified 조건부 재요청 테스트"""
+
+    @pytest.fixture
+    def engine(self, remote_calls, tmp_path):
+        return ScrapeEngine(remote=remote_calls.append, timeout=5.0, pages=PageStore(str(tmp_path / "pages.db")),
+                            allow_private_hosts=True)
+
+    def test_not_modified_page_is_reused(self, catalog_server, engine, monkeypatch):
+        """304 응답이면 다시 변환하지 않고 저장된 마크다운을 사용"""
+        url = f"{catalog_server}/catalog"
+        first = engine.scrape(url)
+        conversions = []
+        monkeypatch.setattr("playground.tools.fetch.html_to_markdown", lambda *args: conversions.append(args))
+
+        second = engine.scrape(url)
+
+        etag = f'"{hashlib.md5(PRODUCT_PAGE.encode()).hexdigest()}"'
+        assert CatalogHandler.requests[1] == ("/catalog", etag, "Mon, 06 Oct 2025 09:00:00 GMT")
+        assert second.status_code == 304 and second.unchanged and not first.unchanged
+        assert second.markdown == first.markdown and second.html == first.html and conversions == []
+        stats = engine.fetch_stats()
+        assert (stats["fetches"], stats["not_modified"], stats["changed"]) == (2, 1, 1)
+        assert stats["bytes_fetched"] == stats["bytes_saved"] == len(PRODUCT_PAGE.encode())
+
+    def test_unchanged_body_without_validators_is_reused(self, catalog_server, engine, monkeypatch):
+        """검증자가 없어도 본문 해시가 같으면 변환을 건너뜀"""
+        url = f"{catalog_server}/plain"
+        first = engine.scrape(url)
+        monkeypatch.setattr("playground.tools.fetch.html_to_markdown", lambda *args: pytest.fail("converted"))
+
+        second = engine.scrape(url)
+
+        assert CatalogHandler.requests[1] == ("/plain", None, None)
+        assert second.unchanged and second.markdown == first.markdown
+        assert engine.fetch_stats()["unchanged"] == 1
+
+    def test_changed_page_is_converted_again(self, catalog_server, engine):
+        """내용이 바뀌면 새로 변환하고 저장된 페이지를 갱신"""
+        url = f"{catalog_server}/catalog"
+        engine.scrape(url)
+        CatalogHandler.body = PRODUCT_PAGE.replace("₩189,000", "₩159,000")
+
+        changed = engine.scrape(url)
+        again = engine.scrape(url)
+
+        assert not changed.unchanged and "**₩159,000**" in changed.markdown
+        assert again.unchanged and "**₩159,000**" in again.markdown
+        assert engine.fetch_stats()["changed"] == 2 and engine.fetch_stats()["not_modified"] == 1
+
+    def test_unchanged_page_is_not_indexed_again(self, catalog_server, engine, monkeypatch):
+        """변경 없는 페이지는 상품을 다시 추출하지 않고 신선도만 갱신"""
+        from playground.tools import crawl, products
+
+        store = products.ProductStore(":memory:")
+        extracted = []
+        extract = products.extract_products
+        monkeypatch.setattr(crawl, "scrape_engine", engine)
+        monkeypatch.setattr(products, "get_product_store", lambda: store)
+        monkeypatch.setattr(products, "extract_products", lambda *args: extracted.append(args) or extract(*args))
+        url = f"{catalog_server}/catalog"
+
+        crawl.scrape_with_firecrawl.invoke({"url": url}, config={"configurable": {"run_id": "first"}})
+        fetched_at = store._conn.execute("SELECT fetched_at FROM products").fetchone()[0]
+        crawl.scrape_with_firecrawl.invoke({"url": url}, config={"configurable": {"run_id": "second"}})
+
+        assert len(extracted) == 1 and engine.fetch_stats()["not_modified"] == 1
+        assert store._conn.execute("SELECT fetched_at FROM products").fetchone()[0] > fetched_at
+
+
+class TestScrapeRelevantPages:
+    """관련 페이지 병렬 스크래핑 테스트"""
+
+    def test_parallel_scrapes_are_capped(self, monkeypatch):
+        """top_n이 커도 동시에 가져오는 페이지 수는 상한을 넘지 않음"""
+        from types import SimpleNamespace
+
+        from playground.tools import crawl
+
+        links = [f"https://shop.test/products/coat-{i}" for i in range(20)]
+        lock, running, peak = threading.Lock(), [0], [0]
+
+        def scrape(url):
+            with lock:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            time.sleep(0.05)
+            with lock:
+                running[0] -= 1
+            return None
+
+        monkeypatch.setattr(crawl, "site_maps", SimpleNamespace(
+            get=lambda url: SimpleNamespace(links=links, anchors={}, domain="shop.test")))
+        monkeypatch.setattr(crawl, "scrape_engine", SimpleNamespace(scrape=scrape))
+
+        result = crawl.scrape_relevant_pages.invoke(
+            {"url": "https://shop.test", "query": "coat", "top_n": 20},
+            config={"configurable": {"run_id": "capped"}})
+
+        assert result.count("[Could not scrape") == 20
+        assert peak[0] == crawl.MAX_SCRAPE_WORKERS
@@ -0,0 +1,115 @@
+"""
+적응형 모델 라우팅 테스트
+API 키 없이 가짜 모델로 지연 기반 선택, 장애 전환, 탐색, 후보 로딩 검증
+"""
+
+import time
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+
+from playground.utils.model import AdaptiveChatModel, get_route_stats, load_chat_model
+
+
+class TimedFake(FakeListChatModel):
+    """지연 시간을 흉내 내고 필요하면 실패하는 가짜 모델"""
+
+    delay: float = 0.0
+    fail: bool = False
+
+    def _call(self, *args, **kwargs):
+        time.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503 upstream unavailable")
+        return super()._call(*args, **kwargs)
+
+
+def make_adaptive(node, *candidates, explore_rate=0.0):
+    return AdaptiveChatModel(
+        candidates=list(candidates),
+        candidate_names=[f"fake/{name}" for name in ("a", "b", "c")[:len(candidates)]],
+        node=node,
+        explore_rate=explore_rate,
+    )
+
+
+def served(response):
+    return response.response_metadata["model_route"]["model"]
+
+
+class TestAdaptiveRouting:
+    """후보 선택 테스트"""
+
+    def test_calls_go_to_the_fastest_candidate(self):
+        """모든 후보를 한 번씩 측정한 뒤 중앙 지연이 가장 낮은 후보로 라우팅"""
+        model = make_adaptive("route_fastest", TimedFake(responses=["slow"], delay=0.05),
+                              TimedFake(responses=["fast"], delay=0.0))
+
+        first, second = served(model.invoke("hi")), served(model.invoke("hi"))
+        rest = [served(model.invoke("hi")) for _ in range(5)]
+
+        assert {first, second} == {"fake/a", "fake/b"}
+        assert rest == ["fake/b"] * 5
+        stats = get_route_stats()["route_fastest"]
+        assert stats["fake/a"]["calls"] == 1 and stats["fake/b"]["calls"] == 6
+        assert stats["fake/a"]["p50_s"] > stats["fake/b"]["p50_s"]
+
+    @pytest.mark.asyncio
+    async def test_failing_candidate_falls_over_and_is_avoided(self):
+        """실패한 호출은 다음 후보로 전환하고, 연속 실패한 후보는 쿨다운 동안 제외"""
+        broken = TimedFake(responses=["never"], fail=True)
+        model = make_adaptive("route_failover", broken, TimedFake(responses=["ok"], delay=0.01))
+
+        responses = [await model.ainvoke("hi") for _ in range(6)]
+
+        assert all(r.content == "ok" for r in responses)
+        assert responses[0].response_metadata["model_route"]["failovers"] == ["fake/a"]
+        stats = get_route_stats()["route_failover"]["fake/a"]
+        assert stats["errors"] == 1 and stats["healthy"] is True
+
+        for _ in range(2):
+            model._failed(0, time.monotonic(), RuntimeError("503"), [])
+        assert get_route_stats()["route_failover"]["fake/a"]["healthy"] is False
+        assert served(await model.ainvoke("hi")) == "fake/b"
+
+    def test_all_candidates_failing_raises(self):
+        model = make_adaptive("route_all_fail", TimedFake(responses=["x"], fail=True),
+                              TimedFake(responses=["y"], fail=True))
+
+        with pytest.raises(RuntimeError, match="503"):
+            model.invoke("hi")
+
+    def test_exploration_tries_other_healthy_candidates(self):
+        model = make_adaptive("route_explore", TimedFake(responses=["a"]), TimedFake(responses=["b"]),
+                              explore_rate=1.0)
+        model.invoke("hi")
+        model.invoke("hi")
+
+        response = model.invoke("hi")
+
+        assert response.response_metadata["model_route"]["explored"] is True
+
+
+class TestLoadEquivalents:
+    """동등 모델 후보 로딩 테스트"""
+
+    def test_candidates_without_keys_are_left_out(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.delenv("OPENROUTER_API_KEY", raising=False)
+        monkeypatch.setattr("playground.utils.model.load_env", lambda: None)
+
+        model = load_chat_model("openai/gpt-4.1-mini", node="route_keys",
+                                equivalents={"openai/gpt-4.1-mini": ["openrouter/openai/gpt-4o-mini"]})
+
+        assert not isinstance(model, AdaptiveChatModel)
+
+    def test_equivalents_build_an_adaptive_model(self, monkeypatch):
+        monkeypatch.setenv("OPENAI_API_KEY", "test")
+        monkeypatch.setenv("OPENROUTER_API_KEY", "test")
+
+        model = load_chat_model(["openai/gpt-4.1-nano", "openai/gpt-4.1-mini"], node="route_tiers",
+                                equivalents={"openai/gpt-4.1-mini": ["openrouter/openai/gpt-4o-mini"]})
+
+        assert isinstance(model.tiers[1], AdaptiveChatModel)
+        assert model.tiers[1].candidate_names == ["openai/gpt-4.1-mini", "openrouter/openai/gpt-4o-mini"]
+        assert not isinstance(model.tiers[0], AdaptiveChatModel)
@@ -0,0 +1,75 @@
+"""
+모델 티어 에스컬레이션 테스트
+API 키 없이 가짜 모델로 TieredChatModel 동작 검증
+"""
+
+import pytest
+from langchain_core.language_models.fake_chat_models import FakeMessagesListChatModel
+from langchain_core.messages import AIMessage
+
+from playground.utils.model import TieredChatModel, get_escalation_stats
+
+
+def make_tiered(node, *tier_responses):
+    """티어별 응답 목록으로 TieredChatModel 생성"""
+    return TieredChatModel(
+        tiers=[FakeMessagesListChatModel(responses=list(responses)) for responses in tier_responses],
+        tier_names=[f"fake/tier-{i}" for i in range(len(tier_responses))],
+        node=node,
+    )
+
+
+class TestTierEscalation:
+    """티어 에스컬레이션 테스트"""
+
+    def test_valid_answer_stays_on_first_tier(self):
+        """정상 응답은 첫 번째 티어에서 처리"""
+        model = make_tiered("tiers_valid", [AIMessage(content="4")], [AIMessage(content="four")])
+
+        response = model.invoke("What is 2+2?")
+
+        assert response.content == "4"
+        assert response.response_metadata["model_tier"]["tier"] == 0
+        assert get_escalation_stats()["tiers_valid"]["escalations"] == 0
+
+    @pytest.mark.asyncio
+    async def test_empty_answer_escalates(self):
+        """빈 응답은 다음 티어로 에스컬레이션"""
+        model = make_tiered("tiers_empty", [AIMessage(content="  ")], [AIMessage(content="4")])
+
+        response = await model.ainvoke("What is 2+2?")
+
+        assert response.content == "4"
+        assert response.response_metadata["model_tier"]["escalations"] == ["empty_answer"]
+        stats = get_escalation_stats()["tiers_empty"]
+        assert stats["reasons"] == {"empty_answer": 1}
+        assert stats["served_by"] == {"fake/tier-1": 1}
+
+    def test_malformed_tool_call_escalates(self):
+        """파싱 불가능한 도구 호출은 에스컬레이션"""
+        malformed = AIMessage(
+            content="",
+            invalid_tool_calls=[{"name": "search", "args": "{oops", "id": "1", "error": "bad json"}],
+        )
+        model = make_tiered("tiers_malformed", [malformed], [AIMessage(content="ok")])
+
+        assert model.invoke("hi").content == "ok"
+        assert get_escalation_stats()["tiers_malformed"]["reasons"] == {"malformed_tool_call": 1}
+
+    def test_exhausted_recursion_escalates(self):
+        """남은 스텝이 없는데 도구를 호출하면 에스컬레이션"""
+        tool_call = AIMessage(content="", tool_calls=[{"name": "search", "args": {}, "id": "1"}])
+        model = make_tiered("tiers_recursion", [tool_call], [AIMessage(content="final")])
+        config = {"recursion_limit": 10, "metadata": {"langgraph_step": 9}}
+
+        assert model.invoke("hi", config).content == "final"
+        assert get_escalation_stats()["tiers_recursion"]["reasons"] == {"recursion_exhausted": 1}
+
+    def test_last_tier_is_always_returned(self):
+        """마지막 티어 응답은 검증 실패여도 반환"""
+        model = make_tiered("tiers_last", [AIMessage(content="")], [AIMessage(content="")])
+
+        response = model.invoke("hi")
+
+        assert response.response_metadata["model_tier"]["tier"] == 1
+        assert get_escalation_stats()["tiers_last"]["escalations"] == 1
@@ -0,0 +1,121 @@
+"""
+로컬 상품 인덱스 테스트
+SQLite FTS5 상품 저장소와 상품 정보 추출 검증
+"""
+
+import sqlite3
+
+import pytest
+
+from playground.tools import products
+from playground.tools.products import ProductRecord, ProductStore, extract_products, parse_price
+
+JSON_LD_PAGE = """<html><head>
+<script type="application/ld+json">
+{"@context": "https://schema.org", "@type": "Product", "name": "Down Coat",
+ "brand": {"@type": "Brand", "name": "Acme"},
+ "offers": {"@type": "Offer", "price": "99000", "priceCurrency": "KRW"}}
+</script></head><body><h1>Down Coat</h1></body></html>"""
+
+
+@pytest.fixture
+def store():
+    """인메모리 상품 저장소"""
+    return ProductStore(":memory:")
+
+
+class TestExtraction:
+    """상품 정보 추출 테스트"""
+
+    @pytest.mark.parametrize("text,expected", [
+        ("Price: ₩189,000", (189000.0, "KRW")),
+        ("189,000원", (189000.0, "KRW")),
+        ("USD 12.50", (12.5, "USD")),
+        ("now $1,299.99", (1299.99, "USD")),
+        ("no price here", (None, None)),
+    ])
+    def test_parse_price(self, text, expected):
+        assert parse_price(text) == expected
+
+    def test_json_ld_product(self):
+        """JSON-LD Product 스키마에서 추출"""
+        [record] = extract_products("https://shop.example/coat", JSON_LD_PAGE)
+
+        assert record.title == "Down Coat"
+        assert record.brand == "Acme"
+        assert (record.price, record.currency) == (99000.0, "KRW")
+
+    def test_markdown_fallback(self):
+        """구조화 데이터가 없으면 제목과 본문 가격 사용"""
+        [record] = extract_products("https://shop.example/parka", markdown="# Winter Parka\n\nPrice: ₩189,000")
+
+        assert record.title == "Winter Parka"
+        assert record.price == 189000.0
+
+    def test_only_product_like_search_results_are_indexed(self, store, monkeypatch):
+        """가격이 언급된 뉴스·보고서 스니펫은 상품으로 색인하지 않음"""
+        monkeypatch.setattr(products, "get_product_store", lambda: store)
+
+        indexed = products.index_search_results([
+            {"url": "https://news.example/funding", "title": "Startup funding", "content": "Raised $5 million."},
+            {"url": "https://stocks.example/aapl", "title": "AAPL", "content": "Shares closed at $190.50."},
+            {"url": "https://shop.example/products/parka", "title": "Winter Parka", "content": "₩189,000"},
+            {"url": "https://blog.example/coats", "title": "Down Coat", "content": "Price: $129.99, in stock"},
+        ])
+
+        assert indexed == 2
+        assert sorted(p["title"] for p in store.search("parka coat")) == ["Down Coat", "Winter Parka"]
+
+
+class TestProductStore:
+    """상품 저장소 검색 테스트"""
+
+    def test_search_ranks_and_filters(self, store):
+        """전문 검색, 가격/통화 필터"""
+        store.upsert([
+            ProductRecord(title="Winter Parka | Shop", url="https://a/1", price=189000, currency="KRW"),
+            ProductRecord(title="Down Coat", url="https://a/2", price=99000, currency="KRW", brand="Acme"),
+            ProductRecord(title="Summer Shirt", url="https://a/3", price=10, currency="USD"),
+        ])
+
+        titles = [product["title"] for product in store.search("winter coats")]
+        assert titles == ["Winter Parka", "Down Coat"]
+
+        cheap = store.search("coat", max_price=150000, currency="krw")
+        assert [product["url"] for product in cheap] == ["https://a/2"]
+        with pytest.raises(ValueError):
+            store.search("shirt", max_price=150000)
+        assert store.search("acme")[0]["brand"] == "Acme"
+
+    def test_price_and_currency_are_updated_together(self, store):
+        """통화 없이 들어온 가격은 이전 통화를 물려받지 않음"""
+        [record] = extract_products("https://shop.example/coat", JSON_LD_PAGE.replace('"KRW"', '"krw"'))
+        store.upsert([record])
+        store.upsert([ProductRecord(title="Down Coat", url="https://shop.example/coat", price=79)])
+        store.upsert([ProductRecord(title="Down Coat", url="https://shop.example/coat")])
+
+        [product] = store.search("down coat")
+        assert (record.currency, product["price"], product["currency"]) == ("KRW", 79, None)
+        assert store.search("down coat", max_price=100, currency="KRW") == []
+
+    def test_odd_queries_and_database_errors_do_not_raise(self, store, monkeypatch):
+        """특수문자 질의는 문자로 검색하고, DB 오류는 도구 오류 문자열로 반환"""
+        store.upsert([ProductRecord(title="Down Coat", url="https://a/2", price=99000, currency="KRW")])
+
+        assert [p["url"] for p in store.search('down" OR coat* NOT (NEAR')] == ["https://a/2"]
+
+        class LockedStore:
+            def search(self, *args):
+                raise sqlite3.OperationalError("database is locked")
+
+        monkeypatch.setattr(products, "get_product_store", lambda: LockedStore())
+        result = products.search_local_products.invoke({"query": "coat"})
+        assert result == "Error searching products: database is locked"
+
+    def test_upsert_refreshes_by_url(self, store):
+        """같은 URL은 최신 정보로 갱신"""
+        store.upsert([ProductRecord(title="Down Coat", url="https://a/2", price=99000, currency="KRW")])
+        store.upsert([ProductRecord(title="Down Coat", url="https://a/2", price=79000, currency="KRW")])
+
+        [product] = store.search("down coat")
+        assert product["price"] == 79000
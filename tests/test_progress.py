@@ -0,0 +1,61 @@
+"""
+도구 진행 이벤트 테스트
+커스텀 스트림과 astream_events로 진행 상황이 전달되는지 검증
+"""
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+
+from playground.utils.progress import PROGRESS_EVENT, ProgressReporter
+
+
+@tool
+def fetch_pages(count: int, config: RunnableConfig) -> str:
+    """Fetch count pages."""
+    progress = ProgressReporter("fetch_pages", config, total=count)
+    for done in range(1, count + 1):
+        progress.update(done=done, bytes_received=1000, final=done == count)
+    return "done"
+
+
+def tool_graph():
+    """도구 노드 하나로 구성된 그래프"""
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolNode([fetch_pages]))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return builder.compile()
+
+
+CALL = AIMessage("", tool_calls=[{"name": "fetch_pages", "args": {"count": 20}, "id": "call-1"}])
+
+
+class TestProgressEvents:
+    """진행 이벤트 전달 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_progress_reaches_astream_events(self):
+        """on_custom_event로 전달되고 최종 이벤트는 스로틀링되지 않음"""
+        events = [
+            event async for event in tool_graph().astream_events({"messages": [CALL]}, version="v2")
+            if event["event"] == "on_custom_event" and event["name"] == PROGRESS_EVENT
+        ]
+
+        # 20 updates in a tight loop are throttled down to the first and the final one
+        assert 1 < len(events) < 20
+        final = events[-1]["data"]
+        assert final["final"] and final["done"] == 20 and final["total"] == 20
+        assert final["bytes"] == 20_000
+
+    def test_progress_reaches_custom_stream(self):
+        chunks = list(tool_graph().stream({"messages": [CALL]}, stream_mode="custom"))
+
+        assert chunks[-1][PROGRESS_EVENT]["final"]
+
+    def test_reporter_works_outside_a_graph(self):
+        """그래프 밖에서 직접 호출해도 오류 없음"""
+        assert fetch_pages.invoke({"count": 2}) == "done"
@@ -0,0 +1,49 @@
+"""
+프롬프트 조립 테스트
+정적 지시문과 실행 컨텍스트 분리 검증
+"""
+
+from langchain_core.messages import HumanMessage
+
+from playground.agents.supervisor.configuration import Configuration
+from playground.utils.prompt import build_prompt, is_run_context, run_context
+
+
+class TestRunContext:
+    """실행 컨텍스트 테스트"""
+
+    def test_context_uses_configured_locale_and_timezone(self):
+        context = run_context({"configurable": {"locale": "en-US", "timezone": "America/New_York"}})
+
+        assert "User locale: en-US" in context
+        assert "Default currency: USD" in context
+        assert "Current date:" in context
+
+    def test_default_context_is_korean(self):
+        """기본값은 한국 로케일과 원화"""
+        assert "Default currency: KRW" in run_context()
+
+    def test_prompt_puts_context_after_history(self):
+        """정적 지시문 → 대화 → 실행 컨텍스트 순서"""
+        prompt = build_prompt("You are a shopping agent.")
+
+        messages = prompt({"messages": [HumanMessage("winter coats")]}, {"configurable": {}})
+
+        assert messages[0].content == "You are a shopping agent."
+        assert messages[-1].content.startswith("<run_context>\nRun context:")
+        # Only the leading message is a system message; some providers reject any other
+        assert [m.type for m in messages] == ["system", "human", "human"]
+        assert is_run_context(messages[-1]) and not is_run_context(messages[1])
+
+
+class TestDefaultPrompts:
+    """기본 프롬프트/도구 구성 테스트"""
+
+    def test_agents_do_not_ask_for_the_date(self):
+        """날짜 조회 도구 호출 없이 실행 컨텍스트 사용"""
+        config = Configuration()
+
+        for prompt in (config.scrape_system_prompt, config.research_system_prompt):
+            assert "get today's date" not in prompt
+        for tools in (config.scrape_tools, config.research_tools, config.writing_tools):
+            assert "get_todays_date" not in tools
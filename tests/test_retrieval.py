@@ -0,0 +1,101 @@
+"""
+청크 검색 테스트
+스크랩한 페이지의 청크 분할과 BM25 검색 검증
+"""
+
+from playground.tools.retrieval import (
+    BM25Index,
+    chunk_markdown,
+    search_page_chunks,
+    select_relevant,
+)
+
+SECTIONS = {
+    "Parkas": "Long down parkas with hoods. Warmest option for sub-zero winters.",
+    "Trench Coats": "Classic trench coats in beige and navy, water resistant cotton.",
+    "Puffer Jackets": "Lightweight puffer jackets that pack into their own pocket.",
+    "Wool Coats": "Tailored wool coats, cashmere blend, for office wear.",
+    "Fleece": "Zip-up fleece layers for hiking and cold mornings.",
+}
+CATEGORY_PAGE = "\n\n".join(
+    f"## {title}\n\n" + "\n\n".join([body] * 20) for title, body in SECTIONS.items()
+)
+
+
+def run_config(run_id):
+    """run_id가 지정된 설정"""
+    return {"configurable": {"run_id": run_id}}
+
+
+class TestChunking:
+    """청크 분할 테스트"""
+
+    def test_chunks_keep_heading_context(self):
+        """각 청크는 가장 가까운 헤딩으로 시작"""
+        chunks = chunk_markdown(CATEGORY_PAGE, max_chars=300)
+
+        assert len(chunks) > len(SECTIONS)
+        assert all(chunk.startswith("## ") for chunk in chunks)
+        assert all(len(chunk) <= 400 for chunk in chunks)
+
+
+class TestBM25Index:
+    """BM25 검색 테스트"""
+
+    def test_ranks_relevant_chunk_first(self):
+        index = BM25Index()
+        index.add_page("https://shop.example/coats", CATEGORY_PAGE)
+
+        [best, *_] = index.search("cashmere wool office", k=1)
+
+        assert best.text.startswith("## Wool Coats")
+
+    def test_neighbours_are_included(self):
+        """이웃 청크 포함"""
+        index = BM25Index()
+        chunks = index.add_page("https://shop.example/coats", CATEGORY_PAGE)
+
+        hits = index.search("cashmere", k=1, neighbours=1)
+        positions = [chunk.index for chunk in hits]
+
+        assert len(hits) == 3
+        assert positions == sorted(positions)
+        assert positions[-1] - positions[0] == 2
+        assert all(chunk.total == len(chunks) for chunk in hits)
+
+    def test_rescraped_page_replaces_old_chunks(self):
+        """같은 URL을 다시 스크랩하면 이전 청크는 검색되지 않음"""
+        index = BM25Index()
+        index.add_page("https://shop.example/p", "## Old\n\nvintage leather jacket")
+        index.add_page("https://shop.example/p", "## New\n\nrecycled nylon anorak")
+
+        assert index.search("leather") == []
+        assert index.search("anorak")[0].text.startswith("## New")
+
+
+class TestRetrievalTools:
+    """도구 레벨 검색 테스트"""
+
+    def test_long_page_returns_only_relevant_chunks(self):
+        """긴 페이지는 질의 관련 청크만 반환"""
+        config = run_config("retrieval-long-page")
+
+        result = select_relevant("https://shop.example/coats", CATEGORY_PAGE, "trench coat beige", config)
+
+        assert len(result) < len(CATEGORY_PAGE) / 2
+        assert "Trench Coats" in result
+
+    def test_short_page_is_returned_whole(self):
+        result = select_relevant("https://shop.example/s", "## Short\n\nsmall page", "page", run_config("r"))
+
+        assert result == "## Short\n\nsmall page"
+
+    def test_indexes_are_scoped_per_run(self):
+        """실행(run)별로 인덱스 분리"""
+        select_relevant("https://shop.example/coats", CATEGORY_PAGE, None, run_config("run-a"))
+
+        found = search_page_chunks.invoke({"query": "fleece hiking"}, config=run_config("run-a"))
+        missing = search_page_chunks.invoke({"query": "fleece hiking"}, config=run_config("run-b"))
+
+        assert "Fleece" in found
+        assert missing.startswith("No scraped content")
@@ -0,0 +1,68 @@
+"""
+세션 저장소 테스트
+큰 도구 결과의 디스크 이동, 메모리 예산, 유휴 세션 정리 검증
+"""
+
+import time
+
+import pytest
+
+from playground.utils.session_store import SessionStore, payload_size
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SessionStore(tmp_path / "sessions", budget_bytes=4000, spill_threshold=1000, idle_ttl=60)
+
+
+def entry(*contents):
+    return {"tool_calls": [{"tool_name": "scrape", "tool_args": {"url": "https://shop.test"}}],
+            "tool_results": [{"tool_name": "scrape", "tool_call_id": str(i), "content": content}
+                             for i, content in enumerate(contents)]}
+
+
+class TestSessionStore:
+    """세션 저장소 테스트"""
+
+    def test_large_results_are_spilled_and_loaded_back(self, store):
+        """임계값보다 큰 결과는 미리보기만 메모리에 남고 요청 시 디스크에서 읽음"""
+        page = {"markdown": "x" * 5000, "metadata": {"title": "Coats"}}
+        store.put("s1", 1, entry("small", page))
+
+        small, spilled = store.get("s1", 1)["tool_results"]
+        assert small["content"] == "small" and "spilled" not in small
+        assert spilled["content"].startswith('{"markdown"') and len(spilled["content"]) < 1000
+        assert store.load("s1", spilled["spilled"]["key"]) == page
+        usage = store.usage("s1")
+        assert usage["memory_bytes"] < 1500 and usage["spilled_bytes"] >= payload_size(page)
+
+    def test_oldest_results_are_spilled_over_budget(self, store):
+        """메모리 예산을 넘으면 오래된 메시지의 결과부터 디스크로 이동"""
+        for index in range(1, 5):
+            store.put("s1", index, entry("y" * 900))
+
+        assert store.usage("s1")["memory_bytes"] <= 4000
+        assert "spilled" in store.get("s1", 1)["tool_results"][0]
+        assert "spilled" not in store.get("s1", 2)["tool_results"][0]
+        assert store.get("s1", 4)["tool_results"][0]["content"] == "y" * 900
+
+    def test_idle_sessions_are_evicted(self, store, monkeypatch):
+        """유휴 시간이 지난 세션은 메모리와 디스크에서 모두 제거"""
+        store.put("idle", 1, entry("z" * 2000))
+        key = store.get("idle", 1)["tool_results"][0]["spilled"]["key"]
+        later = time.monotonic() + 120
+        monkeypatch.setattr(time, "monotonic", lambda: later)
+
+        store.touch("active")
+
+        assert store.get("idle", 1) is None and store.load("idle", key) is None
+        assert store.metrics()["sessions"] == 1 and store.metrics()["evicted"] == 1
+
+    def test_clear_removes_session_data(self, store):
+        store.put("s1", 1, entry("z" * 2000))
+        key = store.get("s1", 1)["tool_results"][0]["spilled"]["key"]
+
+        store.clear("s1")
+
+        assert store.get("s1", 1) is None and store.load("s1", key) is None
+        assert store.usage("s1")["memory_bytes"] == 0
@@ -0,0 +1,58 @@
+"""
+사이트맵 캐시와 URL 순위 테스트
+경로 토큰과 앵커 텍스트 기반 URL 선택 검증
+"""
+
+from playground.tools.sitemap import SiteMapCache, landing_anchors, rank_urls
+
+LINKS = [
+    "https://shop.example/",
+    "https://shop.example/men/winter-coats/parka-1234",
+    "https://shop.example/men/winter-coats/parka-1234?utm_source=mail",
+    "https://shop.example/women/dresses/summer-dress-88",
+    "https://shop.example/p/5521",
+    "https://shop.example/help/shipping",
+]
+LANDING = """
+<a href="/p/5521" title="Navy wool coat">Cashmere blend overcoat</a>
+<a href="/help/shipping">Shipping</a>
+<a href="https://elsewhere.example/coats">Partner coats</a>
+"""
+
+
+class TestRankUrls:
+    """URL 순위 테스트"""
+
+    def test_path_tokens_rank_matching_pages_first(self):
+        """경로가 질의와 맞는 URL이 먼저, 정규화 후 중복 URL은 하나만"""
+        ranked = rank_urls("winter parka", LINKS, top_n=3)
+
+        assert ranked == ["https://shop.example/men/winter-coats/parka-1234"]
+
+    def test_anchor_text_ranks_opaque_urls(self):
+        """경로에 단서가 없는 URL은 앵커 텍스트로 순위 결정"""
+        anchors = landing_anchors(LANDING, "https://shop.example/")
+
+        ranked = rank_urls("wool overcoat", LINKS, anchors, top_n=2)
+
+        assert "https://elsewhere.example/coats" not in anchors
+        assert ranked[0] == "https://shop.example/p/5521"
+
+
+class TestSiteMapCache:
+    """도메인별 사이트맵 캐시 테스트"""
+
+    def test_site_is_mapped_once_per_domain(self):
+        calls = []
+
+        def mapper(url):
+            calls.append(url)
+            return LINKS
+
+        # Closed port: the landing page fetch fails fast and anchors stay empty
+        cache = SiteMapCache(mapper=mapper, timeout=1.0)
+        cache.get("http://127.0.0.1:9/")
+        site_map = cache.get("http://127.0.0.1:9/men")
+
+        assert len(calls) == 1
+        assert site_map.links == LINKS
@@ -0,0 +1,90 @@
+"""
+시작 비용 벤치마크 테스트
+패키지 임포트와 그래프 생성이 네트워크 없이 빠르게 끝나는지 검증
+"""
+
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+REPO_ROOT = Path(__file__).resolve().parent.parent
+
+# Generous budgets: they catch network calls and eager heavy imports, not noise
+IMPORT_BUDGET_SECONDS = 10.0
+BUILD_BUDGET_SECONDS = 10.0
+
+# Modules that must only be imported when a tool actually runs
+LAZY_MODULES = ["firecrawl", "langchain_community", "dotenv"]
+
+STARTUP_SCRIPT = """
+import asyncio, json, socket, sys, time
+
+def blocked(*args, **kwargs):
+    raise RuntimeError("network access during startup")
+
+socket.socket.connect = blocked
+socket.create_connection = blocked
+socket.getaddrinfo = blocked
+
+started = time.perf_counter()
+import playground.tools
+import playground.agents.react.graph
+import playground.agents.supervisor.graph as supervisor
+imported = time.perf_counter()
+after_import = [m for m in LAZY_MODULES if m in sys.modules]
+
+graph = asyncio.run(supervisor.make_supervisor_graph({}))
+built = time.perf_counter()
+after_build = [m for m in LAZY_MODULES if m in sys.modules and m != "dotenv"]
+
+print(json.dumps({
+    "import_seconds": imported - started,
+    "build_seconds": built - imported,
+    "lazy_imported_at_import": after_import,
+    "lazy_imported_at_build": after_build,
+    "nodes": list(graph.nodes),
+}))
+"""
+
+
+def run_startup(tmp_path):
+    """네트워크를 차단한 새 인터프리터에서 임포트와 그래프 생성을 측정"""
+    env = {key: value for key, value in os.environ.items()
+           if not key.startswith(("LANGSMITH_", "LANGCHAIN_"))}
+    env.update({
+        "PYTHONPATH": str(REPO_ROOT),
+        "OPENAI_API_KEY": "sk-test",
+        "FIRECRAWL_API_KEY": "fc-test",
+        "TAVILY_API_KEY": "tvly-test",
+    })
+    script = f"LAZY_MODULES = {LAZY_MODULES!r}\n{STARTUP_SCRIPT}"
+    result = subprocess.run([sys.executable, "-c", script], cwd=tmp_path, env=env,
+                            capture_output=True, text=True, timeout=120)
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+@pytest.fixture(scope="module")
+def startup(tmp_path_factory):
+    return run_startup(tmp_path_factory.mktemp("startup"))
+
+
+class TestStartup:
+    """임포트/그래프 생성 비용 테스트"""
+
+    def test_import_is_lazy_and_offline(self, startup):
+        """임포트 시 무거운 의존성과 네트워크를 건드리지 않음"""
+        print(f"import: {startup['import_seconds']:.2f}s, build: {startup['build_seconds']:.2f}s")
+
+        assert startup["lazy_imported_at_import"] == []
+        assert startup["import_seconds"] < IMPORT_BUDGET_SECONDS
+
+    def test_graph_builds_offline(self, startup):
+        """그래프 생성도 네트워크 없이 완료되고 도구 의존성은 실행 시점까지 미룸"""
+        assert "scrape_agent" in startup["nodes"]
+        assert startup["lazy_imported_at_build"] == []
+        assert startup["build_seconds"] < BUILD_BUDGET_SECONDS
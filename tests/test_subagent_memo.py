@@ -0,0 +1,128 @@
+"""
+서브 에이전트 메모이제이션 테스트
+정규화된 위임 작업 + 설정 해시 키, 에이전트별 TTL, 적중 메타데이터 검증
+"""
+
+import time
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from playground.agents.supervisor.memo import get_memo_stats, handoff_task, memoize_agent
+
+RESEARCH_CONFIG = {"model": "openai/gpt-4.1-nano", "selected_tools": ["advanced_research"]}
+
+
+def counting_agent(name, calls):
+    """호출 횟수를 세고 최종 답변을 돌려주는 에이전트 그래프"""
+    def answer(state):
+        calls.append(state["messages"][-1].content)
+        return {"messages": [AIMessage(f"answer #{len(calls)}", name=name)]}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("agent", answer)
+    builder.add_edge(START, "agent")
+    builder.add_edge("agent", END)
+    return builder.compile(name=name)
+
+
+def handed_off(request, call_id="call-1", earlier="earlier question"):
+    """슈퍼바이저가 위임할 때 서브 에이전트가 받는 메시지"""
+    return [
+        HumanMessage(earlier),
+        AIMessage("earlier answer"),
+        HumanMessage(request),
+        AIMessage("", tool_calls=[{"name": "transfer_to_general_research_agent", "args": {}, "id": call_id}]),
+        ToolMessage("Successfully transferred to general_research_agent", tool_call_id=call_id),
+    ]
+
+
+class TestHandoffTask:
+    """위임 작업 정규화 테스트"""
+
+    def test_task_ignores_handoff_ids_and_whitespace(self):
+        assert (handoff_task(handed_off("Research  top-rated winter coats", "call-1"))
+                == handoff_task(handed_off("research top-rated winter coats\n", "call-2")))
+
+    def test_task_covers_only_the_current_turn(self):
+        assert "earlier" not in handoff_task(handed_off("Research winter coats"))
+
+
+class TestMemoizeAgent:
+    """메모 래퍼 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_repeated_task_is_answered_from_memo(self):
+        """같은 작업의 두 번째 위임은 에이전트를 실행하지 않고 캐시 답변 반환"""
+        calls = []
+        agent = memoize_agent(counting_agent("research_memo_hit", calls), 60, RESEARCH_CONFIG)
+
+        first = await agent.ainvoke({"messages": handed_off("Research winter coats")})
+        second = await agent.ainvoke({"messages": handed_off("research  winter coats", "call-9")})
+
+        assert len(calls) == 1
+        assert second["messages"][-1].content == first["messages"][-1].content == "answer #1"
+        assert second["messages"][-1].response_metadata["memo"]["hit"] is True
+        assert get_memo_stats()["research_memo_hit"] == {"hits": 1, "misses": 1}
+
+    def test_different_config_or_task_misses(self):
+        calls = []
+        agent = memoize_agent(counting_agent("research_memo_miss", calls), 60, RESEARCH_CONFIG)
+        other_model = memoize_agent(counting_agent("research_memo_miss", calls), 60,
+                                    {**RESEARCH_CONFIG, "model": "openai/gpt-4.1"})
+
+        agent.invoke({"messages": handed_off("Research winter coats")})
+        agent.invoke({"messages": handed_off("Research rain boots")})
+        other_model.invoke({"messages": handed_off("Research winter coats")})
+
+        assert len(calls) == 3
+
+    def test_follow_ups_in_other_conversations_miss(self):
+        """같은 후속 질문이라도 이전 대화가 다르면 다른 스레드의 답변을 재사용하지 않음"""
+        calls = []
+        agent = memoize_agent(counting_agent("research_memo_follow_up", calls), 60, RESEARCH_CONFIG)
+
+        agent.invoke({"messages": handed_off("and the cheaper one?", earlier="compare winter coats")})
+        other = agent.invoke({"messages": handed_off("and the cheaper one?", earlier="compare rain boots")})
+        same = agent.invoke({"messages": handed_off("And the cheaper one?", earlier="Compare winter coats")})
+
+        assert len(calls) == 2
+        assert "memo" not in other["messages"][-1].response_metadata
+        assert same["messages"][-1].response_metadata["memo"]["hit"] is True
+
+    def test_expired_answers_are_recomputed(self):
+        calls = []
+        agent = memoize_agent(counting_agent("research_memo_ttl", calls), 0.05, RESEARCH_CONFIG)
+
+        agent.invoke({"messages": handed_off("Research winter coats")})
+        time.sleep(0.1)
+        agent.invoke({"messages": handed_off("Research winter coats")})
+
+        assert len(calls) == 2
+
+    def test_partial_answers_are_not_memoized(self):
+        """예산 소진으로 잘린 부분 답변은 캐시하지 않음"""
+        calls = []
+
+        def partial(state):
+            calls.append(state["messages"][-1].content)
+            return {"messages": [AIMessage("half an answer", name="research_memo_partial",
+                                           response_metadata={"budget": {"partial": True, "reason": "time"}})]}
+
+        builder = StateGraph(MessagesState)
+        builder.add_node("agent", partial)
+        builder.add_edge(START, "agent")
+        builder.add_edge("agent", END)
+        agent = memoize_agent(builder.compile(name="research_memo_partial"), 60, RESEARCH_CONFIG)
+
+        agent.invoke({"messages": handed_off("Research winter coats")})
+        second = agent.invoke({"messages": handed_off("Research winter coats")})
+
+        assert len(calls) == 2
+        assert second["messages"][-1].response_metadata["budget"]["partial"] is True
+
+    def test_memoization_is_opt_in(self):
+        agent = counting_agent("research_memo_off", [])
+
+        assert memoize_agent(agent, None, RESEARCH_CONFIG) is agent
@@ -0,0 +1,145 @@
+"""
+도구 동시 실행 테스트
+병렬 도구 호출의 동시성 상한과 호출별 타임아웃 검증
+"""
+
+import threading
+import time
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.tools import tool
+from langgraph.graph import END, START, MessagesState, StateGraph
+from langgraph.prebuilt import ToolNode
+
+from playground.tools.concurrency import ToolLimiter, limit_tools, tool_stop
+
+threads_used = []
+
+
+@tool
+def slow_scrape(url: str) -> str:
+    """Scrape a page slowly (sync, like the Firecrawl tools)."""
+    threads_used.append(threading.current_thread().name)
+    time.sleep(0.3)
+    return f"scraped {url}"
+
+
+stopped = []
+
+
+@tool
+def polling_crawl(url: str, config: RunnableConfig) -> str:
+    """Crawl a site, polling the stop signal like the Firecrawl crawl does."""
+    for _ in range(100):
+        if tool_stop(config).stopped:
+            stopped.append(url)
+            return "stopped"
+        time.sleep(0.01)
+    return f"crawled {url}"
+
+
+def parallel_calls(count):
+    """한 턴에 여러 도구 호출을 담은 메시지"""
+    return AIMessage("", tool_calls=[
+        {"name": "slow_scrape", "args": {"url": f"https://shop.example/{i}"}, "id": f"call-{i}"}
+        for i in range(count)
+    ])
+
+
+def tool_graph(limiter):
+    """제한된 도구 노드 하나로 구성된 그래프"""
+    builder = StateGraph(MessagesState)
+    builder.add_node("tools", ToolNode(limit_tools([slow_scrape], limiter)))
+    builder.add_edge(START, "tools")
+    builder.add_edge("tools", END)
+    return builder.compile()
+
+
+async def run_calls(limiter, count):
+    """제한된 도구로 병렬 호출 실행, (도구 결과 메시지, 소요 시간) 반환"""
+    started = time.perf_counter()
+    result = await tool_graph(limiter).ainvoke({"messages": [parallel_calls(count)]})
+    return result["messages"][1:], time.perf_counter() - started
+
+
+class TestToolConcurrency:
+    """동시성 상한 테스트"""
+
+    @pytest.mark.asyncio
+    async def test_parallel_calls_take_as_long_as_the_slowest(self):
+        """상한 안의 호출은 동시에 실행되고 전용 스레드 풀 사용"""
+        threads_used.clear()
+
+        messages, elapsed = await run_calls(ToolLimiter(max_concurrency=3, name="research"), 3)
+
+        assert [m.content for m in messages] == [f"scraped https://shop.example/{i}" for i in range(3)]
+        assert elapsed < 0.6
+        assert all(name.startswith("research-tools") for name in threads_used)
+
+    @pytest.mark.asyncio
+    async def test_cap_limits_calls_in_flight(self):
+        _, elapsed = await run_calls(ToolLimiter(max_concurrency=1), 3)
+
+        assert elapsed >= 0.9
+
+    @pytest.mark.asyncio
+    async def test_slow_call_times_out_as_error_message(self):
+        """타임아웃된 호출은 오류 ToolMessage로 반환"""
+        limiter = ToolLimiter(max_concurrency=2, timeout=0.1)
+
+        messages, elapsed = await run_calls(limiter, 2)
+
+        assert elapsed < 0.3
+        assert all(m.status == "error" and "did not finish" in m.content for m in messages)
+        assert limiter.timeouts == 2
+
+    def test_sync_invocation_is_limited_too(self):
+        graph = tool_graph(ToolLimiter(max_concurrency=3))
+
+        started = time.perf_counter()
+        result = graph.invoke({"messages": [parallel_calls(3)]})
+
+        assert len(result["messages"]) == 4
+        assert time.perf_counter() - started < 0.6
+
+    @pytest.mark.asyncio
+    async def test_run_and_arun_go_through_the_limiter(self):
+        """BaseTool.run/arun으로 직접 호출해도 상한과 타임아웃 적용"""
+        limiter = ToolLimiter(max_concurrency=1, timeout=0.1)
+        limited = limit_tools([slow_scrape], limiter)[0]
+
+        assert "did not finish" in limited.run({"url": "https://shop.example/a"})
+        assert "did not finish" in await limited.arun({"url": "https://shop.example/b"})
+        assert limiter.timeouts == 2
+        assert limit_tools([slow_scrape], ToolLimiter())[0].run({"url": "x"}) == "scraped x"
+
+    def test_timed_out_sync_call_is_signalled_to_stop(self):
+        """타임아웃된 동기 도구는 설정의 중단 신호를 받아 스스로 멈춤"""
+        stopped.clear()
+        limiter = ToolLimiter(max_concurrency=1, timeout=0.05)
+        limited = limit_tools([polling_crawl], limiter)[0]
+
+        results = [limited.invoke({"url": f"https://shop.example/{i}"}) for i in range(2)]
+        limiter.executor.shutdown(wait=True)
+
+        assert all("did not finish" in result for result in results)
+        assert stopped == ["https://shop.example/0", "https://shop.example/1"]
+        assert limiter.timeouts == 2
+
+    @pytest.mark.asyncio
+    async def test_slot_is_held_until_an_ignoring_thread_returns(self):
+        """중단 신호를 무시하는 스레드가 끝나기 전에는 다음 호출이 시작되지 않음"""
+        threads_used.clear()
+        limiter = ToolLimiter(max_concurrency=1, timeout=0.05)
+        limited = limit_tools([slow_scrape], limiter)[0]
+
+        started = time.perf_counter()
+        first = await limited.ainvoke({"url": "https://shop.example/a"})
+        second = await limited.ainvoke({"url": "https://shop.example/b"})
+
+        assert "did not finish" in first and "did not finish" in second
+        # The second call waited for the first thread (0.3s) before starting
+        assert time.perf_counter() - started >= 0.3
+        assert len(threads_used) == 2
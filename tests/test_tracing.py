@@ -0,0 +1,78 @@
+"""
+구조화 트레이싱 테스트
+JSONL 출력, 페이로드 축약, 실행 단위 샘플링 검증
+"""
+
+import json
+
+import pytest
+
+from playground.utils.tracing import configure_tracing, span, summarize, trace
+
+
+def run_config(run_id, thread_id="thread-1"):
+    """run_id/thread_id가 지정된 설정"""
+    return {"configurable": {"run_id": run_id, "thread_id": thread_id}}
+
+
+def read_events(path):
+    """기록된 JSONL 이벤트 읽기"""
+    return [json.loads(line) for line in path.read_text().splitlines()]
+
+
+@pytest.fixture
+def trace_file(tmp_path):
+    """임시 파일로 트레이스를 기록하고 테스트 후 기본 설정 복원"""
+    path = tmp_path / "traces.jsonl"
+    yield path
+    configure_tracing(None)
+
+
+class TestSummarize:
+    """페이로드 축약 테스트"""
+
+    def test_long_text_becomes_preview_and_hash(self):
+        summary = summarize("x" * 10_000, max_chars=100)
+
+        assert summary["chars"] == 10_000
+        assert len(summary["preview"]) == 100
+        assert len(summary["sha256"]) == 16
+
+    def test_long_lists_keep_only_head(self):
+        """긴 리스트는 개수와 앞부분만 유지"""
+        summary = summarize([{"url": f"https://x.example/{i}"} for i in range(10)])
+
+        assert summary["items"] == 10
+        assert len(summary["head"]) == 5
+
+
+class TestTracer:
+    """트레이스 기록 테스트"""
+
+    def test_events_are_written_as_json_lines(self, trace_file):
+        """실행/스레드 ID가 붙은 JSONL로 기록"""
+        tracer = configure_tracing(str(trace_file), max_chars=50)
+
+        trace("scrape", run_config("run-1"), url="https://shop.example", markdown="m" * 500)
+        with span("build", run_config("run-1")) as attributes:
+            attributes["nodes"] = 4
+        tracer.flush()
+
+        scrape, build = read_events(trace_file)
+        assert scrape["run_id"] == "run-1" and scrape["thread_id"] == "thread-1"
+        assert scrape["markdown"]["chars"] == 500
+        assert build["nodes"] == 4 and build["duration_ms"] >= 0
+
+    def test_sampling_is_per_run_and_keeps_errors(self, trace_file):
+        """샘플링 제외된 실행도 오류는 기록"""
+        tracer = configure_tracing(str(trace_file), sample_rate=0.0)
+
+        trace("search", run_config("run-2"), result=["a", "b"])
+        with pytest.raises(ValueError):
+            with span("scrape", run_config("run-2")):
+                raise ValueError("blocked")
+        tracer.flush()
+
+        [event] = read_events(trace_file)
+        assert event["level"] == "error"
+        assert "blocked" in event["error"]